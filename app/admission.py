@@ -0,0 +1,277 @@
+#Admission control: per-lane concurrency / row budgets with bounded queueing and load shedding
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from app.monitoring.prometheus import GaugeFamily
+
+
+# shed reasons: (HTTP status, retry makes sense)
+SHED_REASONS: Dict[str, Tuple[int, bool]] = {
+    "queue_full": (429, True),      # too many requests already waiting
+    "queue_timeout": (503, True),   # waited longer than the queue-time budget
+    "too_large": (413, False),      # more rows than the lane's whole budget
+}
+
+
+class LoadShed(Exception):
+    """A request refused by the admission controller."""
+
+    def __init__(self, lane: str, reason: str, retry_after_s: Optional[int], detail: str):
+        super().__init__(detail)
+        self.lane = lane
+        self.reason = reason
+        self.status_code = SHED_REASONS[reason][0]
+        self.retry_after_s = retry_after_s
+        self.detail = detail
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after_s)} if self.retry_after_s is not None else {}
+
+
+class AdmissionLane:
+    """
+    Budget of one traffic class (e.g. single rows vs batches).
+
+    A request holds one concurrency slot and `n_rows` rows of the row
+    budget while it runs. When they are not available it waits in FIFO
+    order, at most `max_queue` waiters for at most `max_queue_ms`;
+    beyond that it is shed instead of piling up.
+
+    Requests with a body are admitted before it is read, on a row cost
+    estimated from its size (`bytes_per_row`); bodies over
+    `max_body_bytes` are refused without being read.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int,
+        max_rows: int,
+        max_queue: int,
+        max_queue_ms: float,
+        max_body_bytes: Optional[int] = None,
+        bytes_per_row: int = 200,
+    ):
+        if max_concurrency < 1 or max_rows < 1:
+            raise ValueError("max_concurrency and max_rows must be >= 1")
+        if max_queue < 0 or max_queue_ms < 0:
+            raise ValueError("max_queue and max_queue_ms must be >= 0")
+        if (max_body_bytes is not None and max_body_bytes < 1) or bytes_per_row < 1:
+            raise ValueError("max_body_bytes and bytes_per_row must be >= 1")
+
+        self.name = name
+        self.max_concurrency = int(max_concurrency)
+        self.max_rows = int(max_rows)
+        self.max_queue = int(max_queue)
+        self.max_queue_s = float(max_queue_ms) / 1000.0
+        self.max_body_bytes = int(max_body_bytes) if max_body_bytes is not None else None
+        self.bytes_per_row = int(bytes_per_row)
+
+        self.in_flight = 0
+        self.rows_in_flight = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+        # EWMA of how long a request holds its slot (Retry-After estimate)
+        self._hold_s = 0.0
+
+        # metrics
+        self.admitted = 0
+        self.queued = 0
+        self.shed: Dict[str, int] = {reason: 0 for reason in SHED_REASONS}
+        self.max_queue_depth = 0
+        self.total_queue_s = 0.0
+
+    def _fits(self, n_rows: int) -> bool:
+        return self.in_flight < self.max_concurrency and self.rows_in_flight + n_rows <= self.max_rows
+
+    def _take(self, n_rows: int) -> None:
+        self.in_flight += 1
+        self.rows_in_flight += n_rows
+        self.admitted += 1
+
+    def retry_after_s(self) -> int:
+        # time for the requests ahead to drain, in whole seconds (>= 1)
+        ahead = len(self._waiters) + self.in_flight
+        return max(1, math.ceil(self._hold_s * ahead / self.max_concurrency))
+
+    def body_cost(self, n_bytes: Optional[int]) -> int:
+        """
+        Provisional row cost of a body not read yet: its size over
+        `bytes_per_row`, capped at the row budget. A body of unknown size
+        (no Content-Length) counts as the largest one allowed.
+        """
+        if n_bytes is not None and self.max_body_bytes is not None and n_bytes > self.max_body_bytes:
+            raise LoadShed(
+                self.name, "too_large", None,
+                f"{n_bytes} byte body exceeds the {self.name} limit ({self.max_body_bytes}); split the request",
+            )
+        if n_bytes is None:
+            if self.max_body_bytes is None:
+                return self.max_rows
+            n_bytes = self.max_body_bytes
+        return min(max(math.ceil(n_bytes / self.bytes_per_row), 1), self.max_rows)
+
+    async def acquire(self, n_rows: int) -> None:
+        if n_rows > self.max_rows:
+            raise LoadShed(
+                self.name, "too_large", None,
+                f"{n_rows} rows exceed the {self.name} row budget ({self.max_rows}); split the request",
+            )
+        if not self._waiters and self._fits(n_rows):
+            self._take(n_rows)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise LoadShed(self.name, "queue_full", self.retry_after_s(), f"Too many queued {self.name} requests")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((n_rows, waiter))
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        start = time.perf_counter()
+        try:
+            # _wake takes the budget on the waiter's behalf before resolving it
+            await asyncio.wait_for(waiter, timeout=self.max_queue_s)
+        except asyncio.TimeoutError:
+            raise LoadShed(
+                self.name, "queue_timeout", self.retry_after_s(),
+                f"{self.name} request waited over {self.max_queue_s * 1000:.0f} ms for capacity",
+            ) from None
+        finally:
+            self.total_queue_s += time.perf_counter() - start
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove((n_rows, waiter))
+                except ValueError:
+                    pass
+
+    def release(self, n_rows: int, hold_s: float) -> None:
+        self.in_flight -= 1
+        self.rows_in_flight -= n_rows
+        self._hold_s = hold_s if self._hold_s == 0.0 else 0.8 * self._hold_s + 0.2 * hold_s
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            n_rows, waiter = self._waiters[0]
+            if waiter.done():  # timed out / cancelled
+                self._waiters.popleft()
+                continue
+            if not self._fits(n_rows):
+                return
+            self._waiters.popleft()
+            self._take(n_rows)
+            waiter.set_result(None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_rows": self.max_rows,
+            "max_queue": self.max_queue,
+            "max_queue_ms": round(self.max_queue_s * 1000.0, 3),
+            "max_body_bytes": self.max_body_bytes,
+            "in_flight": self.in_flight,
+            "rows_in_flight": self.rows_in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "avg_queue_ms": round(self.total_queue_s / self.queued * 1000.0, 3) if self.queued else 0.0,
+            "shed": dict(self.shed),
+        }
+
+
+class AdmissionController:
+    """
+    Admission control for the inference endpoints.
+
+    Single-row and batch traffic get separate lanes, so a burst of large
+    batches uses up the batch budget and queue, never the slots single
+    predictions need. Requests beyond a lane's queue are refused at once
+    (429), requests that wait longer than the queue-time budget get 503,
+    both with Retry-After; a batch larger than the whole row budget gets
+    413. Batch bodies are admitted before they are read or parsed (see
+    `admit_body`), so a burst of large bodies is shed instead of decoded.
+    `on_shed(lane, reason)` is called for every refused request.
+
+    Lanes are only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        lanes: Dict[str, AdmissionLane],
+        on_shed: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.lanes = lanes
+        self.on_shed = on_shed
+
+    def _record(self, e: LoadShed) -> LoadShed:
+        self.lanes[e.lane].shed[e.reason] += 1
+        if self.on_shed is not None:
+            self.on_shed(e.lane, e.reason)
+        return e
+
+    @asynccontextmanager
+    async def admit(self, lane: str, n_rows: int = 1) -> AsyncIterator[None]:
+        budget = self.lanes[lane]
+        n_rows = max(int(n_rows), 1)
+        try:
+            await budget.acquire(n_rows)
+        except LoadShed as e:
+            raise self._record(e)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            budget.release(n_rows, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def admit_body(self, lane: str, n_bytes: Optional[int]) -> AsyncIterator[None]:
+        """
+        Admit a request whose body is not read yet, on the row cost its
+        declared size (Content-Length, None if absent) stands for.
+        """
+        try:
+            n_rows = self.lanes[lane].body_cost(n_bytes)
+        except LoadShed as e:
+            raise self._record(e)
+        async with self.admit(lane, n_rows):
+            yield
+
+    def too_large(self, lane: str, detail: str) -> LoadShed:
+        """A counted 413 for a body found too large once read or decoded."""
+        return self._record(LoadShed(lane, "too_large", None, detail))
+
+    def check_rows(self, lane: str, n_rows: int) -> None:
+        """413 for a decoded body with more rows than the lane's whole budget."""
+        max_rows = self.lanes[lane].max_rows
+        if n_rows > max_rows:
+            raise self.too_large(lane, f"{n_rows} rows exceed the {lane} row budget ({max_rows}); split the request")
+
+    # ------------------------------------------------------------------
+    # Metrics (shed counts live in MetricsStore, via on_shed)
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        return {name: lane.get_metrics() for name, lane in self.lanes.items()}
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`)."""
+        label_sets = [{"lane": name} for name in self.lanes]
+        lanes = list(self.lanes.values())
+        return (
+            GaugeFamily("admission_in_flight", "Requests holding an admission slot.", label_sets)
+            .render([lane.in_flight for lane in lanes])
+            + GaugeFamily("admission_rows_in_flight", "Rows held by admitted requests.", label_sets)
+            .render([lane.rows_in_flight for lane in lanes])
+            + GaugeFamily("admission_queue_depth", "Requests waiting for admission.", label_sets)
+            .render([len(lane._waiters) for lane in lanes])
+        )
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+from app.model_loader import LoadedModelPackage
+from app.predict import _build_matrix
+from app.schemas import PredictResponse
+
+
+# (package the request captured, feature dict, caller's future)
+_Item = Tuple[LoadedModelPackage, Dict[str, float], Future]
+
+
+class MicroBatcher:
+    """
+    Opt-in dynamic batching for single-row /predict calls.
+
+    Concurrent callers submit one feature dict each, with the package
+    their request captured; a background thread coalesces them for up to
+    `max_wait_ms` or `max_batch_size` rows, scores each package's rows
+    with a single LoadedModelPackage.predict_proba_matrix call and resolves
+    each caller's Future with its own PredictResponse. Rows queued before
+    a hot swap are still scored on the package they were submitted with.
+
+    Tree ensembles pay most of their cost per call, not per row, so
+    scoring 32 rows together costs little more than scoring one.
+
+    Batches are scored on the batcher thread itself, not through the
+    InferenceExecutor: with INFERENCE_EXECUTOR=process, batched /predict
+    calls still run in the API process (one batch at a time).
+
+    Once stop() is called (or the worker thread is gone) submit() fails
+    the caller's future right away, and stop() fails whatever is still
+    queued after the worker exits, so no caller waits forever.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_s = float(max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue[_Item]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        # makes "check running + enqueue" atomic with stop()
+        self._lock = threading.Lock()
+
+        # metrics
+        self.total_batches = 0
+        self.total_rows = 0
+        self.failed_batches = 0
+        self.max_batch_size_seen = 0
+        self.max_queue_depth = 0
+        self.batch_size_counts: Dict[int, int] = {}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="predict-micro-batcher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._stopping.set()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=timeout)
+        # rows the worker did not get to (join timed out, or it had died)
+        self._fail_pending(RuntimeError("micro-batcher stopped before scoring the request"))
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        while True:
+            try:
+                _, _, fut = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if not fut.done():
+                fut.set_exception(exc)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, pkg: LoadedModelPackage, row: Dict[str, float]) -> "Future[PredictResponse]":
+        fut: Future = Future()
+        with self._lock:
+            # rows submitted before start() wait for the worker
+            accepting = not self._stopping.is_set() and (
+                self._thread is None or self._thread.is_alive()
+            )
+            if accepting:
+                self._queue.put((pkg, row, fut))
+        if not accepting:
+            fut.set_exception(RuntimeError("micro-batcher is stopped"))
+            return fut
+
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+        return fut
+
+    def predict(
+        self,
+        pkg: LoadedModelPackage,
+        row: Dict[str, float],
+        timeout: float | None = None,
+    ) -> PredictResponse:
+        return self.submit(pkg, row).result(timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def _collect(self) -> List[_Item]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_s
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _score(self, batch: List[_Item]) -> None:
+        # one scoring call per package; a batch spans two only around a swap
+        groups: Dict[int, List[_Item]] = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+        for items in groups.values():
+            self._score_package(items[0][0], items)
+
+    def _score_package(self, pkg: LoadedModelPackage, items: List[_Item]) -> None:
+        rows = [row for _, row, _ in items]
+        futures = [fut for _, _, fut in items]
+
+        try:
+            probas = pkg.predict_proba_matrix(_build_matrix(rows, pkg.input_features))
+        except Exception as e:
+            self.failed_batches += 1
+            for fut in futures:
+                fut.set_exception(e)
+            return
+
+        for fut, proba in zip(futures, probas):
+            proba = float(proba)
+            fut.set_result(
+                PredictResponse(
+                    probability=round(proba, 6),
+                    prediction=int(proba >= pkg.threshold),
+                    threshold_used=pkg.threshold,
+                )
+            )
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if not batch:
+                continue
+
+            n = len(batch)
+            self.total_batches += 1
+            self.total_rows += n
+            self.max_batch_size_seen = max(self.max_batch_size_seen, n)
+            self.batch_size_counts[n] = self.batch_size_counts.get(n, 0) + 1
+
+            try:
+                self._score(batch)
+            except Exception as e:
+                # keep the worker alive; nobody in this batch is left waiting
+                self.failed_batches += 1
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        avg_batch_size = (
+            self.total_rows / self.total_batches
+            if self.total_batches > 0
+            else 0.0
+        )
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait_s * 1000.0, 3),
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "total_batches": self.total_batches,
+            "total_rows": self.total_rows,
+            "failed_batches": self.failed_batches,
+            "avg_batch_size": round(avg_batch_size, 3),
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+        }
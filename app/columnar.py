@@ -0,0 +1,157 @@
+#Column-oriented batch payloads: Arrow IPC stream or JSON {feature: [values]}
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Mapping
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # pyarrow is imported by the first Arrow request, not at API start-up
+    import pyarrow as pa
+
+try:  # optional fast JSON codec
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on environment
+    import json
+
+    orjson = None
+    _loads = json.loads
+
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+ColumnBatch = Dict[str, np.ndarray]
+
+
+def is_arrow(media_type: str | None) -> bool:
+    return bool(media_type) and ARROW_STREAM_MEDIA_TYPE in media_type
+
+
+# ------------------------------------------------------------------
+# Decoding
+# ------------------------------------------------------------------
+def _arrow_column(column: pa.ChunkedArray) -> np.ndarray:
+    import pyarrow as pa
+
+    if column.num_chunks == 1 and column.null_count == 0 and pa.types.is_float64(column.type):
+        # a read-only view into the request body
+        return column.chunk(0).to_numpy(zero_copy_only=True)
+
+    try:
+        column = column.cast(pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Column is not numeric: {e}") from e
+    # nulls come back as NaN
+    return column.to_numpy()
+
+
+def decode_arrow_columns(body: bytes) -> ColumnBatch:
+    """Columns of an Arrow IPC stream as float64 arrays."""
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Arrow IPC stream: {e}") from e
+
+    return {
+        name: _arrow_column(column)
+        for name, column in zip(table.column_names, table.columns)
+    }
+
+
+def _float_or_nan(value: Any) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+
+def _json_column(name: str, values: Any) -> np.ndarray:
+    if not isinstance(values, list):
+        raise ValueError(f"Column {name!r} must be a list of values")
+    try:
+        column = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # non-numeric cells become NaN and fail validation
+        column = np.array([_float_or_nan(v) for v in values], dtype=np.float64)
+    if column.ndim != 1:
+        raise ValueError(f"Column {name!r} must be a flat list of numbers")
+    return column
+
+
+def decode_json_columns(body: bytes) -> ColumnBatch:
+    """Columns of a JSON object {feature: [values...]} as float64 arrays."""
+    try:
+        payload = _loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON body: {e}") from e
+
+    if not isinstance(payload, dict):
+        raise ValueError("Expected a JSON object of feature -> list of values")
+
+    return {name: _json_column(name, values) for name, values in payload.items()}
+
+
+def decode_columns(body: bytes, media_type: str | None) -> ColumnBatch:
+    """
+    Decode a columnar batch body (Arrow IPC stream, else JSON).
+
+    Raises ValueError on a malformed body or columns of unequal length.
+    """
+    columns = decode_arrow_columns(body) if is_arrow(media_type) else decode_json_columns(body)
+
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+
+    return columns
+
+
+# ------------------------------------------------------------------
+# Encoding
+# ------------------------------------------------------------------
+def encode_arrow_predictions(
+    probabilities: np.ndarray,
+    predictions: np.ndarray,
+    threshold: float,
+) -> bytes:
+    """Arrow IPC stream with `probability` (float64) and `prediction` (int8)."""
+    import pyarrow as pa
+
+    table = pa.table(
+        {
+            "probability": pa.array(probabilities, type=pa.float64()),
+            "prediction": pa.array(predictions, type=pa.int8()),
+        }
+    ).replace_schema_metadata({"threshold_used": repr(float(threshold))})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_json_predictions(
+    probabilities: np.ndarray,
+    predictions: np.ndarray,
+    threshold: float,
+) -> bytes:
+    """JSON {threshold_used, n_rows, probability: [...], prediction: [...]}."""
+    payload: Mapping[str, Any] = {
+        "threshold_used": float(threshold),
+        "n_rows": int(len(probabilities)),
+        "probability": np.round(probabilities, 6),
+        "prediction": np.asarray(predictions, dtype=np.int8),
+    }
+
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    return json.dumps(  # pragma: no cover - depends on environment
+        {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in payload.items()}
+    ).encode()
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import operator
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.flat_trees import FLAT_TREES_MAX_ROWS
+
+if TYPE_CHECKING:
+    # sklearn is imported when a pipeline is compiled, not with this module
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import FunctionTransformer, PowerTransformer, StandardScaler
+
+
+# A compiled step takes a 2D float64 array and returns a 2D float64 array.
+ArrayStep = Callable[[np.ndarray], np.ndarray]
+
+
+def _passthrough(X: np.ndarray) -> np.ndarray:
+    return X
+
+
+def _compile_function_transformer(tf: FunctionTransformer) -> ArrayStep:
+    func = tf.func if tf.func is not None else _passthrough
+    kw_args = dict(tf.kw_args or {})
+
+    def step(X: np.ndarray) -> np.ndarray:
+        return func(X, **kw_args)
+
+    return step
+
+
+def _compile_power_transformer(tf: PowerTransformer) -> ArrayStep:
+    """
+    Same math as PowerTransformer.transform, minus the input validation
+    (which warns about missing feature names on raw arrays).
+    """
+    transform_fn = {
+        "yeo-johnson": tf._yeo_johnson_transform,
+    }[tf.method]
+    lambdas = list(tf.lambdas_)
+    scaler = tf._scaler if tf.standardize else None
+
+    def step(X: np.ndarray) -> np.ndarray:
+        out = X.copy()
+        for i, lmbda in enumerate(lambdas):
+            out[:, i] = transform_fn(out[:, i], lmbda)
+        if scaler is not None:
+            out = scaler.transform(out)
+        return out
+
+    return step
+
+
+def _compile_standard_scaler(scaler: StandardScaler) -> ArrayStep:
+    """
+    Same in-place arithmetic as StandardScaler.transform on dense input.
+    """
+    mean = scaler.mean_ if scaler.with_mean else None
+    scale = scaler.scale_ if scaler.with_std else None
+
+    def step(X: np.ndarray) -> np.ndarray:
+        out = X.copy()
+        if mean is not None:
+            out -= mean
+        if scale is not None:
+            out /= scale
+        return out
+
+    return step
+
+
+def _compile_generic(tf: Any, columns: List[str]) -> ArrayStep:
+    """
+    Fallback for transformers we don't know how to run on raw arrays:
+    rebuild a DataFrame with the fitted column names.
+    """
+    import pandas as pd
+
+    def step(X: np.ndarray) -> np.ndarray:
+        return np.asarray(tf.transform(pd.DataFrame(X, columns=columns)))
+
+    return step
+
+
+def _compile_column_transformer(
+    col_tf: ColumnTransformer,
+    features: List[str],
+) -> List[Tuple[np.ndarray, ArrayStep]]:
+    """
+    Turn a fitted ColumnTransformer into (column indices, array step)
+    branches, in the same order the ColumnTransformer hstacks them.
+    """
+    from sklearn.preprocessing import FunctionTransformer, PowerTransformer
+
+    position = {name: i for i, name in enumerate(features)}
+    branches: List[Tuple[np.ndarray, ArrayStep]] = []
+
+    for name, tf, columns in col_tf.transformers_:
+        if name == "remainder":
+            if tf != "drop":
+                raise ValueError("Only remainder='drop' can be compiled")
+            continue
+        if tf == "drop" or len(columns) == 0:
+            continue
+
+        columns = list(columns)
+        idx = np.array([position[c] for c in columns], dtype=np.intp)
+
+        if tf == "passthrough":
+            step = _passthrough
+        elif isinstance(tf, FunctionTransformer) and not tf.validate:
+            step = _compile_function_transformer(tf)
+        elif isinstance(tf, PowerTransformer) and tf.method == "yeo-johnson":
+            step = _compile_power_transformer(tf)
+        else:
+            step = _compile_generic(tf, columns)
+
+        branches.append((idx, step))
+
+    return branches
+
+
+class CompiledPredictor:
+    """
+    DataFrame-free inference path for the packaged pipeline:
+
+        features (ColumnTransformer [+ scaler]) -> model.predict_proba
+
+    Request dicts are mapped straight into a preallocated float64 vector
+    ordered by manifest["features"], and every fitted step runs on raw
+    NumPy arrays. Outputs match the pandas path bit-for-bit.
+
+    With `flat_trees` set (a FlatTreeEnsemble exported with the package),
+    batches of up to FLAT_TREES_MAX_ROWS rows are scored by the NumPy
+    tree walker instead of the estimator, which skips its per-call
+    overhead; larger batches still go to the estimator. With `fused` set
+    (a FusedTransform exported with the package) the feature steps run
+    as one fused kernel instead of branch by branch. With `domain` set (a
+    DomainFeatureKernel) requests carry the raw input features and the
+    engineered columns are computed first.
+
+    Built by compile_exported_predictor, `estimator` is None until the
+    package's model has been loaded (see load_model_package's
+    defer_model); every batch size goes to the flat trees until then.
+    """
+
+    def __init__(
+        self,
+        *,
+        features: List[str],
+        branches: List[Tuple[np.ndarray, ArrayStep]],
+        post_steps: List[ArrayStep],
+        estimator: Any,
+        flat_trees: Any = None,
+        fused: Any = None,
+        domain: Any = None,
+    ):
+        # what requests carry: the raw inputs when domain features are computed here
+        self.features = list(domain.input_features if domain is not None else features)
+        self.branches = branches
+        self.post_steps = post_steps
+        self.estimator = estimator
+        self.flat_trees = flat_trees
+        self.fused = fused
+        self.domain = domain
+
+        self._getter = operator.itemgetter(*self.features)
+        self._local = threading.local()
+
+    def without_domain(self) -> CompiledPredictor:
+        """The same predictor taking the model's features, engineered ones included."""
+        if self.domain is None:
+            return self
+        return CompiledPredictor(
+            features=self.domain.features,
+            branches=self.branches,
+            post_steps=self.post_steps,
+            estimator=self.estimator,
+            flat_trees=self.flat_trees,
+            fused=self.fused,
+            domain=None,
+        )
+
+    def _row_buffer(self) -> np.ndarray:
+        # one buffer per thread: FastAPI runs sync handlers in a threadpool
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = np.empty((1, len(self.features)), dtype=np.float64)
+            self._local.buf = buf
+        return buf
+
+    def vectorize(self, row: Dict[str, float]) -> np.ndarray:
+        """
+        Map a feature dict into the (1, n_features) row buffer.
+        """
+        buf = self._row_buffer()
+        try:
+            values = self._getter(row)
+        except KeyError:
+            missing = [c for c in self.features if c not in row]
+            raise ValueError(f"Missing expected features: {missing}")
+
+        if len(self.features) == 1:
+            values = (values,)
+        buf[0, :] = values
+        return buf
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        if self.domain is not None:
+            X = self.domain.expand(X)
+        if self.fused is not None:
+            return self.fused.transform(X)
+        blocks = [step(X[:, idx]) for idx, step in self.branches]
+        Xt = np.hstack(blocks)
+        for step in self.post_steps:
+            Xt = step(Xt)
+        return Xt
+
+    def predict_proba_matrix(self, X: np.ndarray) -> np.ndarray:
+        """
+        Positive-class probabilities for a 2D matrix ordered like `features`.
+        """
+        Xt = self.transform(X)
+        if self.flat_trees is not None and (self.estimator is None or len(Xt) <= FLAT_TREES_MAX_ROWS):
+            return self.flat_trees.predict_proba(Xt)[:, 1]
+        return self.estimator.predict_proba(Xt)[:, 1]
+
+    def predict_proba_row(self, row: Dict[str, float]) -> float:
+        return float(self.predict_proba_matrix(self.vectorize(row))[0])
+
+
+def compile_predictor(
+    model: Any,
+    features: List[str],
+    flat_trees: Any = None,
+    fused_transform: Any = None,
+    domain_features: Any = None,
+) -> Optional[CompiledPredictor]:
+    """
+    Compile a fitted serving pipeline into a CompiledPredictor.
+
+    Expected layout (see ml/model_pipeline/model_selection.py):
+
+        Pipeline([
+            ("features", Pipeline([("cols", ColumnTransformer), ("scaler", ...)])),
+            ("model", estimator),
+        ])
+
+    Returns None if the model does not follow this layout; callers then
+    keep using the DataFrame path. `flat_trees` is ignored unless it was
+    exported for an estimator with the same number of inputs;
+    `fused_transform` likewise unless it takes `features`. With
+    `domain_features` the predictor takes its raw input features.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if not isinstance(model, Pipeline) or len(model.steps) < 2:
+        return None
+
+    feature_step = model.steps[0][1]
+    estimator = model.steps[-1][1]
+    if not hasattr(estimator, "predict_proba"):
+        return None
+
+    if isinstance(feature_step, Pipeline):
+        inner = [step for _, step in feature_step.steps]
+    else:
+        inner = [feature_step]
+
+    if not inner or not isinstance(inner[0], ColumnTransformer):
+        return None
+
+    try:
+        branches = _compile_column_transformer(inner[0], features)
+    except (KeyError, ValueError):
+        return None
+
+    post_steps: List[ArrayStep] = []
+    for step in inner[1:] + [s for _, s in model.steps[1:-1]]:
+        if step is None or step == "passthrough":
+            continue
+        if isinstance(step, StandardScaler):
+            post_steps.append(_compile_standard_scaler(step))
+        elif hasattr(step, "feature_names_in_"):
+            return None
+        else:
+            post_steps.append(step.transform)
+
+    if flat_trees is not None and flat_trees.n_features != getattr(estimator, "n_features_in_", None):
+        flat_trees = None
+    if fused_transform is not None and fused_transform.n_features != len(features):
+        fused_transform = None
+
+    return CompiledPredictor(
+        features=features,
+        branches=branches,
+        post_steps=post_steps,
+        estimator=estimator,
+        flat_trees=flat_trees,
+        fused=fused_transform,
+        domain=domain_features,
+    )
+
+
+def compile_exported_predictor(
+    features: List[str],
+    flat_trees: Any,
+    fused_transform: Any,
+    domain_features: Any = None,
+) -> Optional[CompiledPredictor]:
+    """
+    CompiledPredictor built from a package's exports alone: the fused
+    feature transform feeding the flat trees, with no fitted pipeline
+    (and no sklearn / XGBoost import) behind it.
+
+    Returns None unless both exports are present and fit together.
+    """
+    if flat_trees is None or fused_transform is None:
+        return None
+    if fused_transform.n_features != len(features) or fused_transform.n_outputs != flat_trees.n_features:
+        return None
+
+    return CompiledPredictor(
+        features=features,
+        branches=[],
+        post_steps=[],
+        estimator=None,
+        flat_trees=flat_trees,
+        fused=fused_transform,
+        domain=domain_features,
+    )
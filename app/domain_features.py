@@ -0,0 +1,105 @@
+#Server-side domain features: the package's feature spec as a NumPy kernel
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+
+class DomainFeatureKernel:
+    """
+    Computes a package's engineered columns from raw box-score stats.
+
+    Built from manifest["feature_spec"] (written at packaging time from
+    ml/configs/feature_spec.yaml, see serving_feature_spec): clients send
+    `input_features` (the model features that are not engineered, plus
+    the raw stats the engineered ones need) and `expand` returns the
+    matrix ordered like the model's `features`.
+
+    All ratios are computed in one vectorized division, with the same
+    float operations as add_domain_features, so served values equal the
+    training ones bit for bit.
+    """
+
+    def __init__(self, features: List[str], spec: Mapping[str, Any]):
+        self.features = list(features)
+        self.epsilon = float(spec.get("epsilon", 1e-9))
+        formulas: Dict[str, Dict[str, Any]] = {
+            name: f for name, f in spec.get("domain_features", {}).items() if name in self.features
+        }
+        self.domain_features = list(formulas)
+
+        inputs = [f for f in self.features if f not in formulas]
+        for formula in formulas.values():
+            inputs += [c for c in formula["inputs"] if c not in inputs]
+        self.input_features = inputs
+
+        position = {name: i for i, name in enumerate(self.input_features)}
+        out_position = {name: j for j, name in enumerate(self.features)}
+
+        # raw model features copied straight through
+        self._copy_src = np.array([position[f] for f in self.features if f not in formulas], dtype=np.intp)
+        self._copy_dst = np.array([out_position[f] for f in self.features if f not in formulas], dtype=np.intp)
+
+        ratios = [(n, f) for n, f in formulas.items() if f["op"] == "ratio"]
+        self._ratio_dst = np.array([out_position[n] for n, _ in ratios], dtype=np.intp)
+        self._ratio_num = np.array([position[f["inputs"][0]] for _, f in ratios], dtype=np.intp)
+        self._ratio_den = np.array([position[f["inputs"][1]] for _, f in ratios], dtype=np.intp)
+        clipped = [(k, f["clip"]) for k, (_, f) in enumerate(ratios) if "clip" in f]
+        self._clip_cols = np.array([k for k, _ in clipped], dtype=np.intp)
+        self._clip_lo = np.array([c[0] for _, c in clipped], dtype=np.float64)
+        self._clip_hi = np.array([c[1] for _, c in clipped], dtype=np.float64)
+
+        self._linear = []
+        for name, f in formulas.items():
+            if f["op"] == "ratio":
+                continue
+            if f["op"] != "linear":
+                raise ValueError(f"Unknown domain feature op for {name}: {f['op']}")
+            self._linear.append(
+                (
+                    out_position[name],
+                    [position[c] for c in f["inputs"]],
+                    [float(w) for w in f["weights"]],
+                )
+            )
+
+    def expand(self, X: np.ndarray) -> np.ndarray:
+        """(n, len(features)) matrix from X ordered like `input_features`."""
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty((X.shape[0], len(self.features)), dtype=np.float64)
+        out[:, self._copy_dst] = X[:, self._copy_src]
+
+        if len(self._ratio_dst):
+            ratios = X[:, self._ratio_num] / (X[:, self._ratio_den] + self.epsilon)
+            if len(self._clip_cols):
+                ratios[:, self._clip_cols] = np.clip(
+                    ratios[:, self._clip_cols], self._clip_lo, self._clip_hi
+                )
+            out[:, self._ratio_dst] = ratios
+
+        for dst, cols, weights in self._linear:
+            total = None
+            for col, weight in zip(cols, weights):
+                term = X[:, col] if weight == 1.0 else weight * X[:, col]
+                total = term if total is None else total + term
+            out[:, dst] = total
+
+        return out
+
+    def expand_row(self, row: Mapping[str, Any]) -> Dict[str, float]:
+        """A raw feature dict as a dict of the model's features."""
+        x = np.array([[float(row[f]) for f in self.input_features]], dtype=np.float64)
+        return dict(zip(self.features, self.expand(x)[0].tolist()))
+
+
+def build_domain_feature_kernel(
+    manifest: Mapping[str, Any],
+    features: List[str],
+) -> Optional[DomainFeatureKernel]:
+    """Kernel for the manifest's feature spec; None if it has no domain features to compute."""
+    spec = manifest.get("feature_spec")
+    if not spec or not any(name in features for name in spec.get("domain_features", {})):
+        return None
+    return DomainFeatureKernel(features, spec)
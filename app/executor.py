@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from starlette.concurrency import run_in_threadpool
+
+from app.model_loader import LoadedModelPackage, load_model_package
+from app.predict import predict_batch, predict_matrix, predict_one
+from app.schemas import BatchPredictResponse, PredictResponse
+
+
+EXECUTOR_MODES = ("default", "thread", "process")
+
+
+# ------------------------------------------------------------------
+# Process-pool worker side: packages loaded once per worker process
+# ------------------------------------------------------------------
+# keyed by package dir; the live package and the one before it, so work
+# captured just before a swap does not reload on every call
+_WORKER_PACKAGES: Dict[str, LoadedModelPackage] = {}
+_WORKER_MAX_PACKAGES = 2
+_WORKER_MMAP_MODE: Optional[str] = None
+
+
+def _init_worker(package_dir: str, mmap_mode: Optional[str] = None) -> None:
+    global _WORKER_MMAP_MODE
+    _WORKER_MMAP_MODE = mmap_mode
+    _worker_package(package_dir)
+
+
+def _worker_package(package_dir: str, precomputed: bool = False) -> LoadedModelPackage:
+    pkg = _WORKER_PACKAGES.get(package_dir)
+    if pkg is None:
+        pkg = load_model_package(package_dir, mmap_mode=_WORKER_MMAP_MODE)
+        while len(_WORKER_PACKAGES) >= _WORKER_MAX_PACKAGES:
+            _WORKER_PACKAGES.pop(next(iter(_WORKER_PACKAGES)))
+        _WORKER_PACKAGES[package_dir] = pkg
+    return pkg.precomputed_view() if precomputed else pkg
+
+
+def _worker_predict_one(package_dir: str, precomputed: bool, row: Dict[str, float]) -> PredictResponse:
+    return predict_one(_worker_package(package_dir, precomputed), row)
+
+
+def _worker_predict_batch(
+    package_dir: str, precomputed: bool, rows: List[Dict[str, float]]
+) -> BatchPredictResponse:
+    return predict_batch(_worker_package(package_dir, precomputed), rows)
+
+
+def _worker_predict_matrix(package_dir: str, precomputed: bool, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return predict_matrix(_worker_package(package_dir, precomputed), X)
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound model work off the event loop.
+
+    Modes:
+    - default: Starlette's shared threadpool (what sync `def` handlers use)
+    - thread:  dedicated ThreadPoolExecutor, for estimators that release
+               the GIL during predict (XGBoost, sklearn trees with n_jobs)
+    - process: ProcessPoolExecutor, each worker loads the package once
+               at start-up and scores on its own copy
+
+    Work is always scored on the package the request captured: process
+    workers get that package's dir (and whether the request carries the
+    engineered columns) and load it if it is not the one they started
+    with (a request that began just before a hot swap).
+    """
+
+    def __init__(self, mode: str = "default", max_workers: Optional[int] = None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode: {mode} (expected one of {EXECUTOR_MODES})")
+
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[Executor] = None
+
+    def start(
+        self,
+        package_dir: str | Path,
+        mmap_mode: Optional[str] = None,
+        warmup_X: Optional[np.ndarray] = None,
+    ) -> None:
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference",
+            )
+        elif self.mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(str(package_dir), mmap_mode),
+            )
+            if warmup_X is not None:
+                self._warm_pool(self._pool, package_dir, warmup_X)
+
+    def swap_package(
+        self,
+        package_dir: str | Path,
+        mmap_mode: Optional[str] = None,
+        warmup_X: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Point the process pool at a new package: a fresh pool loads it
+        (and is warmed with `warmup_X`), new work goes there, and the old
+        pool finishes its queued work in the background. Thread modes
+        share the live package already.
+        """
+        if self.mode != "process" or self._pool is None:
+            return
+
+        new = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(str(package_dir), mmap_mode),
+        )
+        if warmup_X is not None:
+            self._warm_pool(new, package_dir, warmup_X)
+        old, self._pool = self._pool, new
+        old.shutdown(wait=False)
+
+    def _warm_pool(self, pool: Executor, package_dir: str | Path, X: np.ndarray) -> None:
+        # one task per worker: the pool spawns every process, and each
+        # loads its package and scores once before taking real requests
+        futures = [pool.submit(_worker_predict_matrix, str(package_dir), False, X) for _ in range(self.max_workers)]
+        for fut in futures:
+            fut.result()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pool is None:
+            return await run_in_threadpool(fn, *args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, partial(fn, *args))
+
+    async def predict_one(
+        self,
+        pkg: LoadedModelPackage,
+        row: Dict[str, float],
+    ) -> PredictResponse:
+        if self.mode == "process" and self._pool is not None:
+            return await self._run(_worker_predict_one, str(pkg.package_dir), pkg.precomputed, row)
+        return await self._run(predict_one, pkg, row)
+
+    async def predict_batch(
+        self,
+        pkg: LoadedModelPackage,
+        rows: List[Dict[str, float]],
+    ) -> BatchPredictResponse:
+        if self.mode == "process" and self._pool is not None:
+            return await self._run(_worker_predict_batch, str(pkg.package_dir), pkg.precomputed, rows)
+        return await self._run(predict_batch, pkg, rows)
+
+    async def predict_matrix(
+        self,
+        pkg: LoadedModelPackage,
+        X: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if self.mode == "process" and self._pool is not None:
+            return await self._run(_worker_predict_matrix, str(pkg.package_dir), pkg.precomputed, X)
+        return await self._run(predict_matrix, pkg, X)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers if self._pool is not None else None,
+        }
+
+
+class BookkeepingQueue:
+    """
+    Single background thread for logging / drift bookkeeping.
+
+    Handlers enqueue the call and return immediately; a single worker
+    keeps the calls ordered and the (non thread-safe) monitors consistent.
+
+    `submit` always queues (drift sketches must see every row). `offer`
+    is for inference logging only: at most `max_pending` offered calls
+    wait at once, and under overload further ones are dropped and counted
+    instead of piling up in memory. Reliability counters are not queued
+    at all; handlers update them inline.
+    """
+
+    def __init__(self, max_pending: int = 10_000) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.max_pending = int(max_pending)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.submitted_count = 0
+        self.offered_count = 0
+        self.dropped_count = 0
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        # called with self._lock held
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bookkeeping")
+        return self._pool
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Queue a call that must not be lost."""
+        with self._lock:
+            self.submitted_count += 1
+            pool = self._ensure_pool()
+        pool.submit(fn, *args, **kwargs).add_done_callback(self._report_error)
+
+    def offer(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
+        """Queue a sheddable call; False (and counted) when too many already wait."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped_count += 1
+                return False
+            self._pending += 1
+            self.offered_count += 1
+            pool = self._ensure_pool()
+        pool.submit(fn, *args, **kwargs).add_done_callback(self._offer_done)
+        return True
+
+    def _offer_done(self, fut) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._report_error(fut)
+
+    @staticmethod
+    def _report_error(fut) -> None:
+        if fut.exception() is not None:
+            print(f"❌ Bookkeeping task failed: {fut.exception()}")
+
+    def shutdown(self) -> None:
+        """Drain pending bookkeeping calls."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "submitted": self.submitted_count,
+            "offered": self.offered_count,
+            "dropped": self.dropped_count,
+        }
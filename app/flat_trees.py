@@ -0,0 +1,341 @@
+#Tree ensembles flattened into contiguous node arrays + a level-by-level NumPy scorer
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+FLAT_TREES_DIRNAME = "flat_trees"
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "default_left", "roots")
+
+# above this many rows the estimator's own (compiled, multi-threaded)
+# predict_proba is faster than gathering node by node in NumPy
+# (crossover around 50 rows, see benchmarks/bench_flat_trees.py)
+FLAT_TREES_MAX_ROWS = 32
+
+
+class FlatTreeEnsemble:
+    """
+    Binary-classification tree ensemble as flat node arrays.
+
+    All trees are concatenated: node i splits on `feature[i]` at
+    `threshold[i]` and continues to `left[i]` / `right[i]` (global
+    indices); a NaN value goes to the `default_left[i]` side. Leaves
+    point to themselves, so after `max_depth` steps every row sits on a
+    leaf of every tree and `value` holds the leaf outputs.
+
+    Two aggregations:
+    - "mean_proba" (sklearn forests): x <= threshold goes left, the
+      leaf value is P(class 1), probabilities are averaged over trees.
+    - "sigmoid_margin" (XGBoost binary:logistic): x < threshold goes
+      left, leaf values are summed in float32 on top of `base_margin`,
+      then passed through a float32 sigmoid.
+
+    Inputs are compared as float32, like both libraries do.
+    """
+
+    def __init__(
+        self,
+        *,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        default_left: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        aggregation: str,
+        base_margin: float = 0.0,
+    ):
+        if aggregation not in ("mean_proba", "sigmoid_margin"):
+            raise ValueError(f"Unknown aggregation: {aggregation}")
+
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.default_left = default_left
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.aggregation = aggregation
+        self.base_margin = float(base_margin)
+        self.strict = aggregation == "sigmoid_margin"
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_trees) global leaf index reached by each row in each tree."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a (n, {self.n_features}) matrix")
+
+        n_rows = X.shape[0]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        rows = np.arange(n_rows)[:, None]
+
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[nodes]]
+            thresholds = self.threshold[nodes]
+            go_left = values < thresholds if self.strict else values <= thresholds
+            nan = np.isnan(values)
+            if nan.any():
+                go_left = np.where(nan, self.default_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, 2) class probabilities, like the source estimator."""
+        leaf_values = self.value[self.leaves(X)]
+
+        if self.aggregation == "mean_proba":
+            # trees added one after the other, like the forest's predict_proba
+            p1 = np.cumsum(leaf_values, axis=1)[:, -1] / self.n_trees
+        else:
+            # sequential float32 sum (cumsum), starting from the base margin
+            margins = np.empty((leaf_values.shape[0], self.n_trees + 1), dtype=np.float32)
+            margins[:, 0] = self.base_margin
+            margins[:, 1:] = leaf_values
+            margin = np.cumsum(margins, axis=1, dtype=np.float32)[:, -1]
+            exp = np.exp(-margin.astype(np.float64)).astype(np.float32)
+            p1 = (np.float32(1.0) / (np.float32(1.0) + exp)).astype(np.float64)
+
+        return np.column_stack([1.0 - p1, p1])
+
+    # ------------------------------------------------------------------
+    # Persistence: one .npy per array (mmap-able) + meta.json
+    # ------------------------------------------------------------------
+    def save(self, directory: str | Path) -> Path:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            "max_depth": self.max_depth,
+            "n_features": self.n_features,
+            "n_trees": self.n_trees,
+            "aggregation": self.aggregation,
+            "base_margin": self.base_margin,
+        }
+        (directory / "meta.json").write_text(json.dumps(meta, indent=2))
+        return directory
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap_mode: Optional[str] = None) -> "FlatTreeEnsemble":
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text())
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in _ARRAYS
+        }
+        return cls(
+            **arrays,
+            max_depth=meta["max_depth"],
+            n_features=meta["n_features"],
+            aggregation=meta["aggregation"],
+            base_margin=meta["base_margin"],
+        )
+
+
+# ------------------------------------------------------------------
+# Export
+# ------------------------------------------------------------------
+def _concat(trees: List[Dict[str, np.ndarray]], depths: List[int], **kwargs: Any) -> FlatTreeEnsemble:
+    offsets = np.cumsum([0] + [len(t["feature"]) for t in trees[:-1]])
+    out: Dict[str, List[np.ndarray]] = {k: [] for k in ("feature", "threshold", "left", "right", "value", "default_left")}
+
+    for offset, tree in zip(offsets, trees):
+        idx = np.arange(len(tree["feature"]))
+        leaf = tree["left"] < 0
+        out["feature"].append(np.where(leaf, 0, tree["feature"]).astype(np.int32))
+        out["threshold"].append(np.where(leaf, 0.0, tree["threshold"]).astype(np.float64))
+        out["left"].append((np.where(leaf, idx, tree["left"]) + offset).astype(np.int64))
+        out["right"].append((np.where(leaf, idx, tree["right"]) + offset).astype(np.int64))
+        out["value"].append(tree["value"].astype(np.float64))
+        out["default_left"].append(tree["default_left"].astype(bool))
+
+    return FlatTreeEnsemble(
+        **{k: np.concatenate(v) for k, v in out.items()},
+        roots=offsets.astype(np.int64),
+        max_depth=max(depths),
+        **kwargs,
+    )
+
+
+def _sklearn_tree(tree: Any) -> Tuple[Dict[str, np.ndarray], int]:
+    t = tree.tree_
+    value = t.value[:, 0, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p1 = value[:, 1] / value.sum(axis=1)
+    missing_left = getattr(t, "missing_go_to_left", None)
+    return (
+        {
+            "feature": t.feature,
+            "threshold": t.threshold,
+            "left": t.children_left,
+            "right": t.children_right,
+            "value": np.nan_to_num(p1),
+            "default_left": (
+                np.asarray(missing_left, dtype=bool)
+                if missing_left is not None
+                else np.zeros(t.node_count, dtype=bool)
+            ),
+        },
+        int(t.max_depth),
+    )
+
+
+def _from_sklearn_forest(estimator: Any) -> FlatTreeEnsemble:
+    if list(estimator.classes_) != [0, 1] or estimator.n_outputs_ != 1:
+        raise ValueError("Only binary single-output forests with classes [0, 1] are supported")
+
+    trees, depths = zip(*(_sklearn_tree(t) for t in estimator.estimators_))
+    return _concat(
+        list(trees),
+        list(depths),
+        n_features=estimator.n_features_in_,
+        aggregation="mean_proba",
+    )
+
+
+def _xgb_tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [c for n in frontier for c in (left[n], right[n]) if c >= 0]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+def _from_xgboost(estimator: Any) -> FlatTreeEnsemble:
+    booster = estimator.get_booster()
+    learner = json.loads(booster.save_raw("json"))["learner"]
+
+    if learner["objective"]["name"] != "binary:logistic":
+        raise ValueError("Only binary:logistic XGBoost models are supported")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("Only gbtree XGBoost models are supported")
+
+    model = learner["gradient_booster"]["model"]
+    n_trees = len(model["trees"])
+    best = getattr(estimator, "best_iteration", None)
+    if best is not None:
+        n_trees = min(n_trees, best + 1)
+
+    trees, depths = [], []
+    for tree in model["trees"][:n_trees]:
+        if any(tree["split_type"]):
+            raise ValueError("Categorical splits are not supported")
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        # split conditions / leaf values are float32 in the booster
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        trees.append(
+            {
+                "feature": np.asarray(tree["split_indices"], dtype=np.int64),
+                "threshold": conditions,
+                "left": left,
+                "right": right,
+                "value": np.where(left < 0, conditions, 0.0),
+                "default_left": np.asarray(tree["default_left"], dtype=bool),
+            }
+        )
+        depths.append(_xgb_tree_depth(left, right))
+
+    # ProbToMargin as the booster does it, in float32
+    base_score = np.float32(learner["learner_model_param"]["base_score"])
+    base_margin = float(-np.log(np.float32(1.0) / base_score - np.float32(1.0)))
+
+    return _concat(
+        trees,
+        depths,
+        n_features=int(learner["learner_model_param"]["num_feature"]),
+        aggregation="sigmoid_margin",
+        base_margin=base_margin,
+    )
+
+
+def flatten_estimator(estimator: Any) -> FlatTreeEnsemble:
+    """
+    FlatTreeEnsemble for a fitted RandomForestClassifier /
+    BalancedRandomForestClassifier (any sklearn forest of decision
+    trees) or XGBClassifier. Raises ValueError for anything else.
+    """
+    if hasattr(estimator, "get_booster"):
+        return _from_xgboost(estimator)
+
+    trees = getattr(estimator, "estimators_", None)
+    if trees and all(hasattr(t, "tree_") for t in trees):
+        return _from_sklearn_forest(estimator)
+
+    raise ValueError(f"Cannot flatten {type(estimator).__name__}")
+
+
+def max_abs_error(flat: FlatTreeEnsemble, estimator: Any, X: np.ndarray) -> float:
+    """Largest |P(class 1)| difference between the flat and source models on X."""
+    if len(X) == 0:
+        return 0.0
+    expected = np.asarray(estimator.predict_proba(X), dtype=np.float64)[:, 1]
+    return float(np.max(np.abs(flat.predict_proba(X)[:, 1] - expected)))
+
+
+def load_flat_trees(package_dir: str | Path, mmap_mode: Optional[str] = None) -> Optional[FlatTreeEnsemble]:
+    """The package's exported trees, or None if it has none."""
+    directory = Path(package_dir) / FLAT_TREES_DIRNAME
+    if not (directory / "meta.json").exists():
+        return None
+    return FlatTreeEnsemble.load(directory, mmap_mode=mmap_mode)
+
+
+def export_flat_trees(
+    model: Any,
+    features: List[str],
+    package_dir: str | Path,
+    reference_X: np.ndarray,
+    *,
+    tolerance: float = 1e-9,
+) -> Optional[float]:
+    """
+    Flatten the estimator of a packaged pipeline into package_dir/flat_trees.
+
+    The flat scorer is checked against the estimator on `reference_X`
+    (raw feature matrix ordered like `features`, run through the
+    compiled preprocessing first). Returns the max abs error when the
+    export was written; None when the model can't be compiled /
+    flattened or the error is above `tolerance`, in which case nothing
+    is written and serving keeps the estimator's own predict_proba.
+    """
+    from app.compiled_predictor import compile_predictor
+
+    compiled = compile_predictor(model, features)
+    if compiled is None:
+        print("⚠️ Flat trees skipped: pipeline cannot be compiled")
+        return None
+
+    try:
+        flat = flatten_estimator(compiled.estimator)
+    except ValueError as e:
+        print(f"⚠️ Flat trees skipped: {e}")
+        return None
+
+    error = max_abs_error(flat, compiled.estimator, compiled.transform(reference_X))
+    if error > tolerance:
+        print(f"⚠️ Flat trees skipped: max abs error {error:.3g} > {tolerance:g}")
+        return None
+
+    flat.save(Path(package_dir) / FLAT_TREES_DIRNAME)
+    print(f"✅ Flat trees exported: {flat.n_trees} trees, depth {flat.max_depth}, max abs error {error:.3g}")
+    return error
@@ -0,0 +1,273 @@
+#Fitted feature pipeline (log1p / Yeo-Johnson / passthrough + scaler) fused into one array kernel
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+FUSED_TRANSFORM_FILENAME = "fused_transform.json"
+
+# per-output-column transform codes
+PASSTHROUGH, LOG1P, YEO_JOHNSON = 0, 1, 2
+
+
+class FusedTransform:
+    """
+    The `features` step of the serving pipeline as flat per-column arrays:
+
+        out = X[:, columns]                      (ColumnTransformer order)
+        out[:, codes == LOG1P] = log1p(...)
+        out[:, codes == YEO_JOHNSON] = yeo_johnson(..., lambdas)
+        out = (out - pre_offset) / pre_scale     (PowerTransformer standardize)
+        out = (out - post_offset) / post_scale   (StandardScaler), or
+        out = out * post_scale + post_offset     (MinMaxScaler)
+
+    Columns without a step use offset 0 / scale 1, which are exact
+    no-ops in float64, so every step runs on the whole matrix. Each
+    operation is the one sklearn runs, in the same order, so the output
+    is bit-for-bit that of the fitted pipeline.
+    """
+
+    def __init__(
+        self,
+        *,
+        columns: np.ndarray,
+        codes: np.ndarray,
+        lambdas: np.ndarray,
+        pre_offset: np.ndarray,
+        pre_scale: np.ndarray,
+        post_offset: np.ndarray,
+        post_scale: np.ndarray,
+        post_mode: str,
+        n_features: int,
+    ):
+        if post_mode not in ("none", "standard", "minmax"):
+            raise ValueError(f"Unknown post_mode: {post_mode}")
+
+        self.columns = np.asarray(columns, dtype=np.intp)
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.lambdas = np.asarray(lambdas, dtype=np.float64)
+        self.pre_offset = np.asarray(pre_offset, dtype=np.float64)
+        self.pre_scale = np.asarray(pre_scale, dtype=np.float64)
+        self.post_offset = np.asarray(post_offset, dtype=np.float64)
+        self.post_scale = np.asarray(post_scale, dtype=np.float64)
+        self.post_mode = post_mode
+        self.n_features = int(n_features)
+
+        self._log_idx = np.flatnonzero(self.codes == LOG1P)
+        self._yj_idx = np.flatnonzero(self.codes == YEO_JOHNSON)
+        yj_lambdas = self.lambdas[self._yj_idx]
+        self._yj_lambdas = yj_lambdas
+        self._yj_neg_lambdas = 2 - yj_lambdas
+        # the limits sklearn special-cases (log1p instead of the power form)
+        self._yj_log_pos = np.flatnonzero(np.abs(yj_lambdas) < np.spacing(1.0))
+        self._yj_log_neg = np.flatnonzero(~(np.abs(yj_lambdas - 2) > np.spacing(1.0)))
+        self._has_pre = bool(len(self._yj_idx)) and not (
+            (self.pre_offset == 0).all() and (self.pre_scale == 1).all()
+        )
+
+    @property
+    def n_outputs(self) -> int:
+        return len(self.columns)
+
+    def _yeo_johnson(self, Y: np.ndarray) -> np.ndarray:
+        # same expressions as PowerTransformer._yeo_johnson_transform,
+        # with the lambdas broadcast over columns
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            pos_out = (np.power(Y + 1, self._yj_lambdas) - 1) / self._yj_lambdas
+            neg_out = -(np.power(-Y + 1, self._yj_neg_lambdas) - 1) / self._yj_neg_lambdas
+        if len(self._yj_log_pos):
+            pos_out[:, self._yj_log_pos] = np.log1p(Y[:, self._yj_log_pos])
+        if len(self._yj_log_neg):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                neg_out[:, self._yj_log_neg] = -np.log1p(-Y[:, self._yj_log_neg])
+        return np.where(Y >= 0, pos_out, neg_out)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """(n, n_outputs) float64 matrix for X ordered like the manifest features."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a (n, {self.n_features}) matrix")
+
+        out = X.take(self.columns, axis=1)
+        if len(self._log_idx):
+            out[:, self._log_idx] = np.log1p(out[:, self._log_idx])
+        if len(self._yj_idx):
+            out[:, self._yj_idx] = self._yeo_johnson(out[:, self._yj_idx])
+        if self._has_pre:
+            out -= self.pre_offset
+            out /= self.pre_scale
+
+        if self.post_mode == "standard":
+            out -= self.post_offset
+            out /= self.post_scale
+        elif self.post_mode == "minmax":
+            out *= self.post_scale
+            out += self.post_offset
+        return out
+
+    # ------------------------------------------------------------------
+    # Persistence (JSON floats round-trip exactly)
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n_features": self.n_features,
+            "post_mode": self.post_mode,
+            "columns": self.columns.tolist(),
+            "codes": self.codes.tolist(),
+            "lambdas": self.lambdas.tolist(),
+            "pre_offset": self.pre_offset.tolist(),
+            "pre_scale": self.pre_scale.tolist(),
+            "post_offset": self.post_offset.tolist(),
+            "post_scale": self.post_scale.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "FusedTransform":
+        return cls(**d)
+
+    def save(self, package_dir: str | Path) -> Path:
+        path = Path(package_dir) / FUSED_TRANSFORM_FILENAME
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+
+# ------------------------------------------------------------------
+# Fusing a fitted pipeline
+# ------------------------------------------------------------------
+def fuse_feature_pipeline(feature_step: Any, features: List[str]) -> Optional[FusedTransform]:
+    """
+    FusedTransform for a fitted `features` step as built by
+    build_feature_pipeline: a ColumnTransformer of log1p
+    FunctionTransformers, Yeo-Johnson PowerTransformers and passthrough
+    branches, optionally followed by a StandardScaler / MinMaxScaler.
+
+    Returns None for any other layout (callers keep the step-by-step path).
+    """
+    # packaging-time only: loading a fused_transform.json needs no sklearn
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, PowerTransformer, StandardScaler
+
+    steps = [s for _, s in feature_step.steps] if isinstance(feature_step, Pipeline) else [feature_step]
+    steps = [s for s in steps if s is not None and s != "passthrough"]
+    if not steps or not isinstance(steps[0], ColumnTransformer) or len(steps) > 2:
+        return None
+
+    position = {name: i for i, name in enumerate(features)}
+    columns: List[int] = []
+    codes: List[int] = []
+    lambdas: List[float] = []
+    pre_offset: List[float] = []
+    pre_scale: List[float] = []
+
+    for name, tf, cols in steps[0].transformers_:
+        if name == "remainder":
+            if tf != "drop":
+                return None
+            continue
+        if tf == "drop" or len(cols) == 0:
+            continue
+
+        try:
+            idx = [position[c] for c in cols]
+        except (KeyError, TypeError):
+            return None
+        n = len(idx)
+
+        if tf == "passthrough":
+            code, lam, offset, scale = [PASSTHROUGH] * n, [0.0] * n, [0.0] * n, [1.0] * n
+        elif isinstance(tf, FunctionTransformer) and tf.func is np.log1p and not tf.validate and not tf.kw_args:
+            code, lam, offset, scale = [LOG1P] * n, [0.0] * n, [0.0] * n, [1.0] * n
+        elif isinstance(tf, PowerTransformer) and tf.method == "yeo-johnson":
+            code, lam = [YEO_JOHNSON] * n, [float(v) for v in tf.lambdas_]
+            if tf.standardize:
+                scaler = tf._scaler
+                offset = [float(v) for v in scaler.mean_] if scaler.with_mean else [0.0] * n
+                scale = [float(v) for v in scaler.scale_] if scaler.with_std else [1.0] * n
+            else:
+                offset, scale = [0.0] * n, [1.0] * n
+        else:
+            return None
+
+        columns += idx
+        codes += code
+        lambdas += lam
+        pre_offset += offset
+        pre_scale += scale
+
+    n_out = len(columns)
+    post_mode, post_offset, post_scale = "none", np.zeros(n_out), np.ones(n_out)
+    if len(steps) == 2:
+        scaler = steps[1]
+        if isinstance(scaler, StandardScaler):
+            post_mode = "standard"
+            if scaler.with_mean:
+                post_offset = scaler.mean_
+            if scaler.with_std:
+                post_scale = scaler.scale_
+        elif isinstance(scaler, MinMaxScaler) and not scaler.clip:
+            post_mode, post_offset, post_scale = "minmax", scaler.min_, scaler.scale_
+        else:
+            return None
+
+    return FusedTransform(
+        columns=np.asarray(columns),
+        codes=np.asarray(codes),
+        lambdas=np.asarray(lambdas),
+        pre_offset=np.asarray(pre_offset),
+        pre_scale=np.asarray(pre_scale),
+        post_offset=np.asarray(post_offset, dtype=np.float64),
+        post_scale=np.asarray(post_scale, dtype=np.float64),
+        post_mode=post_mode,
+        n_features=len(features),
+    )
+
+
+def export_fused_transform(
+    model: Any,
+    features: List[str],
+    package_dir: str | Path,
+    reference_X: np.ndarray,
+) -> bool:
+    """
+    Fuse the `features` step of a packaged pipeline into
+    package_dir/fused_transform.json.
+
+    Written only when the fused kernel reproduces
+    `model.named_steps["features"].transform` exactly on `reference_X`
+    (raw feature matrix ordered like `features`). Returns whether it was.
+    """
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+
+    if not isinstance(model, Pipeline) or "features" not in model.named_steps:
+        print("⚠️ Fused transform skipped: no 'features' step")
+        return False
+
+    feature_step = model.named_steps["features"]
+    fused = fuse_feature_pipeline(feature_step, features)
+    if fused is None:
+        print("⚠️ Fused transform skipped: unsupported feature pipeline")
+        return False
+
+    expected = np.asarray(feature_step.transform(pd.DataFrame(reference_X, columns=features)))
+    if not np.array_equal(fused.transform(reference_X), expected, equal_nan=True):
+        print("⚠️ Fused transform skipped: output differs from the feature pipeline")
+        return False
+
+    fused.save(package_dir)
+    print(f"✅ Fused transform exported: {fused.n_outputs} columns, post={fused.post_mode}")
+    return True
+
+
+def load_fused_transform(package_dir: str | Path) -> Optional[FusedTransform]:
+    """The package's fused feature transform, or None if it has none."""
+    path = Path(package_dir) / FUSED_TRANSFORM_FILENAME
+    if not path.exists():
+        return None
+    return FusedTransform.from_dict(json.loads(path.read_text()))
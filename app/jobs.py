@@ -0,0 +1,598 @@
+#Async batch jobs: a filesystem queue of scoring jobs, run chunk by chunk with resume
+
+"""
+Layout of one job under the jobs directory:
+
+    <job_id>/job.json                  state and progress (rewritten atomically)
+    <job_id>/input.parquet|.csv        uploaded input (path jobs point elsewhere)
+    <job_id>/parts/part-00000.parquet  scored chunk 0, 1, ...
+    <job_id>/lock                      flock held by the worker running the job
+    pending/<job_id>                   marker while the job is queued or running
+
+A chunk's part file is renamed into place before job.json counts it as
+done, and the flock dies with its process, so a job left `running` by a
+crashed worker is picked up again and resumes after its last completed
+chunk. Workers only scan `pending/`, so finished jobs cost nothing until
+they are removed after the retention period.
+
+Standalone worker pool (the API process can then run with JOBS_WORKERS=0):
+    python -m app.jobs --jobs-dir logs/jobs --package-dir ml/packaging/packages/latest
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.model_loader import LoadedModelPackage, load_model_package
+from app.monitoring.prometheus import CounterFamily, GaugeFamily
+
+
+JOB_STATES = ("queued", "running", "succeeded", "failed")
+TERMINAL_STATES = ("succeeded", "failed")
+# same as run_batch_inference.INPUT_SUFFIXES (not imported here: it pulls in pandas)
+INPUT_SUFFIXES = (".parquet", ".csv")
+
+_JOB_ID = re.compile(r"^job_[0-9A-Za-z]+_[0-9a-f]{8}$")
+
+_COMPLETED = CounterFamily(
+    "jobs_completed",
+    "Batch jobs finished by this process, by final state.",
+    [{"state": "succeeded"}, {"state": "failed"}],
+)
+_ROWS = CounterFamily("jobs_rows_scored", "Rows scored by batch jobs in this process.")
+_ACTIVE = GaugeFamily("jobs_active", "Batch jobs being scored by this process.")
+_REMOVED = CounterFamily("jobs_removed", "Finished batch jobs removed after the retention period.")
+
+# how often workers look for finished jobs past retention
+_CLEANUP_INTERVAL_S = 300.0
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------------
+# Store: job directories
+# ------------------------------------------------------------------
+class JobStore:
+    """Job records, inputs and scored parts under one directory."""
+
+    def __init__(self, root: str | Path, input_roots: Sequence[str | Path] = ()):
+        self.root = Path(root)
+        # directories path jobs may read from (uploads are always allowed)
+        self.input_roots = [Path(r).resolve() for r in input_roots]
+        self.pending_dir = self.root / "pending"
+
+    def job_dir(self, job_id: str) -> Path:
+        if not _JOB_ID.match(job_id):
+            raise KeyError(job_id)
+        return self.root / job_id
+
+    def part_path(self, job_id: str, index: int) -> Path:
+        return self.job_dir(job_id) / "parts" / f"part-{index:05d}.parquet"
+
+    def _check_input_path(self, input_path: str | Path) -> Path:
+        path = Path(input_path).resolve()
+        if not any(path.is_relative_to(root) for root in self.input_roots):
+            raise ValueError(f"input_path must be inside one of: {[str(r) for r in self.input_roots]}")
+        if path.suffix not in INPUT_SUFFIXES or not path.is_file():
+            raise ValueError(f"input_path must be an existing {' / '.join(INPUT_SUFFIXES)} file")
+        return path
+
+    def create(
+        self,
+        *,
+        chunk_rows: int,
+        input_path: Optional[str | Path] = None,
+        upload: Optional[BinaryIO] = None,
+        filename: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue a job on an uploaded file (`upload` + `filename`) or on an
+        existing file under one of the input roots. Raises ValueError on
+        a bad input or chunk size.
+        """
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be positive")
+        if (upload is None) == (input_path is None):
+            raise ValueError("Provide exactly one of an uploaded file or input_path")
+        if upload is not None:
+            suffix = Path(filename or "").suffix.lower()
+            if suffix not in INPUT_SUFFIXES:
+                raise ValueError(f"Uploaded file must be {' / '.join(INPUT_SUFFIXES)}")
+        else:
+            source = self._check_input_path(input_path)
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        job_id = f"job_{stamp}_{uuid.uuid4().hex[:8]}"
+        job_dir = self.job_dir(job_id)
+        (job_dir / "parts").mkdir(parents=True)
+        # marked first: a marker without job.json is skipped until it has one
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        (self.pending_dir / job_id).touch()
+
+        try:
+            if upload is not None:
+                source = job_dir / f"input{suffix}"
+                with open(source, "wb") as f:
+                    shutil.copyfileobj(upload, f, length=1 << 20)
+
+            job = {
+                "job_id": job_id,
+                "state": "queued",
+                "input_path": str(source),
+                "uploaded": upload is not None,
+                "chunk_rows": int(chunk_rows),
+                "created_at": _utc_now(),
+                "started_at": None,
+                "finished_at": None,
+                "package_id": None,
+                "package_dir": None,
+                "attempts": 0,
+                "n_rows_total": None,
+                "chunks_done": 0,
+                "rows_done": 0,
+                "part_rows": [],
+                "seconds": 0.0,
+                "rows_per_s": 0.0,
+                "error": None,
+            }
+            _write_json_atomic(job_dir / "job.json", job)
+        except BaseException:
+            # a failed upload copy (client gone, disk full) leaves nothing behind
+            (self.pending_dir / job_id).unlink(missing_ok=True)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        return job
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """The job record; KeyError for an unknown id."""
+        try:
+            return json.loads((self.job_dir(job_id) / "job.json").read_text())
+        except FileNotFoundError:
+            raise KeyError(job_id) from None
+
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        job = {**self.get(job_id), **fields}
+        _write_json_atomic(self.job_dir(job_id) / "job.json", job)
+        if job["state"] in TERMINAL_STATES:
+            (self.pending_dir / job_id).unlink(missing_ok=True)
+        return job
+
+    def job_ids(self) -> List[str]:
+        """All job ids, oldest first (ids start with the creation time)."""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if _JOB_ID.match(p.name))
+
+    def pending_ids(self) -> List[str]:
+        """Ids of jobs not finished yet, oldest first."""
+        if not self.pending_dir.is_dir():
+            return []
+        return sorted(p.name for p in self.pending_dir.iterdir() if _JOB_ID.match(p.name))
+
+    def remove_finished(self, older_than_s: float) -> List[str]:
+        """Delete jobs that finished more than `older_than_s` ago; returns their ids."""
+        cutoff = datetime.now(timezone.utc).timestamp() - older_than_s
+        pending = set(self.pending_ids())
+        removed = []
+        for job_id in self.job_ids():
+            if job_id in pending:
+                continue
+            try:
+                job = self.get(job_id)
+            except KeyError:
+                continue
+            finished_at = job.get("finished_at")
+            if job["state"] not in TERMINAL_STATES or finished_at is None:
+                continue
+            if datetime.fromisoformat(finished_at).timestamp() < cutoff:
+                shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+                removed.append(job_id)
+        return removed
+
+    def list(self) -> List[Dict[str, Any]]:
+        jobs = []
+        for job_id in self.job_ids():
+            try:
+                jobs.append(self.get(job_id))
+            except KeyError:  # created but job.json not written yet
+                continue
+        return jobs
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+    def read_page(self, job_id: str, offset: int, limit: int) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Rows [offset, offset + limit) of the scored output as a DataFrame,
+        reading only the parts that hold them. Works while the job runs
+        (over the chunks completed so far).
+        """
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        job = self.get(job_id)
+        frames = []
+        part_start = 0
+        end = offset + limit
+        for index, n_rows in enumerate(job["part_rows"]):
+            part_end = part_start + n_rows
+            if part_end > offset and part_start < end:
+                df = pq.read_table(self.part_path(job_id, index)).to_pandas()
+                frames.append(df.iloc[max(offset - part_start, 0): end - part_start])
+            if part_end >= end:
+                break
+            part_start = part_end
+
+        page = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return page, job
+
+    def iter_csv(self, job_id: str) -> Iterator[bytes]:
+        """The scored output as CSV, one completed part at a time."""
+        import pyarrow.parquet as pq
+
+        job = self.get(job_id)
+        for index in range(job["chunks_done"]):
+            df = pq.read_table(self.part_path(job_id, index)).to_pandas()
+            yield df.to_csv(index=False, header=index == 0).encode()
+
+    def iter_arrow(self, job_id: str) -> Iterator[bytes]:
+        """The scored output as an Arrow IPC stream, cast to the first part's schema."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        job = self.get(job_id)
+        sink = _ByteChunks()
+        writer = None
+        schema = None
+        for index in range(job["chunks_done"]):
+            table = pq.read_table(self.part_path(job_id, index))
+            if writer is None:
+                schema = table.schema
+                writer = pa.ipc.new_stream(sink, schema)
+            else:
+                table = table.cast(schema)
+            writer.write_table(table)
+            yield sink.take()
+        if writer is not None:
+            writer.close()
+            yield sink.take()
+
+
+class _ByteChunks:
+    """Write-only file object whose contents are taken out piece by piece."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# ------------------------------------------------------------------
+# Runner: local worker pool
+# ------------------------------------------------------------------
+class JobRunner:
+    """
+    Worker threads that take jobs from a JobStore, oldest first, and
+    score them chunk by chunk with the batch inference helpers
+    (iter_input_chunks / score_frame), one Parquet part per chunk.
+
+    A job is owned through an exclusive flock on its lock file, so
+    workers in several processes can share one jobs directory. Jobs
+    `queued`, or `running` with no lock holder (their worker died), are
+    claimable; a resumed job skips the chunks it has parts for.
+
+    Finished jobs are deleted `retention_s` after they finish (0 keeps
+    them forever).
+
+    `package_provider` returns the live package. A job is pinned to the
+    package of its first run: a resumed job scores its remaining chunks
+    with that package, loading it from its directory if it is no longer
+    live, and fails if it cannot be loaded, so the parts of one job
+    never mix two models.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        package_provider: Callable[[], Optional[LoadedModelPackage]],
+        *,
+        workers: int = 1,
+        poll_interval_s: float = 1.0,
+        retention_s: float = 7 * 24 * 3600.0,
+    ):
+        self.store = store
+        self.package_provider = package_provider
+        self.workers = int(workers)
+        self.poll_interval_s = float(poll_interval_s)
+        self.retention_s = float(retention_s)
+        self._next_cleanup = 0.0
+
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+        # metrics
+        self.active = 0
+        self.jobs_succeeded = 0
+        self.jobs_failed = 0
+        self.rows_scored = 0
+        self.jobs_removed = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self.workers <= 0 or self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop taking jobs; a job being scored stops after its current chunk."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake the workers (a job was just queued)."""
+        self._wake.set()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            self._maybe_cleanup()
+            if not self.run_pending():
+                self._wake.wait(self.poll_interval_s)
+                self._wake.clear()
+
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+    def _claim(self, job_id: str) -> Optional[int]:
+        """Lock file descriptor if this worker now owns the job, else None."""
+        try:
+            fd = os.open(self.store.job_dir(job_id) / "lock", os.O_CREAT | os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+
+        try:
+            state = self.store.get(job_id)["state"]
+        except KeyError:
+            state = None
+        if state not in ("queued", "running"):
+            os.close(fd)  # closing the descriptor releases the flock
+            return None
+        return fd
+
+    def run_pending(self) -> int:
+        """Run every claimable job in this thread; returns how many ran."""
+        n_run = 0
+        for job_id in self.store.pending_ids():
+            if self._stop.is_set():
+                break
+            fd = self._claim(job_id)
+            if fd is None:
+                continue
+            try:
+                self._run(job_id)
+            finally:
+                os.close(fd)
+            n_run += 1
+        return n_run
+
+    def cleanup(self) -> int:
+        """Remove finished jobs past retention; returns how many were removed."""
+        if self.retention_s <= 0:
+            return 0
+        removed = self.store.remove_finished(self.retention_s)
+        with self._lock:
+            self.jobs_removed += len(removed)
+        return len(removed)
+
+    def _maybe_cleanup(self) -> None:
+        # one worker thread at a time, at most every _CLEANUP_INTERVAL_S
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_cleanup:
+                return
+            self._next_cleanup = now + _CLEANUP_INTERVAL_S
+        try:
+            self.cleanup()
+        except OSError as e:
+            print(f"⚠️ Job cleanup failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    def _run(self, job_id: str) -> None:
+        from ml.serving import run_batch_inference as batch
+
+        with self._lock:
+            self.active += 1
+        try:
+            self._score_job(job_id, batch)
+        except Exception as e:
+            self.store.update(job_id, state="failed", error=str(e), finished_at=_utc_now())
+            with self._lock:
+                self.jobs_failed += 1
+            print(f"❌ Job {job_id} failed: {e}")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _package_for(self, job: Dict[str, Any]) -> LoadedModelPackage:
+        """The live package for a new job, the job's own package for a resumed one."""
+        pkg = self.package_provider()
+        if job["package_id"] is None:
+            if pkg is None:
+                raise RuntimeError("Model package not loaded")
+            return pkg
+        if pkg is not None and pkg.manifest.get("package_id", "unknown") == job["package_id"]:
+            return pkg
+
+        try:
+            pinned = load_model_package(job["package_dir"])
+        except Exception as e:
+            raise RuntimeError(
+                f"Job started on package {job['package_id']}, which can no longer be loaded: {e}"
+            ) from e
+        print(f"⚠️ Job {job['job_id']} resumes on its own package {job['package_id']}")
+        return pinned
+
+    def _score_job(self, job_id: str, batch: Any) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        job = self.store.get(job_id)
+        pkg = self._package_for(job)
+        input_path = Path(job["input_path"])
+        job = self.store.update(
+            job_id,
+            state="running",
+            started_at=job["started_at"] or _utc_now(),
+            attempts=job["attempts"] + 1,
+            package_id=pkg.manifest.get("package_id", "unknown"),
+            package_dir=str(pkg.package_dir),
+            n_rows_total=batch.count_input_rows(input_path),
+        )
+
+        chunks_done = job["chunks_done"]
+        rows_done = job["rows_done"]
+        part_rows = list(job["part_rows"])
+        seconds = job["seconds"]
+        rows_this_run = 0
+        start = time.perf_counter()
+
+        for index, chunk in enumerate(batch.iter_input_chunks(input_path, job["chunk_rows"])):
+            if index < chunks_done:
+                continue  # scored by an earlier run
+            if self._stop.is_set():
+                return  # left `running`: the next worker resumes here
+
+            scored = batch.score_frame(pkg, chunk)
+            part = self.store.part_path(job_id, index)
+            tmp = part.with_suffix(".tmp")
+            pq.write_table(pa.Table.from_pandas(scored, preserve_index=False), tmp)
+            os.replace(tmp, part)
+
+            n_rows = len(scored)
+            chunks_done = index + 1
+            rows_done += n_rows
+            rows_this_run += n_rows
+            part_rows.append(n_rows)
+            elapsed = time.perf_counter() - start
+            self.store.update(
+                job_id,
+                chunks_done=chunks_done,
+                rows_done=rows_done,
+                part_rows=part_rows,
+                seconds=round(seconds + elapsed, 3),
+                rows_per_s=round(rows_this_run / max(elapsed, 1e-9), 1),
+            )
+            with self._lock:
+                self.rows_scored += n_rows
+
+        job = self.store.update(job_id, state="succeeded", finished_at=_utc_now())
+        with self._lock:
+            self.jobs_succeeded += 1
+        print(f"✅ Job {job_id}: {rows_done:,} rows in {chunks_done} chunks | {job['rows_per_s']:,} rows/s")
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "jobs_succeeded": self.jobs_succeeded,
+            "jobs_failed": self.jobs_failed,
+            "rows_scored": self.rows_scored,
+            "jobs_removed": self.jobs_removed,
+            "retention_s": self.retention_s,
+        }
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`)."""
+        return (
+            _COMPLETED.render([self.jobs_succeeded, self.jobs_failed])
+            + _ROWS.render([self.rows_scored])
+            + _ACTIVE.render([self.active])
+            + _REMOVED.render([self.jobs_removed])
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs-dir", default="logs/jobs")
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--poll-interval-s", type=float, default=1.0)
+    parser.add_argument("--retention-s", type=float, default=7 * 24 * 3600.0)
+    args = parser.parse_args()
+
+    package = load_model_package(args.package_dir)
+    runner = JobRunner(
+        JobStore(args.jobs_dir),
+        lambda: package,
+        workers=args.workers,
+        poll_interval_s=args.poll_interval_s,
+        retention_s=args.retention_s,
+    )
+    runner.start()
+    print(f"✅ Job workers: {args.workers} on {args.jobs_dir} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        runner.stop()
@@ -1,78 +1,450 @@
 from __future__ import annotations
 
+import asyncio
+import hmac
+import json
 import os
+import tempfile
 import time
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
-from app.model_loader import load_model_package
+from app.admission import AdmissionController, AdmissionLane, LoadShed
+from app.batching import MicroBatcher
+from app.columnar import (
+    ARROW_STREAM_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    decode_columns,
+    encode_arrow_predictions,
+    encode_json_predictions,
+    is_arrow,
+)
+from app.executor import BookkeepingQueue, InferenceExecutor
+from app.jobs import JobRunner, JobStore
+from app.model_loader import LoadedModelPackage, load_model_package
+from app.package_manager import PackageManager
+from app.predict import encode_batch_response
+from app.prediction_cache import PredictionCache
 from app.schemas import (
+    AdminReloadRequest,
     PredictRequest,
     PredictResponse,
     BatchPredictRequest,
     BatchPredictResponse,
 )
-from app.predict import predict_one, predict_batch
-from app.validation import validate_feature_payload, validate_prediction_output
+from app.validation import (
+    BatchValidationResult,
+    validate_feature_batch,
+    validate_feature_columns,
+    validate_feature_payload,
+    validate_prediction_output,
+)
+from app.warmup import synthetic_matrix, warm_up
 
-from app.monitoring.inference_logger import InferenceLogger, generate_request_id
+from app.monitoring.inference_logger import (
+    BufferedInferenceLogger,
+    InferenceLogger,
+    generate_request_id,
+)
 from app.monitoring.metrics_store import MetricsStore
+from app.monitoring.prometheus import OPENMETRICS_CONTENT_TYPE, GaugeFamily, render_exposition
 from app.monitoring.request_metrics import MetricsMiddleware
 from app.monitoring.prediction_reliability import PredictionReliabilityStore
 from app.monitoring.data_reliability import DataReliabilityStore
+from app.monitoring.shared_memory import METRICS_BACKENDS
+from app.monitoring.drift.online_drift import OnlineDriftMonitor, build_online_drift_monitor
 
 
 PACKAGE_DIR = os.getenv("MODEL_PACKAGE_DIR", "ml/packaging/packages/latest")
+# Memory-map model arrays on load: r (default) | none
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r").lower()
+# Serve from flat trees + fused transform while model.joblib loads in the background
+MODEL_DEFERRED_LOAD = os.getenv("MODEL_DEFERRED_LOAD", "true").lower() in ("1", "true", "yes")
+# Poll for a new package (or a moved `latest`) every N seconds; 0 = off
+PACKAGE_WATCH_INTERVAL_S = float(os.getenv("PACKAGE_WATCH_INTERVAL_S", "30"))
+# Required in X-Admin-Token for /admin/*; unset disables those routes
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Synthetic warm-up before a package serves (and before /ready flips)
+WARMUP_BATCH_SIZES = [int(n) for n in os.getenv("WARMUP_BATCH_SIZES", "1,8,64,256").split(",") if n.strip()]
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))
 INFERENCE_LOG_PATH = os.getenv("INFERENCE_LOG_PATH", "logs/inference_log.jsonl")
 FAILURE_LOG_PATH = os.getenv("FAILURE_LOG_PATH", "logs/failures.jsonl")
 
+# Buffered inference logging (background writer thread)
+INFERENCE_LOG_BUFFERED = os.getenv("INFERENCE_LOG_BUFFERED", "true").lower() in ("1", "true", "yes")
+INFERENCE_LOG_BUFFER_SIZE = int(os.getenv("INFERENCE_LOG_BUFFER_SIZE", "10000"))
+INFERENCE_LOG_FLUSH_INTERVAL_S = float(os.getenv("INFERENCE_LOG_FLUSH_INTERVAL_S", "1.0"))
+INFERENCE_LOG_OVERFLOW_POLICY = os.getenv("INFERENCE_LOG_OVERFLOW_POLICY", "drop_oldest")
+
+# Inference log sink: jsonl | parquet | both
+INFERENCE_LOG_SINK = os.getenv("INFERENCE_LOG_SINK", "jsonl").lower()
+INFERENCE_PARQUET_DIR = os.getenv("INFERENCE_PARQUET_DIR", "logs/inference_parquet")
+INFERENCE_PARQUET_MAX_ROWS = int(os.getenv("INFERENCE_PARQUET_MAX_ROWS", "500000"))
+INFERENCE_PARQUET_MAX_AGE_S = float(os.getenv("INFERENCE_PARQUET_MAX_AGE_S", "3600"))
+
+# Opt-in micro-batching of concurrent /predict calls (scored on the batcher
+# thread, so it bypasses INFERENCE_EXECUTOR=process for /predict)
+PREDICT_BATCHING_ENABLED = os.getenv("PREDICT_BATCHING_ENABLED", "false").lower() in ("1", "true", "yes")
+PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "32"))
+
+# Opt-in LRU/TTL cache of /predict results (exact vectors unless DECIMALS is set)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "300"))
+PREDICTION_CACHE_DECIMALS = os.getenv("PREDICTION_CACHE_DECIMALS", "")
+
+# Admission control: per-lane concurrency / in-flight row budgets and queue-time
+# budgets; beyond them requests are shed (429/503 + Retry-After) instead of queueing
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_SINGLE_CONCURRENCY = int(os.getenv("ADMISSION_SINGLE_CONCURRENCY", "64"))
+ADMISSION_SINGLE_QUEUE = int(os.getenv("ADMISSION_SINGLE_QUEUE", "256"))
+ADMISSION_SINGLE_QUEUE_MS = float(os.getenv("ADMISSION_SINGLE_QUEUE_MS", "100"))
+ADMISSION_BATCH_CONCURRENCY = int(os.getenv("ADMISSION_BATCH_CONCURRENCY", "2"))
+ADMISSION_BATCH_MAX_ROWS = int(os.getenv("ADMISSION_BATCH_MAX_ROWS", "200000"))
+ADMISSION_BATCH_QUEUE = int(os.getenv("ADMISSION_BATCH_QUEUE", "16"))
+ADMISSION_BATCH_QUEUE_MS = float(os.getenv("ADMISSION_BATCH_QUEUE_MS", "2000"))
+# batch bodies are admitted before they are read: larger ones get 413 unread,
+# others hold (size / BYTES_PER_ROW) rows of the budget while parsed and scored
+ADMISSION_BATCH_MAX_BODY_BYTES = int(os.getenv("ADMISSION_BATCH_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
+ADMISSION_BATCH_BYTES_PER_ROW = int(os.getenv("ADMISSION_BATCH_BYTES_PER_ROW", "200"))
+
+# Async batch jobs: filesystem queue + local worker threads (0 workers: queue only,
+# scored by `python -m app.jobs` processes sharing JOBS_DIR)
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() in ("1", "true", "yes")
+JOBS_DIR = os.getenv("JOBS_DIR", "logs/jobs")
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "1"))
+JOBS_CHUNK_ROWS = int(os.getenv("JOBS_CHUNK_ROWS", "50000"))
+JOBS_INPUT_DIRS = [d for d in os.getenv("JOBS_INPUT_DIRS", "ml/data").split(",") if d.strip()]
+JOBS_POLL_INTERVAL_S = float(os.getenv("JOBS_POLL_INTERVAL_S", "1.0"))
+# finished jobs (records, inputs, results) are deleted this long after finishing; 0 keeps them
+JOBS_RETENTION_S = float(os.getenv("JOBS_RETENTION_S", str(7 * 24 * 3600)))
+JOBS_MAX_PAGE_ROWS = 10_000
+
+# Where CPU-bound model work runs: default | thread | process
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "default").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0")) or None
+# Inference-log writes allowed to wait behind the bookkeeping thread (more are dropped)
+BOOKKEEPING_MAX_PENDING = int(os.getenv("BOOKKEEPING_MAX_PENDING", "10000"))
+
+# Monitoring store backend: local (per worker) | shared (mmap, all workers)
+METRICS_BACKEND = os.getenv("METRICS_BACKEND", "local").lower()
+METRICS_SHARED_DIR = os.getenv(
+    "METRICS_SHARED_DIR",
+    "/dev/shm/nba_api_metrics" if os.path.isdir("/dev/shm")
+    else os.path.join(tempfile.gettempdir(), "nba_api_metrics"),
+)
+METRICS_SHARED_STRIPES = int(os.getenv("METRICS_SHARED_STRIPES", "32"))
+
+# Online drift against the package's reference sketches
+ONLINE_DRIFT_ENABLED = os.getenv("ONLINE_DRIFT_ENABLED", "true").lower() in ("1", "true", "yes")
+DRIFT_PSI_THRESHOLD = float(os.getenv("DRIFT_PSI_THRESHOLD", "0.2"))
+# /drift scores live traffic in tumbling windows of this length; 0 = since start-up
+DRIFT_WINDOW_S = float(os.getenv("DRIFT_WINDOW_S", "3600"))
+
 app = FastAPI(
     title="NBA Career Prediction API",
     description="Predict whether an NBA player will stay at least 5 years in the league.",
     version="2.0.0",
 )
 
-templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
+# the Jinja UI is built on the first request to `/`
+_templates: Any = None
 
 model_package: Any = None
+drift_monitor: Optional[OnlineDriftMonitor] = None
+# set once startup (load + warm-up of the package and executor) is done
+startup_complete = False
+
+if INFERENCE_LOG_SINK in ("parquet", "both"):
+    from app.monitoring.parquet_sink import ParquetEventSink
+
+    parquet_sink = ParquetEventSink(
+        INFERENCE_PARQUET_DIR,
+        max_rows_per_file=INFERENCE_PARQUET_MAX_ROWS,
+        max_file_age_s=INFERENCE_PARQUET_MAX_AGE_S,
+    )
+else:
+    parquet_sink = None
 
-inference_logger = InferenceLogger(
-    log_path=INFERENCE_LOG_PATH,
-    failure_log_path=FAILURE_LOG_PATH,
+if INFERENCE_LOG_BUFFERED:
+    inference_logger = BufferedInferenceLogger(
+        log_path=INFERENCE_LOG_PATH,
+        failure_log_path=FAILURE_LOG_PATH,
+        max_buffer_size=INFERENCE_LOG_BUFFER_SIZE,
+        flush_interval_s=INFERENCE_LOG_FLUSH_INTERVAL_S,
+        overflow_policy=INFERENCE_LOG_OVERFLOW_POLICY,
+        parquet_sink=parquet_sink,
+        write_jsonl=INFERENCE_LOG_SINK != "parquet",
+    )
+else:
+    inference_logger = InferenceLogger(
+        log_path=INFERENCE_LOG_PATH,
+        failure_log_path=FAILURE_LOG_PATH,
+        parquet_sink=parquet_sink,
+        write_jsonl=INFERENCE_LOG_SINK != "parquet",
+    )
+
+if METRICS_BACKEND not in METRICS_BACKENDS:
+    raise ValueError(f"Unknown METRICS_BACKEND: {METRICS_BACKEND} (expected one of {METRICS_BACKENDS})")
+
+_store_kwargs: Dict[str, Any] = (
+    {"shared_dir": METRICS_SHARED_DIR, "n_stripes": METRICS_SHARED_STRIPES}
+    if METRICS_BACKEND == "shared"
+    else {}
+)
+metrics_store = MetricsStore(**_store_kwargs)
+prediction_reliability_store = PredictionReliabilityStore(**_store_kwargs)
+data_reliability_store = DataReliabilityStore(**_store_kwargs)
+
+micro_batcher = (
+    MicroBatcher(
+        max_batch_size=PREDICT_BATCH_MAX_SIZE,
+        max_wait_ms=PREDICT_BATCH_MAX_WAIT_MS,
+    )
+    if PREDICT_BATCHING_ENABLED
+    else None
+)
+
+prediction_cache = (
+    PredictionCache(
+        max_entries=PREDICTION_CACHE_MAX_ENTRIES,
+        ttl_s=PREDICTION_CACHE_TTL_S,
+        quantize_decimals=int(PREDICTION_CACHE_DECIMALS) if PREDICTION_CACHE_DECIMALS else None,
+    )
+    if PREDICTION_CACHE_ENABLED
+    else None
 )
 
-metrics_store = MetricsStore()
-prediction_reliability_store = PredictionReliabilityStore()
-data_reliability_store = DataReliabilityStore()
+admission_controller = (
+    AdmissionController(
+        {
+            "single": AdmissionLane(
+                "single",
+                max_concurrency=ADMISSION_SINGLE_CONCURRENCY,
+                max_rows=ADMISSION_SINGLE_CONCURRENCY,
+                max_queue=ADMISSION_SINGLE_QUEUE,
+                max_queue_ms=ADMISSION_SINGLE_QUEUE_MS,
+            ),
+            "batch": AdmissionLane(
+                "batch",
+                max_concurrency=ADMISSION_BATCH_CONCURRENCY,
+                max_rows=ADMISSION_BATCH_MAX_ROWS,
+                max_queue=ADMISSION_BATCH_QUEUE,
+                max_queue_ms=ADMISSION_BATCH_QUEUE_MS,
+                max_body_bytes=ADMISSION_BATCH_MAX_BODY_BYTES,
+                bytes_per_row=ADMISSION_BATCH_BYTES_PER_ROW,
+            ),
+        },
+        on_shed=metrics_store.record_shed,
+    )
+    if ADMISSION_ENABLED
+    else None
+)
+
+job_runner = (
+    JobRunner(
+        JobStore(JOBS_DIR, input_roots=JOBS_INPUT_DIRS),
+        lambda: model_package,
+        workers=JOBS_WORKERS,
+        poll_interval_s=JOBS_POLL_INTERVAL_S,
+        retention_s=JOBS_RETENTION_S,
+    )
+    if JOBS_ENABLED
+    else None
+)
+
+inference_executor = InferenceExecutor(
+    mode=INFERENCE_EXECUTOR,
+    max_workers=INFERENCE_WORKERS,
+)
+bookkeeping = BookkeepingQueue(max_pending=BOOKKEEPING_MAX_PENDING)
 
 app.add_middleware(MetricsMiddleware, metrics_store=metrics_store)
 
 
+@app.exception_handler(LoadShed)
+async def load_shed_handler(request: Request, exc: LoadShed):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail, "reason": exc.reason},
+        headers=exc.headers,
+    )
+
+
+@asynccontextmanager
+async def _admit(lane: str, n_rows: int = 1):
+    if admission_controller is None:
+        yield
+        return
+    async with admission_controller.admit(lane, n_rows):
+        yield
+
+
+@asynccontextmanager
+async def _admit_body(lane: str, request: Request):
+    """Admission on the declared body size, before the body is read."""
+    if admission_controller is None:
+        yield
+        return
+    length = request.headers.get("content-length")
+    try:
+        n_bytes = int(length) if length is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    async with admission_controller.admit_body(lane, n_bytes):
+        yield
+
+
+async def _read_body(request: Request, lane: str) -> bytes:
+    """The body, cut off with a 413 past the lane's limit (Content-Length may be absent or wrong)."""
+    limit = admission_controller.lanes[lane].max_body_bytes if admission_controller is not None else None
+    if limit is None:
+        return await request.body()
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise admission_controller.too_large(lane, f"Body exceeds the {lane} limit ({limit} bytes); split the request")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _check_rows(lane: str, n_rows: int) -> None:
+    if admission_controller is not None:
+        admission_controller.check_rows(lane, n_rows)
+
+
+def _mmap_mode() -> Optional[str]:
+    return None if MODEL_MMAP_MODE in ("", "none", "off", "false") else MODEL_MMAP_MODE
+
+
+def _warm_up(pkg: LoadedModelPackage) -> Any:
+    return warm_up(pkg, batch_sizes=WARMUP_BATCH_SIZES, rounds=WARMUP_ROUNDS)
+
+
+def _executor_warmup_matrix(pkg: LoadedModelPackage) -> Any:
+    return synthetic_matrix(pkg, max(WARMUP_BATCH_SIZES, default=1))
+
+
+package_manager = PackageManager(
+    PACKAGE_DIR,
+    mmap_mode=_mmap_mode(),
+    loader=partial(load_model_package, defer_model=MODEL_DEFERRED_LOAD),
+    warmup=_warm_up,
+)
+
+
+def _on_package_swap(new: LoadedModelPackage, old: Optional[LoadedModelPackage]) -> None:
+    """Make `new` the live package; requests already running keep `old`."""
+    global model_package, drift_monitor
+
+    if ONLINE_DRIFT_ENABLED:
+        # drift is measured against the new package's reference sketches
+        drift_monitor = build_online_drift_monitor(
+            new.reference_sketches,
+            psi_threshold=DRIFT_PSI_THRESHOLD,
+            window_s=DRIFT_WINDOW_S,
+        )
+        if drift_monitor is None:
+            print("⚠️ No reference sketches in package, online drift disabled")
+
+    model_package = new
+    if parquet_sink is not None:
+        # only the package's own inputs (raw or engineered) become feature columns
+        parquet_sink.set_features(list(dict.fromkeys(new.input_features + new.features)))
+    if prediction_cache is not None:
+        prediction_cache.clear()
+
+    if old is not None:
+        inference_executor.swap_package(
+            new.package_dir,
+            mmap_mode=_mmap_mode(),
+            warmup_X=_executor_warmup_matrix(new),
+        )
+
+
+package_manager.add_swap_hook(_on_package_swap)
+
+
 @app.on_event("startup")
 def startup_event():
-    global model_package
+    global startup_complete
     try:
-        model_package = load_model_package(PACKAGE_DIR)
+        package_manager.reload()
         print(f"✅ Loaded model package from: {model_package.package_dir}")
+        print(f"✅ Warm-up done in {package_manager.last_warmup.total_s:.2f}s")
     except Exception as e:
         print(f"❌ Failed to load model package: {e}")
         raise
 
+    inference_executor.start(
+        model_package.package_dir,
+        mmap_mode=_mmap_mode(),
+        warmup_X=_executor_warmup_matrix(model_package),
+    )
+    print(f"✅ Inference executor: {inference_executor.mode}")
+
+    package_manager.start_watching(PACKAGE_WATCH_INTERVAL_S)
+
+    if job_runner is not None:
+        # also resumes jobs a crashed process left running
+        job_runner.start()
+        print(f"✅ Batch jobs: {JOBS_WORKERS} workers on {JOBS_DIR}")
+
+    if micro_batcher is not None:
+        micro_batcher.start()
+        print(
+            f"✅ Micro-batching enabled "
+            f"(max_batch_size={PREDICT_BATCH_MAX_SIZE}, max_wait_ms={PREDICT_BATCH_MAX_WAIT_MS})"
+        )
+        if inference_executor.mode == "process":
+            print("⚠️ Micro-batched /predict calls are scored in the API process, not the process pool")
+
+    startup_complete = True
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    global startup_complete
+    startup_complete = False
+    package_manager.stop_watching()
+    if job_runner is not None:
+        job_runner.stop()
+    if micro_batcher is not None:
+        micro_batcher.stop()
+    inference_executor.shutdown()
+    bookkeeping.shutdown()
+    # stops the writer thread first, then drains and closes the sink
+    inference_logger.close()
+
 
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request):
     if model_package is None:
         raise HTTPException(status_code=500, detail="Model package not loaded")
 
-    return templates.TemplateResponse(
+    global _templates
+    if _templates is None:
+        from fastapi.templating import Jinja2Templates
+
+        _templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
+
+    return _templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "features": model_package.features,
+            "features": model_package.input_features,
             "threshold": model_package.threshold,
             "package_id": model_package.manifest.get("package_id"),
         },
@@ -81,12 +453,30 @@ def home(request: Request):
 
 @app.get("/health")
 def health():
+    """Liveness: the process is up (use /ready to gate traffic)."""
     return {
         "status": "ok",
         "model_loaded": model_package is not None,
     }
 
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness: 200 once the package is loaded and warmed (in process and
+    in the inference executor), 503 before. Hot swaps keep it ready, the
+    old package serves until the new one is warm.
+    """
+    if not (startup_complete and package_manager.ready):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+
+    return {
+        "status": "ready",
+        "package_id": package_manager.current.manifest.get("package_id"),
+        "warmup": package_manager.get_metrics()["warmup"],
+    }
+
+
 @app.get("/model-info")
 def model_info():
     if model_package is None:
@@ -98,6 +488,14 @@ def model_info():
         "threshold": model_package.threshold,
         "n_features": len(model_package.features),
         "features": model_package.features,
+        # what /predict expects; differs from `features` when the package
+        # computes its domain features server-side
+        "input_features": model_package.input_features,
+        "domain_features": (
+            model_package.domain_features.domain_features
+            if model_package.domain_features is not None
+            else []
+        ),
     }
 
 
@@ -108,28 +506,157 @@ def get_metrics():
     - system reliability
     - prediction reliability
     - data reliability
+    - inference executor
+    - inference logging
+    - model package (hot reload)
+    - admission control / batch jobs / micro-batching / prediction cache (when enabled)
     """
-    return {
+    metrics = {
         "system_reliability": metrics_store.get_metrics(),
         "prediction_reliability": prediction_reliability_store.get_metrics(),
         "data_reliability": data_reliability_store.get_metrics(),
+        "executor": inference_executor.get_metrics(),
+        "bookkeeping": bookkeeping.get_metrics(),
+        "inference_logging": inference_logger.get_metrics(),
+        "package": package_manager.get_metrics(),
     }
 
+    if admission_controller is not None:
+        metrics["admission"] = admission_controller.get_metrics()
+    if job_runner is not None:
+        metrics["jobs"] = job_runner.get_metrics()
+    if micro_batcher is not None:
+        metrics["batching"] = micro_batcher.get_metrics()
+    if prediction_cache is not None:
+        metrics["prediction_cache"] = prediction_cache.get_metrics()
+
+    return metrics
+
+
+@app.get("/metrics/prometheus")
+def get_metrics_prometheus():
+    """
+    The monitoring stores in OpenMetrics text format (for Prometheus).
+    """
+    sections = [
+        metrics_store.render_openmetrics(),
+        prediction_reliability_store.render_openmetrics(),
+        data_reliability_store.render_openmetrics(),
+        package_manager.render_openmetrics(),
+    ]
+    if admission_controller is not None:
+        sections.append(admission_controller.render_openmetrics())
+    if job_runner is not None:
+        sections.append(job_runner.render_openmetrics())
+    if prediction_cache is not None:
+        sections.append(prediction_cache.render_openmetrics())
+
+    if model_package is not None:
+        sections.append(
+            GaugeFamily(
+                "model_info",
+                "Loaded model package.",
+                [{"package_id": model_package.manifest.get("package_id", "unknown")}],
+            ).render([1])
+        )
+
+    return Response(
+        content=render_exposition(sections),
+        media_type=OPENMETRICS_CONTENT_TYPE,
+    )
+
+
+@app.get("/drift")
+def get_drift():
+    """
+    Online drift of live traffic vs the package's reference sketches
+    (PSI, approximate KS and Wasserstein per feature), over the current
+    DRIFT_WINDOW_S window, with a summary of the previous one.
+    """
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Online drift monitoring not available")
+
+    return drift_monitor.get_report()
+
+
+# ------------------------------------------------------------------
+# Admin: hot reload / pinning
+# ------------------------------------------------------------------
+def _check_admin_token(request: Request) -> None:
+    # fail closed: without a configured token the admin routes do not exist
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get("/admin/package")
+def admin_package(request: Request):
+    """The live package, pin and reload history."""
+    _check_admin_token(request)
+    return package_manager.get_metrics()
+
+
+@app.post("/admin/drift/reset")
+def admin_drift_reset(request: Request):
+    """Forget the traffic seen so far and start a new drift window now."""
+    _check_admin_token(request)
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Online drift monitoring not available")
+    drift_monitor.reset()
+    return {"window_start": drift_monitor.get_report()["window_start"]}
+
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request, payload: Optional[AdminReloadRequest] = None):
+    """
+    Load, warm and swap in a package without downtime.
+
+    No package_id reloads the current target (the pinned package, or
+    MODEL_PACKAGE_DIR); a package_id pins that package; "latest" unpins.
+    On failure the old package keeps serving.
+    """
+    _check_admin_token(request)
+    package_id = payload.package_id if payload is not None else None
+
+    try:
+        if package_id is None:
+            swapped = await run_in_threadpool(package_manager.reload)
+        elif package_id == "latest":
+            swapped = await run_in_threadpool(package_manager.unpin)
+        else:
+            swapped = await run_in_threadpool(package_manager.pin, package_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, previous package kept: {e}")
+
+    return {"swapped": swapped, **package_manager.get_metrics()}
+
 
 @app.post("/predict", response_model=PredictResponse)
-def predict(payload: PredictRequest):
-    if model_package is None:
+async def predict(payload: PredictRequest):
+    async with _admit("single"):
+        return await _predict(payload)
+
+
+async def _predict(payload: PredictRequest):
+    pkg = model_package
+    if pkg is None:
         raise HTTPException(status_code=500, detail="Model package not loaded")
+    # engineered columns sent by the client are used as they are
+    pkg = pkg.for_payload(payload.features)
 
     request_id = generate_request_id()
     start = time.perf_counter()
+    package_id = pkg.manifest.get("package_id", "unknown")
 
     # ------------------------------
     # Data reliability checks
     # ------------------------------
     is_valid_payload, counts, payload_error = validate_feature_payload(
         payload.features,
-        model_package.features,
+        pkg.input_features,
     )
 
     data_reliability_store.record_payload(
@@ -142,10 +669,11 @@ def predict(payload: PredictRequest):
     if not is_valid_payload:
         latency_ms = (time.perf_counter() - start) * 1000.0
 
-        inference_logger.log_single_inference(
+        bookkeeping.offer(
+            inference_logger.log_single_inference,
             request_id=request_id,
-            package_id=model_package.manifest.get("package_id", "unknown"),
-            threshold=model_package.threshold,
+            package_id=package_id,
+            threshold=pkg.threshold,
             features=payload.features,
             prediction=-1,
             probability=-1.0,
@@ -157,7 +685,20 @@ def predict(payload: PredictRequest):
         raise HTTPException(status_code=400, detail=payload_error)
 
     try:
-        result = predict_one(model_package, payload.features)
+        # validated payload: a cache hit skips inference only
+        cache_key = (
+            prediction_cache.key(package_id, pkg.input_features, payload.features)
+            if prediction_cache is not None
+            else None
+        )
+        cached = prediction_cache.get(cache_key) if cache_key is not None else None
+
+        if cached is not None:
+            result = cached
+        elif micro_batcher is not None:
+            result = await asyncio.wrap_future(micro_batcher.submit(pkg, payload.features))
+        else:
+            result = await inference_executor.predict_one(pkg, payload.features)
         latency_ms = (time.perf_counter() - start) * 1000.0
 
         # ------------------------------
@@ -175,10 +716,11 @@ def predict(payload: PredictRequest):
         )
 
         if not is_valid_prediction:
-            inference_logger.log_single_inference(
+            bookkeeping.offer(
+                inference_logger.log_single_inference,
                 request_id=request_id,
-                package_id=model_package.manifest.get("package_id", "unknown"),
-                threshold=model_package.threshold,
+                package_id=package_id,
+                threshold=pkg.threshold,
                 features=payload.features,
                 prediction=result.prediction,
                 probability=result.probability,
@@ -188,10 +730,14 @@ def predict(payload: PredictRequest):
             )
             raise HTTPException(status_code=500, detail=prediction_error)
 
-        inference_logger.log_single_inference(
+        if cache_key is not None and cached is None:
+            prediction_cache.put(cache_key, result)
+
+        bookkeeping.offer(
+            inference_logger.log_single_inference,
             request_id=request_id,
-            package_id=model_package.manifest.get("package_id", "unknown"),
-            threshold=model_package.threshold,
+            package_id=package_id,
+            threshold=pkg.threshold,
             features=payload.features,
             prediction=result.prediction,
             probability=result.probability,
@@ -199,6 +745,9 @@ def predict(payload: PredictRequest):
             status="success",
         )
 
+        if drift_monitor is not None:
+            bookkeeping.submit(_update_drift_row, drift_monitor, pkg, payload.features)
+
         return result
 
     except HTTPException:
@@ -207,10 +756,11 @@ def predict(payload: PredictRequest):
     except Exception as e:
         latency_ms = (time.perf_counter() - start) * 1000.0
 
-        inference_logger.log_single_inference(
+        bookkeeping.offer(
+            inference_logger.log_single_inference,
             request_id=request_id,
-            package_id=model_package.manifest.get("package_id", "unknown"),
-            threshold=model_package.threshold,
+            package_id=package_id,
+            threshold=pkg.threshold,
             features=payload.features,
             prediction=-1,
             probability=-1.0,
@@ -222,69 +772,109 @@ def predict(payload: PredictRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/predict_batch", response_model=BatchPredictResponse)
-def predict_batch_endpoint(payload: BatchPredictRequest):
-    if model_package is None:
+def _update_drift_row(monitor: OnlineDriftMonitor, pkg: Any, row: Dict[str, float]) -> None:
+    # the reference sketches cover the model's features, engineered ones included
+    monitor.update_row(pkg.model_row(row))
+
+
+def _update_drift_matrix(monitor: OnlineDriftMonitor, pkg: Any, X: Any) -> None:
+    monitor.update_columns(dict(zip(pkg.features, pkg.model_matrix(X).T)))
+
+
+def _record_batch_payloads(validation: BatchValidationResult) -> None:
+    data_reliability_store.record_payloads(
+        valid_count=validation.valid_count,
+        invalid_count=validation.invalid_count,
+        missing_count=validation.missing_count,
+        unexpected_count=validation.unexpected_count,
+        invalid_value_count=validation.invalid_value_count,
+    )
+
+
+@app.post(
+    "/predict_batch",
+    response_model=BatchPredictResponse,
+    # the body is parsed in the handler, after admission
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": BatchPredictRequest.model_json_schema()}},
+        }
+    },
+)
+async def predict_batch_endpoint(request: Request):
+    async with _admit_body("batch", request):
+        body = await _read_body(request, "batch")
+        try:
+            payload = await run_in_threadpool(BatchPredictRequest.model_validate_json, body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            )
+        _check_rows("batch", len(payload.rows))
+        return await _predict_batch(payload)
+
+
+async def _predict_batch(payload: BatchPredictRequest):
+    pkg = model_package
+    if pkg is None:
         raise HTTPException(status_code=500, detail="Model package not loaded")
+    pkg = pkg.for_payload(payload.rows[0] if payload.rows else ())
 
     request_id = generate_request_id()
     start = time.perf_counter()
+    package_id = pkg.manifest.get("package_id", "unknown")
 
     # ------------------------------
     # Data reliability checks for all rows
     # ------------------------------
-    for row in payload.rows:
-        is_valid_payload, counts, payload_error = validate_feature_payload(
-            row,
-            model_package.features,
-        )
-
-        data_reliability_store.record_payload(
-            is_valid=is_valid_payload,
-            missing_count=counts["missing_count"],
-            unexpected_count=counts["unexpected_count"],
-            invalid_value_count=counts["invalid_value_count"],
-        )
+    validation = await run_in_threadpool(
+        validate_feature_batch,
+        payload.rows,
+        pkg.input_features,
+    )
+    _record_batch_payloads(validation)
 
-        if not is_valid_payload:
-            latency_ms = (time.perf_counter() - start) * 1000.0
+    if not validation.is_valid:
+        latency_ms = (time.perf_counter() - start) * 1000.0
 
-            inference_logger.log_batch_inference(
-                request_id=request_id,
-                package_id=model_package.manifest.get("package_id", "unknown"),
-                threshold=model_package.threshold,
-                n_rows=len(payload.rows),
-                latency_ms=latency_ms,
-                status="failed",
-                error_message=payload_error,
-            )
+        bookkeeping.offer(
+            inference_logger.log_batch_inference,
+            request_id=request_id,
+            package_id=package_id,
+            threshold=pkg.threshold,
+            n_rows=len(payload.rows),
+            latency_ms=latency_ms,
+            status="failed",
+            error_message=validation.error,
+        )
 
-            raise HTTPException(status_code=400, detail=payload_error)
+        raise HTTPException(
+            status_code=400,
+            detail={"error": validation.error, "invalid_rows": validation.invalid_rows},
+        )
 
     try:
-        result = predict_batch(model_package, payload.rows)
+        probas, preds = await inference_executor.predict_matrix(pkg, validation.matrix)
         latency_ms = (time.perf_counter() - start) * 1000.0
 
         # ------------------------------
         # Prediction reliability checks for all outputs
         # ------------------------------
-        for row_pred in result.predictions:
-            is_valid_prediction, _ = validate_prediction_output(
-                row_pred.prediction,
-                row_pred.probability,
-            )
+        prediction_reliability_store.record_predictions(
+            predictions=preds,
+            probabilities=probas,
+        )
 
-            prediction_reliability_store.record_prediction(
-                prediction=row_pred.prediction,
-                probability=row_pred.probability,
-                is_valid=is_valid_prediction,
-            )
+        if drift_monitor is not None:
+            bookkeeping.submit(_update_drift_matrix, drift_monitor, pkg, validation.matrix)
 
-        inference_logger.log_batch_inference(
+        bookkeeping.offer(
+            inference_logger.log_batch_inference,
             request_id=request_id,
-            package_id=model_package.manifest.get("package_id", "unknown"),
-            threshold=model_package.threshold,
-            n_rows=result.n_rows,
+            package_id=package_id,
+            threshold=pkg.threshold,
+            n_rows=validation.n_rows,
             latency_ms=latency_ms,
             status="success",
         )
@@ -293,18 +883,23 @@ def predict_batch_endpoint(payload: BatchPredictRequest):
             latency_ms=latency_ms,
             success=True,
             request_type="batch",
-            n_rows=result.n_rows,
+            n_rows=validation.n_rows,
         )
 
-        return result
+        # written straight from the arrays; response_model only documents the shape
+        return Response(
+            content=encode_batch_response(probas, preds, pkg.threshold),
+            media_type=JSON_MEDIA_TYPE,
+        )
 
     except Exception as e:
         latency_ms = (time.perf_counter() - start) * 1000.0
 
-        inference_logger.log_batch_inference(
+        bookkeeping.offer(
+            inference_logger.log_batch_inference,
             request_id=request_id,
-            package_id=model_package.manifest.get("package_id", "unknown"),
-            threshold=model_package.threshold,
+            package_id=package_id,
+            threshold=pkg.threshold,
             n_rows=len(payload.rows),
             latency_ms=latency_ms,
             status="failed",
@@ -318,4 +913,244 @@ def predict_batch_endpoint(payload: BatchPredictRequest):
             n_rows=len(payload.rows),
         )
 
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/predict_batch/columnar")
+async def predict_batch_columnar(request: Request):
+    """
+    Batch inference on a column-oriented body.
+
+    Accepts an Arrow IPC stream (Content-Type:
+    application/vnd.apache.arrow.stream) or a JSON object
+    {feature: [values...]}. Returns typed arrays: an Arrow IPC stream
+    with `probability` / `prediction` columns when the request is Arrow
+    or Accept asks for it, otherwise JSON
+    {threshold_used, n_rows, probability: [...], prediction: [...]}.
+    """
+    pkg = model_package
+    if pkg is None:
+        raise HTTPException(status_code=500, detail="Model package not loaded")
+
+    request_id = generate_request_id()
+    start = time.perf_counter()
+
+    content_type = request.headers.get("content-type")
+    wants_arrow = is_arrow(request.headers.get("accept")) or is_arrow(content_type)
+
+    # admitted on the body size: a burst of large bodies is shed before it is decoded
+    async with _admit_body("batch", request):
+        body = await _read_body(request, "batch")
+        try:
+            columns = await run_in_threadpool(decode_columns, body, content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        del body  # not kept alive while the batch is scored
+
+        _check_rows("batch", len(next(iter(columns.values()), ())))
+        return await _predict_columns(pkg, columns, wants_arrow, request_id, start)
+
+
+async def _predict_columns(
+    pkg: LoadedModelPackage,
+    columns: Any,
+    wants_arrow: bool,
+    request_id: str,
+    start: float,
+):
+    pkg = pkg.for_payload(columns)
+    package_id = pkg.manifest.get("package_id", "unknown")
+
+    # ------------------------------
+    # Data reliability checks for all rows
+    # ------------------------------
+    validation = await run_in_threadpool(
+        validate_feature_columns,
+        columns,
+        pkg.input_features,
+    )
+    _record_batch_payloads(validation)
+
+    if not validation.is_valid:
+        latency_ms = (time.perf_counter() - start) * 1000.0
+
+        bookkeeping.offer(
+            inference_logger.log_batch_inference,
+            request_id=request_id,
+            package_id=package_id,
+            threshold=pkg.threshold,
+            n_rows=validation.n_rows,
+            latency_ms=latency_ms,
+            status="failed",
+            error_message=validation.error,
+        )
+
+        raise HTTPException(
+            status_code=400,
+            detail={"error": validation.error, "invalid_rows": validation.invalid_rows},
+        )
+
+    try:
+        probas, preds = await inference_executor.predict_matrix(pkg, validation.matrix)
+        latency_ms = (time.perf_counter() - start) * 1000.0
+
+        prediction_reliability_store.record_predictions(
+            predictions=preds,
+            probabilities=probas,
+        )
+
+        if drift_monitor is not None:
+            bookkeeping.submit(_update_drift_matrix, drift_monitor, pkg, validation.matrix)
+
+        bookkeeping.offer(
+            inference_logger.log_batch_inference,
+            request_id=request_id,
+            package_id=package_id,
+            threshold=pkg.threshold,
+            n_rows=validation.n_rows,
+            latency_ms=latency_ms,
+            status="success",
+        )
+
+        metrics_store.record_request(
+            latency_ms=latency_ms,
+            success=True,
+            request_type="batch",
+            n_rows=validation.n_rows,
+        )
+
+    except Exception as e:
+        latency_ms = (time.perf_counter() - start) * 1000.0
+
+        bookkeeping.offer(
+            inference_logger.log_batch_inference,
+            request_id=request_id,
+            package_id=package_id,
+            threshold=pkg.threshold,
+            n_rows=validation.n_rows,
+            latency_ms=latency_ms,
+            status="failed",
+            error_message=str(e),
+        )
+
+        metrics_store.record_request(
+            latency_ms=latency_ms,
+            success=False,
+            request_type="batch",
+            n_rows=validation.n_rows,
+        )
+
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if wants_arrow:
+        return Response(
+            content=encode_arrow_predictions(probas, preds, pkg.threshold),
+            media_type=ARROW_STREAM_MEDIA_TYPE,
+        )
+    return Response(
+        content=encode_json_predictions(probas, preds, pkg.threshold),
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+# ------------------------------------------------------------------
+# Async batch jobs
+# ------------------------------------------------------------------
+def _job_store() -> JobStore:
+    if job_runner is None:
+        raise HTTPException(status_code=404, detail="Batch jobs not enabled")
+    return job_runner.store
+
+
+def _get_job(store: JobStore, job_id: str) -> Dict[str, Any]:
+    try:
+        return store.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    file: Optional[UploadFile] = File(None),
+    input_path: Optional[str] = Form(None),
+    chunk_rows: Optional[int] = Form(None),
+):
+    """
+    Queue a batch scoring job on an uploaded CSV / Parquet file, or on a
+    file under JOBS_INPUT_DIRS (`input_path`). Poll GET /jobs/{job_id};
+    results are paged (/results) or streamed (/results/stream).
+    """
+    store = _job_store()
+    try:
+        job = await run_in_threadpool(
+            store.create,
+            chunk_rows=chunk_rows if chunk_rows is not None else JOBS_CHUNK_ROWS,
+            input_path=input_path,
+            upload=file.file if file is not None else None,
+            filename=file.filename if file is not None else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job_runner.notify()
+    return JSONResponse(
+        status_code=202,
+        content=job,
+        headers={"Location": f"/jobs/{job['job_id']}"},
+    )
+
+
+@app.get("/jobs")
+def list_jobs():
+    return {"jobs": _job_store().list()}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Job state and progress (chunks_done, rows_done, n_rows_total, rows_per_s)."""
+    return _get_job(_job_store(), job_id)
+
+
+@app.get("/jobs/{job_id}/results")
+def get_job_results(job_id: str, offset: int = 0, limit: int = 1000):
+    """
+    One page of scored rows. Available while the job runs, over the
+    chunks completed so far (`complete` is true once it succeeded).
+    """
+    store = _job_store()
+    _get_job(store, job_id)
+    if offset < 0 or not 0 < limit <= JOBS_MAX_PAGE_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset must be >= 0 and limit in 1..{JOBS_MAX_PAGE_ROWS}",
+        )
+
+    page, job = store.read_page(job_id, offset, limit)
+    return {
+        "job_id": job_id,
+        "state": job["state"],
+        "complete": job["state"] == "succeeded",
+        "offset": offset,
+        "n_rows_available": job["rows_done"],
+        "rows": json.loads(page.to_json(orient="records")),
+    }
+
+
+@app.get("/jobs/{job_id}/results/stream")
+def stream_job_results(job_id: str, request: Request):
+    """
+    The whole scored output of a finished job, streamed part by part:
+    CSV, or an Arrow IPC stream when Accept asks for it.
+    """
+    store = _job_store()
+    job = _get_job(store, job_id)
+    if job["state"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['state']}; results are streamed once it succeeded")
+
+    if is_arrow(request.headers.get("accept")):
+        return StreamingResponse(store.iter_arrow(job_id), media_type=ARROW_STREAM_MEDIA_TYPE)
+    return StreamingResponse(
+        store.iter_csv(job_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.csv"'},
+    )
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import json
-import joblib
-import pandas as pd
+import numpy as np
 
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from app.compiled_predictor import CompiledPredictor, compile_exported_predictor, compile_predictor
+from app.domain_features import DomainFeatureKernel, build_domain_feature_kernel
+from app.flat_trees import FlatTreeEnsemble, load_flat_trees
+from app.fused_transform import load_fused_transform
+from app.monitoring.drift.sketches import FeatureSketch, load_reference_sketches
+
+if TYPE_CHECKING:
+    # pandas / joblib (and the sklearn / XGBoost they unpickle) load on first use
+    import pandas as pd
 
 
 @dataclass
@@ -17,12 +27,99 @@ class LoadedModelPackage:
     threshold: float
     features: List[str]
     target_col: str
+    compiled: Optional[CompiledPredictor] = None
+    reference_sketches: Optional[Dict[str, FeatureSketch]] = None
+    flat_trees: Optional[FlatTreeEnsemble] = None
+    domain_features: Optional[DomainFeatureKernel] = None
+    # set while model.joblib is still being loaded in the background
+    model_future: Optional[Future] = None
+    # True for the view that scores rows carrying the engineered columns
+    precomputed: bool = False
+    _precomputed_view: Optional[LoadedModelPackage] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def require_model(self) -> Any:
+        """The fitted pipeline, waiting for a deferred load to finish."""
+        if self.model is None and self.model_future is not None:
+            self.model_future.result()
+        return self.model
+
+    @property
+    def input_features(self) -> List[str]:
+        """
+        Features a request must carry: the raw stats when the package
+        computes its domain features server-side, else `features`.
+        """
+        if self.domain_features is not None:
+            return self.domain_features.input_features
+        return self.features
+
+    def add_domain_features(self, X: pd.DataFrame) -> pd.DataFrame:
+        """X with the engineered columns computed, unless it already has them."""
+        if self.domain_features is None or all(f in X.columns for f in self.features):
+            return X
+        import pandas as pd
+
+        values = self.domain_features.expand(X[self.input_features].to_numpy(dtype=np.float64))
+        return pd.DataFrame(values, columns=self.features, index=X.index)
+
+    def for_payload(self, keys: Iterable[str]) -> LoadedModelPackage:
+        """
+        The package to score a payload with these feature keys. Like
+        score_frame, a payload that already carries every model feature
+        (engineered ones included) is scored on those values; otherwise
+        the domain features are computed from its raw inputs.
+        """
+        if self.domain_features is None:
+            return self
+        keys = set(keys)
+        if not all(f in keys for f in self.features):
+            return self
+        return self.precomputed_view()
+
+    def precomputed_view(self) -> LoadedModelPackage:
+        """This package without server-side domain features: requests carry `features`."""
+        if self.domain_features is None:
+            return self
+        view = self._precomputed_view
+        # rebuilt once a deferred model load swaps in the estimator
+        if view is None or view.model is not self.model:
+            view = replace(
+                self,
+                domain_features=None,
+                compiled=self.compiled.without_domain() if self.compiled is not None else None,
+                model_future=None,
+                precomputed=True,
+            )
+            self._precomputed_view = view
+        return view
+
+    def model_row(self, row: Dict[str, float]) -> Dict[str, float]:
+        """A request row as a dict of the model's features."""
+        if self.domain_features is None:
+            return row
+        return self.domain_features.expand_row(row)
+
+    def model_matrix(self, X: np.ndarray) -> np.ndarray:
+        """A matrix ordered like `input_features` as one ordered like `features`."""
+        if self.domain_features is None:
+            return X
+        return self.domain_features.expand(X)
 
     def predict_proba(self, X: pd.DataFrame):
-        return self.model.predict_proba(X)[:, 1]
+        return self.require_model().predict_proba(self.add_domain_features(X))[:, 1]
+
+    def predict_proba_matrix(self, X: np.ndarray):
+        """Positive-class probabilities for a float matrix ordered like `input_features`."""
+        if self.compiled is not None:
+            return self.compiled.predict_proba_matrix(X)
+        import pandas as pd
+
+        return self.predict_proba(pd.DataFrame(X, columns=self.input_features, copy=False))
 
     def predict(self, X: pd.DataFrame):
-        return self.model.predict(X)
+        return self.require_model().predict(self.add_domain_features(X))
 
 
 def _resolve_latest_package(packages_root: Path) -> Path:
@@ -54,7 +151,61 @@ def _resolve_latest_package(packages_root: Path) -> Path:
     return candidates[0]
 
 
-def load_model_package(package_dir: str | Path) -> LoadedModelPackage:
+def _load_model(model_path: Path, mmap_mode: Optional[str]) -> Any:
+    import joblib
+
+    return joblib.load(model_path, mmap_mode=mmap_mode)
+
+
+def _load_model_in_background(
+    pkg: LoadedModelPackage,
+    model_path: Path,
+    mmap_mode: Optional[str],
+    fused_transform: Any,
+) -> Future:
+    """
+    Unpickle model.joblib on a helper thread, then attach it to `pkg`
+    with a predictor that sends large batches to the estimator again.
+    Until then `pkg.compiled` scores everything with the flat trees.
+    """
+
+    def load() -> Any:
+        try:
+            model = _load_model(model_path, mmap_mode)
+            compiled = compile_predictor(
+                model,
+                pkg.features,
+                flat_trees=pkg.flat_trees,
+                fused_transform=fused_transform,
+                domain_features=pkg.domain_features,
+            )
+            if compiled is not None and compiled.estimator is not None:
+                # booster / thread-pool initialization, off the request path
+                compiled.estimator.predict_proba(
+                    compiled.transform(np.ones((2, len(compiled.features))))
+                )
+        except Exception as e:
+            print(f"❌ Deferred model load failed ({model_path}): {e}")
+            raise
+
+        pkg.model = model
+        if compiled is not None:
+            pkg.compiled = compiled
+        print(f"✅ Model loaded in background: {model_path}")
+        return model
+
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+    future = pool.submit(load)
+    pool.shutdown(wait=False)
+    return future
+
+
+def load_model_package(
+    package_dir: str | Path,
+    *,
+    mmap_mode: Optional[str] = None,
+    defer_model: bool = False,
+) -> LoadedModelPackage:
     """
     Load packaged model + manifest from the deployment package directory.
 
@@ -68,6 +219,31 @@ def load_model_package(package_dir: str | Path) -> LoadedModelPackage:
 
     In case (2) the loader automatically finds the newest
     timestamped package folder.
+
+    `mmap_mode="r"` memory-maps the NumPy arrays of model.joblib
+    (packages are dumped uncompressed) instead of reading them into
+    process memory. Arrays that estimators use as-is (scaler / power
+    transformer parameters) stay shared through the page cache;
+    sklearn trees still copy their node arrays into private memory on
+    unpickling, so for forests this mainly avoids the transient heap
+    copy (see benchmarks/bench_model_load.py).
+
+    A package's flat_trees/ export (see app/flat_trees.py) is loaded
+    with the same mmap_mode and handed to the compiled predictor for
+    single rows and small batches; fused_transform.json (see
+    app/fused_transform.py) replaces its step-by-step preprocessing.
+
+    When the manifest embeds a feature spec (manifest["feature_spec"]),
+    the engineered columns are computed in-process from raw stats and
+    requests carry `input_features` instead of `features`.
+
+    With `defer_model=True`, a package that ships both flat_trees/ and
+    fused_transform.json is usable without model.joblib: it is returned
+    right away with a predictor built from those exports (which need
+    neither sklearn, XGBoost nor pandas) and the pickled pipeline is
+    loaded in the background (`model_future`, see require_model). This
+    takes the unpickling and its imports off the time to first
+    prediction. Other packages load as usual.
     """
 
     package_dir = Path(package_dir)
@@ -102,20 +278,50 @@ def load_model_package(package_dir: str | Path) -> LoadedModelPackage:
     # Load artifacts
     # --------------------------------------------------
     manifest = json.loads(manifest_path.read_text())
-    model = joblib.load(model_path)
 
     threshold = float(manifest["threshold"])
     features = list(manifest["features"])
     target_col = str(manifest["target_col"])
+    flat_trees = load_flat_trees(package_dir, mmap_mode=mmap_mode)
+    fused_transform = load_fused_transform(package_dir)
+    domain_features = build_domain_feature_kernel(manifest, features)
+
+    exported = (
+        compile_exported_predictor(features, flat_trees, fused_transform, domain_features)
+        if defer_model
+        else None
+    )
+    model = _load_model(model_path, mmap_mode) if exported is None else None
 
     print(f"✅ Loaded model package from: {package_dir}")
     print(f"📊 Features: {len(features)} | Threshold: {threshold}")
+    if domain_features is not None:
+        print(
+            f"🧮 Server-side domain features: {domain_features.domain_features} "
+            f"({len(domain_features.input_features)} raw inputs)"
+        )
 
-    return LoadedModelPackage(
+    pkg = LoadedModelPackage(
         package_dir=package_dir,
         model=model,
         manifest=manifest,
         threshold=threshold,
         features=features,
         target_col=target_col,
-    )
\ No newline at end of file
+        compiled=exported or compile_predictor(
+            model,
+            features,
+            flat_trees=flat_trees,
+            fused_transform=fused_transform,
+            domain_features=domain_features,
+        ),
+        reference_sketches=load_reference_sketches(package_dir),
+        flat_trees=flat_trees,
+        domain_features=domain_features,
+    )
+
+    if exported is not None:
+        print("⏳ Serving from flat trees + fused transform while model.joblib loads")
+        pkg.model_future = _load_model_in_background(pkg, model_path, mmap_mode, fused_transform)
+
+    return pkg
\ No newline at end of file
@@ -1,6 +1,35 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.monitoring.prometheus import CounterFamily
+from app.monitoring.shared_memory import make_stripes
+
+
+(
+    _TOTAL,
+    _VALID,
+    _INVALID,
+    _MISSING,
+    _UNEXPECTED,
+    _INVALID_VALUES,
+) = range(6)
+
+_PAYLOADS = CounterFamily(
+    "payloads",
+    "Inference payloads by schema validity.",
+    [{"status": "valid"}, {"status": "invalid"}],
+)
+_SCHEMA_FAILURES = CounterFamily(
+    "schema_failures",
+    "Schema failures in inference payloads, by kind.",
+    [
+        {"kind": "missing_count"},
+        {"kind": "unexpected_count"},
+        {"kind": "invalid_value_count"},
+    ],
+)
 
 
 class DataReliabilityStore:
@@ -13,16 +42,24 @@ class DataReliabilityStore:
     - total_missing_features
     - total_unexpected_features
     - total_invalid_values
-    """
 
-    def __init__(self) -> None:
-        self.total_payloads = 0
-        self.valid_payload_count = 0
-        self.invalid_payload_count = 0
+    Counters live in a float64 stripe; with `shared_dir` set the stripe
+    is part of a shared mmap file and reads aggregate every worker.
+    """
 
-        self.total_missing_features = 0
-        self.total_unexpected_features = 0
-        self.total_invalid_values = 0
+    def __init__(
+        self,
+        *,
+        shared_dir: Optional[str | Path] = None,
+        n_stripes: int = 32,
+    ) -> None:
+        self._stripes = make_stripes(
+            "data_reliability",
+            6,
+            shared_dir=shared_dir,
+            n_stripes=n_stripes,
+        )
+        self._counters = memoryview(self._stripes.local)
 
     def record_payload(
         self,
@@ -32,37 +69,97 @@ class DataReliabilityStore:
         unexpected_count: int = 0,
         invalid_value_count: int = 0,
     ) -> None:
-        self.total_payloads += 1
+        counters = self._counters
+        counters[_TOTAL] += 1
 
         if is_valid:
-            self.valid_payload_count += 1
+            counters[_VALID] += 1
         else:
-            self.invalid_payload_count += 1
+            counters[_INVALID] += 1
 
-        self.total_missing_features += int(missing_count)
-        self.total_unexpected_features += int(unexpected_count)
-        self.total_invalid_values += int(invalid_value_count)
+        counters[_MISSING] += int(missing_count)
+        counters[_UNEXPECTED] += int(unexpected_count)
+        counters[_INVALID_VALUES] += int(invalid_value_count)
+
+    def record_payloads(
+        self,
+        *,
+        valid_count: int,
+        invalid_count: int,
+        missing_count: int = 0,
+        unexpected_count: int = 0,
+        invalid_value_count: int = 0,
+    ) -> None:
+        """Record a whole batch from its aggregated validation counts."""
+        counters = self._counters
+        counters[_TOTAL] += int(valid_count) + int(invalid_count)
+        counters[_VALID] += int(valid_count)
+        counters[_INVALID] += int(invalid_count)
+        counters[_MISSING] += int(missing_count)
+        counters[_UNEXPECTED] += int(unexpected_count)
+        counters[_INVALID_VALUES] += int(invalid_value_count)
+
+    # ------------------------------------------------------------------
+    # Aggregated (all workers) reads
+    # ------------------------------------------------------------------
+    def _totals(self) -> List[int]:
+        return [int(v) for v in self._stripes.rows().sum(axis=0)]
+
+    @property
+    def total_payloads(self) -> int:
+        return self._totals()[_TOTAL]
+
+    @property
+    def valid_payload_count(self) -> int:
+        return self._totals()[_VALID]
+
+    @property
+    def invalid_payload_count(self) -> int:
+        return self._totals()[_INVALID]
+
+    @property
+    def total_missing_features(self) -> int:
+        return self._totals()[_MISSING]
+
+    @property
+    def total_unexpected_features(self) -> int:
+        return self._totals()[_UNEXPECTED]
+
+    @property
+    def total_invalid_values(self) -> int:
+        return self._totals()[_INVALID_VALUES]
 
     def get_metrics(self) -> Dict[str, Any]:
+        totals = self._totals()
+        total_payloads = totals[_TOTAL]
+
         schema_validity_rate = (
-            self.valid_payload_count / self.total_payloads
-            if self.total_payloads > 0
+            totals[_VALID] / total_payloads
+            if total_payloads > 0
             else 0.0
         )
 
         invalid_payload_rate = (
-            self.invalid_payload_count / self.total_payloads
-            if self.total_payloads > 0
+            totals[_INVALID] / total_payloads
+            if total_payloads > 0
             else 0.0
         )
 
         return {
-            "total_payloads": self.total_payloads,
-            "valid_payload_count": self.valid_payload_count,
-            "invalid_payload_count": self.invalid_payload_count,
+            "total_payloads": total_payloads,
+            "valid_payload_count": totals[_VALID],
+            "invalid_payload_count": totals[_INVALID],
             "schema_validity_rate": round(schema_validity_rate, 4),
             "invalid_payload_rate": round(invalid_payload_rate, 4),
-            "total_missing_features": self.total_missing_features,
-            "total_unexpected_features": self.total_unexpected_features,
-            "total_invalid_values": self.total_invalid_values,
-        }
\ No newline at end of file
+            "total_missing_features": totals[_MISSING],
+            "total_unexpected_features": totals[_UNEXPECTED],
+            "total_invalid_values": totals[_INVALID_VALUES],
+        }
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`) aggregated over workers."""
+        totals = self._totals()
+        return (
+            _PAYLOADS.render([totals[_VALID], totals[_INVALID]])
+            + _SCHEMA_FAILURES.render(totals[_MISSING:_INVALID_VALUES + 1])
+        )
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
 
-from evidently.report import Report
-from evidently.metric_preset import DataDriftPreset
+from app.monitoring.log_reader import load_feature_frame
 
 
 class DataDriftMonitor:
@@ -31,25 +30,44 @@ class DataDriftMonitor:
         else:
             raise ValueError("Unsupported reference format")
 
-    def load_current_from_logs(self, log_path: str) -> pd.DataFrame:
+    def load_current_from_logs(
+        self,
+        log_path: str,
+        features: Optional[Sequence[str]] = None,
+        *,
+        sample_size: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        **filters,
+    ) -> pd.DataFrame:
         """
-        Extract features from inference logs
+        Extract features from inference logs.
+
+        JSONL logs are streamed chunk by chunk (see log_reader.py), with an
+        optional reservoir sample / row cap so memory stays bounded.
+        `log_path` may also be the root directory of the Parquet sink.
+        `filters` (start, end, package_ids) apply to both.
         """
-        rows = []
-
-        with open(log_path, "r") as f:
-            for line in f:
-                try:
-                    event = eval(line)
-                    if event.get("event_type") == "single_inference":
-                        rows.append(event["features"])
-                except Exception:
-                    continue
-
-        if not rows:
+        if Path(log_path).is_dir():
+            from app.monitoring.parquet_sink import read_inference_features
+
+            df = read_inference_features(log_path, features, **filters)
+            if max_rows is not None:
+                df = df.head(max_rows)
+            if sample_size is not None and len(df) > sample_size:
+                df = df.sample(n=sample_size, random_state=42)
+        else:
+            df = load_feature_frame(
+                log_path,
+                features,
+                sample_size=sample_size,
+                max_rows=max_rows,
+                **filters,
+            )
+
+        if df.empty:
             raise ValueError("No valid inference data found")
 
-        return pd.DataFrame(rows)
+        return df
 
     def run_drift_report(
         self,
@@ -59,6 +77,9 @@ class DataDriftMonitor:
         """
         Run Evidently drift report
         """
+        # Evidently is heavy and only needed here
+        from evidently.report import Report
+        from evidently.metric_preset import DataDriftPreset
 
         report = Report(metrics=[DataDriftPreset()])
         report.run(
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.monitoring.drift.sketches import (
+    FeatureSketch,
+    ks_approx,
+    psi,
+    wasserstein_approx,
+)
+
+
+class OnlineDriftMonitor:
+    """
+    Streaming data drift against a package's reference sketches.
+
+    Live feature values are folded into per-feature sketches that share
+    the reference bin edges, so updates are O(features) per row and the
+    PSI / KS / Wasserstein scores are O(bins) per feature at any time.
+    The full Evidently report (DataDriftMonitor) stays an offline job.
+
+    Traffic is scored in tumbling windows of `window_s` seconds (0 keeps
+    one window from start-up or the last reset), so drift that starts
+    after days of normal traffic still shows up. The report covers the
+    current window plus a summary of the last complete one.
+    """
+
+    def __init__(
+        self,
+        reference: Mapping[str, FeatureSketch],
+        *,
+        psi_threshold: float = 0.2,
+        drift_share: float = 0.5,
+        window_s: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not reference:
+            raise ValueError("OnlineDriftMonitor needs at least one reference sketch")
+        if window_s < 0:
+            raise ValueError("window_s must be >= 0")
+
+        self.reference = dict(reference)
+        self.psi_threshold = float(psi_threshold)
+        self.drift_share = float(drift_share)
+        self.window_s = float(window_s)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._current = {f: s.empty_like() for f, s in self.reference.items()}
+        self.n_rows = 0
+        self.window_start = clock()
+        # (start, sketches, n_rows) of the last complete window
+        self._previous: Optional[Tuple[float, Dict[str, FeatureSketch], int]] = None
+        self.windows_completed = 0
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+    def _roll(self) -> None:
+        """Start a new window if the current one is over (lock held)."""
+        if self.window_s <= 0:
+            return
+        n_elapsed = int((self._clock() - self.window_start) // self.window_s)
+        if n_elapsed < 1:
+            return
+
+        last_start = self.window_start + (n_elapsed - 1) * self.window_s
+        if n_elapsed == 1:
+            self._previous = (last_start, self._current, self.n_rows)
+        else:  # no traffic at all in the last complete window
+            self._previous = (last_start, {f: s.empty_like() for f, s in self.reference.items()}, 0)
+        self._current = {f: s.empty_like() for f, s in self.reference.items()}
+        self.n_rows = 0
+        self.window_start += n_elapsed * self.window_s
+        self.windows_completed += n_elapsed
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def update_row(self, row: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._roll()
+            for name, sketch in self._current.items():
+                value = row.get(name)
+                try:
+                    sketch.update_one(float(value))
+                except (TypeError, ValueError):
+                    continue
+            self.n_rows += 1
+
+    def update_columns(self, columns: Mapping[str, np.ndarray]) -> None:
+        """Fold in a column-oriented batch {feature: values}."""
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        if n_rows == 0:
+            return
+
+        with self._lock:
+            self._roll()
+            for name, sketch in self._current.items():
+                if name in columns:
+                    sketch.update(np.asarray(columns[name], dtype=np.float64))
+            self.n_rows += n_rows
+
+    def reset(self) -> None:
+        """Drop all traffic seen so far and start a new window now."""
+        with self._lock:
+            self._current = {f: s.empty_like() for f, s in self.reference.items()}
+            self.n_rows = 0
+            self.window_start = self._clock()
+            self._previous = None
+
+    # ------------------------------------------------------------------
+    # Scores
+    # ------------------------------------------------------------------
+    def get_report(self) -> Dict[str, Any]:
+        with self._lock:
+            self._roll()
+            current = {f: s.copy() for f, s in self._current.items()}
+            n_rows = self.n_rows
+            window_start = self.window_start
+            previous = self._previous
+
+        report = {
+            "window_s": self.window_s,
+            "window_start": _iso(window_start),
+            **self._score(current, n_rows),
+            "previous_window": None,
+        }
+        if previous is not None:
+            start, sketches, previous_rows = previous
+            scores = self._score(sketches, previous_rows)
+            report["previous_window"] = {
+                "window_start": _iso(start),
+                "window_end": _iso(start + self.window_s),
+                **{k: v for k, v in scores.items() if k != "features"},
+            }
+        return report
+
+    def _score(self, current: Mapping[str, FeatureSketch], n_rows: int) -> Dict[str, Any]:
+        features: Dict[str, Dict[str, Any]] = {}
+        for name, cur in current.items():
+            if cur.n == 0:
+                continue
+
+            ref = self.reference[name]
+            feature_psi = psi(ref, cur)
+            wasserstein = wasserstein_approx(ref, cur)
+            ref_std = ref.std
+
+            features[name] = {
+                "psi": round(feature_psi, 4),
+                "ks": round(ks_approx(ref, cur), 4),
+                "wasserstein": round(wasserstein, 4),
+                "wasserstein_norm": round(wasserstein / ref_std, 4) if ref_std > 0 else None,
+                "n": cur.n,
+                "mean": round(cur.mean, 4),
+                "reference_mean": round(ref.mean, 4),
+                "drifted": feature_psi >= self.psi_threshold,
+            }
+
+        n_drifted = sum(1 for f in features.values() if f["drifted"])
+        n_scored = len(features)
+
+        return {
+            "n_rows": n_rows,
+            "psi_threshold": self.psi_threshold,
+            "dataset_drift": n_scored > 0 and n_drifted / n_scored >= self.drift_share,
+            "drifted_features": n_drifted,
+            "total_features": n_scored,
+            "features": features,
+        }
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def build_online_drift_monitor(
+    reference: Optional[Mapping[str, FeatureSketch]],
+    **kwargs: Any,
+) -> Optional[OnlineDriftMonitor]:
+    """OnlineDriftMonitor for a package, or None if it ships no sketches."""
+    if not reference:
+        return None
+    return OnlineDriftMonitor(reference, **kwargs)
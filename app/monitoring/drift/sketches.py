@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import json
+import math
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+REFERENCE_SKETCHES_FILENAME = "reference_sketches.json"
+
+# quantile levels stored in the reference digest (0%, 1%, ..., 100%)
+QUANTILE_LEVELS = np.linspace(0.0, 1.0, 101)
+
+
+class FeatureSketch:
+    """
+    Fixed-bin summary of one feature's distribution.
+
+    - histogram over bins cut at the reference quantiles
+      (bin i holds edges[i-1] <= x < edges[i], with open outer bins),
+      with the per-bin sum of values
+    - moments (count, sum, sum of squares, min, max)
+    - quantile digest (reference only)
+
+    Reference and live sketches of a feature share the same edges, so
+    every drift score is computed in O(bins).
+    """
+
+    def __init__(
+        self,
+        edges: Sequence[float],
+        counts: Optional[Sequence[float]] = None,
+        bin_sums: Optional[Sequence[float]] = None,
+        *,
+        n: int = 0,
+        total: float = 0.0,
+        total_sq: float = 0.0,
+        min_value: float = float("inf"),
+        max_value: float = float("-inf"),
+        quantiles: Optional[Sequence[float]] = None,
+    ):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self._edges_list = self.edges.tolist()
+        self.counts = (
+            np.asarray(counts, dtype=np.float64).copy()
+            if counts is not None
+            else np.zeros(len(self.edges) + 1, dtype=np.float64)
+        )
+        self.bin_sums = (
+            np.asarray(bin_sums, dtype=np.float64).copy()
+            if bin_sums is not None
+            else np.zeros(len(self.edges) + 1, dtype=np.float64)
+        )
+        self.n = int(n)
+        self.total = float(total)
+        self.total_sq = float(total_sq)
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+        self.quantiles = (
+            np.asarray(quantiles, dtype=np.float64) if quantiles is not None else None
+        )
+
+    # ------------------------------------------------------------------
+    # Construction / updates
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_values(cls, values: np.ndarray, n_bins: int = 10) -> "FeatureSketch":
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            raise ValueError("Cannot build a sketch from an empty / non-finite column")
+
+        cuts = np.quantile(values, np.linspace(0.0, 1.0, n_bins + 1)[1:-1])
+        sketch = cls(np.unique(cuts), quantiles=np.quantile(values, QUANTILE_LEVELS))
+        sketch.update(values)
+        return sketch
+
+    def empty_like(self) -> "FeatureSketch":
+        return FeatureSketch(self.edges)
+
+    def copy(self) -> "FeatureSketch":
+        return FeatureSketch(
+            self.edges,
+            self.counts,
+            self.bin_sums,
+            n=self.n,
+            total=self.total,
+            total_sq=self.total_sq,
+            min_value=self.min_value,
+            max_value=self.max_value,
+            quantiles=self.quantiles,
+        )
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        idx = np.searchsorted(self.edges, values, side="right")
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self.bin_sums += np.bincount(idx, weights=values, minlength=len(self.counts))
+        self.n += values.size
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.min_value = min(self.min_value, float(values.min()))
+        self.max_value = max(self.max_value, float(values.max()))
+
+    def update_one(self, value: float) -> None:
+        if not math.isfinite(value):
+            return
+        # plain bisect: cheaper than a NumPy call for a single value
+        i = bisect_right(self._edges_list, value)
+        self.counts[i] += 1
+        self.bin_sums[i] += value
+        self.n += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: "FeatureSketch") -> None:
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge sketches with different bin edges")
+        self.counts += other.counts
+        self.bin_sums += other.bin_sums
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+    # ------------------------------------------------------------------
+    # Summaries
+    # ------------------------------------------------------------------
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return 0.0
+        var = (self.total_sq - self.n * self.mean ** 2) / (self.n - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+    def bin_means(self) -> np.ndarray:
+        """Mean value per bin (bin midpoint / edge for empty bins)."""
+        lo = np.concatenate(([self.edges[0]], self.edges))
+        hi = np.concatenate((self.edges, [self.edges[-1]]))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.bin_sums / self.counts
+        return np.where(self.counts > 0, means, (lo + hi) / 2.0)
+
+    def proportions(self) -> np.ndarray:
+        if self.n == 0:
+            return np.zeros_like(self.counts)
+        return self.counts / self.counts.sum()
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist(),
+            "bin_sums": self.bin_sums.tolist(),
+            "n": self.n,
+            "sum": self.total,
+            "sum_sq": self.total_sq,
+            "min": self.min_value,
+            "max": self.max_value,
+            "quantile_levels": QUANTILE_LEVELS.tolist() if self.quantiles is not None else None,
+            "quantiles": self.quantiles.tolist() if self.quantiles is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "FeatureSketch":
+        return cls(
+            d["edges"],
+            d["counts"],
+            d["bin_sums"],
+            n=d["n"],
+            total=d["sum"],
+            total_sq=d["sum_sq"],
+            min_value=d["min"],
+            max_value=d["max"],
+            quantiles=d.get("quantiles"),
+        )
+
+
+# ------------------------------------------------------------------
+# Drift scores, all O(bins)
+# ------------------------------------------------------------------
+def psi(reference: FeatureSketch, current: FeatureSketch, eps: float = 1e-4) -> float:
+    """Population Stability Index over the shared bins."""
+    p_ref = np.clip(reference.proportions(), eps, None)
+    p_cur = np.clip(current.proportions(), eps, None)
+    return float(np.sum((p_cur - p_ref) * np.log(p_cur / p_ref)))
+
+
+def ks_approx(reference: FeatureSketch, current: FeatureSketch) -> float:
+    """Kolmogorov-Smirnov statistic evaluated at the bin edges."""
+    cdf_ref = np.cumsum(reference.proportions())
+    cdf_cur = np.cumsum(current.proportions())
+    return float(np.max(np.abs(cdf_ref - cdf_cur)))
+
+
+def wasserstein_approx(reference: FeatureSketch, current: FeatureSketch) -> float:
+    """
+    Wasserstein-1 distance with each bin's mass placed at its mean value:
+    the integral of |F_ref - F_cur| between the sorted bin means.
+    """
+    positions = np.concatenate((reference.bin_means(), current.bin_means()))
+    weights = np.concatenate((reference.proportions(), -current.proportions()))
+
+    order = np.argsort(positions, kind="stable")
+    cdf_diff = np.cumsum(weights[order])[:-1]
+    return float(np.sum(np.abs(cdf_diff) * np.diff(positions[order])))
+
+
+# ------------------------------------------------------------------
+# Reference sketches next to package_manifest.json
+# ------------------------------------------------------------------
+def build_reference_sketches(
+    df,
+    features: Sequence[str],
+    n_bins: int = 10,
+) -> Dict[str, FeatureSketch]:
+    missing = [f for f in features if f not in df.columns]
+    if missing:
+        raise ValueError(f"Reference data is missing features: {missing}")
+
+    return {
+        f: FeatureSketch.from_values(df[f].to_numpy(dtype=np.float64), n_bins=n_bins)
+        for f in features
+    }
+
+
+def save_reference_sketches(
+    package_dir: str | Path,
+    sketches: Dict[str, FeatureSketch],
+) -> Path:
+    path = Path(package_dir) / REFERENCE_SKETCHES_FILENAME
+    path.write_text(
+        json.dumps(
+            {"features": {f: s.to_dict() for f, s in sketches.items()}},
+            indent=2,
+        )
+    )
+    return path
+
+
+def load_reference_sketches(package_dir: str | Path) -> Optional[Dict[str, FeatureSketch]]:
+    """Reference sketches of a package, or None if it has none."""
+    path = Path(package_dir) / REFERENCE_SKETCHES_FILENAME
+    if not path.exists():
+        return None
+
+    data = json.loads(path.read_text())
+    return {f: FeatureSketch.from_dict(d) for f, d in data["features"].items()}
+
+
+def reference_quantiles(
+    sketches: Dict[str, FeatureSketch],
+    levels: Sequence[float],
+) -> Dict[str, List[float]]:
+    """Interpolated reference quantiles per feature (from the digest)."""
+    out = {}
+    for f, s in sketches.items():
+        if s.quantiles is None:
+            continue
+        out[f] = np.interp(levels, QUANTILE_LEVELS, s.quantiles).tolist()
+    return out
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, List, Optional
 from uuid import uuid4
 
 
@@ -22,12 +25,17 @@ class InferenceLogger:
     Writes:
     - all inference events to the main inference log
     - failed events also to a dedicated failure log
+    - optionally, all events to a columnar sink (see parquet_sink.py),
+      with or without the main JSONL log
     """
 
     def __init__(
         self,
         log_path: str | Path,
         failure_log_path: str | Path = "logs/failures.jsonl",
+        *,
+        parquet_sink: Optional[Any] = None,
+        write_jsonl: bool = True,
     ):
         self.log_path = Path(log_path)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
@@ -35,15 +43,66 @@ class InferenceLogger:
         self.failure_log_path = Path(failure_log_path)
         self.failure_log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    def _append_jsonl(self, path: Path, event: Dict[str, Any]) -> None:
+        self.parquet_sink = parquet_sink
+        self.write_jsonl = write_jsonl
+
+        self.written_count = 0
+
+    def _append_jsonl(self, path: Path, lines: List[str]) -> None:
         with path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            f.write("".join(lines))
+
+    def _write_events(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Serialize a batch of events and append them with one open/write
+        per file (failed events also go to the failure log).
+        """
+        if self.write_jsonl:
+            lines = [json.dumps(event, ensure_ascii=False) + "\n" for event in events]
+            failed = [
+                line for event, line in zip(events, lines)
+                if event.get("status") == "failed"
+            ]
+            self._append_jsonl(self.log_path, lines)
+        else:
+            failed = [
+                json.dumps(event, ensure_ascii=False) + "\n"
+                for event in events
+                if event.get("status") == "failed"
+            ]
+
+        if failed:
+            self._append_jsonl(self.failure_log_path, failed)
+
+        if self.parquet_sink is not None:
+            self.parquet_sink.write_events(events)
+
+        self.written_count += len(events)
 
     def log_event(self, event: Dict[str, Any]) -> None:
-        self._append_jsonl(self.log_path, event)
+        self._write_events([event])
 
-        if event.get("status") == "failed":
-            self._append_jsonl(self.failure_log_path, event)
+    def _tick(self) -> None:
+        """Periodic housekeeping (time-based sink rotation)."""
+        if self.parquet_sink is not None:
+            self.parquet_sink.maybe_rotate()
+
+    def flush(self) -> None:
+        """Unbuffered logger: every event is already on disk."""
+
+    def close(self) -> None:
+        self.flush()
+        if self.parquet_sink is not None:
+            self.parquet_sink.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = {
+            "buffered": False,
+            "written_events": self.written_count,
+        }
+        if self.parquet_sink is not None:
+            metrics["parquet_sink"] = self.parquet_sink.get_metrics()
+        return metrics
 
     def log_single_inference(
         self,
@@ -95,4 +154,213 @@ class InferenceLogger:
             "status": status,
             "error_message": error_message,
         }
-        self.log_event(event)
\ No newline at end of file
+        self.log_event(event)
+
+
+OVERFLOW_POLICIES = ("drop_oldest", "block", "sample")
+
+
+class BufferedInferenceLogger(InferenceLogger):
+    """
+    InferenceLogger that keeps request handlers off the filesystem.
+
+    log_event() only appends the event dict to a bounded in-memory ring;
+    a background writer thread serializes and appends events in batches,
+    flushing when `flush_batch_size` events are pending or every
+    `flush_interval_s` seconds, and drains everything on close().
+    Draining and writing happen under one write lock, so a flush() from
+    another thread never interleaves with (or overtakes) the writer.
+
+    When the ring is full, `overflow_policy` decides what happens:
+    - drop_oldest: evict the oldest pending event (default)
+    - block:       wait up to `block_timeout_s` for space, then drop the new event
+    - sample:      keep 1 in `sample_every` new events (evicting the oldest),
+                   drop the rest
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path,
+        failure_log_path: str | Path = "logs/failures.jsonl",
+        *,
+        max_buffer_size: int = 10_000,
+        flush_batch_size: int = 512,
+        flush_interval_s: float = 1.0,
+        overflow_policy: str = "drop_oldest",
+        block_timeout_s: float = 0.05,
+        sample_every: int = 10,
+        parquet_sink: Optional[Any] = None,
+        write_jsonl: bool = True,
+    ):
+        super().__init__(
+            log_path=log_path,
+            failure_log_path=failure_log_path,
+            parquet_sink=parquet_sink,
+            write_jsonl=write_jsonl,
+        )
+
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy: {overflow_policy} (expected one of {OVERFLOW_POLICIES})"
+            )
+        if max_buffer_size < 1:
+            raise ValueError("max_buffer_size must be >= 1")
+
+        self.max_buffer_size = int(max_buffer_size)
+        self.flush_batch_size = max(1, int(flush_batch_size))
+        self.flush_interval_s = float(flush_interval_s)
+        self.overflow_policy = overflow_policy
+        self.block_timeout_s = float(block_timeout_s)
+        self.sample_every = max(1, int(sample_every))
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        # taken before _cond, never while holding it
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._overflow_seen = 0
+
+        # counters
+        self.enqueued_count = 0
+        self.dropped_count = 0
+        self.flushed_count = 0
+        self.flush_count = 0
+        self.write_error_count = 0
+        self.last_flush_ms = 0.0
+
+        self._writer = threading.Thread(
+            target=self._run,
+            name="inference-log-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Producer side (request handlers)
+    # ------------------------------------------------------------------
+    def log_event(self, event: Dict[str, Any]) -> None:
+        with self._cond:
+            if not self._closed:
+                if len(self._buffer) >= self.max_buffer_size and not self._make_room():
+                    self.dropped_count += 1
+                    return
+
+                self._buffer.append(event)
+                self.enqueued_count += 1
+
+                if len(self._buffer) >= self.flush_batch_size:
+                    self._cond.notify_all()
+                return
+
+        # after shutdown, fall back to a direct write (and leave no open sink file)
+        with self._write_lock:
+            self._write_events([event])
+            if self.parquet_sink is not None:
+                self.parquet_sink.close()
+
+    def _make_room(self) -> bool:
+        """
+        Apply the overflow policy while holding the lock.
+        Returns True if the new event should be enqueued.
+        """
+        if self.overflow_policy == "drop_oldest":
+            self._buffer.popleft()
+            self.dropped_count += 1
+            return True
+
+        if self.overflow_policy == "block":
+            self._cond.notify_all()
+            deadline = time.monotonic() + self.block_timeout_s
+            while len(self._buffer) >= self.max_buffer_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return len(self._buffer) < self.max_buffer_size
+
+        # sample
+        self._overflow_seen += 1
+        if self._overflow_seen % self.sample_every != 0:
+            return False
+        self._buffer.popleft()
+        self.dropped_count += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Consumer side (writer thread)
+    # ------------------------------------------------------------------
+    def _drain(self) -> List[Dict[str, Any]]:
+        events = list(self._buffer)
+        self._buffer.clear()
+        self._cond.notify_all()  # wake producers blocked on a full ring
+        return events
+
+    def _flush_events(self, events: List[Dict[str, Any]]) -> None:
+        if not events:
+            return
+
+        start = time.perf_counter()
+        try:
+            self._write_events(events)
+        except Exception as e:
+            self.write_error_count += 1
+            self.dropped_count += len(events)
+            print(f"❌ Failed to flush {len(events)} inference events: {e}")
+            return
+
+        self.flushed_count += len(events)
+        self.flush_count += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000.0
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if len(self._buffer) < self.flush_batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval_s)
+                closed = self._closed
+
+            self.flush()
+            self._tick()
+
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """Synchronously write every pending event."""
+        with self._write_lock:
+            with self._cond:
+                events = self._drain()
+            self._flush_events(events)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the writer thread and flush everything still buffered."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        self._writer.join(timeout=timeout)
+        self.flush()
+        if self.parquet_sink is not None:
+            self.parquet_sink.close()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = {
+            "buffered": True,
+            "overflow_policy": self.overflow_policy,
+            "max_buffer_size": self.max_buffer_size,
+            "pending_events": len(self._buffer),
+            "enqueued_events": self.enqueued_count,
+            "flushed_events": self.flushed_count,
+            "dropped_events": self.dropped_count,
+            "flush_count": self.flush_count,
+            "write_errors": self.write_error_count,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
+        if self.parquet_sink is not None:
+            metrics["parquet_sink"] = self.parquet_sink.get_metrics()
+        return metrics
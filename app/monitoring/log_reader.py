@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:  # optional fast JSON decoder
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on environment
+    import json
+
+    _loads = json.loads
+
+
+FeatureChunk = Dict[str, np.ndarray]
+
+
+def _iso_bound(value: datetime | str | None) -> Optional[str]:
+    """
+    Normalise a time bound to the timestamp format InferenceLogger writes
+    (UTC isoformat), so the window check is a plain string comparison.
+    """
+    if value is None:
+        return None
+    ts = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+def _discover_features(log_path: Path, marker: bytes) -> List[str]:
+    with log_path.open("rb") as f:
+        for line in f:
+            if marker not in line:
+                continue
+            try:
+                event = _loads(line)
+            except ValueError:
+                continue
+            features = event.get("features")
+            if isinstance(features, dict) and features:
+                return list(features)
+    return []
+
+
+def iter_feature_chunks(
+    log_path: str | Path,
+    features: Sequence[str] | None = None,
+    *,
+    chunk_size: int = 65_536,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    max_rows: int | None = None,
+    package_ids: Sequence[str] | None = None,
+    event_type: str = "single_inference",
+) -> Iterator[FeatureChunk]:
+    """
+    Stream model features out of a JSONL inference log.
+
+    Yields {feature: float64 array} chunks of at most `chunk_size` rows.
+    Lines are decoded with orjson (json as fallback); lines without the
+    event type marker are skipped before decoding, malformed lines and
+    non-numeric values are skipped / read as NaN. `start` is inclusive,
+    `end` exclusive; `package_ids` restricts to those packages. Memory is
+    bounded by one chunk regardless of the log size.
+    """
+    log_path = Path(log_path)
+    marker = f'"{event_type}"'.encode()
+
+    if features is None:
+        features = _discover_features(log_path, marker)
+    features = list(features)
+    if not features:
+        return
+
+    start_s = _iso_bound(start)
+    end_s = _iso_bound(end)
+    packages = set(package_ids) if package_ids else None
+    n_features = len(features)
+
+    buf = np.empty((chunk_size, n_features), dtype=np.float64)
+    n = 0
+    total = 0
+
+    with log_path.open("rb") as f:
+        for line in f:
+            if marker not in line:
+                continue
+            try:
+                event = _loads(line)
+            except ValueError:
+                continue
+
+            if event.get("event_type") != event_type:
+                continue
+
+            if start_s is not None or end_s is not None:
+                ts = event.get("timestamp_utc") or ""
+                if start_s is not None and ts < start_s:
+                    continue
+                if end_s is not None and ts >= end_s:
+                    continue
+
+            if packages is not None and event.get("package_id") not in packages:
+                continue
+
+            row = event.get("features")
+            if not isinstance(row, dict):
+                continue
+
+            out = buf[n]
+            for j, name in enumerate(features):
+                value = row.get(name)
+                try:
+                    out[j] = value
+                except (TypeError, ValueError):
+                    out[j] = np.nan
+
+            n += 1
+            total += 1
+
+            if n == chunk_size:
+                yield {name: buf[:, j].copy() for j, name in enumerate(features)}
+                n = 0
+
+            if max_rows is not None and total >= max_rows:
+                break
+
+    if n:
+        yield {name: buf[:n, j].copy() for j, name in enumerate(features)}
+
+
+def reservoir_sample_features(
+    log_path: str | Path,
+    features: Sequence[str] | None = None,
+    *,
+    sample_size: int,
+    seed: int = 42,
+    **kwargs,
+) -> FeatureChunk:
+    """
+    Uniform random sample (Algorithm R) of at most `sample_size` rows from
+    the log, in O(sample_size) memory. Extra kwargs go to
+    iter_feature_chunks (time window, max_rows, chunk_size, ...).
+    """
+    rng = np.random.default_rng(seed)
+    reservoir: Optional[np.ndarray] = None
+    names: List[str] = []
+    seen = 0
+
+    for chunk in iter_feature_chunks(log_path, features, **kwargs):
+        if reservoir is None:
+            names = list(chunk)
+            reservoir = np.empty((sample_size, len(names)), dtype=np.float64)
+
+        rows = np.column_stack([chunk[name] for name in names])
+        m = len(rows)
+
+        # fill phase
+        take = min(max(sample_size - seen, 0), m)
+        if take:
+            reservoir[seen:seen + take] = rows[:take]
+
+        # replacement phase: row with global index i replaces slot j ~ U[0, i]
+        if take < m:
+            idx = np.arange(seen + take, seen + m)
+            slots = rng.integers(0, idx + 1)
+            keep = slots < sample_size
+            reservoir[slots[keep]] = rows[take:][keep]
+
+        seen += m
+
+    if reservoir is None:
+        return {}
+
+    n = min(seen, sample_size)
+    return {name: reservoir[:n, j].copy() for j, name in enumerate(names)}
+
+
+def load_feature_frame(
+    log_path: str | Path,
+    features: Sequence[str] | None = None,
+    *,
+    sample_size: int | None = None,
+    seed: int = 42,
+    **kwargs,
+):
+    """
+    Features from a JSONL inference log as a DataFrame, either every
+    matching row (bounded by max_rows) or a reservoir sample.
+    """
+    import pandas as pd
+
+    if sample_size is not None:
+        return pd.DataFrame(
+            reservoir_sample_features(
+                log_path, features, sample_size=sample_size, seed=seed, **kwargs
+            )
+        )
+
+    chunks = list(iter_feature_chunks(log_path, features, **kwargs))
+    if not chunks:
+        return pd.DataFrame()
+
+    return pd.DataFrame(
+        {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+    )
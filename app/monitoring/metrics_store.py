@@ -2,58 +2,147 @@
 
 from __future__ import annotations
 
-from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, Any
-import math
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import time
+
+from app.monitoring.quantile_sketch import (
+    LATENCY_WINDOWS,
+    DDSketch,
+    RingCounter,
+    WindowedSketch,
+    summarize,
+)
+from app.monitoring.prometheus import (
+    BATCH_SIZE_BUCKETS,
+    LATENCY_BUCKETS_MS,
+    CounterFamily,
+    Histogram,
+    HistogramFamily,
+)
+from app.monitoring.shared_memory import make_stripes
 
 
 def utc_now():
     return datetime.now(timezone.utc)
 
 
-def percentile(values: list[float], q: float) -> float:
-    """
-    Compute percentile without external dependency.
-    q should be in [0, 100].
-    """
-    if not values:
-        return 0.0
-
-    vals = sorted(values)
-    k = (len(vals) - 1) * (q / 100.0)
-    f = math.floor(k)
-    c = math.ceil(k)
-
-    if f == c:
-        return float(vals[int(k)])
+# counter slots at the start of the MetricsStore stripe
+_TOTAL, _SUCCESS, _ERROR, _SINGLE, _BATCH, _BATCH_ROWS = range(6)
 
-    d0 = vals[f] * (c - k)
-    d1 = vals[c] * (k - f)
-    return float(d0 + d1)
+# requests refused by admission control, one slot per (lane, reason)
+SHED_LANES = ("single", "batch")
+SHED_REASONS = ("queue_full", "queue_timeout", "too_large")
+_SHED = {
+    (lane, reason): 6 + i * len(SHED_REASONS) + j
+    for i, lane in enumerate(SHED_LANES)
+    for j, reason in enumerate(SHED_REASONS)
+}
+_N_COUNTERS = 6 + len(_SHED)
 
 
 class MetricsStore:
     """
     In-memory metrics store for:
     - reliability: success rate, error rate
-    - latency: avg, p95
+    - latency: avg, p50/p90/p95/p99/p999 over 1m / 5m / 1h windows
     - throughput: requests/min
     - usage: total predictions and batch volume (cost proxy)
+    - load shedding: requests refused by admission control
+
+    Latencies go into mergeable DDSketches in time-bucketed rings (see
+    quantile_sketch.py) and the request rate into one-second ring
+    buckets, so memory is bounded and a scrape never sorts or scans the
+    request history.
+
+    All state lives in one float64 stripe. With `shared_dir` set, each
+    worker process writes its own stripe of a shared mmap file and
+    get_metrics() aggregates every worker (see shared_memory.py).
     """
 
-    def __init__(self, max_history: int = 5000):
-        self.latencies = deque(maxlen=max_history)
-        self.request_timestamps = deque(maxlen=max_history)
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        *,
+        shared_dir: Optional[str | Path] = None,
+        n_stripes: int = 32,
+    ):
+        ring_size = RingCounter.state_size(60)
+        window_sizes = {
+            name: WindowedSketch.state_size(spec["n_slots"], relative_accuracy=relative_accuracy)
+            for name, spec in LATENCY_WINDOWS.items()
+        }
+
+        latency_hist_size = Histogram.state_size(LATENCY_BUCKETS_MS)
+        batch_hist_size = Histogram.state_size(BATCH_SIZE_BUCKETS)
+
+        self._stripes = make_stripes(
+            "metrics_store",
+            _N_COUNTERS + latency_hist_size + batch_hist_size
+            + ring_size + sum(window_sizes.values()),
+            shared_dir=shared_dir,
+            n_stripes=n_stripes,
+        )
+        buf = self._stripes.local
+        self._counters = memoryview(buf)
+
+        # cumulative histograms for the OpenMetrics exposition
+        offset = _N_COUNTERS
+        self._latency_hist_slice = slice(offset, offset + latency_hist_size)
+        self.latency_histogram = Histogram(LATENCY_BUCKETS_MS, self._counters, offset)
+        offset += latency_hist_size
+
+        self._batch_hist_slice = slice(offset, offset + batch_hist_size)
+        self.batch_size_histogram = Histogram(BATCH_SIZE_BUCKETS, self._counters, offset)
+        offset += batch_hist_size
+        self._exposition_end = offset
+
+        self._families = {
+            "requests": CounterFamily(
+                "requests",
+                "HTTP requests by outcome.",
+                [{"status": "success"}, {"status": "error"}],
+            ),
+            "inference_requests": CounterFamily(
+                "inference_requests",
+                "Inference requests by type.",
+                [{"type": "single"}, {"type": "batch"}],
+            ),
+            "batch_rows": CounterFamily("batch_rows", "Rows scored by batch requests."),
+            "shed": CounterFamily(
+                "shed_requests",
+                "Requests refused by admission control, by lane and reason.",
+                [{"lane": lane, "reason": reason} for lane, reason in _SHED],
+            ),
+            "latency": HistogramFamily(
+                "request_duration_seconds",
+                "Request latency.",
+                LATENCY_BUCKETS_MS,
+                scale=1e-3,
+            ),
+            "batch_size": HistogramFamily(
+                "batch_size_rows",
+                "Rows per batch request.",
+                BATCH_SIZE_BUCKETS,
+            ),
+        }
 
-        self.total_requests = 0
-        self.success_count = 0
-        self.error_count = 0
+        self._ring_slice = slice(offset, offset + ring_size)
+        self.request_rate = RingCounter(60, buffer=buf[self._ring_slice])
+        offset += ring_size
 
-        # usage / cost proxy
-        self.single_inference_count = 0
-        self.batch_request_count = 0
-        self.total_batch_rows = 0
+        self._window_slices: Dict[str, slice] = {}
+        self.latency_windows: Dict[str, WindowedSketch] = {}
+        for name, spec in LATENCY_WINDOWS.items():
+            region = slice(offset, offset + window_sizes[name])
+            self._window_slices[name] = region
+            self.latency_windows[name] = WindowedSketch(
+                buffer=buf[region],
+                relative_accuracy=relative_accuracy,
+                **spec,
+            )
+            offset += window_sizes[name]
 
     def record_request(
         self,
@@ -63,73 +152,139 @@ class MetricsStore:
         request_type: str = "single",
         n_rows: int = 1,
     ) -> None:
-        self.total_requests += 1
-        self.latencies.append(float(latency_ms))
-        self.request_timestamps.append(utc_now())
+        now = time.time()
+        latency_ms = float(latency_ms)
+        counters = self._counters
+
+        counters[_TOTAL] += 1
+        self.latency_histogram.observe(latency_ms)
+        # all windows share the same bucket mapping
+        bucket = self.latency_windows["1h"].bucket(latency_ms)
+        for window in self.latency_windows.values():
+            window.add(latency_ms, now, bucket)
+        self.request_rate.add(1, now)
 
         if success:
-            self.success_count += 1
+            counters[_SUCCESS] += 1
         else:
-            self.error_count += 1
+            counters[_ERROR] += 1
 
         if request_type == "single":
-            self.single_inference_count += 1
+            counters[_SINGLE] += 1
         elif request_type == "batch":
-            self.batch_request_count += 1
-            self.total_batch_rows += int(n_rows)
+            counters[_BATCH] += 1
+            counters[_BATCH_ROWS] += int(n_rows)
+            self.batch_size_histogram.observe(int(n_rows))
+
+    def record_shed(self, lane: str, reason: str) -> None:
+        """Count a request refused by admission control (never scored)."""
+        self._counters[_SHED[(lane, reason)]] += 1
+
+    # ------------------------------------------------------------------
+    # Aggregated (all workers) reads
+    # ------------------------------------------------------------------
+    def _totals(self) -> List[int]:
+        return [int(v) for v in self._stripes.rows()[:, :_N_COUNTERS].sum(axis=0)]
+
+    @property
+    def total_requests(self) -> int:
+        return self._totals()[_TOTAL]
+
+    @property
+    def success_count(self) -> int:
+        return self._totals()[_SUCCESS]
+
+    @property
+    def error_count(self) -> int:
+        return self._totals()[_ERROR]
+
+    @property
+    def single_inference_count(self) -> int:
+        return self._totals()[_SINGLE]
+
+    @property
+    def batch_request_count(self) -> int:
+        return self._totals()[_BATCH]
+
+    @property
+    def total_batch_rows(self) -> int:
+        return self._totals()[_BATCH_ROWS]
+
+    def get_latency_sketch(self, window: str = "1h") -> DDSketch:
+        """Merged latency sketch of a window, across all workers."""
+        rows = self._stripes.rows()
+        return self.latency_windows[window].snapshot(rows=rows[:, self._window_slices[window]])
 
     def get_metrics(self) -> Dict[str, Any]:
-        latencies_list = list(self.latencies)
+        now = time.time()
+        rows = self._stripes.rows()
+        totals = [int(v) for v in rows[:, :_N_COUNTERS].sum(axis=0)]
 
-        avg_latency = (
-            sum(latencies_list) / len(latencies_list)
-            if latencies_list
-            else 0.0
-        )
+        latency = {
+            name: summarize(window.snapshot(now, rows[:, self._window_slices[name]]))
+            for name, window in self.latency_windows.items()
+        }
 
-        p95_latency = percentile(latencies_list, 95)
+        total_requests = totals[_TOTAL]
+        batch_request_count = totals[_BATCH]
 
         success_rate = (
-            self.success_count / self.total_requests
-            if self.total_requests > 0
+            totals[_SUCCESS] / total_requests
+            if total_requests > 0
             else 0.0
         )
 
         error_rate = (
-            self.error_count / self.total_requests
-            if self.total_requests > 0
+            totals[_ERROR] / total_requests
+            if total_requests > 0
             else 0.0
         )
 
-        now = utc_now()
-        requests_last_minute = [
-            ts for ts in self.request_timestamps
-            if (now - ts).total_seconds() <= 60
-        ]
-        throughput_rpm = len(requests_last_minute)
+        throughput_rpm = self.request_rate.total(now, rows[:, self._ring_slice])
 
         avg_rows_per_batch = (
-            self.total_batch_rows / self.batch_request_count
-            if self.batch_request_count > 0
+            totals[_BATCH_ROWS] / batch_request_count
+            if batch_request_count > 0
             else 0.0
         )
 
         return {
             # reliability
-            "total_requests": self.total_requests,
+            "total_requests": total_requests,
             "success_rate": round(success_rate, 4),
             "error_rate": round(error_rate, 4),
 
-            # latency
-            "avg_latency_ms": round(avg_latency, 3),
-            "p95_latency_ms": round(p95_latency, 3),
+            # latency (headline numbers over the last hour)
+            "avg_latency_ms": latency["1h"]["avg_ms"],
+            "p95_latency_ms": latency["1h"]["p95_ms"],
+            "latency_windows": latency,
 
             # throughput
             "throughput_requests_per_min": throughput_rpm,
 
             # usage / cost proxy
-            "single_inference_count": self.single_inference_count,
-            "batch_request_count": self.batch_request_count,
-            "total_batch_rows": self.total_batch_rows,
+            "single_inference_count": totals[_SINGLE],
+            "batch_request_count": batch_request_count,
+            "total_batch_rows": totals[_BATCH_ROWS],
             "avg_rows_per_batch": round(avg_rows_per_batch, 3),
-        }
\ No newline at end of file
+
+            # load shedding
+            "shed_requests_total": sum(totals[i] for i in _SHED.values()),
+            "shed_requests": {
+                lane: {reason: totals[_SHED[(lane, reason)]] for reason in SHED_REASONS}
+                for lane in SHED_LANES
+            },
+        }
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`) aggregated over workers."""
+        totals = self._stripes.rows()[:, : self._exposition_end].sum(axis=0)
+        f = self._families
+        return "".join([
+            f["requests"].render(totals[[_SUCCESS, _ERROR]]),
+            f["inference_requests"].render(totals[[_SINGLE, _BATCH]]),
+            f["batch_rows"].render(totals[[_BATCH_ROWS]]),
+            f["shed"].render(totals[list(_SHED.values())]),
+            f["latency"].render(totals[self._latency_hist_slice]),
+            f["batch_size"].render(totals[self._batch_hist_slice]),
+        ])
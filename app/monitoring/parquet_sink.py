@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+FEATURE_PREFIX = "feature__"
+
+# Columns shared by every inference event (features are appended as
+# flattened `feature__<name>` float64 columns).
+BASE_FIELDS: List[pa.Field] = [
+    pa.field("event_type", pa.string()),
+    pa.field("timestamp_utc", pa.timestamp("us", tz="UTC")),
+    pa.field("request_id", pa.string()),
+    pa.field("package_id", pa.string()),
+    pa.field("threshold_used", pa.float64()),
+    pa.field("prediction", pa.int64()),
+    pa.field("probability", pa.float64()),
+    pa.field("n_rows", pa.int64()),
+    pa.field("latency_ms", pa.float64()),
+    pa.field("status", pa.string()),
+    pa.field("error_message", pa.string()),
+    # feature keys outside the package's feature list (not stored)
+    pa.field("unexpected_feature_count", pa.int64()),
+]
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("hour", pa.string())]),
+    flavor="hive",
+)
+
+
+def _parse_ts(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _partition_key(ts: datetime) -> Tuple[str, str]:
+    ts = ts.astimezone(timezone.utc)
+    return ts.strftime("%Y-%m-%d"), ts.strftime("%H")
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ParquetEventSink:
+    """
+    Columnar sink for inference events.
+
+    Events are written to time-partitioned Parquet files:
+
+        <root_dir>/date=YYYY-MM-DD/hour=HH/part-<created>-<seq>.parquet
+
+    Features are stored as flattened, typed `feature__<name>` columns
+    instead of nested dicts, one per name in `features` (the live
+    package's input features, see set_features). Other keys a client
+    sends are dropped and only counted (`unexpected_feature_count`), so
+    requests cannot widen the schema or force rotations. A file is
+    rotated when it reaches `max_rows_per_file`, gets older than
+    `max_file_age_s`, the event hour changes, or the feature list
+    changes (package swap). Files are written under a
+    `.inprogress` name and renamed on rotation, so readers only ever see
+    complete files.
+
+    Writes are expected in batches (see BufferedInferenceLogger): each
+    write_events() call becomes one Parquet row group.
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path,
+        *,
+        features: Optional[Sequence[str]] = None,
+        max_rows_per_file: int = 500_000,
+        max_file_age_s: float = 3600.0,
+        compression: str = "zstd",
+    ):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_rows_per_file = int(max_rows_per_file)
+        self.max_file_age_s = float(max_file_age_s)
+        self.compression = compression
+
+        self._lock = threading.Lock()
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._path: Optional[Path] = None
+        self._partition: Optional[Tuple[str, str]] = None
+        # columns of new files vs. columns of the open file
+        self._allowed: List[str] = list(dict.fromkeys(features or ()))
+        self._features: List[str] = []
+        self._schema: Optional[pa.Schema] = None
+        self._rows_in_file = 0
+        self._opened_at = 0.0
+        self._seq = 0
+
+        self.files_written = 0
+        self.rows_written = 0
+        self.unexpected_features_dropped = 0
+
+    def set_features(self, features: Sequence[str]) -> None:
+        """Feature columns for the next events (the open file rotates if they differ)."""
+        with self._lock:
+            self._allowed = list(dict.fromkeys(features))
+
+    # ------------------------------------------------------------------
+    # File lifecycle
+    # ------------------------------------------------------------------
+    def _open(self, partition: Tuple[str, str], features: List[str]) -> None:
+        date, hour = partition
+        part_dir = self.root_dir / f"date={date}" / f"hour={hour}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+
+        self._seq += 1
+        created = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        name = f"part-{created}-{os.getpid()}-{self._seq:05d}.parquet"
+
+        self._features = list(features)
+        self._schema = pa.schema(
+            BASE_FIELDS + [pa.field(FEATURE_PREFIX + f, pa.float64()) for f in self._features]
+        )
+        self._path = part_dir / name
+        self._writer = pq.ParquetWriter(
+            str(self._path) + ".inprogress",
+            self._schema,
+            compression=self.compression,
+        )
+        self._partition = partition
+        self._rows_in_file = 0
+        self._opened_at = time.monotonic()
+
+    def _close_current(self) -> None:
+        if self._writer is None:
+            return
+
+        self._writer.close()
+        os.replace(str(self._path) + ".inprogress", self._path)
+        self.files_written += 1
+
+        self._writer = None
+        self._path = None
+        self._partition = None
+
+    def _needs_rotation(self, partition: Tuple[str, str]) -> bool:
+        if self._writer is None:
+            return True
+        if partition != self._partition:
+            return True
+        if self._rows_in_file >= self.max_rows_per_file:
+            return True
+        if time.monotonic() - self._opened_at >= self.max_file_age_s:
+            return True
+        return self._features != self._allowed
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _to_table(self, events: List[Dict[str, Any]], timestamps: List[datetime]) -> pa.Table:
+        columns: Dict[str, List[Any]] = {
+            field.name: [event.get(field.name) for event in events]
+            for field in BASE_FIELDS
+            if field.name != "timestamp_utc"
+        }
+        columns["timestamp_utc"] = timestamps
+
+        allowed = set(self._features)
+        columns["unexpected_feature_count"] = [
+            sum(1 for f in (event.get("features") or {}) if f not in allowed)
+            for event in events
+        ]
+        self.unexpected_features_dropped += sum(columns["unexpected_feature_count"])
+
+        for f in self._features:
+            columns[FEATURE_PREFIX + f] = [
+                _to_float((event.get("features") or {}).get(f)) for event in events
+            ]
+
+        return pa.Table.from_pydict(columns, schema=self._schema)
+
+    def write_events(self, events: List[Dict[str, Any]]) -> None:
+        if not events:
+            return
+
+        # group consecutive events by (date, hour) partition
+        groups: List[Tuple[Tuple[str, str], List[Dict[str, Any]], List[datetime]]] = []
+        for event in events:
+            ts = _parse_ts(event.get("timestamp_utc") or datetime.now(timezone.utc))
+            key = _partition_key(ts)
+            if not groups or groups[-1][0] != key:
+                groups.append((key, [], []))
+            groups[-1][1].append(event)
+            groups[-1][2].append(ts)
+
+        with self._lock:
+            for partition, group, timestamps in groups:
+                if self._needs_rotation(partition):
+                    self._close_current()
+                    self._open(partition, self._allowed)
+
+                self._writer.write_table(self._to_table(group, timestamps))
+                self._rows_in_file += len(group)
+                self.rows_written += len(group)
+
+    def maybe_rotate(self) -> None:
+        """Close the current file if it is older than max_file_age_s."""
+        with self._lock:
+            if (
+                self._writer is not None
+                and time.monotonic() - self._opened_at >= self.max_file_age_s
+            ):
+                self._close_current()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_current()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "root_dir": str(self.root_dir),
+            "files_written": self.files_written,
+            "rows_written": self.rows_written,
+            "unexpected_features_dropped": self.unexpected_features_dropped,
+            "rows_in_open_file": self._rows_in_file if self._writer is not None else 0,
+        }
+
+
+# ------------------------------------------------------------------
+# Reader API
+# ------------------------------------------------------------------
+def _as_utc(value: datetime | str) -> datetime:
+    ts = _parse_ts(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def open_inference_dataset(root_dir: str | Path) -> ds.Dataset:
+    """
+    Open every complete Parquet file under root_dir as one dataset.
+    Files written with different feature sets are unified (missing
+    feature columns read as nulls).
+    """
+    root_dir = Path(root_dir)
+    files = sorted(str(p) for p in root_dir.rglob("*.parquet"))
+    if not files:
+        raise FileNotFoundError(f"No Parquet inference logs found under {root_dir}")
+
+    schema = pa.unify_schemas(
+        [pq.read_schema(f) for f in files] + [PARTITIONING.schema]
+    )
+    return ds.dataset(
+        files,
+        schema=schema,
+        format="parquet",
+        partitioning=PARTITIONING,
+        partition_base_dir=str(root_dir),
+    )
+
+
+def read_inference_events(
+    root_dir: str | Path,
+    *,
+    start: datetime | str | None = None,
+    end: datetime | str | None = None,
+    package_ids: Sequence[str] | None = None,
+    event_type: str | None = "single_inference",
+    status: str | None = None,
+    columns: Sequence[str] | None = None,
+) -> pa.Table:
+    """
+    Read inference events from the Parquet sink.
+
+    Time-range, package_id, event_type and status filters are pushed down
+    to Arrow: the date partition directories prune whole days, and row
+    group statistics skip the rest. `end` is exclusive.
+    """
+    dataset = open_inference_dataset(root_dir)
+
+    filters = []
+    if start is not None:
+        start_ts = _as_utc(start)
+        filters.append(ds.field("date") >= start_ts.strftime("%Y-%m-%d"))
+        filters.append(ds.field("timestamp_utc") >= pa.scalar(start_ts, pa.timestamp("us", tz="UTC")))
+    if end is not None:
+        end_ts = _as_utc(end)
+        filters.append(ds.field("date") <= end_ts.strftime("%Y-%m-%d"))
+        filters.append(ds.field("timestamp_utc") < pa.scalar(end_ts, pa.timestamp("us", tz="UTC")))
+    if package_ids:
+        filters.append(ds.field("package_id").isin(list(package_ids)))
+    if event_type is not None:
+        filters.append(ds.field("event_type") == event_type)
+    if status is not None:
+        filters.append(ds.field("status") == status)
+
+    expr = None
+    for f in filters:
+        expr = f if expr is None else expr & f
+
+    return dataset.to_table(
+        columns=list(columns) if columns is not None else None,
+        filter=expr,
+    )
+
+
+def feature_columns(table: pa.Table | pa.Schema) -> List[str]:
+    """Flattened feature column names present in a table/schema."""
+    names = table.schema.names if isinstance(table, pa.Table) else table.names
+    return [n for n in names if n.startswith(FEATURE_PREFIX)]
+
+
+def read_inference_features(
+    root_dir: str | Path,
+    features: Sequence[str] | None = None,
+    **filters: Any,
+):
+    """
+    Model features from successful single inferences as a DataFrame,
+    with the `feature__` prefix stripped.
+    """
+    if features is None:
+        schema = open_inference_dataset(root_dir).schema
+        columns = feature_columns(schema)
+    else:
+        columns = [FEATURE_PREFIX + f for f in features]
+
+    table = read_inference_events(root_dir, columns=columns, **filters)
+    df = table.to_pandas()
+    df.columns = [c[len(FEATURE_PREFIX):] for c in df.columns]
+    return df
@@ -2,19 +2,35 @@ from __future__ import annotations
 
 import json
 import pandas as pd
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, Optional, Sequence
 from pathlib import Path
 
 
 class PredictionMonitor:
     """
     Analyze prediction behavior from inference logs.
+
+    `log_path` is either the JSONL inference log or the root directory
+    of the Parquet sink (app/monitoring/parquet_sink.py).
     """
 
     def __init__(self, log_path: str):
         self.log_path = Path(log_path)
 
-    def load_predictions(self) -> pd.DataFrame:
+    def load_predictions(
+        self,
+        *,
+        start: Optional[datetime | str] = None,
+        end: Optional[datetime | str] = None,
+        package_ids: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        if self.log_path.is_dir():
+            return self._load_predictions_parquet(start, end, package_ids)
+
+        if start is not None or end is not None or package_ids:
+            raise ValueError("Time-range / package_id filters require the Parquet sink")
+
         rows = []
 
         with open(self.log_path, "r") as f:
@@ -35,6 +51,22 @@ class PredictionMonitor:
 
         return pd.DataFrame(rows)
 
+    def _load_predictions_parquet(self, start, end, package_ids) -> pd.DataFrame:
+        from app.monitoring.parquet_sink import read_inference_events
+
+        table = read_inference_events(
+            self.log_path,
+            start=start,
+            end=end,
+            package_ids=package_ids,
+            columns=["prediction", "probability", "timestamp_utc"],
+        )
+
+        if table.num_rows == 0:
+            raise ValueError("No predictions found in logs")
+
+        return table.to_pandas().rename(columns={"timestamp_utc": "timestamp"})
+
     def compute_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
         total = len(df)
 
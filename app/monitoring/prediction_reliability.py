@@ -1,6 +1,33 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.monitoring.prometheus import (
+    PROBABILITY_BUCKETS,
+    CounterFamily,
+    Histogram,
+    HistogramFamily,
+)
+from app.monitoring.shared_memory import make_stripes
+
+
+_TOTAL, _INVALID, _POSITIVE, _PROBA_SUM = range(4)
+_N_COUNTERS = 4
+_SIZE = _N_COUNTERS + Histogram.state_size(PROBABILITY_BUCKETS)
+
+_PREDICTIONS = CounterFamily(
+    "predictions",
+    "Model predictions by outcome.",
+    [{"outcome": "positive"}, {"outcome": "negative"}, {"outcome": "invalid"}],
+)
+_PROBABILITY = HistogramFamily(
+    "prediction_probability",
+    "Predicted probability of the positive class (valid predictions).",
+    PROBABILITY_BUCKETS,
+)
 
 
 class PredictionReliabilityStore:
@@ -12,13 +39,26 @@ class PredictionReliabilityStore:
     - invalid_prediction_count
     - positive_prediction_rate
     - average_probability
+
+    Counters live in a float64 stripe; with `shared_dir` set the stripe
+    is part of a shared mmap file and reads aggregate every worker.
     """
 
-    def __init__(self) -> None:
-        self.total_predictions = 0
-        self.invalid_prediction_count = 0
-        self.positive_prediction_count = 0
-        self.probability_sum = 0.0
+    def __init__(
+        self,
+        *,
+        shared_dir: Optional[str | Path] = None,
+        n_stripes: int = 32,
+    ) -> None:
+        self._stripes = make_stripes(
+            "prediction_reliability",
+            _SIZE,
+            shared_dir=shared_dir,
+            n_stripes=n_stripes,
+        )
+        self._counters = memoryview(self._stripes.local)
+
+        self.probability_histogram = Histogram(PROBABILITY_BUCKETS, self._counters, _N_COUNTERS)
 
     def record_prediction(
         self,
@@ -27,42 +67,107 @@ class PredictionReliabilityStore:
         probability: float,
         is_valid: bool,
     ) -> None:
-        self.total_predictions += 1
+        counters = self._counters
+        counters[_TOTAL] += 1
 
         if not is_valid:
-            self.invalid_prediction_count += 1
+            counters[_INVALID] += 1
             return
 
         if prediction == 1:
-            self.positive_prediction_count += 1
+            counters[_POSITIVE] += 1
 
-        self.probability_sum += float(probability)
+        probability = float(probability)
+        counters[_PROBA_SUM] += probability
+        self.probability_histogram.observe(probability)
+
+    def record_predictions(
+        self,
+        *,
+        predictions: np.ndarray,
+        probabilities: np.ndarray,
+    ) -> None:
+        """
+        Record a whole batch; validity is the vectorized equivalent of
+        app.validation.validate_prediction_output.
+        """
+        predictions = np.asarray(predictions)
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+
+        valid = (
+            ((predictions == 0) | (predictions == 1))
+            & np.isfinite(probabilities)
+            & (probabilities >= 0.0)
+            & (probabilities <= 1.0)
+        )
+        valid_probabilities = probabilities[valid]
+
+        counters = self._counters
+        counters[_TOTAL] += len(probabilities)
+        counters[_INVALID] += len(probabilities) - len(valid_probabilities)
+        counters[_POSITIVE] += int((predictions[valid] == 1).sum())
+        counters[_PROBA_SUM] += float(valid_probabilities.sum())
+        self.probability_histogram.observe_many(valid_probabilities)
+
+    # ------------------------------------------------------------------
+    # Aggregated (all workers) reads
+    # ------------------------------------------------------------------
+    def _totals(self) -> List[float]:
+        return self._stripes.rows().sum(axis=0).tolist()
+
+    @property
+    def total_predictions(self) -> int:
+        return int(self._totals()[_TOTAL])
+
+    @property
+    def invalid_prediction_count(self) -> int:
+        return int(self._totals()[_INVALID])
+
+    @property
+    def positive_prediction_count(self) -> int:
+        return int(self._totals()[_POSITIVE])
+
+    @property
+    def probability_sum(self) -> float:
+        return self._totals()[_PROBA_SUM]
 
     def get_metrics(self) -> Dict[str, Any]:
-        valid_prediction_count = self.total_predictions - self.invalid_prediction_count
+        totals = self._totals()
+        total_predictions = int(totals[_TOTAL])
+        invalid_prediction_count = int(totals[_INVALID])
+        valid_prediction_count = total_predictions - invalid_prediction_count
 
         prediction_validity_rate = (
-            valid_prediction_count / self.total_predictions
-            if self.total_predictions > 0
+            valid_prediction_count / total_predictions
+            if total_predictions > 0
             else 0.0
         )
 
         positive_prediction_rate = (
-            self.positive_prediction_count / valid_prediction_count
+            totals[_POSITIVE] / valid_prediction_count
             if valid_prediction_count > 0
             else 0.0
         )
 
         average_probability = (
-            self.probability_sum / valid_prediction_count
+            totals[_PROBA_SUM] / valid_prediction_count
             if valid_prediction_count > 0
             else 0.0
         )
 
         return {
-            "total_predictions": self.total_predictions,
-            "invalid_prediction_count": self.invalid_prediction_count,
+            "total_predictions": total_predictions,
+            "invalid_prediction_count": invalid_prediction_count,
             "prediction_validity_rate": round(prediction_validity_rate, 4),
             "positive_prediction_rate": round(positive_prediction_rate, 4),
             "average_probability": round(average_probability, 4),
-        }
\ No newline at end of file
+        }
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`) aggregated over workers."""
+        totals = self._totals()
+        negative = totals[_TOTAL] - totals[_INVALID] - totals[_POSITIVE]
+        return (
+            _PREDICTIONS.render([totals[_POSITIVE], negative, totals[_INVALID]])
+            + _PROBABILITY.render(totals[_N_COUNTERS:])
+        )
@@ -0,0 +1,160 @@
+#OpenMetrics text exposition from preformatted line prefixes
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, List, MutableSequence, Optional, Sequence
+
+import numpy as np
+
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRIC_PREFIX = "nba_api_"
+
+# request latency (ms), rows per batch request, predicted probability
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PROBABILITY_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def _fmt(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(
+            k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for k, v in labels.items()
+    )
+    return "{" + inner + "}"
+
+
+class Histogram:
+    """
+    Cumulative fixed-bucket histogram over a slice of a counter buffer.
+
+    State: one count per bucket (bounds..., +Inf), then the sum. The
+    buffer is any mutable float sequence: a list, or a memoryview over
+    a shared stripe (see shared_memory.py).
+    """
+
+    def __init__(
+        self,
+        bounds: Sequence[float],
+        buffer: Optional[MutableSequence[float]] = None,
+        offset: int = 0,
+    ):
+        self.bounds = [float(b) for b in bounds]
+        self._buffer = buffer if buffer is not None else [0.0] * self.state_size(bounds)
+        self._offset = int(offset)
+        self._sum_index = self._offset + len(self.bounds) + 1
+
+    @staticmethod
+    def state_size(bounds: Sequence[float]) -> int:
+        return len(bounds) + 2
+
+    def observe(self, value: float) -> None:
+        # `le` buckets: the first bound >= value
+        self._buffer[self._offset + bisect_left(self.bounds, value)] += 1
+        self._buffer[self._sum_index] += value
+
+    def observe_many(self, values: np.ndarray) -> None:
+        counts = np.bincount(
+            np.searchsorted(self.bounds, values, side="left"),
+            minlength=len(self.bounds) + 1,
+        )
+        for i, count in enumerate(counts.tolist()):
+            if count:
+                self._buffer[self._offset + i] += count
+        self._buffer[self._sum_index] += float(values.sum())
+
+
+class CounterFamily:
+    """`# TYPE counter` family with preformatted sample prefixes."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_sets: Optional[List[Dict[str, str]]] = None,
+    ):
+        name = METRIC_PREFIX + name
+        self.header = f"# HELP {name} {help_text}\n# TYPE {name} counter\n"
+        self.prefixes = [
+            f"{name}_total{_labels(labels)} " for labels in (label_sets or [None])
+        ]
+
+    def render(self, values: Sequence[float]) -> str:
+        return self.header + "".join(
+            f"{prefix}{_fmt(v)}\n" for prefix, v in zip(self.prefixes, values)
+        )
+
+
+class GaugeFamily:
+    """`# TYPE gauge` family with preformatted sample prefixes."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_sets: Optional[List[Dict[str, str]]] = None,
+    ):
+        name = METRIC_PREFIX + name
+        self.header = f"# HELP {name} {help_text}\n# TYPE {name} gauge\n"
+        self.prefixes = [
+            f"{name}{_labels(labels)} " for labels in (label_sets or [None])
+        ]
+
+    def render(self, values: Sequence[float]) -> str:
+        return self.header + "".join(
+            f"{prefix}{_fmt(v)}\n" for prefix, v in zip(self.prefixes, values)
+        )
+
+
+class HistogramFamily:
+    """
+    `# TYPE histogram` family for a Histogram state.
+
+    `scale` converts the stored unit to the exposed one (e.g. ms -> s),
+    for both the `le` bounds and the sum.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        bounds: Sequence[float],
+        scale: float = 1.0,
+    ):
+        name = METRIC_PREFIX + name
+        self.scale = float(scale)
+        self.header = f"# HELP {name} {help_text}\n# TYPE {name} histogram\n"
+        self.bucket_prefixes = [
+            f'{name}_bucket{{le="{_fmt(b * scale)}"}} ' for b in bounds
+        ] + [f'{name}_bucket{{le="+Inf"}} ']
+        self.count_prefix = f"{name}_count "
+        self.sum_prefix = f"{name}_sum "
+
+    def render(self, state: Sequence[float]) -> str:
+        n = len(self.bucket_prefixes)
+        parts = [self.header]
+        cumulative = 0
+        for prefix, count in zip(self.bucket_prefixes, state[:n]):
+            cumulative += int(count)
+            parts.append(f"{prefix}{cumulative}\n")
+        parts.append(f"{self.count_prefix}{cumulative}\n")
+        parts.append(f"{self.sum_prefix}{_fmt(float(state[n]) * self.scale)}\n")
+        return "".join(parts)
+
+
+def render_exposition(sections: Sequence[str]) -> str:
+    """Join rendered families into one OpenMetrics document."""
+    return "".join(sections) + "# EOF\n"
@@ -0,0 +1,338 @@
+#Mergeable latency sketches + time-bucketed windows for MetricsStore
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+_COUNT, _SUM, _MIN, _MAX = 0, 1, 2, 3
+_STATE_FIELDS = 4
+
+
+class DDSketch:
+    """
+    DDSketch-style quantile sketch with a fixed, dense bucket array.
+
+    Values in (min_value, max_value] fall into logarithmic buckets
+    (gamma^(j-1), gamma^j], so every quantile is returned within
+    `relative_accuracy` of the true value. Values <= min_value share a
+    single low bucket and values above max_value are clamped into the
+    top bucket.
+
+    Memory is fixed (~1.2k buckets for 1 µs .. 3 h in ms at 1%), adding a
+    value is O(1), a quantile is one cumsum over the buckets, and two
+    sketches with the same parameters merge by adding their arrays.
+
+    The whole state (count, sum, min, max, buckets) is one float64
+    array, which may be a view into a shared stripe (see shared_memory.py).
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-3,
+        max_value: float = 1e7,
+        buffer: Optional[np.ndarray] = None,
+    ):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if not 0.0 < min_value < max_value:
+            raise ValueError("Expected 0 < min_value < max_value")
+
+        self.relative_accuracy = float(relative_accuracy)
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+
+        self.gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        self._top = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+
+        size = self.state_size(relative_accuracy, min_value, max_value)
+        if buffer is None:
+            buffer = np.zeros(size, dtype=np.float64)
+        elif buffer.shape != (size,):
+            raise ValueError(f"Expected a buffer of {size} float64 values")
+
+        self._state = buffer
+        self._mv = memoryview(buffer)
+        # bucket 0 holds values <= min_value
+        self.counts = buffer[_STATE_FIELDS:]
+
+        if self._state[_COUNT] == 0:
+            self.clear()
+
+    @staticmethod
+    def state_size(
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-3,
+        max_value: float = 1e7,
+    ) -> int:
+        """Length of the float64 state array for these parameters."""
+        log_gamma = math.log((1.0 + relative_accuracy) / (1.0 - relative_accuracy))
+        offset = math.ceil(math.log(min_value) / log_gamma)
+        top = math.ceil(math.log(max_value) / log_gamma) - offset + 1
+        return _STATE_FIELDS + top + 1
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        k = math.ceil(math.log(value) / self._log_gamma) - self._offset + 1
+        return k if k < self._top else self._top
+
+    def add(self, value: float, bucket: Optional[int] = None) -> None:
+        mv = self._mv
+        mv[_STATE_FIELDS + (self.bucket(value) if bucket is None else bucket)] += 1
+        mv[_COUNT] += 1
+        mv[_SUM] += value
+        if value < mv[_MIN]:
+            mv[_MIN] = value
+        if value > mv[_MAX]:
+            mv[_MAX] = value
+
+    def _check_compatible(self, other: "DDSketch") -> None:
+        if (
+            other.relative_accuracy != self.relative_accuracy
+            or other.min_value != self.min_value
+            or other.max_value != self.max_value
+        ):
+            raise ValueError("Cannot merge sketches with different parameters")
+
+    def merge(self, other: "DDSketch") -> None:
+        self._check_compatible(other)
+        self.merge_states(other._state[None, :])
+
+    def merge_states(self, states: np.ndarray) -> None:
+        """Merge raw sketch states (one per row) with these parameters."""
+        states = states[states[:, _COUNT] > 0]
+        if len(states) == 0:
+            return
+
+        self._state[_MIN] = min(self._state[_MIN], states[:, _MIN].min())
+        self._state[_MAX] = max(self._state[_MAX], states[:, _MAX].max())
+
+        self._state[_COUNT] += states[:, _COUNT].sum()
+        self._state[_SUM] += states[:, _SUM].sum()
+        self.counts += states[:, _STATE_FIELDS:].sum(axis=0)
+
+    def clear(self) -> None:
+        self._state[:] = 0.0
+        self._state[_MIN] = math.inf
+        self._state[_MAX] = -math.inf
+
+    def empty_like(self) -> "DDSketch":
+        return DDSketch(self.relative_accuracy, self.min_value, self.max_value)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @property
+    def count(self) -> int:
+        return int(self._state[_COUNT])
+
+    @property
+    def sum(self) -> float:
+        return float(self._state[_SUM])
+
+    @property
+    def min(self) -> float:
+        return float(self._state[_MIN]) if self.count else math.inf
+
+    @property
+    def max(self) -> float:
+        return float(self._state[_MAX]) if self.count else -math.inf
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def _bucket_value(self, k: int) -> float:
+        if k == 0:
+            return self.min_value
+        # midpoint (in relative terms) of (gamma^(j-1), gamma^j]
+        j = k + self._offset - 1
+        return 2.0 * self.gamma ** j / (self.gamma + 1.0)
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Values at quantiles qs (each in [0, 1]); 0.0 for an empty sketch."""
+        count = self.count
+        if count == 0:
+            return [0.0 for _ in qs]
+
+        lo, hi = self.min, self.max
+        cum = np.cumsum(self.counts)
+        out = []
+        for q in qs:
+            if q <= 0.0:
+                out.append(lo)
+            elif q >= 1.0:
+                out.append(hi)
+            else:
+                rank = q * (count - 1)
+                k = int(np.searchsorted(cum, rank, side="right"))
+                # never outside the observed range
+                out.append(min(max(self._bucket_value(k), lo), hi))
+        return out
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+
+class WindowedSketch:
+    """
+    Sliding window of DDSketches in a ring of `n_slots` time slots.
+
+    Each slot covers window_s / n_slots seconds; a slot is cleared when
+    the ring wraps around to it. A snapshot merges the live slots, so the
+    window is accurate to one slot (e.g. 1m as 6 x 10s covers the last
+    50-60s).
+
+    State layout (one float64 array): slot epochs, then one DDSketch
+    state per slot. snapshot() also accepts the same region of several
+    workers' stripes (one row each) and merges them.
+    """
+
+    def __init__(
+        self,
+        window_s: float,
+        n_slots: int,
+        buffer: Optional[np.ndarray] = None,
+        **sketch_kwargs: Any,
+    ):
+        self.window_s = float(window_s)
+        self.n_slots = int(n_slots)
+        self.slot_s = self.window_s / self.n_slots
+
+        self._sketch_size = DDSketch.state_size(**sketch_kwargs)
+        size = self.n_slots * (1 + self._sketch_size)
+        if buffer is None:
+            buffer = np.zeros(size, dtype=np.float64)
+        elif buffer.shape != (size,):
+            raise ValueError(f"Expected a buffer of {size} float64 values")
+
+        self._buffer = buffer
+        self._epochs = memoryview(buffer[: self.n_slots])
+        self._slots = [
+            DDSketch(
+                buffer=buffer[self.n_slots + i * self._sketch_size:
+                              self.n_slots + (i + 1) * self._sketch_size],
+                **sketch_kwargs,
+            )
+            for i in range(self.n_slots)
+        ]
+
+    @staticmethod
+    def state_size(n_slots: int, **sketch_kwargs: Any) -> int:
+        return int(n_slots) * (1 + DDSketch.state_size(**sketch_kwargs))
+
+    def bucket(self, value: float) -> int:
+        return self._slots[0].bucket(value)
+
+    def add(
+        self,
+        value: float,
+        now: Optional[float] = None,
+        bucket: Optional[int] = None,
+    ) -> None:
+        """Add a value; `bucket` skips the log when already computed."""
+        epoch = int((time.time() if now is None else now) // self.slot_s)
+        i = epoch % self.n_slots
+        if self._epochs[i] != epoch:
+            self._slots[i].clear()
+            self._epochs[i] = epoch
+        self._slots[i].add(value, bucket)
+
+    def snapshot(
+        self,
+        now: Optional[float] = None,
+        rows: Optional[np.ndarray] = None,
+    ) -> DDSketch:
+        """Merged sketch of the live slots (of `rows`, or of this buffer)."""
+        if rows is None:
+            rows = self._buffer[None, :]
+
+        epoch = int((time.time() if now is None else now) // self.slot_s)
+        epochs = rows[:, : self.n_slots]
+        live = (epochs > epoch - self.n_slots) & (epochs <= epoch)
+        states = rows[:, self.n_slots:].reshape(len(rows), self.n_slots, self._sketch_size)
+
+        merged = self._slots[0].empty_like()
+        merged.merge_states(states[live])
+        return merged
+
+
+class RingCounter:
+    """
+    Event counter over fixed one-second ring buckets.
+
+    State layout (one float64 array): bucket epochs, then bucket counts.
+    """
+
+    def __init__(self, window_s: int = 60, buffer: Optional[np.ndarray] = None):
+        self.window_s = int(window_s)
+        size = self.state_size(self.window_s)
+        if buffer is None:
+            buffer = np.zeros(size, dtype=np.float64)
+        elif buffer.shape != (size,):
+            raise ValueError(f"Expected a buffer of {size} float64 values")
+
+        self._buffer = buffer
+        self._epochs = memoryview(buffer[: self.window_s])
+        self._counts = memoryview(buffer[self.window_s:])
+
+    @staticmethod
+    def state_size(window_s: int = 60) -> int:
+        return 2 * int(window_s)
+
+    def add(self, n: int = 1, now: Optional[float] = None) -> None:
+        epoch = int(time.time() if now is None else now)
+        i = epoch % self.window_s
+        if self._epochs[i] != epoch:
+            self._counts[i] = 0
+            self._epochs[i] = epoch
+        self._counts[i] += n
+
+    def total(self, now: Optional[float] = None, rows: Optional[np.ndarray] = None) -> int:
+        """Events in the last `window_s` seconds (current second included)."""
+        if rows is None:
+            rows = self._buffer[None, :]
+
+        epoch = int(time.time() if now is None else now)
+        epochs = rows[:, : self.window_s]
+        live = (epochs > epoch - self.window_s) & (epochs <= epoch)
+        return int(rows[:, self.window_s:][live].sum())
+
+
+# 1m: 6 x 10s, 5m: 5 x 60s, 1h: 12 x 300s
+LATENCY_WINDOWS: Dict[str, Dict[str, float]] = {
+    "1m": {"window_s": 60, "n_slots": 6},
+    "5m": {"window_s": 300, "n_slots": 5},
+    "1h": {"window_s": 3600, "n_slots": 12},
+}
+
+LATENCY_QUANTILES: Dict[str, float] = {
+    "p50": 0.50,
+    "p90": 0.90,
+    "p95": 0.95,
+    "p99": 0.99,
+    "p999": 0.999,
+}
+
+
+def summarize(sketch: DDSketch) -> Dict[str, Any]:
+    """Count, average and LATENCY_QUANTILES of a sketch (in ms)."""
+    values = sketch.quantiles(list(LATENCY_QUANTILES.values()))
+    out: Dict[str, Any] = {
+        "count": sketch.count,
+        "avg_ms": round(sketch.avg, 3),
+    }
+    for name, value in zip(LATENCY_QUANTILES, values):
+        out[f"{name}_ms"] = round(value, 3)
+    return out
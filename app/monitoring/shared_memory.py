@@ -0,0 +1,184 @@
+#Per-worker counter stripes, local or in a shared mmap file
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+METRICS_BACKENDS = ("local", "shared")
+
+_MAGIC = 0x4E42414D45545253  # "NBAMETRS"
+_HEADER_FIELDS = 4           # magic, stripe length, n_stripes, reserved
+
+
+class LocalStripes:
+    """Single in-process stripe (the default, per-worker metrics)."""
+
+    def __init__(self, length: int):
+        self.length = int(length)
+        self.local = np.zeros(self.length, dtype=np.float64)
+
+    def rows(self) -> np.ndarray:
+        return self.local[None, :]
+
+    def close(self) -> None:
+        pass
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedStripes:
+    """
+    float64 counter stripes shared by all workers through an mmap'd file.
+
+    Layout: an int64 header (magic, stripe length, n_stripes, reserved),
+    one owner pid per stripe, then n_stripes x length float64 values.
+
+    Each worker process claims its own stripe when the store is created
+    (under an flock on the file), so increments are plain, uncontended
+    8-byte stores into that worker's row. Readers sum the claimed rows
+    to get cluster-wide values. A stripe left by a dead worker keeps its
+    counts (they stay part of the totals) and is reused by the next
+    worker. If no owner is alive, the file starts a new generation and
+    is zeroed.
+
+    Stores must be created after the worker processes are started
+    (uvicorn --workers imports the app once per worker): a stripe
+    inherited through fork() would be shared by several writers.
+    """
+
+    def __init__(self, path: str | Path, length: int, n_stripes: int = 32):
+        self.path = Path(path)
+        self.length = int(length)
+        self.n_stripes = int(n_stripes)
+
+        header_bytes = (_HEADER_FIELDS + self.n_stripes) * 8
+        data_bytes = self.n_stripes * self.length * 8
+        size = header_bytes + data_bytes
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                self._mm = self._open(fd, size)
+                self._header = np.frombuffer(self._mm, dtype=np.int64, count=_HEADER_FIELDS)
+                self._pids = np.frombuffer(
+                    self._mm, dtype=np.int64, count=self.n_stripes, offset=_HEADER_FIELDS * 8
+                )
+                self._data = np.frombuffer(
+                    self._mm, dtype=np.float64, offset=header_bytes
+                ).reshape(self.n_stripes, self.length)
+                self.stripe = self._claim()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+        self.local = self._data[self.stripe]
+
+    def _open(self, fd: int, size: int) -> mmap.mmap:
+        current = os.fstat(fd).st_size
+        expected = [_MAGIC, self.length, self.n_stripes, 0]
+
+        if current == size:
+            mm = mmap.mmap(fd, size)
+            header = np.frombuffer(mm, dtype=np.int64, count=_HEADER_FIELDS)
+            if header.tolist() == expected:
+                return mm
+
+            pids = np.frombuffer(mm, dtype=np.int64, count=_HEADER_FIELDS + self.n_stripes)
+            live = [p for p in pids[_HEADER_FIELDS:].tolist() if _pid_alive(p)]
+            del header, pids
+            mm.close()
+            if live:
+                raise RuntimeError(
+                    f"Shared metrics file {self.path} has a different layout "
+                    f"and is in use by pids {live}"
+                )
+        elif current > 0:
+            # different size: only the layout of a dead generation can be replaced
+            with open(self.path, "rb") as f:
+                raw = f.read((_HEADER_FIELDS + 256) * 8)
+            words = np.frombuffer(raw[: len(raw) // 8 * 8], dtype=np.int64)
+            n_old = int(words[2]) if len(words) > 2 and words[0] == _MAGIC else 0
+            live = [p for p in words[_HEADER_FIELDS:_HEADER_FIELDS + n_old].tolist() if _pid_alive(p)]
+            if live:
+                raise RuntimeError(
+                    f"Shared metrics file {self.path} has a different layout "
+                    f"and is in use by pids {live}"
+                )
+
+        os.ftruncate(fd, 0)
+        os.ftruncate(fd, size)
+        mm = mmap.mmap(fd, size)
+        header = np.frombuffer(mm, dtype=np.int64, count=_HEADER_FIELDS)
+        header[:] = expected
+        del header
+        return mm
+
+    def _claim(self) -> int:
+        pid = os.getpid()
+        owners = self._pids.tolist()
+
+        if not any(_pid_alive(p) for p in owners):
+            # new generation: no worker of the previous run is left
+            self._data[:] = 0.0
+            self._pids[:] = 0
+            owners = [0] * self.n_stripes
+
+        if pid in owners:
+            return owners.index(pid)
+
+        for i, owner in enumerate(owners):
+            if not _pid_alive(owner):
+                self._pids[i] = pid
+                return i
+
+        raise RuntimeError(
+            f"No free metrics stripe in {self.path} "
+            f"({self.n_stripes} workers); raise METRICS_SHARED_STRIPES"
+        )
+
+    def rows(self) -> np.ndarray:
+        """Rows of every stripe that was ever claimed in this generation."""
+        return self._data[self._pids != 0]
+
+    def close(self) -> None:
+        self.local = None
+        self._header = self._pids = self._data = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # views handed out to a store are still alive; the mapping
+            # goes away with them
+            pass
+
+
+def make_stripes(
+    name: str,
+    length: int,
+    *,
+    shared_dir: Optional[str | Path] = None,
+    n_stripes: int = 32,
+):
+    """LocalStripes, or SharedStripes in `shared_dir/<name>.bin` when set."""
+    if shared_dir is None:
+        return LocalStripes(length)
+    return SharedStripes(Path(shared_dir) / f"{name}.bin", length, n_stripes=n_stripes)
@@ -0,0 +1,251 @@
+#Hot model reload: resolve, load, warm and swap model packages without downtime
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.model_loader import LoadedModelPackage, _resolve_latest_package, load_model_package
+from app.monitoring.prometheus import CounterFamily, GaugeFamily, Histogram, HistogramFamily
+from app.warmup import WarmupReport, warm_up
+
+
+# reload duration (s): joblib load + warm-up
+RELOAD_DURATION_BUCKETS_S = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_RELOADS = CounterFamily(
+    "package_reloads",
+    "Model package reloads, by outcome.",
+    [{"status": "success"}, {"status": "failed"}],
+)
+_RELOAD_DURATION = HistogramFamily(
+    "package_reload_duration_seconds",
+    "Time to load and warm a model package before swapping it in.",
+    RELOAD_DURATION_BUCKETS_S,
+)
+_PINNED = GaugeFamily("package_pinned", "1 when the live package is pinned by package_id.")
+
+# hook(new_package, old_package) run right after a swap
+SwapHook = Callable[[LoadedModelPackage, Optional[LoadedModelPackage]], None]
+Fingerprint = Tuple[str, Optional[int]]
+
+
+class PackageManager:
+    """
+    Owns the live model package and swaps it without downtime.
+
+    `package_dir` is what MODEL_PACKAGE_DIR points to: a package folder
+    or the `latest` alias. reload() resolves it (or the pinned
+    package_id, a folder next to it), loads and warms the package in the
+    calling thread while the old one keeps serving, then replaces the
+    reference in a single assignment and runs the swap hooks (e.g.
+    app.main rebinding `model_package`). Handlers read the reference
+    once per request, so requests in flight finish on the package they
+    started with.
+
+    A watcher thread (start_watching) polls the resolved directory and
+    its manifest mtime and reloads when either changes. A package that
+    fails to load or warm is not retried until it changes again.
+    """
+
+    def __init__(
+        self,
+        package_dir: str | Path,
+        *,
+        mmap_mode: Optional[str] = None,
+        loader: Callable[..., LoadedModelPackage] = load_model_package,
+        warmup: Optional[Callable[[LoadedModelPackage], Any]] = warm_up,
+    ):
+        self.package_dir = Path(package_dir)
+        self.packages_root = self.package_dir.parent
+        self.mmap_mode = mmap_mode
+        self.loader = loader
+        self.warmup = warmup
+
+        self.pinned_package_id: Optional[str] = None
+        self._current: Optional[LoadedModelPackage] = None
+        self._fingerprint: Optional[Fingerprint] = None
+        self._failed_fingerprint: Optional[Fingerprint] = None
+        self._hooks: List[SwapHook] = []
+        self._reload_lock = threading.Lock()
+
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+        # metrics
+        self.reload_count = 0
+        self.failed_reload_count = 0
+        self.last_reload_duration_s: Optional[float] = None
+        self.last_reload_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_warmup: Any = None
+        self._duration_state = [0.0] * Histogram.state_size(RELOAD_DURATION_BUCKETS_S)
+        self._duration_hist = Histogram(RELOAD_DURATION_BUCKETS_S, self._duration_state)
+
+    @property
+    def current(self) -> Optional[LoadedModelPackage]:
+        return self._current
+
+    @property
+    def ready(self) -> bool:
+        """A package has been loaded and warmed (swaps keep the old one live)."""
+        return self._current is not None
+
+    def add_swap_hook(self, hook: SwapHook) -> None:
+        self._hooks.append(hook)
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+    def resolve(self) -> Path:
+        """Directory the live package should come from right now."""
+        if self.pinned_package_id is not None:
+            return self.packages_root / self.pinned_package_id
+        if self.package_dir.name == "latest":
+            return _resolve_latest_package(self.packages_root)
+        return self.package_dir
+
+    @staticmethod
+    def _fingerprint_of(package_dir: Path) -> Fingerprint:
+        manifest = package_dir / "package_manifest.json"
+        try:
+            mtime: Optional[int] = manifest.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        return str(package_dir), mtime
+
+    # ------------------------------------------------------------------
+    # Reload / pin
+    # ------------------------------------------------------------------
+    def reload(self, *, force: bool = True) -> bool:
+        """
+        Load, warm and swap in the resolved package.
+
+        With force=False (the watcher), nothing happens unless the
+        resolved package changed since the last swap or failed attempt.
+        Returns whether a new package went live; load / warm-up errors
+        are raised with force=True and only recorded otherwise.
+        """
+        with self._reload_lock:
+            target = self.resolve()
+            fingerprint = self._fingerprint_of(target)
+            if not force and fingerprint in (self._fingerprint, self._failed_fingerprint):
+                return False
+
+            start = time.perf_counter()
+            try:
+                new = self.loader(target, mmap_mode=self.mmap_mode)
+                warmup = self.warmup(new) if self.warmup is not None else None
+            except Exception as e:
+                self.failed_reload_count += 1
+                self._failed_fingerprint = fingerprint
+                self.last_error = f"{target.name}: {e}"
+                print(f"❌ Package reload failed ({target.name}): {e}")
+                if force:
+                    raise
+                return False
+
+            duration = time.perf_counter() - start
+            old, self._current = self._current, new
+            self._fingerprint = fingerprint
+            self._failed_fingerprint = None
+
+            self.reload_count += 1
+            self.last_reload_duration_s = duration
+            self.last_reload_at = time.time()
+            self.last_error = None
+            self.last_warmup = warmup
+            self._duration_hist.observe(duration)
+
+            for hook in self._hooks:
+                hook(new, old)
+
+            print(f"🔄 Package live: {new.manifest.get('package_id', target.name)} ({duration:.2f}s)")
+            return True
+
+    def pin(self, package_id: str) -> bool:
+        """Serve `package_id` (a folder under packages_root) until unpinned."""
+        target = self.packages_root / package_id
+        if Path(package_id).name != package_id or not target.is_dir():
+            raise FileNotFoundError(f"Package not found: {package_id}")
+
+        previous = self.pinned_package_id
+        self.pinned_package_id = package_id
+        try:
+            return self.reload()
+        except Exception:
+            self.pinned_package_id = previous
+            raise
+
+    def unpin(self) -> bool:
+        """Go back to MODEL_PACKAGE_DIR (e.g. the `latest` alias)."""
+        self.pinned_package_id = None
+        return self.reload()
+
+    # ------------------------------------------------------------------
+    # Watcher
+    # ------------------------------------------------------------------
+    def start_watching(self, interval_s: float) -> None:
+        if interval_s <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch,
+            args=(float(interval_s),),
+            name="package-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+
+    def stop_watching(self, timeout: float = 5.0) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=timeout)
+            self._watcher = None
+
+    def _watch(self, interval_s: float) -> None:
+        while not self._stop_watching.wait(interval_s):
+            try:
+                self.reload(force=False)
+            except Exception as e:  # resolution errors: keep serving, retry next poll
+                self.last_error = str(e)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        pkg = self._current
+        return {
+            "package_id": pkg.manifest.get("package_id") if pkg is not None else None,
+            "package_dir": str(pkg.package_dir) if pkg is not None else None,
+            "pinned_package_id": self.pinned_package_id,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+            "reload_count": self.reload_count,
+            "failed_reload_count": self.failed_reload_count,
+            "last_reload_duration_s": (
+                round(self.last_reload_duration_s, 4)
+                if self.last_reload_duration_s is not None
+                else None
+            ),
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error,
+            "warmup": (
+                self.last_warmup.to_dict()
+                if isinstance(self.last_warmup, WarmupReport)
+                else None
+            ),
+        }
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`)."""
+        text = (
+            _RELOADS.render([self.reload_count, self.failed_reload_count])
+            + _RELOAD_DURATION.render(self._duration_state)
+            + _PINNED.render([1 if self.pinned_package_id is not None else 0])
+        )
+        if isinstance(self.last_warmup, WarmupReport):
+            text += self.last_warmup.render_openmetrics()
+        return text
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import Dict, List
-import pandas as pd
+import json
+from itertools import chain
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, List, Tuple
+import numpy as np
 
 from app.model_loader import LoadedModelPackage
 from app.schemas import (
@@ -10,6 +13,9 @@ from app.schemas import (
     BatchPredictResponse,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def _build_dataframe(
     rows: List[Dict[str, float]],
@@ -42,6 +48,8 @@ def _build_dataframe(
     ValueError
         If required features are missing.
     """
+    import pandas as pd
+
     df = pd.DataFrame(rows)
 
     missing = [c for c in expected_features if c not in df.columns]
@@ -51,6 +59,43 @@ def _build_dataframe(
     return df[expected_features]
 
 
+def _build_matrix(
+    rows: List[Dict[str, float]],
+    expected_features: List[str],
+) -> np.ndarray:
+    """
+    (n_rows, n_features) float64 matrix ordered like `expected_features`,
+    without going through pandas.
+
+    Same contract as _build_dataframe: ValueError for a feature no row
+    carries, NaN where only some rows lack it.
+    """
+    n_rows, n_features = len(rows), len(expected_features)
+    getter = itemgetter(*expected_features)
+    if n_features == 1:
+        name = expected_features[0]
+        getter = lambda row: (row[name],)  # noqa: E731
+
+    try:
+        flat = np.fromiter(
+            chain.from_iterable(map(getter, rows)),
+            dtype=np.float64,
+            count=n_rows * n_features,
+        )
+        return flat.reshape(n_rows, n_features)
+    except KeyError:
+        pass
+
+    missing = [c for c in expected_features if not any(c in row for row in rows)]
+    if missing:
+        raise ValueError(f"Missing expected features: {missing}")
+
+    return np.array(
+        [[row.get(c, np.nan) for c in expected_features] for row in rows],
+        dtype=np.float64,
+    ).reshape(n_rows, n_features)
+
+
 def predict_one(
     pkg: LoadedModelPackage,
     row: Dict[str, float],
@@ -71,9 +116,12 @@ def predict_one(
     PredictResponse
         Probability + binary prediction using the tuned threshold.
     """
-    X = _build_dataframe([row], pkg.features)
+    if pkg.compiled is not None:
+        proba = pkg.compiled.predict_proba_row(row)
+    else:
+        X = _build_dataframe([row], pkg.input_features)
+        proba = float(pkg.predict_proba(X)[0])
 
-    proba = float(pkg.predict_proba(X)[0])
     pred = int(proba >= pkg.threshold)
 
     return PredictResponse(
@@ -103,9 +151,10 @@ def predict_batch(
     BatchPredictResponse
         Predictions for all rows.
     """
-    X = _build_dataframe(rows, pkg.features)
-
-    probas = pkg.predict_proba(X)
+    if pkg.compiled is not None:
+        probas = pkg.compiled.predict_proba_matrix(_build_matrix(rows, pkg.input_features))
+    else:
+        probas = pkg.predict_proba(_build_dataframe(rows, pkg.input_features))
     preds = (probas >= pkg.threshold).astype(int)
 
     results = [
@@ -120,4 +169,88 @@ def predict_batch(
         threshold_used=pkg.threshold,
         n_rows=len(results),
         predictions=results,
-    )
\ No newline at end of file
+    )
+
+def predict_matrix(
+    pkg: LoadedModelPackage,
+    X: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batch inference on a float matrix ordered like pkg.input_features.
+
+    Returns
+    -------
+    (probabilities, predictions)
+        float64 probabilities and int8 predictions, one per row.
+    """
+    probas = np.asarray(pkg.predict_proba_matrix(X), dtype=np.float64)
+    preds = (probas >= pkg.threshold).astype(np.int8)
+    return probas, preds
+
+
+# one fixed-width JSON object per row; digits are filled in place
+_ROW_TEMPLATE = b'{"probability":0.000000,"prediction":0},'
+_ROW_WIDTH = len(_ROW_TEMPLATE)
+_PROBA_AT = len(b'{"probability":')
+_PRED_AT = _ROW_TEMPLATE.index(b'"prediction":') + len(b'"prediction":')
+_DIGIT_POWERS = 10 ** np.arange(5, -1, -1, dtype=np.int64)
+
+
+def _round6_units(probas: np.ndarray) -> np.ndarray:
+    """
+    round(p, 6) * 1e6 as int64 for each p, vectorized.
+
+    rint(p * 1e6) agrees with Python's correctly rounded round() except
+    where the product lands within its rounding error of a .5 tie; those
+    few values are redone with round().
+    """
+    scaled = probas * 1e6
+    units = np.rint(scaled)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        units[near_tie] = [round(round(p, 6) * 1e6) for p in probas[near_tie].tolist()]
+    return units.astype(np.int64)
+
+
+def encode_batch_response(
+    probas: np.ndarray,
+    preds: np.ndarray,
+    threshold: float,
+) -> bytes:
+    """
+    JSON body of a BatchPredictResponse, written straight from the arrays.
+
+    Same document as serializing predict_batch's response (probabilities
+    rounded to 6 decimals), without building one Pydantic object per
+    row. Probabilities in [0, 1] are formatted with fixed width
+    ("0.500000" for 0.5) into a preallocated byte matrix; anything else
+    goes through json.
+    """
+    probas = np.asarray(probas, dtype=np.float64)
+    preds = np.asarray(preds)
+    n_rows = len(probas)
+    head = b'{"threshold_used":%b,"n_rows":%d,"predictions":[' % (
+        json.dumps(float(threshold)).encode(),
+        n_rows,
+    )
+
+    in_range = n_rows > 0 and bool(
+        np.isfinite(probas).all() and probas.min() >= 0.0 and probas.max() <= 1.0
+    )
+    if not in_range or not np.isin(preds, (0, 1)).all():
+        rows = [
+            {"probability": round(p, 6), "prediction": int(y)}
+            for p, y in zip(probas.tolist(), preds.tolist())
+        ]
+        return head + json.dumps(rows, separators=(",", ":"))[1:-1].encode() + b"]}"
+
+    units = _round6_units(probas)
+    buf = np.tile(np.frombuffer(_ROW_TEMPLATE, dtype=np.uint8), (n_rows, 1))
+    buf[:, _PROBA_AT] += (units // 1_000_000).astype(np.uint8)
+    buf[:, _PROBA_AT + 2:_PROBA_AT + 8] += (
+        (units % 1_000_000)[:, None] // _DIGIT_POWERS % 10
+    ).astype(np.uint8)
+    buf[:, _PRED_AT] += preds.astype(np.uint8)
+
+    # drop the trailing comma of the last row
+    return head + buf.tobytes()[:-1] + b"]}"
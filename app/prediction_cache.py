@@ -0,0 +1,149 @@
+#Prediction cache: LRU + TTL over /predict results, keyed on the ordered feature vector
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.monitoring.prometheus import CounterFamily, GaugeFamily
+
+
+_LOOKUPS = CounterFamily(
+    "prediction_cache_lookups",
+    "Prediction cache lookups, by result.",
+    [{"result": "hit"}, {"result": "miss"}],
+)
+_EVICTIONS = CounterFamily(
+    "prediction_cache_evictions",
+    "Prediction cache entries dropped, by reason.",
+    [{"reason": "capacity"}, {"reason": "expired"}, {"reason": "invalidated"}],
+)
+_ENTRIES = GaugeFamily("prediction_cache_entries", "Entries held by the prediction cache.")
+
+CacheKey = Tuple[str, bytes]
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction results with a time-to-live.
+
+    Keys are (package_id, 16-byte BLAKE2 digest of the feature vector in
+    the package's input_features order), so memory per entry is fixed
+    whatever the feature count; with `quantize_decimals` the vector is
+    rounded first and near-identical rows share an entry. Entries expire
+    `ttl_s` after they were stored; the least recently used entry goes
+    when `max_entries` is reached. clear() drops everything (package
+    swap).
+
+    Callers look up after payload validation, so a hit is still counted
+    as a valid payload, and only store outputs that passed the
+    prediction checks.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_s: float = 300.0,
+        quantize_decimals: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if ttl_s <= 0:
+            raise ValueError("ttl_s must be positive")
+
+        self.max_entries = int(max_entries)
+        self.ttl_s = float(ttl_s)
+        self.quantize_decimals = quantize_decimals
+        self._clock = clock
+
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.capacity_evictions = 0
+        self.expired_evictions = 0
+        self.invalidated = 0
+
+    def key(
+        self,
+        package_id: str,
+        features: List[str],
+        row: Mapping[str, Any],
+    ) -> CacheKey:
+        x = np.array([float(row[f]) for f in features], dtype=np.float64)
+        if self.quantize_decimals is not None:
+            x = np.round(x, self.quantize_decimals)
+        x += 0.0  # -0.0 -> 0.0, so both hash the same
+        return package_id, hashlib.blake2b(x.tobytes(), digest_size=16).digest()
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expired_evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        expires_at = self._clock() + self.ttl_s
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.capacity_evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidated += len(self._entries)
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "quantize_decimals": self.quantize_decimals,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": {
+                "capacity": self.capacity_evictions,
+                "expired": self.expired_evictions,
+                "invalidated": self.invalidated,
+            },
+        }
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics families (without `# EOF`)."""
+        return (
+            _LOOKUPS.render([self.hits, self.misses])
+            + _EVICTIONS.render([self.capacity_evictions, self.expired_evictions, self.invalidated])
+            + _ENTRIES.render([len(self._entries)])
+        )
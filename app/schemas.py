@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -69,6 +69,21 @@ class BatchPredictRowResponse(BaseModel):
     prediction: int
 
 
+class AdminReloadRequest(BaseModel):
+    """
+    Body of POST /admin/reload.
+    """
+
+    package_id: Optional[str] = Field(
+        None,
+        description=(
+            "Pin this package (a folder next to MODEL_PACKAGE_DIR); "
+            "'latest' unpins; omit to reload the current target"
+        ),
+        example="nba_model_20260319T145318Z",
+    )
+
+
 class BatchPredictResponse(BaseModel):
     """
     Response returned by /predict_batch endpoint.
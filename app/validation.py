@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import math
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 def validate_feature_payload(
@@ -65,6 +70,288 @@ def validate_feature_payload(
     return False, counts, " | ".join(parts)
 
 
+@dataclass
+class BatchValidationResult:
+    """
+    Outcome of validate_feature_batch / validate_feature_columns.
+
+    `matrix` holds the rows in `expected_features` order (NaN where a
+    value is missing or not numeric); the counts are totals over all
+    rows, in the units of validate_feature_payload.
+    """
+
+    matrix: np.ndarray
+    n_rows: int
+    valid_count: int
+    missing_count: int
+    unexpected_count: int
+    invalid_value_count: int
+    invalid_rows: List[int] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def is_valid(self) -> bool:
+        # an empty batch has no invalid rows but can still lack columns
+        return not self.invalid_rows and self.error is None
+
+    @property
+    def invalid_count(self) -> int:
+        return len(self.invalid_rows)
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return math.nan
+
+
+def _values_matrix(rows: Sequence[Mapping[str, Any]], n_cols: int) -> np.ndarray:
+    try:
+        values = np.array([list(row.values()) for row in rows], dtype=np.float64)
+    except (TypeError, ValueError):
+        # non-numeric cells: convert one by one, they become NaN
+        values = np.array(
+            [[_to_float(v) for v in row.values()] for row in rows],
+            dtype=np.float64,
+        )
+    return values.reshape(len(rows), n_cols)
+
+
+def _conforming_matrix(
+    rows: Sequence[Mapping[str, Any]],
+    expected_features: List[str],
+) -> Optional[np.ndarray]:
+    """
+    Matrix of the rows in one pass when all of them hold exactly the
+    expected keys (in any order) and only numeric values; None otherwise.
+    """
+    n_rows, n_features = len(rows), len(expected_features)
+    if n_features == 0:
+        return None
+
+    getter = itemgetter(*expected_features)
+    if n_features == 1:
+        name = expected_features[0]
+        getter = lambda row: (row[name],)  # noqa: E731
+
+    try:
+        flat = np.fromiter(
+            chain.from_iterable(map(getter, rows)),
+            dtype=np.float64,
+            count=n_rows * n_features,
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    # every expected key is present, so equal sizes mean equal key sets
+    sizes = np.fromiter(map(len, rows), dtype=np.intp, count=n_rows)
+    if (sizes != n_features).any():
+        return None
+
+    return flat.reshape(n_rows, n_features)
+
+
+def validate_feature_batch(
+    rows: Sequence[Mapping[str, Any]],
+    expected_features: List[str],
+) -> BatchValidationResult:
+    """
+    Validate a batch of payloads against the expected feature schema.
+
+    Same checks as validate_feature_payload, but columnar: rows are
+    built into one float matrix in a single pass when every row holds
+    exactly the expected keys. Otherwise rows are grouped by key
+    signature (the ordered tuple of their keys), so the key-set
+    comparison runs once per distinct signature and each group's values
+    are converted in one call. Finiteness is a single np.isfinite.
+
+    Per-row detail is the sorted list of invalid row indices; `error`
+    describes the first invalid row only.
+    """
+    n_rows = len(rows)
+    n_features = len(expected_features)
+    position = {name: j for j, name in enumerate(expected_features)}
+
+    matrix = _conforming_matrix(rows, expected_features)
+    if matrix is not None:
+        # common case: every row has exactly the expected keys
+        bad = ~np.isfinite(matrix)
+        invalid_rows = np.flatnonzero(bad.any(axis=1)).tolist()
+
+        error = None
+        if invalid_rows:
+            first = invalid_rows[0]
+            error = _batch_error(
+                first,
+                n_rows,
+                len(invalid_rows),
+                [],
+                [],
+                [expected_features[j] for j in np.flatnonzero(bad[first])],
+            )
+
+        return BatchValidationResult(
+            matrix=matrix,
+            n_rows=n_rows,
+            valid_count=n_rows - len(invalid_rows),
+            missing_count=0,
+            unexpected_count=0,
+            invalid_value_count=int(bad.sum()),
+            invalid_rows=invalid_rows,
+            error=error,
+        )
+
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for i, row in enumerate(rows):
+        groups.setdefault(tuple(row), []).append(i)
+
+    matrix = np.full((n_rows, n_features), np.nan, dtype=np.float64)
+    row_bad = np.zeros(n_rows, dtype=bool)
+    missing_total = unexpected_total = invalid_value_total = 0
+    first_detail: Dict[int, Tuple[List[str], List[str], List[str]]] = {}
+
+    for signature, idx in groups.items():
+        keys = set(signature)
+        missing = [f for f in expected_features if f not in keys]
+        unexpected = sorted(k for k in keys if k not in position)
+
+        values = _values_matrix([rows[i] for i in idx], len(signature))
+        bad = ~np.isfinite(values)
+        idx_arr = np.asarray(idx, dtype=np.intp)
+
+        src = [j for j, k in enumerate(signature) if k in position]
+        dst = [position[signature[j]] for j in src]
+        if src:
+            matrix[np.ix_(idx_arr, dst)] = values[:, src]
+
+        missing_total += len(missing) * len(idx)
+        unexpected_total += len(unexpected) * len(idx)
+        invalid_value_total += int(bad.sum())
+
+        group_bad = bad.any(axis=1)
+        if missing or unexpected:
+            group_bad[:] = True
+        row_bad[idx_arr] = group_bad
+
+        bad_in_group = np.flatnonzero(group_bad)
+        if len(bad_in_group):
+            k = int(bad_in_group[0])
+            first_detail[idx[k]] = (
+                sorted(missing),
+                unexpected,
+                [signature[j] for j in np.flatnonzero(bad[k])],
+            )
+
+    invalid_rows = np.flatnonzero(row_bad).tolist()
+    error = None
+    if invalid_rows:
+        first = invalid_rows[0]
+        error = _batch_error(first, n_rows, len(invalid_rows), *first_detail[first])
+
+    return BatchValidationResult(
+        matrix=matrix,
+        n_rows=n_rows,
+        valid_count=n_rows - len(invalid_rows),
+        missing_count=missing_total,
+        unexpected_count=unexpected_total,
+        invalid_value_count=invalid_value_total,
+        invalid_rows=invalid_rows,
+        error=error,
+    )
+
+
+def validate_feature_columns(
+    columns: Mapping[str, np.ndarray],
+    expected_features: List[str],
+) -> BatchValidationResult:
+    """
+    validate_feature_batch for a column-oriented batch {feature: values}.
+
+    Every row shares the column set, so a missing or unexpected column
+    makes every row invalid (and an empty batch invalid as a whole);
+    otherwise only rows with a non-finite value are. Columns must have
+    equal lengths.
+    """
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    n_features = len(expected_features)
+
+    expected = set(expected_features)
+    missing = sorted(f for f in expected_features if f not in columns)
+    unexpected = sorted(k for k in columns if k not in expected)
+
+    matrix = np.empty((n_rows, n_features), dtype=np.float64)
+    for j, name in enumerate(expected_features):
+        matrix[:, j] = columns[name] if name in columns else np.nan
+
+    bad = ~np.isfinite(matrix)
+    # a missing column counts once per row as missing, not as invalid values
+    bad[:, [j for j, name in enumerate(expected_features) if name not in columns]] = False
+    invalid_value_count = int(bad.sum())
+    for name in unexpected:
+        extra_bad = ~np.isfinite(np.asarray(columns[name], dtype=np.float64))
+        invalid_value_count += int(extra_bad.sum())
+
+    if missing or unexpected:
+        invalid_rows = list(range(n_rows))
+    else:
+        invalid_rows = np.flatnonzero(bad.any(axis=1)).tolist()
+
+    error = None
+    if n_rows == 0 and (missing or unexpected):
+        error = "Empty batch; " + " | ".join(
+            part for part in (
+                f"Missing features: {missing}" if missing else "",
+                f"Unexpected features: {unexpected}" if unexpected else "",
+            ) if part
+        )
+    elif invalid_rows:
+        first = invalid_rows[0]
+        invalid_value_features = [expected_features[j] for j in np.flatnonzero(bad[first])]
+        invalid_value_features += [
+            name for name in unexpected
+            if not np.isfinite(float(columns[name][first]))
+        ]
+        error = _batch_error(
+            first,
+            n_rows,
+            len(invalid_rows),
+            missing,
+            unexpected,
+            invalid_value_features,
+        )
+
+    return BatchValidationResult(
+        matrix=matrix,
+        n_rows=n_rows,
+        valid_count=n_rows - len(invalid_rows),
+        missing_count=len(missing) * n_rows,
+        unexpected_count=len(unexpected) * n_rows,
+        invalid_value_count=invalid_value_count,
+        invalid_rows=invalid_rows,
+        error=error,
+    )
+
+
+def _batch_error(
+    first: int,
+    n_rows: int,
+    n_invalid: int,
+    missing: List[str],
+    unexpected: List[str],
+    invalid_value_features: List[str],
+) -> str:
+    parts = []
+    if missing:
+        parts.append(f"Missing features: {missing}")
+    if unexpected:
+        parts.append(f"Unexpected features: {unexpected}")
+    if invalid_value_features:
+        parts.append(f"Invalid numeric values for: {invalid_value_features}")
+
+    return f"{n_invalid} of {n_rows} rows invalid; row {first}: " + " | ".join(parts)
+
+
 def validate_prediction_output(
     prediction: int,
     probability: float,
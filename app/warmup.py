@@ -0,0 +1,134 @@
+#Model warm-up: synthetic traffic through the serving paths before a package takes requests
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.model_loader import LoadedModelPackage
+from app.monitoring.drift.sketches import QUANTILE_LEVELS
+from app.monitoring.prometheus import GaugeFamily
+from app.predict import predict_batch, predict_matrix, predict_one
+
+
+# batch sizes sent through predict_batch / predict_matrix (predict_one: 1)
+WARMUP_BATCH_SIZES = (1, 8, 64, 256)
+WARMUP_ROUNDS = 3
+
+# synthetic values are drawn between these training quantiles
+_LOW_LEVEL, _HIGH_LEVEL = 0.01, 0.99
+
+
+def synthetic_matrix(pkg: LoadedModelPackage, n_rows: int, seed: int = 0) -> np.ndarray:
+    """
+    (n_rows, len(input_features)) matrix of plausible inputs.
+
+    Each column is sampled between the 1% and 99% training quantiles
+    stored in the package's reference sketches; inputs without a sketch
+    (e.g. raw stats behind server-side domain features) are set to 1.
+    """
+    rng = np.random.default_rng(seed)
+    sketches = pkg.reference_sketches or {}
+
+    X = np.ones((n_rows, len(pkg.input_features)), dtype=np.float64)
+    for j, feature in enumerate(pkg.input_features):
+        sketch = sketches.get(feature)
+        if sketch is None or sketch.quantiles is None:
+            continue
+        levels = rng.uniform(_LOW_LEVEL, _HIGH_LEVEL, size=n_rows)
+        X[:, j] = np.interp(levels, QUANTILE_LEVELS, sketch.quantiles)
+    return X
+
+
+class WarmupReport:
+    """
+    Latencies of a warm-up run, per serving path and batch size.
+
+    `first_ms` is the cold call, `last_ms` the call after `rounds - 1`
+    repeats; the gap is what the first real requests would have paid.
+    """
+
+    def __init__(self) -> None:
+        self.latencies_ms: Dict[str, Dict[int, List[float]]] = {}
+        self.total_s = 0.0
+
+    def record(self, path: str, batch_size: int, ms: float) -> None:
+        self.latencies_ms.setdefault(path, {}).setdefault(batch_size, []).append(ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_s": round(self.total_s, 4),
+            "latencies_ms": {
+                path: {
+                    str(size): {"first_ms": round(runs[0], 4), "last_ms": round(runs[-1], 4)}
+                    for size, runs in sizes.items()
+                }
+                for path, sizes in self.latencies_ms.items()
+            },
+        }
+
+    def render_openmetrics(self) -> str:
+        label_sets: List[Dict[str, str]] = []
+        values: List[float] = []
+        for path, sizes in self.latencies_ms.items():
+            for size, runs in sizes.items():
+                for run, ms in (("first", runs[0]), ("last", runs[-1])):
+                    label_sets.append({"path": path, "batch_size": str(size), "run": run})
+                    values.append(ms / 1000.0)
+
+        return GaugeFamily(
+            "model_warmup_latency_seconds",
+            "Latency of the warm-up calls made before the package went live.",
+            label_sets,
+        ).render(values)
+
+
+def _check_probas(probas: Any, n_rows: int) -> None:
+    probas = np.asarray(probas, dtype=np.float64)
+    if probas.shape != (n_rows,) or not np.isfinite(probas).all():
+        raise ValueError(f"Warm-up produced invalid probabilities: {probas!r}")
+
+
+def warm_up(
+    pkg: LoadedModelPackage,
+    batch_sizes: Sequence[int] = WARMUP_BATCH_SIZES,
+    rounds: int = WARMUP_ROUNDS,
+    seed: int = 0,
+) -> WarmupReport:
+    """
+    Run synthetic rows through predict_one, predict_batch and
+    predict_matrix (the columnar path) so lazy allocations, thread-pool
+    spin-up and booster initialization happen before real traffic.
+
+    Raises ValueError if any path returns a non-finite probability, so a
+    broken package never goes live.
+    """
+    batch_sizes = sorted({int(n) for n in batch_sizes if int(n) > 0}) or [1]
+    X = synthetic_matrix(pkg, max(batch_sizes), seed=seed)
+    rows = [dict(zip(pkg.input_features, r)) for r in X.tolist()]
+
+    report = WarmupReport()
+    start = time.perf_counter()
+
+    for _ in range(max(rounds, 1)):
+        t0 = time.perf_counter()
+        response = predict_one(pkg, rows[0])
+        report.record("predict_one", 1, (time.perf_counter() - t0) * 1000.0)
+        _check_probas([response.probability], 1)
+
+        for n in batch_sizes:
+            t0 = time.perf_counter()
+            batch = predict_batch(pkg, rows[:n])
+            report.record("predict_batch", n, (time.perf_counter() - t0) * 1000.0)
+            _check_probas([p.probability for p in batch.predictions], n)
+
+            t0 = time.perf_counter()
+            probas, _ = predict_matrix(pkg, X[:n])
+            report.record("predict_matrix", n, (time.perf_counter() - t0) * 1000.0)
+            _check_probas(probas, n)
+
+    report.total_s = time.perf_counter() - start
+    return report
+
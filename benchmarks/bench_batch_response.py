@@ -0,0 +1,92 @@
+"""
+Microbenchmark: serializing a /predict_batch response.
+
+Compares the response_model path (predict_batch's per-row Pydantic
+objects, FastAPI's serialize_response, then JSONResponse rendering) with
+encode_batch_response writing the JSON body straight from the
+probability / prediction arrays. Reports time and tracemalloc peak, and
+checks both bodies decode to the same document.
+
+Usage:
+    python -m benchmarks.bench_batch_response --n-rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.predict import encode_batch_response
+from app.schemas import BatchPredictResponse, BatchPredictRowResponse
+
+
+RESPONSE_FIELD = create_model_field("Response_predict_batch", BatchPredictResponse, mode="serialization")
+
+
+def pydantic_body(probas: np.ndarray, preds: np.ndarray, threshold: float) -> bytes:
+    # what predict_batch + a response_model route do
+    result = BatchPredictResponse(
+        threshold_used=threshold,
+        n_rows=len(probas),
+        predictions=[
+            BatchPredictRowResponse(probability=round(float(p), 6), prediction=int(y))
+            for p, y in zip(probas, preds)
+        ],
+    )
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=result))
+    return JSONResponse(content).body
+
+
+def measure(fn: Callable[[], bytes], n_iter: int) -> Tuple[float, float, bytes]:
+    timings = []
+    for _ in range(n_iter):
+        start = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(timings)) * 1e3, peak / 2**20, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-rows", type=int, default=100_000)
+    parser.add_argument("--n-iter", type=int, default=5)
+    args = parser.parse_args()
+
+    probas = np.random.default_rng(0).random(args.n_rows)
+    preds = (probas >= 0.5).astype(np.int8)
+
+    print(f"Rows: {args.n_rows}")
+    print(f"{'path':<10} {'p50_ms':>10} {'peak_MiB':>10} {'body_MiB':>10}")
+    results = {}
+    for name, fn in (
+        ("pydantic", lambda: pydantic_body(probas, preds, 0.5)),
+        ("direct", lambda: encode_batch_response(probas, preds, 0.5)),
+    ):
+        ms, peak, body = measure(fn, args.n_iter)
+        results[name] = (ms, peak, body)
+        print(f"{name:<10} {ms:>10.1f} {peak:>10.1f} {len(body) / 2**20:>10.1f}")
+
+    same = json.loads(results["pydantic"][2]) == json.loads(results["direct"][2])
+    print(f"Same document: {same}")
+    print(
+        f"Speedup: {results['pydantic'][0] / results['direct'][0]:.1f}x, "
+        f"peak memory: {results['pydantic'][1] / results['direct'][1]:.1f}x lower"
+    )
+
+
+if __name__ == "__main__":
+    main()
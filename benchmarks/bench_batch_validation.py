@@ -0,0 +1,84 @@
+"""
+Microbenchmark: /predict_batch payload validation.
+
+Compares the per-row loop (validate_feature_payload + one
+DataReliabilityStore.record_payload per row) with the columnar
+validate_feature_batch + one record_payloads call, on synthetic rows
+with the package's feature names.
+
+Usage:
+    python -m benchmarks.bench_batch_validation --n-rows 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.model_loader import load_model_package
+from app.monitoring.data_reliability import DataReliabilityStore
+from app.validation import validate_feature_batch, validate_feature_payload
+
+
+def make_rows(features: List[str], n_rows: int, seed: int = 0) -> List[Dict[str, float]]:
+    values = np.random.default_rng(seed).normal(10.0, 3.0, size=(n_rows, len(features)))
+    return [dict(zip(features, row)) for row in values.tolist()]
+
+
+def per_row(rows, features, store: DataReliabilityStore) -> None:
+    for row in rows:
+        is_valid, counts, _ = validate_feature_payload(row, features)
+        store.record_payload(is_valid=is_valid, **counts)
+
+
+def columnar(rows, features, store: DataReliabilityStore) -> None:
+    result = validate_feature_batch(rows, features)
+    store.record_payloads(
+        valid_count=result.valid_count,
+        invalid_count=result.invalid_count,
+        missing_count=result.missing_count,
+        unexpected_count=result.unexpected_count,
+        invalid_value_count=result.invalid_value_count,
+    )
+
+
+def time_runs(fn: Callable, rows, features, n_iter: int) -> np.ndarray:
+    store = DataReliabilityStore()
+    timings = np.empty(n_iter, dtype=np.float64)
+    for i in range(n_iter):
+        start = time.perf_counter()
+        fn(rows, features, store)
+        timings[i] = (time.perf_counter() - start) * 1e3
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--n-rows", type=int, default=10000)
+    parser.add_argument("--n-iter", type=int, default=20)
+    args = parser.parse_args()
+
+    features = load_model_package(args.package_dir).input_features
+    rows = make_rows(features, args.n_rows)
+
+    print(f"Rows: {args.n_rows} x {len(features)} features")
+    print(f"{'path':<10} {'p50_ms':>10} {'mean_ms':>10} {'rows/s':>12}")
+    results = {}
+    for name, fn in (("per_row", per_row), ("columnar", columnar)):
+        t = time_runs(fn, rows, features, args.n_iter)
+        results[name] = t
+        print(
+            f"{name:<10} {np.percentile(t, 50):>10.2f} {t.mean():>10.2f} "
+            f"{args.n_rows / (np.percentile(t, 50) / 1e3):>12.0f}"
+        )
+
+    gain = np.percentile(results["per_row"], 50) / np.percentile(results["columnar"], 50)
+    print(f"Speedup (p50): {gain:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
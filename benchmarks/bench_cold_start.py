@@ -0,0 +1,116 @@
+"""
+Benchmark: API cold start, i.e. time to first prediction in a fresh
+interpreter, with and without the deferred model load.
+
+Each run imports app.main, loads and warms the package through the
+startup path (package_manager.reload, as startup_event does) and scores
+one row. It reports each phase, the total, and which heavy modules
+were imported by the time the first prediction returned.
+
+--importtime N also prints the N slowest imports of `import app.main`
+(cumulative, from `python -X importtime`).
+
+Usage:
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --n-runs 10 --importtime 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+
+HEAVY_MODULES = ("pandas", "sklearn", "xgboost", "scipy", "jinja2", "pyarrow", "evidently", "matplotlib")
+
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+main.package_manager.reload()
+loaded = time.perf_counter()
+from app.predict import predict_one
+pkg = main.model_package
+predict_one(pkg, {f: 1.0 for f in pkg.input_features})
+done = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "load_warm_s": loaded - imported,
+    "first_predict_ms": (done - loaded) * 1000.0,
+    "total_s": done - start,
+    "heavy": [m for m in sys.argv[1].split(",") if m in sys.modules],
+}))
+"""
+
+
+def measure(package_dir: str, deferred: bool, n_runs: int) -> Dict[str, object]:
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.getcwd(),
+        MODEL_PACKAGE_DIR=package_dir,
+        MODEL_DEFERRED_LOAD="true" if deferred else "false",
+    )
+    runs = []
+    for _ in range(n_runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, ",".join(HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, env=env,
+        ).stdout
+        # the background model load may still print after the result line
+        runs.append(json.loads([line for line in out.splitlines() if line.startswith("{")][-1]))
+
+    summary: Dict[str, object] = {
+        k: float(np.median([r[k] for r in runs])) for k in ("import_s", "load_warm_s", "first_predict_ms", "total_s")
+    }
+    summary["heavy"] = runs[-1]["heavy"]
+    return summary
+
+
+def slowest_imports(n: int) -> List[str]:
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True, env=env,
+    ).stderr
+
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    return [f"{us / 1000.0:>9.1f} ms  {name}" for us, name in rows[:n]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--n-runs", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, help="Show the N slowest imports of app.main")
+    args = parser.parse_args()
+
+    print(f"Package: {args.package_dir} | median of {args.n_runs} fresh interpreters")
+    print(f"{'model load':<12} {'import_s':>9} {'load+warm_s':>12} {'first_ms':>9} {'total_s':>8}  heavy modules")
+    for deferred in (False, True):
+        m = measure(args.package_dir, deferred, args.n_runs)
+        print(
+            f"{'deferred' if deferred else 'eager':<12} {m['import_s']:>9.3f} {m['load_warm_s']:>12.3f} "
+            f"{m['first_predict_ms']:>9.3f} {m['total_s']:>8.3f}  {', '.join(m['heavy']) or '-'}"
+        )
+
+    if args.importtime:
+        print("\nSlowest imports of app.main (cumulative):")
+        for line in slowest_imports(args.importtime):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
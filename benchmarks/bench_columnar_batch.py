@@ -0,0 +1,100 @@
+"""
+Benchmark: /predict_batch (row JSON) vs /predict_batch/columnar (column
+JSON and Arrow IPC) end-to-end through the ASGI app.
+
+Rows come from the validated dataset (with domain features), tiled up to
+--n-rows. Timings include request encoding on the client side, since
+that cost is part of choosing a payload format.
+
+Usage:
+    python -m benchmarks.bench_columnar_batch --n-rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+import app.main as api
+from app.columnar import ARROW_STREAM_MEDIA_TYPE
+from app.model_loader import load_model_package
+from ml.feature_pipeline.domain_features import DomainFeatureConfig, add_domain_features
+
+
+def load_frame(data_path: str, features, n_rows: int) -> pd.DataFrame:
+    df = add_domain_features(pd.read_parquet(data_path), DomainFeatureConfig())
+    df = df[features].astype(float)
+    reps = -(-n_rows // len(df))
+    return pd.concat([df] * reps, ignore_index=True).head(n_rows)
+
+
+def arrow_body(frame: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def time_requests(fn: Callable[[], object], n_iter: int) -> np.ndarray:
+    timings = np.empty(n_iter, dtype=np.float64)
+    for i in range(n_iter):
+        start = time.perf_counter()
+        r = fn()
+        timings[i] = time.perf_counter() - start
+        assert r.status_code == 200, r.text[:200]
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--data-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--n-rows", type=int, default=100_000)
+    parser.add_argument("--n-iter", type=int, default=3)
+    args = parser.parse_args()
+
+    api.model_package = load_model_package(args.package_dir)
+    api.drift_monitor = None
+    client = TestClient(api.app)
+
+    frame = load_frame(args.data_path, api.model_package.input_features, args.n_rows)
+
+    def rows_json():
+        return client.post("/predict_batch", json={"rows": frame.to_dict(orient="records")})
+
+    def columns_json():
+        return client.post("/predict_batch/columnar", json=frame.to_dict(orient="list"))
+
+    def columns_arrow():
+        return client.post(
+            "/predict_batch/columnar",
+            content=arrow_body(frame),
+            headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+        )
+
+    print(f"Rows: {args.n_rows} x {frame.shape[1]} features")
+    print(f"{'path':<16} {'p50_s':>8} {'rows/s':>12}")
+    results = {}
+    for name, fn in (
+        ("rows_json", rows_json),
+        ("columnar_json", columns_json),
+        ("columnar_arrow", columns_arrow),
+    ):
+        t = time_requests(fn, args.n_iter)
+        results[name] = np.median(t)
+        print(f"{name:<16} {np.median(t):>8.3f} {args.n_rows / np.median(t):>12.0f}")
+        api.bookkeeping.shutdown()
+
+    for name in ("columnar_json", "columnar_arrow"):
+        print(f"Speedup {name} vs rows_json: {results['rows_json'] / results[name]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmark: flat-array NumPy tree scorer vs the estimator's own
+predict_proba, by batch size.
+
+Both paths get the same preprocessed matrix (CompiledPredictor.transform
+runs once up front), so the timings are for the tree ensemble only. The
+max abs difference of P(class 1) is printed per batch size; serving uses
+the flat scorer up to FLAT_TREES_MAX_ROWS rows.
+
+Usage:
+    python -m benchmarks.bench_flat_trees
+    python -m benchmarks.bench_flat_trees --batch-sizes 1 8 32 64 256 --n-iter 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+
+from app.flat_trees import FLAT_TREES_MAX_ROWS, flatten_estimator
+from app.model_loader import load_model_package
+from benchmarks.bench_predict_one import load_rows
+
+
+def time_calls(fn: Callable[[np.ndarray], np.ndarray], X: np.ndarray, n_iter: int) -> np.ndarray:
+    timings = np.empty(n_iter, dtype=np.float64)
+    for i in range(n_iter):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = (time.perf_counter() - start) * 1e6
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--data-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64, 256, 1024])
+    parser.add_argument("--n-iter", type=int, default=300)
+    args = parser.parse_args()
+
+    pkg = load_model_package(args.package_dir)
+    if pkg.compiled is None:
+        raise SystemExit("Package pipeline could not be compiled; nothing to compare.")
+
+    estimator = pkg.compiled.estimator
+    flat = pkg.flat_trees if pkg.flat_trees is not None else flatten_estimator(estimator)
+    print(f"Flat trees: {flat.n_trees} trees, depth {flat.max_depth}, {len(flat.feature):,} nodes")
+
+    rows = load_rows(args.data_path, pkg.input_features, max(args.batch_sizes))
+    X_all = np.array([[r[f] for f in pkg.input_features] for r in rows], dtype=np.float64)
+    Xt_all = pkg.compiled.transform(X_all)
+
+    def estimator_path(Xt):
+        return estimator.predict_proba(Xt)[:, 1]
+
+    def flat_path(Xt):
+        return flat.predict_proba(Xt)[:, 1]
+
+    print(
+        f"{'rows':>6} {'estimator_p50_us':>17} {'flat_p50_us':>12} "
+        f"{'speedup':>8} {'max_abs_err':>12}"
+    )
+    for n in args.batch_sizes:
+        Xt = np.tile(Xt_all, (n // len(Xt_all) + 1, 1))[:n]
+        err = float(np.max(np.abs(flat_path(Xt) - estimator_path(Xt))))
+
+        # warm both paths before timing
+        time_calls(estimator_path, Xt, 20)
+        time_calls(flat_path, Xt, 20)
+
+        est = np.percentile(time_calls(estimator_path, Xt, args.n_iter), 50)
+        fl = np.percentile(time_calls(flat_path, Xt, args.n_iter), 50)
+        marker = " *" if n <= FLAT_TREES_MAX_ROWS else ""
+        print(f"{n:>6} {est:>17.1f} {fl:>12.1f} {est / fl:>7.1f}x {err:>12.2e}{marker}")
+
+    print(f"* served by the flat scorer (FLAT_TREES_MAX_ROWS={FLAT_TREES_MAX_ROWS})")
+
+
+if __name__ == "__main__":
+    main()
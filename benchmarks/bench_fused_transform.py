@@ -0,0 +1,85 @@
+"""
+Microbenchmark: the packaged `features` step three ways, by batch size.
+
+- pipeline: model.named_steps["features"].transform on a DataFrame
+- branches: CompiledPredictor step-by-step arrays (ColumnTransformer
+  branches + hstack + scaler)
+- fused:    FusedTransform, one pass over flat per-column arrays
+
+Each batch is checked to be bit-for-bit identical across the three.
+
+Usage:
+    python -m benchmarks.bench_fused_transform
+    python -m benchmarks.bench_fused_transform --batch-sizes 1 64 10000 --n-iter 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.fused_transform import fuse_feature_pipeline
+from app.model_loader import load_model_package
+from benchmarks.bench_predict_one import load_rows
+
+
+def time_calls(fn: Callable[[np.ndarray], np.ndarray], X: np.ndarray, n_iter: int) -> np.ndarray:
+    timings = np.empty(n_iter, dtype=np.float64)
+    for i in range(n_iter):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = (time.perf_counter() - start) * 1e6
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--data-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024, 10000])
+    parser.add_argument("--n-iter", type=int, default=300)
+    args = parser.parse_args()
+
+    pkg = load_model_package(args.package_dir)
+    if pkg.compiled is None:
+        raise SystemExit("Package pipeline could not be compiled; nothing to compare.")
+
+    feature_step = pkg.model.named_steps["features"]
+    fused = pkg.compiled.fused or fuse_feature_pipeline(feature_step, pkg.features)
+    if fused is None:
+        raise SystemExit("Feature pipeline could not be fused; nothing to compare.")
+
+    # the step-by-step arrays path, without the fused kernel; all three
+    # paths take the model's features (domain features already computed)
+    pkg.compiled.fused = None
+    pkg.compiled.domain = None
+    branches = pkg.compiled.transform
+
+    def pipeline_path(X):
+        return feature_step.transform(pd.DataFrame(X, columns=pkg.features))
+
+    rows = load_rows(args.data_path, pkg.features, max(args.batch_sizes))
+    X_all = np.array([[r[f] for f in pkg.features] for r in rows], dtype=np.float64)
+
+    paths = {"pipeline": pipeline_path, "branches": branches, "fused": fused.transform}
+
+    print(f"{'rows':>6} " + " ".join(f"{name + '_p50_us':>16}" for name in paths) + f" {'identical':>10}")
+    for n in args.batch_sizes:
+        X = np.tile(X_all, (n // len(X_all) + 1, 1))[:n]
+        expected = pipeline_path(X)
+        identical = all(np.array_equal(fn(X), expected) for fn in paths.values())
+
+        p50 = {}
+        for name, fn in paths.items():
+            time_calls(fn, X, 20)
+            p50[name] = np.percentile(time_calls(fn, X, args.n_iter), 50)
+
+        print(f"{n:>6} " + " ".join(f"{p50[name]:>16.1f}" for name in paths) + f" {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Microbenchmark: per-request cost of InferenceLogger.log_single_inference.
+
+Compares the direct JSONL writer (open/write/close per event) with the
+BufferedInferenceLogger (enqueue only; a background thread writes).
+
+Usage:
+    python -m benchmarks.bench_inference_logger --n-events 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.monitoring.inference_logger import BufferedInferenceLogger, InferenceLogger
+
+
+def time_logger(logger: InferenceLogger, n_events: int, features: dict) -> np.ndarray:
+    timings = np.empty(n_events, dtype=np.float64)
+    for i in range(n_events):
+        start = time.perf_counter()
+        logger.log_single_inference(
+            request_id=str(i),
+            package_id="bench",
+            threshold=0.5,
+            features=features,
+            prediction=1,
+            probability=0.73,
+            latency_ms=1.2,
+            status="failed" if i % 50 == 0 else "success",
+        )
+        timings[i] = (time.perf_counter() - start) * 1e6
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-events", type=int, default=20000)
+    parser.add_argument("--n-features", type=int, default=15)
+    args = parser.parse_args()
+
+    features = {f"f{i}": float(i) for i in range(args.n_features)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        direct = InferenceLogger(tmp / "direct.jsonl", tmp / "direct_failures.jsonl")
+        buffered = BufferedInferenceLogger(
+            tmp / "buffered.jsonl",
+            tmp / "buffered_failures.jsonl",
+            max_buffer_size=args.n_events,
+        )
+
+        results = {
+            "direct": time_logger(direct, args.n_events, features),
+            "buffered": time_logger(buffered, args.n_events, features),
+        }
+
+        start = time.perf_counter()
+        buffered.close()
+        drain_ms = (time.perf_counter() - start) * 1000.0
+
+        print(f"{'logger':<10} {'p50_us':>10} {'p99_us':>10} {'mean_us':>10}")
+        for name, t in results.items():
+            print(
+                f"{name:<10} {np.percentile(t, 50):>10.2f} "
+                f"{np.percentile(t, 99):>10.2f} {t.mean():>10.2f}"
+            )
+        print(f"Buffered close() drain: {drain_ms:.1f} ms | {buffered.get_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark: reading model features from a large JSONL inference log.
+
+Compares the legacy eval()-per-line loader (whole log as a list of dicts,
+then one DataFrame) with the streaming reader in app/monitoring/log_reader.py
+(full scan and reservoir sample). Each reader runs in its own subprocess so
+peak RSS is measured independently.
+
+Usage:
+    python -m benchmarks.bench_log_reader --n-lines 10000000
+    python -m benchmarks.bench_log_reader --n-lines 1000000 --skip-legacy
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+
+FEATURES = [
+    "GP", "MIN", "PTS", "FGM", "FGA", "FG%", "FTM", "FTA", "FT%", "REB",
+    "PTS_per_MIN", "FGM_per_FGA", "FT_rate", "Usage_proxy", "REB_per_MIN",
+]
+
+
+def generate_log(path: Path, n_lines: int, seed: int = 0) -> None:
+    """Synthetic log: ~98% single inferences, ~2% batch events."""
+    rng = np.random.default_rng(seed)
+    t0 = datetime(2026, 3, 19, tzinfo=timezone.utc)
+    block = 100_000
+
+    with path.open("w") as f:
+        for offset in range(0, n_lines, block):
+            n = min(block, n_lines - offset)
+            values = np.round(rng.uniform(0, 40, size=(n, len(FEATURES))), 3)
+            lines = []
+            for i in range(n):
+                k = offset + i
+                ts = (t0 + timedelta(milliseconds=k)).isoformat()
+                if k % 50 == 0:
+                    event = {"event_type": "batch_inference", "timestamp_utc": ts, "n_rows": 10}
+                else:
+                    event = {
+                        "event_type": "single_inference",
+                        "timestamp_utc": ts,
+                        "package_id": "nba_model_bench",
+                        "features": dict(zip(FEATURES, values[i].tolist())),
+                        "prediction": 1,
+                        "probability": 0.7,
+                        "status": "success",
+                    }
+                lines.append(json.dumps(event) + "\n")
+            f.write("".join(lines))
+
+
+def _legacy(log_path: str):
+    import pandas as pd
+
+    rows = []
+    with open(log_path, "r") as f:
+        for line in f:
+            try:
+                event = eval(line)
+                if event.get("event_type") == "single_inference":
+                    rows.append(event["features"])
+            except Exception:
+                continue
+    return pd.DataFrame(rows)
+
+
+def _streaming(log_path: str):
+    from app.monitoring.log_reader import load_feature_frame
+
+    return load_feature_frame(log_path, FEATURES)
+
+
+def _streaming_scan(log_path: str):
+    from app.monitoring.log_reader import iter_feature_chunks
+
+    n = 0
+    for chunk in iter_feature_chunks(log_path, FEATURES):
+        n += len(chunk[FEATURES[0]])
+    return n
+
+
+def _reservoir(log_path: str):
+    from app.monitoring.log_reader import load_feature_frame
+
+    return load_feature_frame(log_path, FEATURES, sample_size=50_000)
+
+
+READERS = {
+    "legacy_eval": _legacy,
+    "streaming_frame": _streaming,
+    "streaming_scan": _streaming_scan,
+    "reservoir_50k": _reservoir,
+}
+
+
+def _run_child(reader: str, log_path: str) -> None:
+    start = time.perf_counter()
+    result = READERS[reader](log_path)
+    elapsed = time.perf_counter() - start
+    n_rows = result if isinstance(result, int) else len(result)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print(json.dumps({"reader": reader, "seconds": elapsed, "rows": n_rows, "peak_rss_mb": peak_mb}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-lines", type=int, default=1_000_000)
+    parser.add_argument("--log-path", default="/tmp/nba_bench_inference_log.jsonl")
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "generate":
+        generate_log(Path(args.log_path), args.n_lines)
+        return
+    if args.child:
+        _run_child(args.child, args.log_path)
+        return
+
+    log_path = Path(args.log_path)
+    start = time.perf_counter()
+    # generate in a child too: ru_maxrss of the parent would leak into
+    # the reader subprocesses through fork
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_log_reader", "--child", "generate",
+         "--log-path", str(log_path), "--n-lines", str(args.n_lines)],
+        check=True,
+    )
+    size_mb = log_path.stat().st_size / 1e6
+    print(f"Generated {args.n_lines:,} lines ({size_mb:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+    readers = [r for r in READERS if not (args.skip_legacy and r == "legacy_eval")]
+    results = []
+    for reader in readers:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_log_reader", "--child", reader, "--log-path", str(log_path)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'reader':<18} {'seconds':>10} {'rows':>12} {'peak_rss_mb':>12}")
+    for r in results:
+        print(f"{r['reader']:<18} {r['seconds']:>10.2f} {r['rows']:>12,} {r['peak_rss_mb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
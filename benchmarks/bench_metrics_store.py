@@ -0,0 +1,98 @@
+"""
+Microbenchmark: MetricsStore record + /metrics scrape cost.
+
+Compares the legacy store (5000-entry latency / timestamp deques, sorted
+on every scrape) with the sketch-based MetricsStore (DDSketch windows +
+one-second ring counter).
+
+Usage:
+    python -m benchmarks.bench_metrics_store --n-requests 100000 --n-scrapes 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.monitoring.metrics_store import MetricsStore
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Compute percentile without external dependency.
+    q should be in [0, 100].
+    """
+    if not values:
+        return 0.0
+
+    vals = sorted(values)
+    k = (len(vals) - 1) * (q / 100.0)
+    f = math.floor(k)
+    c = math.ceil(k)
+
+    if f == c:
+        return float(vals[int(k)])
+
+    d0 = vals[f] * (c - k)
+    d1 = vals[c] * (k - f)
+    return float(d0 + d1)
+
+
+class LegacyMetricsStore:
+    """Latency part of the previous deque-based MetricsStore."""
+
+    def __init__(self, max_history: int = 5000):
+        self.latencies = deque(maxlen=max_history)
+        self.request_timestamps = deque(maxlen=max_history)
+
+    def record_request(self, *, latency_ms: float, success: bool) -> None:
+        self.latencies.append(float(latency_ms))
+        self.request_timestamps.append(datetime.now(timezone.utc))
+
+    def get_metrics(self) -> dict:
+        latencies_list = list(self.latencies)
+        now = datetime.now(timezone.utc)
+        return {
+            "avg_latency_ms": sum(latencies_list) / len(latencies_list),
+            "p95_latency_ms": percentile(latencies_list, 95),
+            "throughput_requests_per_min": len(
+                [ts for ts in self.request_timestamps if (now - ts).total_seconds() <= 60]
+            ),
+        }
+
+
+def bench(store, latencies: np.ndarray, n_scrapes: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    for v in latencies:
+        store.record_request(latency_ms=float(v), success=True)
+    record_us = (time.perf_counter() - start) / len(latencies) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(n_scrapes):
+        store.get_metrics()
+    scrape_us = (time.perf_counter() - start) / n_scrapes * 1e6
+
+    return record_us, scrape_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-requests", type=int, default=100_000)
+    parser.add_argument("--n-scrapes", type=int, default=2000)
+    args = parser.parse_args()
+
+    latencies = np.random.default_rng(0).lognormal(1.0, 0.8, size=args.n_requests)
+
+    print(f"{'store':<10} {'record us':>10} {'scrape us':>10}")
+    for name, store in (("legacy", LegacyMetricsStore()), ("sketch", MetricsStore())):
+        record_us, scrape_us = bench(store, latencies, args.n_scrapes)
+        print(f"{name:<10} {record_us:>10.2f} {scrape_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: cold start and per-worker memory of load_model_package,
+with and without mmap_mode="r".
+
+Each measurement runs in a fresh interpreter (a cold worker): it imports
+the serving stack, then times load_model_package and reads VmHWM (peak
+RSS), RssAnon (private memory) and RssFile (file-backed, shareable
+pages) from /proc/self/status. Deltas are against the state right
+before the load.
+
+--synthetic-trees N packages a RandomForest with N full-depth trees in
+a temporary directory, for a model large enough to show the effect.
+
+Usage:
+    python -m benchmarks.bench_model_load
+    python -m benchmarks.bench_model_load --synthetic-trees 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+
+_CHILD = r"""
+import json, sys, time
+from app.model_loader import load_model_package
+
+def status():
+    out = {}
+    for line in open("/proc/self/status"):
+        key, value = line.split(":", 1)
+        if key in ("VmHWM", "RssAnon", "RssFile"):
+            out[key] = int(value.split()[0]) / 1024.0
+    return out
+
+mmap_mode = None if sys.argv[2] == "none" else sys.argv[2]
+before = status()
+start = time.perf_counter()
+pkg = load_model_package(sys.argv[1], mmap_mode=mmap_mode)
+seconds = time.perf_counter() - start
+after = status()
+print(json.dumps({"seconds": seconds, **{k: after[k] - before[k] for k in after}}))
+"""
+
+
+def measure(package_dir: str, mmap_mode: str, n_runs: int) -> Dict[str, float]:
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    runs = []
+    for _ in range(n_runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, package_dir, mmap_mode],
+            capture_output=True, text=True, check=True, env=env,
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return {k: float(np.median([r[k] for r in runs])) for k in runs[0]}
+
+
+def make_synthetic_package(root: Path, n_trees: int) -> str:
+    import joblib
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from ml.packaging.package_model import create_model_package
+
+    rng = np.random.default_rng(0)
+    features = [f"f{i}" for i in range(15)]
+    X = pd.DataFrame(rng.normal(size=(20_000, len(features))), columns=features)
+    y = (X["f0"] + rng.normal(size=len(X)) > 0).astype(int)
+
+    model = Pipeline([
+        ("features", StandardScaler()),
+        ("model", RandomForestClassifier(n_estimators=n_trees, random_state=0)),
+    ]).fit(X, y)
+
+    model_path = root / "model.joblib"
+    joblib.dump(model, model_path)
+    info = create_model_package(
+        package_root=root / "packages",
+        model_path=model_path,
+        threshold=0.5,
+        features=features,
+        target_col="y",
+        metrics={},
+        cfg_path=Path("synthetic"),
+    )
+    return info["package_dir"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--synthetic-trees", type=int, default=None)
+    parser.add_argument("--n-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        package_dir: Optional[str] = args.package_dir
+        if args.synthetic_trees:
+            package_dir = make_synthetic_package(Path(tmp), args.synthetic_trees)
+
+        size_mb = (Path(package_dir) / "model.joblib").stat().st_size / 2**20 \
+            if Path(package_dir).name != "latest" else None
+        print(f"Package: {package_dir}" + (f" (model.joblib {size_mb:.1f} MB)" if size_mb else ""))
+        print(f"{'mmap_mode':<10} {'load_s':>8} {'peak_MB':>9} {'private_MB':>11} {'file_MB':>8}")
+        for mode in ("none", "r"):
+            m = measure(package_dir, mode, args.n_runs)
+            print(
+                f"{mode:<10} {m['seconds']:>8.3f} {m['VmHWM']:>9.1f} "
+                f"{m['RssAnon']:>11.1f} {m['RssFile']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: run_parallel_batch_inference scaling with --workers.
+
+Writes a synthetic Parquet input (package features drawn from gamma
+distributions, several row groups), then scores it with 1, 2, 4, ...
+workers up to the machine's core count and reports rows/s, speedup
+and parallel efficiency against one worker.
+
+Usage:
+    python -m benchmarks.bench_parallel_batch_inference --n-rows 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.model_loader import load_model_package
+from ml.serving.run_batch_inference import run_parallel_batch_inference
+
+
+def write_input(path: Path, features, n_rows: int, row_group_size: int) -> None:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({f: rng.gamma(2.0, 5.0, n_rows) for f in features})
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=row_group_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--n-rows", type=int, default=2_000_000)
+    parser.add_argument("--row-group-size", type=int, default=50_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    features = load_model_package(args.package_dir).input_features
+    counts = sorted({1, args.max_workers} | {2 ** k for k in range(1, 8) if 2 ** k < args.max_workers})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "input.parquet"
+        write_input(input_path, features, args.n_rows, args.row_group_size)
+        n_groups = pq.ParquetFile(input_path).num_row_groups
+        print(f"Input: {args.n_rows:,} rows x {len(features)} features, {n_groups} row groups")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>12} {'speedup':>8} {'efficiency':>11}")
+
+        base = None
+        for workers in counts:
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = run_parallel_batch_inference(
+                    package_dir=args.package_dir,
+                    input_path=str(input_path),
+                    output_dir=str(Path(tmp) / "parts"),
+                    workers=workers,
+                )
+            base = base or summary["seconds"]
+            speedup = base / summary["seconds"]
+            print(
+                f"{workers:>8} {summary['seconds']:>9.2f} {summary['rows_per_s']:>12,.0f} "
+                f"{speedup:>8.2f} {speedup / workers:>11.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Microbenchmark: single-row /predict inference path.
+
+Compares the pandas path (_build_dataframe -> LoadedModelPackage.predict_proba)
+with the compiled NumPy path (CompiledPredictor.predict_proba_row) on real
+rows from the validated dataset, and checks both return identical floats.
+
+Usage:
+    python -m benchmarks.bench_predict_one --n-iter 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.model_loader import load_model_package
+from app.predict import _build_dataframe
+from ml.feature_pipeline.domain_features import DomainFeatureConfig, add_domain_features
+
+
+def load_rows(data_path: str, features: List[str], n_rows: int) -> List[Dict[str, float]]:
+    df = add_domain_features(pd.read_parquet(data_path), DomainFeatureConfig())
+    df = df[features].astype(float).head(n_rows)
+    return df.to_dict(orient="records")
+
+
+def time_calls(fn: Callable[[Dict[str, float]], float], rows, n_iter: int) -> np.ndarray:
+    timings = np.empty(n_iter, dtype=np.float64)
+    for i in range(n_iter):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        timings[i] = (time.perf_counter() - start) * 1e6
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--data-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--n-rows", type=int, default=200)
+    parser.add_argument("--n-iter", type=int, default=2000)
+    args = parser.parse_args()
+
+    pkg = load_model_package(args.package_dir)
+    if pkg.compiled is None:
+        raise SystemExit("Package pipeline could not be compiled; nothing to compare.")
+
+    rows = load_rows(args.data_path, pkg.input_features, args.n_rows)
+
+    def pandas_path(row):
+        return float(pkg.predict_proba(_build_dataframe([row], pkg.input_features))[0])
+
+    compiled_path = pkg.compiled.predict_proba_row
+
+    mismatches = sum(pandas_path(r) != compiled_path(r) for r in rows)
+    print(f"Bit-for-bit check: {len(rows) - mismatches}/{len(rows)} rows identical")
+
+    # warm both paths before timing
+    time_calls(pandas_path, rows, 50)
+    time_calls(compiled_path, rows, 50)
+
+    results = {
+        "pandas": time_calls(pandas_path, rows, args.n_iter),
+        "compiled": time_calls(compiled_path, rows, args.n_iter),
+    }
+
+    print(f"{'path':<10} {'p50_us':>10} {'p99_us':>10} {'mean_us':>10}")
+    for name, t in results.items():
+        print(
+            f"{name:<10} {np.percentile(t, 50):>10.1f} "
+            f"{np.percentile(t, 99):>10.1f} {t.mean():>10.1f}"
+        )
+
+    p50_gain = np.percentile(results["pandas"], 50) / np.percentile(results["compiled"], 50)
+    p99_gain = np.percentile(results["pandas"], 99) / np.percentile(results["compiled"], 99)
+    print(f"Speedup: p50 x{p50_gain:.2f} | p99 x{p99_gain:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Load-test harness for the serving API.
+
+Starts one uvicorn server per inference mode (INFERENCE_EXECUTOR=default,
+thread, process, optionally with micro-batching) and fires concurrent
+/predict and /predict_batch requests at it, then prints throughput and
+latency per mode. Point --url at an already running server (e.g. an older
+checkout) to include it in the comparison.
+
+--mix-batch-size adds --mix-concurrency clients sending /predict_batch of
+that size alongside the measured traffic (mixed load); the table still
+reports the measured requests only, plus how many were shed (429/503).
+Compare `default` with `no_admission` to see admission control keep
+single-row p99 stable.
+
+Usage:
+    python -m benchmarks.load_test --modes default thread process --duration 10
+    python -m benchmarks.load_test --url http://127.0.0.1:8080 --duration 10
+    python -m benchmarks.load_test --modes default no_admission --mix-batch-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+
+MODE_ENV = {
+    "default": {"INFERENCE_EXECUTOR": "default"},
+    "thread": {"INFERENCE_EXECUTOR": "thread"},
+    "process": {"INFERENCE_EXECUTOR": "process"},
+    "batched": {"INFERENCE_EXECUTOR": "default", "PREDICT_BATCHING_ENABLED": "1"},
+    "no_admission": {"INFERENCE_EXECUTOR": "default", "ADMISSION_ENABLED": "0"},
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode: str, package_dir: str, workers: int, log_dir: str) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ)
+    env.update(MODE_ENV[mode])
+    env.update(
+        {
+            "MODEL_PACKAGE_DIR": package_dir,
+            "INFERENCE_WORKERS": str(workers),
+            "INFERENCE_LOG_PATH": os.path.join(log_dir, f"inference_{mode}.jsonl"),
+            "FAILURE_LOG_PATH": os.path.join(log_dir, f"failures_{mode}.jsonl"),
+        }
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return proc, f"http://127.0.0.1:{port}"
+
+
+async def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                r = await client.get(f"{url}/ready")
+                if r.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"Server at {url} did not become ready")
+
+
+async def run_load(
+    url: str,
+    *,
+    features: List[str],
+    concurrency: int,
+    duration: float,
+    batch_size: int,
+    mix_batch_size: int = 0,
+    mix_concurrency: int = 0,
+) -> Dict[str, float]:
+    rng = np.random.default_rng(0)
+    latencies: List[float] = []
+    errors = 0
+    shed = 0
+    rows_scored = 0
+    stop_at = time.perf_counter() + duration
+
+    async def background(client: httpx.AsyncClient) -> None:
+        rows = [{f: 1.0 for f in features}] * mix_batch_size
+        while time.perf_counter() < stop_at:
+            r = await client.post(f"{url}/predict_batch", json={"rows": rows})
+            if r.status_code in (429, 503):
+                await asyncio.sleep(float(r.headers.get("Retry-After", "1")))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors, shed, rows_scored
+        while time.perf_counter() < stop_at:
+            rows = [
+                {f: float(v) for f, v in zip(features, rng.uniform(0.5, 20.0, len(features)))}
+                for _ in range(batch_size)
+            ]
+            if batch_size == 1:
+                path, body = "/predict", {"features": rows[0]}
+            else:
+                path, body = "/predict_batch", {"rows": rows}
+
+            t0 = time.perf_counter()
+            r = await client.post(f"{url}{path}", json=body)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            if r.status_code == 200:
+                rows_scored += batch_size
+            elif r.status_code in (429, 503):
+                shed += 1
+            else:
+                errors += 1
+
+    n_background = mix_concurrency if mix_batch_size > 0 else 0
+    limits = httpx.Limits(max_connections=concurrency + n_background)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(
+            *(worker(client) for _ in range(concurrency)),
+            *(background(client) for _ in range(n_background)),
+        )
+        elapsed = time.perf_counter() - t0
+
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "shed": shed,
+        "req_per_s": len(latencies) / elapsed,
+        "rows_per_s": rows_scored / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+
+async def bench_target(name: str, url: str, args) -> Dict[str, float]:
+    await wait_ready(url)
+    async with httpx.AsyncClient() as client:
+        info = (await client.get(f"{url}/model-info")).json()
+    features = info.get("input_features", info["features"])
+
+    # short warm-up so first-request costs don't skew the comparison
+    await run_load(url, features=features, concurrency=4, duration=1.0, batch_size=args.batch_size)
+    return await run_load(
+        url,
+        features=features,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        batch_size=args.batch_size,
+        mix_batch_size=args.mix_batch_size,
+        mix_concurrency=args.mix_concurrency,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="*", default=["default", "thread", "process"], choices=list(MODE_ENV))
+    parser.add_argument("--url", default=None, help="Extra, already running server to include")
+    parser.add_argument("--package-dir", default="ml/packaging/packages/latest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--batch-size", type=int, default=1, help="1 -> /predict, >1 -> /predict_batch")
+    parser.add_argument("--mix-batch-size", type=int, default=0, help="Rows per background /predict_batch (0: none)")
+    parser.add_argument("--mix-concurrency", type=int, default=4)
+    parser.add_argument("--log-dir", default="/tmp/nba_load_test")
+    args = parser.parse_args()
+
+    os.makedirs(args.log_dir, exist_ok=True)
+    results: Dict[str, Dict[str, float]] = {}
+
+    if args.url:
+        results["external"] = asyncio.run(bench_target("external", args.url, args))
+
+    for mode in args.modes:
+        proc: Optional[subprocess.Popen] = None
+        try:
+            proc, url = start_server(mode, args.package_dir, args.workers, args.log_dir)
+            results[mode] = asyncio.run(bench_target(mode, url, args))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+    print(f"{'mode':<12} {'req/s':>10} {'rows/s':>10} {'p50_ms':>10} {'p99_ms':>10} {'errors':>8} {'shed':>8}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<12} {r['req_per_s']:>10.1f} {r['rows_per_s']:>10.1f} "
+            f"{r['p50_ms']:>10.2f} {r['p99_ms']:>10.2f} {r['errors']:>8d} {r['shed']:>8d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
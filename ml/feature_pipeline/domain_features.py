@@ -14,10 +14,12 @@ Scaling/encoding belongs later in sklearn pipelines (training stage).
 """
 
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 import pandas as pd
+import yaml
 
 
 @dataclass(frozen=True)
@@ -38,11 +40,46 @@ class DomainFeatureConfig:
     )
 
 
+# Formula of every domain feature, in the order add_domain_features
+# appends them. The same table is embedded in model packages (see
+# serving_feature_spec) so the API computes the features with exactly
+# these operations (app/domain_features.py):
+# - ratio:  inputs[0] / (inputs[1] + eps), optionally clipped
+# - linear: sum of weight * input, left to right
+DOMAIN_FEATURE_FORMULAS: dict[str, dict[str, Any]] = {
+    # --- Rate features (normalize by opportunity/time) ---
+    "PTS_per_MIN": {"op": "ratio", "inputs": ["PTS", "MIN"]},
+    "FGM_per_FGA": {"op": "ratio", "inputs": ["FGM", "FGA"]},
+    "FT_per_FTA": {"op": "ratio", "inputs": ["FTM", "FTA"]},
+    # --- Style/shot profile ---
+    "ThreePA_rate": {"op": "ratio", "inputs": ["3PA", "FGA"]},
+    "FT_rate": {"op": "ratio", "inputs": ["FTA", "FGA"]},
+    # --- Usage proxy (common NBA analytics approximation) ---
+    # More usage often correlates with role; role can correlate with career length.
+    "Usage_proxy": {"op": "linear", "inputs": ["FGA", "FTA", "TOV"], "weights": [1.0, 0.44, 1.0]},
+    # --- Ball security / playmaking efficiency ---
+    "AST_to_TOV": {"op": "ratio", "inputs": ["AST", "TOV"]},
+    # --- Rebounding normalized by playing time ---
+    "REB_per_MIN": {"op": "ratio", "inputs": ["REB", "MIN"]},
+    # --- Rebound composition shares (should be between 0 and 1) ---
+    "OREB_share": {"op": "ratio", "inputs": ["OREB", "REB"], "clip": [0.0, 1.0]},
+    "DREB_share": {"op": "ratio", "inputs": ["DREB", "REB"], "clip": [0.0, 1.0]},
+}
+
+
 def _safe_div(numer: pd.Series, denom: pd.Series, eps: float) -> pd.Series:
     """Safe division to avoid division-by-zero; keeps output numeric and stable."""
     return numer / (denom + eps)
 
 
+def _linear(out: pd.DataFrame, inputs: list[str], weights: list[float]) -> pd.Series:
+    total = None
+    for name, weight in zip(inputs, weights):
+        term = out[name] if weight == 1.0 else weight * out[name]
+        total = term if total is None else total + term
+    return total
+
+
 def add_domain_features(df: pd.DataFrame, cfg: DomainFeatureConfig) -> pd.DataFrame:
     """
     Add domain knowledge features to a dataframe.
@@ -53,41 +90,45 @@ def add_domain_features(df: pd.DataFrame, cfg: DomainFeatureConfig) -> pd.DataFr
     out = df.copy()
     eps = cfg.epsilon
 
-    # --- Rate features (normalize by opportunity/time) ---
-    if "PTS_per_MIN" in cfg.enabled_features:
-        out["PTS_per_MIN"] = _safe_div(out["PTS"], out["MIN"], eps)
-
-    if "FGM_per_FGA" in cfg.enabled_features:
-        out["FGM_per_FGA"] = _safe_div(out["FGM"], out["FGA"], eps)
+    for name, formula in DOMAIN_FEATURE_FORMULAS.items():
+        if name not in cfg.enabled_features:
+            continue
 
-    if "FT_per_FTA" in cfg.enabled_features:
-        out["FT_per_FTA"] = _safe_div(out["FTM"], out["FTA"], eps)
+        inputs = formula["inputs"]
+        if formula["op"] == "ratio":
+            value = _safe_div(out[inputs[0]], out[inputs[1]], eps)
+        else:
+            value = _linear(out, inputs, formula["weights"])
 
-    # --- Style/shot profile ---
-    if "ThreePA_rate" in cfg.enabled_features:
-        out["ThreePA_rate"] = _safe_div(out["3PA"], out["FGA"], eps)
-
-    if "FT_rate" in cfg.enabled_features:
-        out["FT_rate"] = _safe_div(out["FTA"], out["FGA"], eps)
+        if "clip" in formula:
+            value = value.clip(*formula["clip"])
+        out[name] = value
 
-    # --- Usage proxy (common NBA analytics approximation) ---
-    # More usage often correlates with role; role can correlate with career length.
-    if "Usage_proxy" in cfg.enabled_features:
-        out["Usage_proxy"] = out["FGA"] + 0.44 * out["FTA"] + out["TOV"]
+    return out
 
-    # --- Ball security / playmaking efficiency ---
-    if "AST_to_TOV" in cfg.enabled_features:
-        out["AST_to_TOV"] = _safe_div(out["AST"], out["TOV"], eps)
 
-    # --- Rebounding normalized by playing time ---
-    if "REB_per_MIN" in cfg.enabled_features:
-        out["REB_per_MIN"] = _safe_div(out["REB"], out["MIN"], eps)
-
-    # --- Rebound composition shares (should be between 0 and 1) ---
-    if "OREB_share" in cfg.enabled_features:
-        out["OREB_share"] = _safe_div(out["OREB"], out["REB"], eps).clip(0, 1)
+def load_domain_feature_config(spec_path: str | Path) -> DomainFeatureConfig:
+    """DomainFeatureConfig from feature_spec.yaml (epsilon + enabled features)."""
+    spec = yaml.safe_load(Path(spec_path).read_text())
+    return DomainFeatureConfig(
+        epsilon=float(spec["base"].get("epsilon", 1e-9)),
+        enabled_features=tuple(
+            k for k, v in spec["features"].items() if v.get("enabled", True)
+        ),
+    )
 
-    if "DREB_share" in cfg.enabled_features:
-        out["DREB_share"] = _safe_div(out["DREB"], out["REB"], eps).clip(0, 1)
 
-    return out
+def serving_feature_spec(features: list[str], cfg: DomainFeatureConfig) -> dict[str, Any]:
+    """
+    Feature spec embedded in a model package: epsilon plus the formulas
+    of the enabled domain features among `features`, so the serving
+    process can compute them from raw stats.
+    """
+    return {
+        "epsilon": cfg.epsilon,
+        "domain_features": {
+            name: dict(formula)
+            for name, formula in DOMAIN_FEATURE_FORMULAS.items()
+            if name in features and name in cfg.enabled_features
+        },
+    }
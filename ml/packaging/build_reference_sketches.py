@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from app.model_loader import load_model_package
+from app.monitoring.drift.sketches import (
+    REFERENCE_SKETCHES_FILENAME,
+    build_reference_sketches,
+    save_reference_sketches,
+)
+from ml.feature_pipeline.domain_features import add_domain_features, load_domain_feature_config
+
+
+def build_package_sketches(
+    *,
+    package_dir: str,
+    reference_path: str,
+    spec_path: str = "ml/configs/feature_spec.yaml",
+    n_bins: int = 10,
+) -> Path:
+    """
+    (Re)build reference_sketches.json for an existing model package.
+
+    Packages created by run_model_cycle already ship sketches of their
+    training split; this covers older packages. If the reference dataset
+    holds raw columns only (e.g. nba_validated.parquet), the domain
+    features are added from the feature spec first.
+    """
+    pkg = load_model_package(package_dir)
+
+    reference_path = Path(reference_path)
+    if reference_path.suffix == ".parquet":
+        df = pd.read_parquet(reference_path)
+    else:
+        df = pd.read_csv(reference_path)
+
+    if any(f not in df.columns for f in pkg.features):
+        df = add_domain_features(df, load_domain_feature_config(spec_path))
+
+    sketches = build_reference_sketches(df, pkg.features, n_bins=n_bins)
+    path = save_reference_sketches(pkg.package_dir, sketches)
+
+    manifest_path = pkg.package_dir / "package_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["reference_sketches"] = REFERENCE_SKETCHES_FILENAME
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    print(f"✅ Reference sketches written: {path} ({len(sketches)} features, {len(df)} rows)")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", required=True)
+    parser.add_argument("--reference-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--spec-path", default="ml/configs/feature_spec.yaml")
+    parser.add_argument("--n-bins", type=int, default=10)
+    args = parser.parse_args()
+
+    build_package_sketches(
+        package_dir=args.package_dir,
+        reference_path=args.reference_path,
+        spec_path=args.spec_path,
+        n_bins=args.n_bins,
+    )
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Dict
+
+from app.model_loader import load_model_package
+from ml.feature_pipeline.domain_features import load_domain_feature_config, serving_feature_spec
+
+
+def embed_package_feature_spec(
+    *,
+    package_dir: str,
+    spec_path: str = "ml/configs/feature_spec.yaml",
+) -> Dict[str, Any]:
+    """
+    Write manifest["feature_spec"] into an existing model package.
+
+    Packages created by run_model_cycle already embed it; this covers
+    older packages. Once embedded, the API computes the package's domain
+    features from raw stats and /predict expects the raw inputs.
+    """
+    pkg = load_model_package(package_dir)
+    feature_spec = serving_feature_spec(pkg.features, load_domain_feature_config(spec_path))
+
+    manifest_path = pkg.package_dir / "package_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["feature_spec"] = feature_spec
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    print(
+        f"✅ Feature spec embedded: {list(feature_spec['domain_features'])} "
+        f"computed server-side ({manifest_path})"
+    )
+    return feature_spec
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", required=True)
+    parser.add_argument("--spec-path", default="ml/configs/feature_spec.yaml")
+    args = parser.parse_args()
+
+    embed_package_feature_spec(package_dir=args.package_dir, spec_path=args.spec_path)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.flat_trees import FLAT_TREES_DIRNAME, export_flat_trees
+from app.model_loader import load_model_package
+from ml.feature_pipeline.domain_features import add_domain_features, load_domain_feature_config
+
+
+def load_reference_matrix(
+    reference_path: str | Path,
+    features: List[str],
+    spec_path: str = "ml/configs/feature_spec.yaml",
+) -> np.ndarray:
+    """
+    Reference dataset as a float matrix ordered like `features`; domain
+    features are added from the feature spec if it holds raw columns only
+    (e.g. nba_validated.parquet).
+    """
+    reference_path = Path(reference_path)
+    if reference_path.suffix == ".parquet":
+        df = pd.read_parquet(reference_path)
+    else:
+        df = pd.read_csv(reference_path)
+
+    if any(f not in df.columns for f in features):
+        df = add_domain_features(df, load_domain_feature_config(spec_path))
+
+    return df[features].to_numpy(dtype=np.float64)
+
+
+def export_package_flat_trees(
+    *,
+    package_dir: str,
+    reference_path: str,
+    spec_path: str = "ml/configs/feature_spec.yaml",
+) -> Optional[Path]:
+    """
+    (Re)export flat_trees/ for an existing model package.
+
+    Packages created with a reference dataset already ship the export;
+    this covers older packages. The flat scorer is checked against the
+    model on the reference dataset and only written when it matches
+    within 1e-9.
+    """
+    pkg = load_model_package(package_dir)
+    reference_X = load_reference_matrix(reference_path, pkg.features, spec_path)
+
+    error = export_flat_trees(
+        pkg.model,
+        pkg.features,
+        pkg.package_dir,
+        reference_X,
+    )
+    if error is None:
+        return None
+
+    manifest_path = pkg.package_dir / "package_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["flat_trees"] = FLAT_TREES_DIRNAME
+    manifest["flat_trees_max_abs_error"] = error
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    return pkg.package_dir / FLAT_TREES_DIRNAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", required=True)
+    parser.add_argument("--reference-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--spec-path", default="ml/configs/feature_spec.yaml")
+    args = parser.parse_args()
+
+    export_package_flat_trees(
+        package_dir=args.package_dir,
+        reference_path=args.reference_path,
+        spec_path=args.spec_path,
+    )
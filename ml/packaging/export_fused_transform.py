@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Optional
+
+from app.fused_transform import FUSED_TRANSFORM_FILENAME, export_fused_transform
+from app.model_loader import load_model_package
+from ml.packaging.export_flat_trees import load_reference_matrix
+
+
+def export_package_fused_transform(
+    *,
+    package_dir: str,
+    reference_path: str,
+    spec_path: str = "ml/configs/feature_spec.yaml",
+) -> Optional[Path]:
+    """
+    (Re)export fused_transform.json for an existing model package.
+
+    Packages created with a reference dataset already ship it; this
+    covers older packages. Written only when the fused kernel matches
+    the package's `features` step exactly on the reference dataset.
+    """
+    pkg = load_model_package(package_dir)
+    reference_X = load_reference_matrix(reference_path, pkg.features, spec_path)
+
+    if not export_fused_transform(pkg.model, pkg.features, pkg.package_dir, reference_X):
+        return None
+
+    manifest_path = pkg.package_dir / "package_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["fused_transform"] = FUSED_TRANSFORM_FILENAME
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    return pkg.package_dir / FUSED_TRANSFORM_FILENAME
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--package-dir", required=True)
+    parser.add_argument("--reference-path", default="ml/data/processed/nba_validated.parquet")
+    parser.add_argument("--spec-path", default="ml/configs/feature_spec.yaml")
+    args = parser.parse_args()
+
+    export_package_fused_transform(
+        package_dir=args.package_dir,
+        reference_path=args.reference_path,
+        spec_path=args.spec_path,
+    )
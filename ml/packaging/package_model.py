@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import json
 import shutil
 
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.flat_trees import FLAT_TREES_DIRNAME, export_flat_trees
+from app.fused_transform import FUSED_TRANSFORM_FILENAME, export_fused_transform
+from app.monitoring.drift.sketches import (
+    REFERENCE_SKETCHES_FILENAME,
+    build_reference_sketches,
+    save_reference_sketches,
+)
+
 
 def create_model_package(
     *,
@@ -16,6 +28,8 @@ def create_model_package(
     target_col: str,
     metrics: Dict[str, Any],
     cfg_path: Path,
+    reference_df: Optional[pd.DataFrame] = None,
+    feature_spec: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Create a self-contained 'model package' directory that API or batch
@@ -23,7 +37,17 @@ def create_model_package(
 
     Contents:
       - model.joblib 
-      - package_manifest.json (metadata: threshold, features, metrics, config path)
+      - package_manifest.json (metadata: threshold, features, metrics, config
+        path and, when given, the `feature_spec` the API uses to compute
+        domain features from raw stats, see serving_feature_spec)
+      - reference_sketches.json (per-feature histograms / quantiles / moments
+        of `reference_df`, used by the online drift monitor), when given
+      - flat_trees/ (tree ensemble as flat node arrays for the small-batch
+        NumPy scorer, see app/flat_trees.py), when given `reference_df`
+        and the scorer reproduces predict_proba on it within 1e-9
+      - fused_transform.json (the `features` step as one fused array
+        kernel, see app/fused_transform.py), when given `reference_df` and
+        the kernel reproduces the step's transform exactly on it
     """
 
     #ts is a UTC timestamp like 20250301T212045Z
@@ -53,6 +77,25 @@ def create_model_package(
         "metrics": metrics,           # full eval summary from model cycle
         "config_path": str(cfg_path), # which config produced this model
     }
+    if feature_spec is not None:
+        manifest["feature_spec"] = feature_spec
+
+    # Reference sketches for online drift (computed once per package)
+    if reference_df is not None:
+        sketches = build_reference_sketches(reference_df, features)
+        save_reference_sketches(pkg_dir, sketches)
+        manifest["reference_sketches"] = REFERENCE_SKETCHES_FILENAME
+
+        model = joblib.load(packaged_model_path)
+        reference_X = reference_df[list(features)].to_numpy(dtype=np.float64)
+
+        flat_error = export_flat_trees(model, list(features), pkg_dir, reference_X)
+        if flat_error is not None:
+            manifest["flat_trees"] = FLAT_TREES_DIRNAME
+            manifest["flat_trees_max_abs_error"] = flat_error
+
+        if export_fused_transform(model, list(features), pkg_dir, reference_X):
+            manifest["fused_transform"] = FUSED_TRANSFORM_FILENAME
 
     (pkg_dir / "package_manifest.json").write_text(json.dumps(manifest, indent=2))
 
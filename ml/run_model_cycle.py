@@ -27,6 +27,7 @@ from ml.model_pipeline.train import train_best_pipeline
 from ml.model_pipeline.evaluate import evaluate_with_threshold
 from ml.validation.validation_gates import run_validation_gates
 from ml.packaging.package_model import create_model_package
+from ml.feature_pipeline.domain_features import load_domain_feature_config, serving_feature_spec
 from ml.model_pipeline.registry.mlflow_utils import log_and_register_with_mlflow
 from ml.model_pipeline.model_card import generate_model_card
 
@@ -297,6 +298,13 @@ def run(config_path: str = "ml/configs/model.yaml") -> None:
         target_col=target_col,
         metrics=metrics_out,
         cfg_path=cfg_path,
+        reference_df=X_train[selected_features],
+        feature_spec=serving_feature_spec(
+            selected_features,
+            load_domain_feature_config(
+                _safe_get(cfg, ["dataset", "feature_spec_path"], "ml/configs/feature_spec.yaml")
+            ),
+        ),
     )
 
     print(f"✅ Model packaged: {package_info['package_dir']}")
@@ -1,48 +1,324 @@
 from __future__ import annotations
 
 import argparse
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.model_loader import LoadedModelPackage, load_model_package
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def score_frame(pkg: LoadedModelPackage, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add prediction_proba / prediction / threshold_used columns to `df`
+    (in place) and return it.
+
+    The input may hold the model's features, or only the raw inputs when
+    the package computes its domain features itself.
+    """
+    if all(c in df.columns for c in pkg.features):
+        X = df[pkg.features]
+    else:
+        missing = [c for c in pkg.input_features if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing expected features in batch input: {missing}")
+        X = df[pkg.input_features]
+
+    probas = pkg.predict_proba(X)
+    df["prediction_proba"] = probas
+    df["prediction"] = (probas >= pkg.threshold).astype(int)
+    df["threshold_used"] = pkg.threshold
+    return df
+
+
+def count_input_rows(input_path: Path) -> Optional[int]:
+    """Row count from the Parquet footer; None for CSV (unknown up front)."""
+    if input_path.suffix == ".parquet":
+        return pq.ParquetFile(input_path).metadata.num_rows
+    return None
+
+
+def iter_input_chunks(input_path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Read the input in chunks of at most `chunk_rows` rows: Parquet record
+    batches (one row group in memory at a time) or CSV chunks.
+    """
+    if input_path.suffix == ".parquet":
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_rows)
+
+
+class ChunkWriter:
+    """
+    Appends scored chunks to one output file: a Parquet file written
+    through a ParquetWriter (one row group per chunk), or a CSV file.
+
+    The schema of the first chunk is kept; later chunks are cast to it.
+    """
+
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._schema: Optional[pa.Schema] = None
+        self.n_chunks = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.output_path.suffix == ".parquet":
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.output_path, self._schema)
+            elif table.schema != self._schema:
+                try:
+                    table = table.cast(self._schema)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as e:
+                    raise ValueError(
+                        f"Chunk {self.n_chunks} does not match the schema of the first "
+                        f"chunk ({e}); use a larger chunk size or a Parquet input"
+                    ) from e
+            self._writer.write_table(table)
+        else:
+            df.to_csv(
+                self.output_path,
+                mode="w" if self.n_chunks == 0 else "a",
+                header=self.n_chunks == 0,
+                index=False,
+            )
+        self.n_chunks += 1
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def _report_progress(n_done: int, n_total: Optional[int], start: float) -> None:
+    elapsed = time.perf_counter() - start
+    rate = n_done / elapsed if elapsed > 0 else 0.0
+    if n_total is None:
+        done = f"{n_done:,} rows"
+    else:
+        done = f"{n_done:,}/{n_total:,} rows ({n_done / max(n_total, 1):.0%})"
+    print(f"  {done} | {rate:,.0f} rows/s | peak RSS {_peak_rss_mb():,.0f} MB")
+
+
+# ------------------------------------------------------------------
+# Parallel mode: shards scored in a process pool
+# ------------------------------------------------------------------
+INPUT_SUFFIXES = (".parquet", ".csv")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One unit of parallel work: a Parquet row group or a whole CSV file."""
+
+    path: Path
+    row_group: Optional[int] = None
+
 
-from app.model_loader import load_model_package
+def list_input_files(input_path: Path) -> List[Path]:
+    """The input file, or the Parquet / CSV files of a directory (sorted)."""
+    if input_path.is_dir():
+        files = sorted(p for p in input_path.iterdir() if p.suffix in INPUT_SUFFIXES)
+        if not files:
+            raise FileNotFoundError(f"No .parquet / .csv files in {input_path}")
+        return files
+    return [input_path]
 
 
+def plan_shards(input_path: Path) -> List[Shard]:
+    """Shards in input order: one per Parquet row group, one per CSV file."""
+    shards: List[Shard] = []
+    for path in list_input_files(input_path):
+        if path.suffix == ".parquet":
+            n_groups = pq.ParquetFile(path).num_row_groups
+            shards.extend(Shard(path, i) for i in range(n_groups))
+        else:
+            shards.append(Shard(path))
+    return shards
+
+
+_WORKER_PACKAGE: Optional[LoadedModelPackage] = None
+_WORKER_THREAD_LIMITS: Any = None
+
+
+def _init_worker(package_dir: str, mmap_mode: Optional[str]) -> None:
+    global _WORKER_PACKAGE, _WORKER_THREAD_LIMITS
+    from threadpoolctl import threadpool_limits
+
+    # one core per worker: no OpenMP / BLAS oversubscription across the pool
+    _WORKER_THREAD_LIMITS = threadpool_limits(limits=1)
+    _WORKER_PACKAGE = load_model_package(package_dir, mmap_mode=mmap_mode)
+
+
+def _score_shard(shard: Shard, part_path: Path) -> Tuple[int, float]:
+    if shard.row_group is not None:
+        df = pq.ParquetFile(shard.path).read_row_group(shard.row_group).to_pandas()
+    else:
+        df = pd.read_csv(shard.path)
+
+    scored = score_frame(_WORKER_PACKAGE, df)
+    pq.write_table(pa.Table.from_pandas(scored, preserve_index=False), part_path)
+    return len(scored), _peak_rss_mb()
+
+
+def run_parallel_batch_inference(
+    *,
+    package_dir: str,
+    input_path: str,
+    output_dir: str,
+    workers: int,
+    mmap_mode: Optional[str] = "r",
+) -> Dict[str, Any]:
+    """
+    Score a Parquet / CSV file, or a directory of them, on `workers`
+    processes.
+
+    The input is split into shards (Parquet row groups, whole CSV files)
+    and each worker loads the package once, at start-up (memory-mapped
+    by default, see load_model_package). Shard i is
+    written to output_dir/part-{i:05d}.parquet, so reading the directory
+    in file-name order gives the rows in input order whatever the
+    completion order was. Part files left by an earlier run are removed.
+    """
+    if workers <= 0:
+        raise ValueError("workers must be positive")
+
+    input_path = Path(input_path)
+    output_dir = Path(output_dir)
+    shards = plan_shards(input_path)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob("part-*.parquet"):
+        stale.unlink()
+
+    start = time.perf_counter()
+    n_rows = 0
+    peak_rss_mb = _peak_rss_mb()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(package_dir), mmap_mode),
+    ) as pool:
+        futures = [
+            pool.submit(_score_shard, shard, output_dir / f"part-{i:05d}.parquet")
+            for i, shard in enumerate(shards)
+        ]
+        for done, fut in enumerate(as_completed(futures), start=1):
+            shard_rows, worker_rss = fut.result()
+            n_rows += shard_rows
+            peak_rss_mb = max(peak_rss_mb, worker_rss)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"  shard {done}/{len(shards)} | {n_rows:,} rows | "
+                f"{n_rows / max(elapsed, 1e-9):,.0f} rows/s | peak worker RSS {peak_rss_mb:,.0f} MB"
+            )
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "output_path": str(output_dir),
+        "n_rows": n_rows,
+        "n_shards": len(shards),
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(n_rows / max(elapsed, 1e-9), 1),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+    print(f"Parallel batch inference completed. Parts saved to: {output_dir}")
+    print(
+        f"Rows: {n_rows:,} | {len(shards)} shards on {workers} workers | "
+        f"{summary['rows_per_s']:,} rows/s"
+    )
+    return summary
+
+
+# ------------------------------------------------------------------
+# Entry point
+# ------------------------------------------------------------------
 def run_batch_inference(
     *,
     package_dir: str,
     input_path: str,
     output_path: str,
-):
-    pkg = load_model_package(package_dir)
+    chunk_rows: Optional[int] = None,
+    mmap_mode: Optional[str] = "r",
+) -> Dict[str, Any]:
+    """
+    Score a CSV / Parquet file with a packaged model.
+
+    With `chunk_rows` the input is streamed: each Parquet record batch
+    or CSV chunk is scored and appended to the output, so memory stays
+    bounded by the chunk (and Parquet row group) size instead of the
+    file size. Progress, rows/s and peak RSS are printed per chunk.
+    """
+    pkg = load_model_package(package_dir, mmap_mode=mmap_mode)
 
     input_path = Path(input_path)
     output_path = Path(output_path)
+    start = time.perf_counter()
 
-    if input_path.suffix == ".parquet":
-        df = pd.read_parquet(input_path)
+    if chunk_rows is None:
+        if input_path.suffix == ".parquet":
+            df = pd.read_parquet(input_path)
+        else:
+            df = pd.read_csv(input_path)
+        chunks: Iterator[pd.DataFrame] = iter([df])
+        n_total: Optional[int] = len(df)
     else:
-        df = pd.read_csv(input_path)
-
-    missing = [c for c in pkg.features if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing expected features in batch input: {missing}")
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be positive")
+        chunks = iter_input_chunks(input_path, chunk_rows)
+        n_total = count_input_rows(input_path)
 
-    X = df[pkg.features].copy()
-    probas = pkg.predict_proba(X)
-    preds = (probas >= pkg.threshold).astype(int)
-
-    out = df.copy()
-    out["prediction_proba"] = probas
-    out["prediction"] = preds
-    out["threshold_used"] = pkg.threshold
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+    try:
+        for chunk in chunks:
+            writer.write(score_frame(pkg, chunk))
+            n_rows += len(chunk)
+            if chunk_rows is not None:
+                _report_progress(n_rows, n_total, start)
+    finally:
+        writer.close()
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    if output_path.suffix == ".parquet":
-        out.to_parquet(output_path, index=False)
-    else:
-        out.to_csv(output_path, index=False)
+    elapsed = time.perf_counter() - start
+    summary = {
+        "output_path": str(output_path),
+        "n_rows": n_rows,
+        "n_chunks": writer.n_chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(n_rows / max(elapsed, 1e-9), 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
 
     print(f"Batch inference completed. Output saved to: {output_path}")
+    print(
+        f"Rows: {n_rows:,} | {summary['rows_per_s']:,} rows/s | "
+        f"peak RSS {summary['peak_rss_mb']:,} MB"
+    )
+    return summary
 
 
 if __name__ == "__main__":
@@ -50,10 +326,42 @@ if __name__ == "__main__":
     parser.add_argument("--package-dir", required=True)
     parser.add_argument("--input-path", required=True)
     parser.add_argument("--output-path", required=True)
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help="Stream the input in chunks of this many rows (default: load it whole)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Score row groups / files on this many processes and write "
+            "partitioned Parquet to --output-path (a directory); 0 = all cores"
+        ),
+    )
+    parser.add_argument(
+        "--mmap-mode",
+        default="r",
+        help="joblib mmap_mode for the model arrays ('none' to read them into memory)",
+    )
     args = parser.parse_args()
+    mmap_mode = None if args.mmap_mode.lower() == "none" else args.mmap_mode
 
-    run_batch_inference(
-        package_dir=args.package_dir,
-        input_path=args.input_path,
-        output_path=args.output_path,
-    )
\ No newline at end of file
+    if args.workers is not None:
+        run_parallel_batch_inference(
+            package_dir=args.package_dir,
+            input_path=args.input_path,
+            output_dir=args.output_path,
+            workers=args.workers or os.cpu_count() or 1,
+            mmap_mode=mmap_mode,
+        )
+    else:
+        run_batch_inference(
+            package_dir=args.package_dir,
+            input_path=args.input_path,
+            output_path=args.output_path,
+            chunk_rows=args.chunk_rows,
+            mmap_mode=mmap_mode,
+        )
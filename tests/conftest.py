@@ -5,9 +5,26 @@
 # tests/conftest.py
 from __future__ import annotations
 
+import atexit
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
 import pandas as pd
 import pytest
 
+# app.main builds its inference logger, Parquet sink and job store at import
+# time from these variables: point them at a scratch directory so a test
+# run never writes into the repo (app_client swaps the logger per test)
+_RUNTIME_DIR = Path(tempfile.mkdtemp(prefix="nba_api_tests_"))
+atexit.register(shutil.rmtree, _RUNTIME_DIR, ignore_errors=True)
+os.environ["INFERENCE_LOG_PATH"] = str(_RUNTIME_DIR / "logs" / "inference_log.jsonl")
+os.environ["FAILURE_LOG_PATH"] = str(_RUNTIME_DIR / "logs" / "failures.jsonl")
+os.environ["INFERENCE_PARQUET_DIR"] = str(_RUNTIME_DIR / "logs" / "inference_parquet")
+os.environ["JOBS_DIR"] = str(_RUNTIME_DIR / "logs" / "jobs")
+
 @pytest.fixture
 def sample_df() -> pd.DataFrame:
     # small dataset with a few issues to test cleaning & validation
@@ -47,3 +64,139 @@ def sample_df() -> pd.DataFrame:
             },
         ]
     )
+
+
+# ------------------------------------------------------------------
+# Small fitted model package (serving-side tests)
+# ------------------------------------------------------------------
+SERVING_FEATURES = ["GP", "MIN", "PTS", "FTM", "FTA", "REB"]
+
+
+def _make_serving_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame(
+        {
+            "GP": rng.randint(1, 82, size=n).astype(float),
+            "MIN": rng.uniform(5, 35, size=n),
+            "PTS": rng.uniform(0, 30, size=n),
+            "FTM": rng.uniform(0, 5, size=n),
+            "FTA": rng.uniform(0, 6, size=n),
+            "REB": rng.uniform(0, 10, size=n),
+        }
+    )
+    df["TARGET_5Yrs"] = ((df["MIN"] > 20) & (df["PTS"] > 10)).astype(int)
+    return df
+
+
+@pytest.fixture
+def serving_frame() -> pd.DataFrame:
+    return _make_serving_frame(120, seed=1)
+
+
+@pytest.fixture
+def model_package_dir(tmp_path):
+    """
+    Fit a tiny features+model pipeline (log1p / yeo_johnson / passthrough +
+    StandardScaler -> RandomForest) and package it like the model cycle does.
+    """
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+
+    from ml.model_pipeline.build_pipeline import build_feature_pipeline
+    from ml.packaging.package_model import create_model_package
+
+    df = _make_serving_frame(200)
+    suggestions = {"FTM": "log1p", "FTA": "log1p", "MIN": "yeo_johnson", "PTS": "yeo_johnson"}
+
+    skew_path = tmp_path / "skewness_report.csv"
+    pd.DataFrame(
+        [
+            {
+                "feature": f,
+                "skewness": 0.0,
+                "zero_ratio": 0.0,
+                "category": "test",
+                "suggestion": suggestions.get(f, "none"),
+            }
+            for f in SERVING_FEATURES
+        ]
+    ).to_csv(skew_path, index=False)
+
+    feature_pipeline, _ = build_feature_pipeline(
+        selected_features=SERVING_FEATURES,
+        X_train=df[SERVING_FEATURES],
+        eng_cfg={"skewness_report_path": str(skew_path), "scaler": "standard"},
+    )
+    pipeline = Pipeline(
+        steps=[
+            ("features", feature_pipeline),
+            ("model", RandomForestClassifier(n_estimators=20, max_depth=4, random_state=0)),
+        ]
+    )
+    pipeline.fit(df[SERVING_FEATURES], df["TARGET_5Yrs"])
+
+    model_path = tmp_path / "model.joblib"
+    joblib.dump(pipeline, model_path)
+
+    info = create_model_package(
+        package_root=tmp_path / "packages",
+        model_path=model_path,
+        threshold=0.5,
+        features=SERVING_FEATURES,
+        target_col="TARGET_5Yrs",
+        metrics={},
+        cfg_path=tmp_path / "model.yaml",
+        reference_df=df[SERVING_FEATURES],
+    )
+    return info["package_dir"]
+
+
+
+@pytest.fixture
+def app_client(tmp_path, monkeypatch):
+    """
+    TestClient on app.main with the inference logs under tmp_path; the test
+    sets main.model_package (or runs startup with `with app_client:`).
+    """
+    from fastapi.testclient import TestClient
+
+    import app.main as main
+    from app.monitoring.inference_logger import InferenceLogger
+
+    monkeypatch.setattr(
+        main,
+        "inference_logger",
+        InferenceLogger(
+            log_path=tmp_path / "logs" / "inference_log.jsonl",
+            failure_log_path=tmp_path / "logs" / "failures.jsonl",
+        ),
+    )
+
+    # no `with` block: startup (which loads PACKAGE_DIR) is not triggered
+    yield TestClient(main.app)
+    main.bookkeeping.shutdown()
+
+
+@pytest.fixture
+def client(app_client, model_package_dir, monkeypatch):
+    """app_client serving the model_package_dir package."""
+    import app.main as main
+    from app.model_loader import load_model_package
+
+    monkeypatch.setattr(main, "model_package", load_model_package(model_package_dir))
+    return app_client
+
+
+def _copy_package(package_dir: str, package_id: str, **manifest_updates) -> Path:
+    src = Path(package_dir)
+    dst = src.parent / package_id
+    shutil.copytree(src, dst)
+    manifest_path = dst / "package_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["package_id"] = package_id
+    manifest.update(manifest_updates)
+    manifest_path.write_text(json.dumps(manifest))
+    return dst
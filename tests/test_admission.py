@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import app.main as main
+from app.admission import SHED_REASONS, AdmissionController, AdmissionLane, LoadShed
+from app.monitoring import metrics_store as metrics_store_module
+from app.monitoring.metrics_store import MetricsStore
+
+
+def _controller(on_shed=None, **lane_kwargs) -> AdmissionController:
+    kwargs = {"max_concurrency": 1, "max_rows": 10, "max_queue": 1, "max_queue_ms": 1000, **lane_kwargs}
+    return AdmissionController({"batch": AdmissionLane("batch", **kwargs)}, on_shed=on_shed)
+
+
+def test_waiters_are_admitted_fifo_and_full_queue_is_shed():
+    shed = []
+    controller = _controller(on_shed=lambda lane, reason: shed.append((lane, reason)))
+    order = []
+
+    async def request(name: str, hold: asyncio.Event) -> None:
+        async with controller.admit("batch", 4):
+            order.append(name)
+            await hold.wait()
+
+    async def scenario() -> None:
+        release_first, release_second = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(request("first", release_first))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(request("second", release_second))
+        await asyncio.sleep(0)
+
+        # one running, one queued: the third is refused at once
+        with pytest.raises(LoadShed) as e:
+            async with controller.admit("batch", 1):
+                pass
+        assert e.value.status_code == 429
+        assert e.value.headers["Retry-After"] == "1"
+
+        release_first.set()
+        await first
+        await asyncio.sleep(0)
+        assert order == ["first", "second"]
+        release_second.set()
+        await second
+
+    asyncio.run(scenario())
+
+    m = controller.get_metrics()["batch"]
+    assert (m["admitted"], m["queued"], m["in_flight"], m["rows_in_flight"]) == (2, 1, 0, 0)
+    assert m["shed"]["queue_full"] == 1
+    assert shed == [("batch", "queue_full")]
+
+
+def test_queue_timeout_and_oversized_requests():
+    controller = _controller(max_concurrency=2, max_queue_ms=10)
+
+    async def scenario() -> None:
+        async with controller.admit("batch", 8):
+            # fits the concurrency limit but not the row budget: waits, then 503
+            with pytest.raises(LoadShed) as e:
+                async with controller.admit("batch", 8):
+                    pass
+            assert (e.value.status_code, e.value.reason) == (503, "queue_timeout")
+            assert int(e.value.headers["Retry-After"]) >= 1
+
+        # more rows than the whole budget can never be admitted
+        with pytest.raises(LoadShed) as e:
+            async with controller.admit("batch", 11):
+                pass
+        assert (e.value.status_code, e.value.headers) == (413, {})
+
+        async with controller.admit("batch", 8):
+            pass
+
+    asyncio.run(scenario())
+
+    m = controller.get_metrics()["batch"]
+    assert m["shed"] == {"queue_full": 0, "queue_timeout": 1, "too_large": 1}
+    assert (m["queue_depth"], m["in_flight"], m["rows_in_flight"]) == (0, 0, 0)
+
+
+def test_shed_requests_get_retry_after_and_are_counted(client, monkeypatch):
+    assert tuple(SHED_REASONS) == metrics_store_module.SHED_REASONS
+
+    pkg = main.model_package
+    store = MetricsStore()
+    controller = AdmissionController(
+        {
+            "single": AdmissionLane("single", max_concurrency=1, max_rows=1, max_queue=0, max_queue_ms=0),
+            "batch": AdmissionLane("batch", max_concurrency=1, max_rows=2, max_queue=0, max_queue_ms=0),
+        },
+        on_shed=store.record_shed,
+    )
+    monkeypatch.setattr(main, "admission_controller", controller)
+    row = {f: 1.0 for f in pkg.input_features}
+
+    too_large = client.post("/predict_batch", json={"rows": [row] * 3})
+    assert too_large.status_code == 413
+    assert too_large.json()["reason"] == "too_large"
+
+    # a request still holds the only single-row slot
+    controller.lanes["single"].in_flight = 1
+    busy = client.post("/predict", json={"features": row})
+    assert busy.status_code == 429
+    assert busy.headers["Retry-After"] == "1"
+
+    m = store.get_metrics()
+    assert m["shed_requests_total"] == 2
+    assert m["shed_requests"]["single"]["queue_full"] == 1
+    assert m["shed_requests"]["batch"]["too_large"] == 1
+    assert 'nba_api_shed_requests_total{lane="single",reason="queue_full"} 1' in store.render_openmetrics()
+    assert 'nba_api_admission_in_flight{lane="single"} 1' in client.get("/metrics/prometheus").text
+
+
+def test_batch_bodies_are_shed_before_they_are_parsed(client, monkeypatch):
+    pkg = main.model_package
+    lane = AdmissionLane("batch", max_concurrency=1, max_rows=100, max_queue=0, max_queue_ms=0,
+                         max_body_bytes=4096, bytes_per_row=50)
+    controller = AdmissionController({"batch": lane})
+    monkeypatch.setattr(main, "admission_controller", controller)
+    decoded = []
+    monkeypatch.setattr(main, "decode_columns", lambda *a: decoded.append(a) or {})
+    columns = {f: [1.0] * 10 for f in pkg.input_features}
+
+    # over the byte limit: refused on Content-Length, or while streaming without one
+    big = {f: [1.0] * 500 for f in pkg.input_features}
+    assert client.post("/predict_batch/columnar", json=big).status_code == 413
+    chunked = client.post("/predict_batch/columnar", content=iter([b"x" * 3000, b"x" * 3000]))
+    assert chunked.status_code == 413
+
+    # the lane is busy: shed before the body is decoded
+    lane.in_flight = 1
+    assert client.post("/predict_batch/columnar", json=columns).status_code == 429
+    assert client.post("/predict_batch", json={"rows": [{"GP": 1.0}]}).status_code == 429
+    assert decoded == []
+    lane.in_flight = 0
+
+    assert lane.body_cost(1000) == 20 and lane.body_cost(None) == 82
+    assert lane.get_metrics()["shed"] == {"queue_full": 2, "queue_timeout": 0, "too_large": 2}
+
+    # malformed rows are still a 422 once admitted
+    r = client.post("/predict_batch", json={"rows": [{"GP": "x"}]})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"][:2] == ["body", "rows"]
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import app.main as main
+from app.columnar import ARROW_STREAM_MEDIA_TYPE
+from app.executor import BookkeepingQueue, InferenceExecutor
+from app.predict import predict_one
+
+
+def test_predict_endpoint_returns_model_prediction(client, serving_frame):
+    row = serving_frame[main.model_package.features].iloc[0].to_dict()
+
+    r = client.post("/predict", json={"features": row})
+
+    assert r.status_code == 200
+    assert r.json() == predict_one(main.model_package, row).model_dump()
+
+
+def test_predict_endpoint_rejects_invalid_payload(client):
+    r = client.post("/predict", json={"features": {"GP": 1.0}})
+
+    assert r.status_code == 400
+    assert "Missing features" in r.json()["detail"]
+
+
+def test_predict_batch_endpoint(client, serving_frame):
+    rows = serving_frame[main.model_package.features].head(10).to_dict(orient="records")
+
+    r = client.post("/predict_batch", json={"rows": rows})
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["n_rows"] == 10
+    assert [p["probability"] for p in body["predictions"]] == [
+        predict_one(main.model_package, row).probability for row in rows
+    ]
+
+
+def test_predict_batch_rejects_invalid_rows(client, serving_frame):
+    rows = serving_frame[main.model_package.features].head(5).to_dict(orient="records")
+    del rows[1]["GP"]
+    rows[3]["extra"] = 1.0
+    before = main.data_reliability_store.invalid_payload_count
+
+    r = client.post("/predict_batch", json={"rows": rows})
+    main.bookkeeping.shutdown()
+
+    assert r.status_code == 400
+    detail = r.json()["detail"]
+    assert detail["invalid_rows"] == [1, 3]
+    assert "row 1: Missing features: ['GP']" in detail["error"]
+    assert main.data_reliability_store.invalid_payload_count == before + 2
+
+
+def test_predict_batch_columnar_json(client, serving_frame):
+    frame = serving_frame[main.model_package.features].head(10)
+    rows = frame.to_dict(orient="records")
+
+    r = client.post("/predict_batch/columnar", json=frame.to_dict(orient="list"))
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["n_rows"] == 10
+    assert body["threshold_used"] == main.model_package.threshold
+    expected = [predict_one(main.model_package, row) for row in rows]
+    assert body["probability"] == pytest.approx([p.probability for p in expected], abs=1e-6)
+    assert body["prediction"] == [p.prediction for p in expected]
+
+
+def test_predict_batch_columnar_arrow(client, serving_frame):
+    frame = serving_frame[main.model_package.features].head(50)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    r = client.post(
+        "/predict_batch/columnar",
+        content=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+    out = pa.ipc.open_stream(r.content).read_all()
+    assert out.schema.field("prediction").type == pa.int8()
+    np.testing.assert_array_equal(
+        out["probability"].to_numpy(),
+        main.model_package.predict_proba(frame),
+    )
+
+
+def test_predict_batch_columnar_rejects_bad_columns(client, serving_frame):
+    columns = serving_frame[main.model_package.features].head(4).to_dict(orient="list")
+    columns["GP"][2] = None
+
+    r = client.post("/predict_batch/columnar", json=columns)
+    assert r.status_code == 400
+    assert r.json()["detail"]["invalid_rows"] == [2]
+
+    del columns["GP"]
+    r = client.post("/predict_batch/columnar", json=columns)
+    assert r.status_code == 400
+    assert r.json()["detail"]["invalid_rows"] == [0, 1, 2, 3]
+
+    r = client.post("/predict_batch/columnar", json={"GP": [1.0], "MIN": [1.0, 2.0]})
+    assert r.status_code == 400
+
+    # nested values are a 400, not a 500
+    nested = {f: [1.0] for f in main.model_package.input_features}
+    nested["GP"] = [[1.0, 2.0]]
+    r = client.post("/predict_batch/columnar", json=nested)
+    assert r.status_code == 400
+    assert "flat list" in r.json()["detail"]
+
+    # no rows does not excuse missing columns
+    for body in ({}, {"GP": []}):
+        r = client.post("/predict_batch/columnar", json=body)
+        assert r.status_code == 400
+        assert "Missing features" in r.json()["detail"]["error"]
+
+
+def test_predict_uses_dedicated_thread_executor(client, serving_frame, monkeypatch):
+    executor = InferenceExecutor(mode="thread", max_workers=2)
+    executor.start(main.model_package.package_dir)
+    monkeypatch.setattr(main, "inference_executor", executor)
+
+    try:
+        row = serving_frame[main.model_package.features].iloc[0].to_dict()
+        r = client.post("/predict", json={"features": row})
+    finally:
+        executor.shutdown()
+
+    assert r.status_code == 200
+    assert r.json()["probability"] == predict_one(main.model_package, row).probability
+
+
+def test_bookkeeping_updates_monitoring_stores(client, serving_frame):
+    before = main.data_reliability_store.total_payloads
+    row = serving_frame[main.model_package.features].iloc[0].to_dict()
+
+    client.post("/predict", json={"features": row})
+    main.bookkeeping.shutdown()
+
+    assert main.data_reliability_store.total_payloads == before + 1
+    assert main.inference_logger.log_path.exists()
+
+
+def test_bookkeeping_queue_sheds_only_offered_calls():
+    queue = BookkeepingQueue(max_pending=2)
+    release = threading.Event()
+    done = []
+
+    for i in range(4):  # the first blocks the worker, the second waits, the rest are dropped
+        queue.offer(lambda i=i: (release.wait(5), done.append(i)))
+    queue.submit(done.append, "drift")  # never dropped
+    release.set()
+    queue.shutdown()
+
+    assert done == [0, 1, "drift"]
+    m = queue.get_metrics()
+    assert (m["pending"], m["offered"], m["dropped"], m["submitted"]) == (0, 2, 2, 1)
+
+
+def test_reliability_counters_stay_exact_when_logging_is_shed(client, serving_frame, monkeypatch):
+    queue = BookkeepingQueue(max_pending=1)
+    release = threading.Event()
+    queue.offer(release.wait, 5)  # the logger is stuck: every log write is dropped
+    monkeypatch.setattr(main, "bookkeeping", queue)
+    before = main.data_reliability_store.total_payloads
+
+    row = serving_frame[main.model_package.features].iloc[0].to_dict()
+    for _ in range(3):
+        assert client.post("/predict", json={"features": row}).status_code == 200
+    assert client.post("/predict", json={"features": {"GP": 1.0}}).status_code == 400
+
+    assert main.data_reliability_store.total_payloads == before + 4
+    assert queue.get_metrics()["dropped"] == 4
+    release.set()
+    queue.shutdown()
+
+
+def test_unknown_executor_mode_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="gpu")
+
+
+def test_drift_endpoint_tracks_live_traffic(client, serving_frame, monkeypatch):
+    from app.monitoring.drift.online_drift import OnlineDriftMonitor
+
+    monitor = OnlineDriftMonitor(main.model_package.reference_sketches)
+    monkeypatch.setattr(main, "drift_monitor", monitor)
+
+    rows = serving_frame[main.model_package.features].head(20).to_dict(orient="records")
+    client.post("/predict_batch", json={"rows": rows})
+    client.post("/predict", json={"features": rows[0]})
+    main.bookkeeping.shutdown()
+
+    r = client.get("/drift")
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["n_rows"] == 21
+    assert set(body["features"]) == set(main.model_package.features)
+    assert all(f["n"] == 21 for f in body["features"].values())
+    assert body["window_start"] and body["previous_window"] is None
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    r = client.post("/admin/drift/reset", headers={"X-Admin-Token": "secret"})
+    assert r.status_code == 200
+    assert client.get("/drift").json()["n_rows"] == 0
+
+
+def test_drift_endpoint_without_reference_sketches(client, monkeypatch):
+    monkeypatch.setattr(main, "drift_monitor", None)
+
+    assert client.get("/drift").status_code == 404
+
+
+def test_prometheus_endpoint(client, serving_frame):
+    row = serving_frame[main.model_package.features].iloc[0].to_dict()
+    client.post("/predict", json={"features": row})
+    main.bookkeeping.shutdown()
+
+    r = client.get("/metrics/prometheus")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/openmetrics-text")
+    assert "# TYPE nba_api_request_duration_seconds histogram" in r.text
+    assert 'nba_api_model_info{package_id="' in r.text
+    assert r.text.endswith("# EOF\n")
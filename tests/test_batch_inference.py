@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ml.serving.run_batch_inference import run_batch_inference, run_parallel_batch_inference
+from tests.conftest import _make_serving_frame
+
+
+@pytest.fixture
+def batch_input(tmp_path):
+    df = _make_serving_frame(1000, seed=3)
+    df.insert(0, "Name", [f"player_{i}" for i in range(len(df))])
+
+    parquet_path = tmp_path / "input.parquet"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), parquet_path, row_group_size=128)
+    csv_path = tmp_path / "input.csv"
+    df.to_csv(csv_path, index=False)
+    return parquet_path, csv_path
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".csv"])
+def test_streaming_matches_in_memory_scoring(model_package_dir, batch_input, tmp_path, suffix):
+    input_path = batch_input[0] if suffix == ".parquet" else batch_input[1]
+
+    whole = run_batch_inference(
+        package_dir=str(model_package_dir),
+        input_path=str(input_path),
+        output_path=str(tmp_path / f"whole{suffix}"),
+    )
+    streamed = run_batch_inference(
+        package_dir=str(model_package_dir),
+        input_path=str(input_path),
+        output_path=str(tmp_path / f"streamed{suffix}"),
+        chunk_rows=300,
+    )
+
+    read = pd.read_parquet if suffix == ".parquet" else pd.read_csv
+    expected = read(tmp_path / f"whole{suffix}")
+    pd.testing.assert_frame_equal(read(tmp_path / f"streamed{suffix}"), expected)
+
+    assert whole["n_chunks"] == 1
+    assert streamed["n_rows"] == 1000
+    assert streamed["n_chunks"] == 4
+    assert streamed["peak_rss_mb"] > 0
+    assert {"prediction_proba", "prediction", "threshold_used"} <= set(expected.columns)
+
+
+def test_missing_features_are_rejected(model_package_dir, tmp_path):
+    path = tmp_path / "bad.csv"
+    pd.DataFrame({"GP": [1.0]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="Missing expected features"):
+        run_batch_inference(
+            package_dir=str(model_package_dir),
+            input_path=str(path),
+            output_path=str(tmp_path / "out.csv"),
+            chunk_rows=10,
+        )
+
+
+def test_parallel_parts_keep_input_order(model_package_dir, batch_input, tmp_path):
+    parquet_path, csv_path = batch_input
+    input_dir = tmp_path / "inputs"
+    input_dir.mkdir()
+    (input_dir / "a.parquet").write_bytes(parquet_path.read_bytes())
+    (input_dir / "b.csv").write_bytes(csv_path.read_bytes())
+
+    run_batch_inference(
+        package_dir=str(model_package_dir),
+        input_path=str(parquet_path),
+        output_path=str(tmp_path / "whole.parquet"),
+    )
+    summary = run_parallel_batch_inference(
+        package_dir=str(model_package_dir),
+        input_path=str(input_dir),
+        output_dir=str(tmp_path / "parts"),
+        workers=2,
+    )
+
+    parts = sorted((tmp_path / "parts").glob("part-*.parquet"))
+    assert summary["n_shards"] == len(parts) == 8 + 1
+    assert summary["n_rows"] == 2000
+
+    expected = pd.read_parquet(tmp_path / "whole.parquet")
+    scored = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    pd.testing.assert_frame_equal(scored.iloc[:1000].reset_index(drop=True), expected)
+    pd.testing.assert_frame_equal(scored.iloc[1000:].reset_index(drop=True), expected)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from app.predict import encode_batch_response
+from app.schemas import BatchPredictResponse, BatchPredictRowResponse
+
+
+def _pydantic_body(probas, preds, threshold):
+    return BatchPredictResponse(
+        threshold_used=threshold,
+        n_rows=len(probas),
+        predictions=[
+            BatchPredictRowResponse(probability=round(float(p), 6), prediction=int(y))
+            for p, y in zip(probas, preds)
+        ],
+    ).model_dump()
+
+
+def test_encoded_body_matches_pydantic_response():
+    rng = np.random.default_rng(0)
+    # includes exact and near .5 ties at the 6th decimal, and both bounds
+    probas = np.concatenate([rng.random(5000), [0.0, 1.0, 0.0078125, 0.1234565, 0.9999995]])
+    preds = (probas >= 0.4).astype(np.int8)
+
+    body = encode_batch_response(probas, preds, 0.4)
+
+    assert json.loads(body) == _pydantic_body(probas, preds, 0.4)
+
+
+def test_out_of_range_values_fall_back_to_json():
+    probas = np.array([0.25, 1.5])
+    preds = np.array([0, 2])
+
+    body = encode_batch_response(probas, preds, 0.5)
+
+    assert json.loads(body)["predictions"] == [
+        {"probability": 0.25, "prediction": 0},
+        {"probability": 1.5, "prediction": 2},
+    ]
+
+
+def test_empty_batch():
+    body = encode_batch_response(np.array([]), np.array([], dtype=np.int8), 0.5)
+
+    assert json.loads(body) == {"threshold_used": 0.5, "n_rows": 0, "predictions": []}
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from app.monitoring.data_reliability import DataReliabilityStore
+from app.validation import (
+    validate_feature_batch,
+    validate_feature_columns,
+    validate_feature_payload,
+)
+
+
+FEATURES = ["GP", "MIN", "PTS"]
+
+
+def _per_row_totals(rows):
+    totals = {"valid": 0, "missing_count": 0, "unexpected_count": 0, "invalid_value_count": 0}
+    invalid_rows = []
+    for i, row in enumerate(rows):
+        is_valid, counts, _ = validate_feature_payload(row, FEATURES)
+        totals["valid"] += int(is_valid)
+        for k, v in counts.items():
+            totals[k] += v
+        if not is_valid:
+            invalid_rows.append(i)
+    return totals, invalid_rows
+
+
+def test_conforming_batch_builds_matrix_in_feature_order():
+    rows = [{"GP": float(i), "MIN": 2.0 * i, "PTS": 3.0 * i} for i in range(5)]
+
+    result = validate_feature_batch(rows, FEATURES)
+
+    assert result.is_valid
+    assert result.error is None
+    assert result.valid_count == 5
+    np.testing.assert_array_equal(result.matrix[:, 1], 2.0 * np.arange(5))
+
+
+def test_batch_matches_per_row_validation():
+    rows = [
+        {"GP": 1.0, "MIN": 2.0, "PTS": 3.0},
+        {"PTS": 3.0, "GP": 1.0, "MIN": 2.0},           # other key order
+        {"GP": 1.0, "MIN": 2.0},                       # missing
+        {"GP": 1.0, "MIN": 2.0, "PTS": 3.0, "X": 0.0},  # unexpected
+        {"GP": math.nan, "MIN": math.inf, "PTS": 3.0},  # non-finite
+        {"GP": "abc", "MIN": 2.0, "PTS": 3.0},         # non-numeric
+        {"PTS": 4.0, "GP": 5.0, "MIN": 6.0},
+    ]
+
+    result = validate_feature_batch(rows, FEATURES)
+    totals, invalid_rows = _per_row_totals(rows)
+
+    assert result.invalid_rows == invalid_rows == [2, 3, 4, 5]
+    assert result.valid_count == totals["valid"]
+    assert result.missing_count == totals["missing_count"]
+    assert result.unexpected_count == totals["unexpected_count"]
+    assert result.invalid_value_count == totals["invalid_value_count"]
+    assert result.error.startswith("4 of 7 rows invalid; row 2: Missing features: ['PTS']")
+
+    np.testing.assert_array_equal(result.matrix[1], [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(result.matrix[6], [5.0, 6.0, 4.0])
+    assert math.isnan(result.matrix[2, 2])
+
+
+def test_record_payloads_matches_per_row_recording():
+    rows = [{"GP": 1.0, "MIN": 2.0}, {"GP": 1.0, "MIN": math.nan, "PTS": 3.0, "X": 1.0}]
+    result = validate_feature_batch(rows, FEATURES)
+
+    bulk, per_row = DataReliabilityStore(), DataReliabilityStore()
+    bulk.record_payloads(
+        valid_count=result.valid_count,
+        invalid_count=result.invalid_count,
+        missing_count=result.missing_count,
+        unexpected_count=result.unexpected_count,
+        invalid_value_count=result.invalid_value_count,
+    )
+    for row in rows:
+        is_valid, counts, _ = validate_feature_payload(row, FEATURES)
+        per_row.record_payload(is_valid=is_valid, **counts)
+
+    assert bulk.get_metrics() == per_row.get_metrics()
+
+
+def test_empty_batch():
+    result = validate_feature_batch([], FEATURES)
+
+    assert result.is_valid
+    assert result.matrix.shape == (0, 3)
+
+
+def test_columns_validation_matches_row_validation():
+    columns = {"PTS": np.array([3.0, np.inf]), "GP": np.array([1.0, 2.0]), "MIN": np.array([2.0, 4.0])}
+
+    result = validate_feature_columns(columns, FEATURES)
+
+    assert result.invalid_rows == [1]
+    assert result.invalid_value_count == 1
+    np.testing.assert_array_equal(result.matrix[0], [1.0, 2.0, 3.0])
+
+    columns["X"] = np.array([0.0, 0.0])
+    del columns["MIN"]
+    result = validate_feature_columns(columns, FEATURES)
+    rows = [{k: float(v[i]) for k, v in columns.items()} for i in range(2)]
+    totals, invalid_rows = _per_row_totals(rows)
+
+    assert result.invalid_rows == invalid_rows == [0, 1]
+    assert result.missing_count == totals["missing_count"]
+    assert result.unexpected_count == totals["unexpected_count"]
+    assert result.invalid_value_count == totals["invalid_value_count"]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from app.batching import MicroBatcher
+from app.model_loader import load_model_package
+from app.predict import predict_one
+
+
+def test_micro_batcher_matches_single_row_predictions(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    rows = serving_frame[pkg.features].to_dict(orient="records")
+
+    batcher = MicroBatcher(max_batch_size=16, max_wait_ms=20)
+    batcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(lambda row: batcher.predict(pkg, row), rows))
+    finally:
+        batcher.stop()
+
+    assert results == [predict_one(pkg, row) for row in rows]
+
+    metrics = batcher.get_metrics()
+    assert metrics["total_rows"] == len(rows)
+    assert metrics["total_batches"] < len(rows)
+    assert 1 <= metrics["max_batch_size_seen"] <= 16
+    assert sum(metrics["batch_size_counts"].values()) == metrics["total_batches"]
+    assert metrics["queue_depth"] == 0
+
+
+def test_micro_batcher_propagates_scoring_errors(model_package_dir):
+    pkg = load_model_package(model_package_dir)
+
+    batcher = MicroBatcher(max_batch_size=4, max_wait_ms=1)
+    batcher.start()
+    try:
+        with pytest.raises(ValueError):
+            batcher.predict(pkg, {"GP": 1.0}, timeout=5)
+    finally:
+        batcher.stop()
+
+    assert batcher.get_metrics()["failed_batches"] == 1
+
+
+def test_micro_batcher_rejects_bad_config():
+    with pytest.raises(ValueError):
+        MicroBatcher(max_batch_size=0)
+
+
+def test_micro_batcher_fails_requests_once_stopped(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    row = serving_frame[pkg.features].to_dict(orient="records")[0]
+
+    batcher = MicroBatcher(max_batch_size=4, max_wait_ms=1)
+    batcher.start()
+    assert batcher.predict(pkg, row, timeout=5) == predict_one(pkg, row)
+    batcher.stop()
+
+    with pytest.raises(RuntimeError):
+        batcher.predict(pkg, row, timeout=5)
+
+
+def test_micro_batcher_stop_fails_rows_left_in_the_queue(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    row = serving_frame[pkg.features].to_dict(orient="records")[0]
+
+    batcher = MicroBatcher(max_batch_size=4, max_wait_ms=1)
+    # a row queued with no worker left to score it
+    stranded: Future = Future()
+    batcher._queue.put((pkg, row, stranded))
+    batcher.stop()
+
+    with pytest.raises(RuntimeError):
+        stranded.result(timeout=5)
+    assert batcher.get_metrics()["queue_depth"] == 0
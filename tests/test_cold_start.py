@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from app.model_loader import load_model_package
+
+HEAVY_MODULES = ["pandas", "sklearn", "xgboost", "jinja2", "pyarrow", "evidently", "matplotlib"]
+
+
+def _run_python(code: str, *args: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    out = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        capture_output=True, text=True, check=True, env=env,
+    ).stdout
+    return json.loads([line for line in out.splitlines() if line.startswith("{")][-1])
+
+
+def test_importing_the_api_skips_heavy_modules():
+    loaded = _run_python(
+        "import json, sys; import app.main; "
+        "print(json.dumps({'loaded': [m for m in sys.argv[1:] if m in sys.modules]}))",
+        *HEAVY_MODULES,
+    )["loaded"]
+    assert loaded == []
+
+
+def test_inference_path_runs_without_pandas(model_package_dir):
+    # pandas made unimportable: the deferred model load fails, serving does not
+    result = _run_python(
+        r"""
+import json, sys
+sys.modules["pandas"] = None
+import numpy as np
+from app.model_loader import load_model_package
+from app.predict import predict_batch, predict_matrix, predict_one
+
+pkg = load_model_package(sys.argv[1], defer_model=True)
+rows = [{f: float(i + 1) for f in pkg.input_features} for i in range(100)]
+one = predict_one(pkg, rows[0]).probability
+batch = [p.probability for p in predict_batch(pkg, rows).predictions]
+probas, _ = predict_matrix(pkg, np.array([[r[f] for f in pkg.input_features] for r in rows]))
+print(json.dumps({"one": one, "batch": batch, "matrix": probas.tolist()}))
+""",
+        str(model_package_dir),
+    )
+
+    pkg = load_model_package(model_package_dir)
+    rows = [{f: float(i + 1) for f in pkg.input_features} for i in range(100)]
+    expected = pkg.predict_proba_matrix(np.array([[r[f] for f in pkg.input_features] for r in rows]))
+
+    np.testing.assert_allclose(result["matrix"], expected, rtol=0, atol=1e-12)
+    assert result["batch"] == [round(p, 6) for p in result["matrix"]]
+    assert result["one"] == result["batch"][0]
+
+
+def test_deferred_load_attaches_the_model(model_package_dir):
+    eager = load_model_package(model_package_dir)
+    pkg = load_model_package(model_package_dir, defer_model=True)
+    X = np.random.default_rng(0).uniform(0, 30, size=(100, len(pkg.input_features)))
+
+    assert pkg.model_future is not None
+    np.testing.assert_allclose(pkg.predict_proba_matrix(X), eager.predict_proba_matrix(X), rtol=0, atol=1e-12)
+
+    model = pkg.require_model()
+    assert type(model) is type(eager.model)
+    assert pkg.compiled.estimator is not None
+    np.testing.assert_array_equal(pkg.predict_proba_matrix(X), eager.predict_proba_matrix(X))
+
+
+def test_package_without_exports_loads_eagerly(model_package_dir, tmp_path):
+    import shutil
+
+    plain = tmp_path / "plain"
+    shutil.copytree(model_package_dir, plain)
+    (plain / "fused_transform.json").unlink()
+
+    pkg = load_model_package(plain, defer_model=True)
+    assert pkg.model_future is None
+    assert pkg.model is not None
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.compiled_predictor import compile_predictor
+from app.model_loader import load_model_package
+from app.predict import _build_dataframe, predict_one
+
+
+def test_package_is_compiled_on_load(model_package_dir):
+    pkg = load_model_package(model_package_dir)
+    assert pkg.compiled is not None
+    assert pkg.compiled.features == pkg.features
+
+
+def test_compiled_row_matches_pandas_path_bit_for_bit(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+
+    for row in serving_frame[pkg.features].to_dict(orient="records"):
+        expected = float(pkg.predict_proba(_build_dataframe([row], pkg.features))[0])
+        assert pkg.compiled.predict_proba_row(row) == expected
+
+
+def test_compiled_matrix_matches_pipeline(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    X = serving_frame[pkg.features]
+
+    expected = pkg.predict_proba(X)
+    got = pkg.compiled.predict_proba_matrix(X.to_numpy(dtype=np.float64))
+
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_mmap_loaded_package_predicts_identically(model_package_dir, serving_frame):
+    X = serving_frame[load_model_package(model_package_dir).features]
+
+    loaded = load_model_package(model_package_dir)
+    mapped = load_model_package(model_package_dir, mmap_mode="r")
+
+    np.testing.assert_array_equal(mapped.predict_proba(X), loaded.predict_proba(X))
+    np.testing.assert_array_equal(
+        mapped.compiled.predict_proba_matrix(X.to_numpy(dtype=np.float64)),
+        loaded.predict_proba(X),
+    )
+
+
+def test_compiled_row_ignores_key_order_and_rejects_missing(model_package_dir):
+    pkg = load_model_package(model_package_dir)
+    row = {f: 1.0 for f in reversed(pkg.features)}
+
+    assert predict_one(pkg, row).prediction in (0, 1)
+
+    row.pop(pkg.features[0])
+    with pytest.raises(ValueError, match=re.escape(pkg.features[0])):
+        pkg.compiled.predict_proba_row(row)
+
+
+def test_compile_predictor_returns_none_for_unknown_layout():
+    assert compile_predictor(object(), ["GP"]) is None
+    assert compile_predictor(pd.DataFrame(), ["GP"]) is None
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.model_loader import load_model_package
+from tests.conftest import _make_serving_frame
+from app.monitoring.drift.online_drift import OnlineDriftMonitor
+from app.monitoring.drift.sketches import (
+    FeatureSketch,
+    build_reference_sketches,
+    ks_approx,
+    load_reference_sketches,
+    psi,
+    save_reference_sketches,
+    wasserstein_approx,
+)
+
+
+def _sketches(reference, current):
+    ref = FeatureSketch.from_values(reference)
+    cur = ref.empty_like()
+    cur.update(current)
+    return ref, cur
+
+
+def test_sketch_moments_and_counts():
+    values = np.random.default_rng(0).normal(10.0, 2.0, size=5000)
+    sketch = FeatureSketch.from_values(values)
+
+    assert sketch.n == 5000
+    assert sketch.counts.sum() == 5000
+    assert sketch.mean == pytest.approx(values.mean())
+    assert sketch.std == pytest.approx(values.std(ddof=1))
+    assert sketch.quantiles[50] == pytest.approx(np.median(values))
+
+
+def test_update_one_matches_vectorized_update():
+    rng = np.random.default_rng(1)
+    ref = FeatureSketch.from_values(rng.normal(size=1000))
+    values = np.concatenate([rng.normal(size=200), ref.edges[:3]])
+
+    one = ref.empty_like()
+    for v in values:
+        one.update_one(float(v))
+    many = ref.empty_like()
+    many.update(values)
+
+    np.testing.assert_array_equal(one.counts, many.counts)
+    assert one.total == pytest.approx(many.total)
+
+
+def test_scores_are_small_without_drift_and_large_with_drift():
+    rng = np.random.default_rng(2)
+    reference = rng.normal(0.0, 1.0, size=20_000)
+
+    ref, same = _sketches(reference, rng.normal(0.0, 1.0, size=5000))
+    _, shifted = _sketches(reference, rng.normal(1.0, 1.0, size=5000))
+
+    assert psi(ref, same) < 0.02
+    assert psi(ref, shifted) > 0.2
+    assert ks_approx(ref, same) < 0.05
+    assert ks_approx(ref, shifted) > 0.3
+    # a unit mean shift moves W1 by ~1
+    assert wasserstein_approx(ref, same) < 0.1
+    assert wasserstein_approx(ref, shifted) == pytest.approx(1.0, abs=0.05)
+
+
+def test_reference_sketches_round_trip(tmp_path):
+    df = pd.DataFrame({"a": np.arange(100.0), "b": np.linspace(0, 1, 100)})
+    sketches = build_reference_sketches(df, ["a", "b"], n_bins=10)
+
+    save_reference_sketches(tmp_path, sketches)
+    loaded = load_reference_sketches(tmp_path)
+
+    assert list(loaded) == ["a", "b"]
+    np.testing.assert_array_equal(loaded["a"].edges, sketches["a"].edges)
+    np.testing.assert_array_equal(loaded["a"].counts, sketches["a"].counts)
+    assert load_reference_sketches(tmp_path / "missing") is None
+
+
+def test_packaged_model_ships_reference_sketches(model_package_dir):
+    pkg = load_model_package(model_package_dir)
+
+    assert pkg.manifest["reference_sketches"] == "reference_sketches.json"
+    assert set(pkg.reference_sketches) == set(pkg.features)
+
+    # same generator as the packaged reference, different draw
+    traffic = _make_serving_frame(2000, seed=3)
+    monitor = OnlineDriftMonitor(pkg.reference_sketches)
+    monitor.update_columns({f: traffic[f].to_numpy() for f in pkg.features})
+    report = monitor.get_report()
+
+    assert report["n_rows"] == len(traffic)
+    assert report["drifted_features"] == 0
+    assert report["dataset_drift"] is False
+
+
+def test_online_monitor_flags_shifted_traffic(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    monitor = OnlineDriftMonitor(pkg.reference_sketches)
+
+    shifted = serving_frame[pkg.features] * 3.0 + 50.0
+    for row in shifted.to_dict(orient="records"):
+        monitor.update_row(row)
+    report = monitor.get_report()
+
+    assert report["dataset_drift"] is True
+    assert report["drifted_features"] == len(pkg.features)
+
+    monitor.reset()
+    assert monitor.get_report()["n_rows"] == 0
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_online_monitor_scores_tumbling_windows(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    clock = _Clock()
+    monitor = OnlineDriftMonitor(pkg.reference_sketches, window_s=60, clock=clock)
+    normal = {f: serving_frame[f].to_numpy() for f in pkg.features}
+    shifted = {f: values * 3.0 + 50.0 for f, values in normal.items()}
+
+    monitor.update_columns(normal)
+    clock.now += 61  # a day of normal traffic does not hide drift that starts later
+    monitor.update_columns(shifted)
+
+    report = monitor.get_report()
+    assert report["n_rows"] == len(serving_frame)
+    assert report["dataset_drift"] is True
+    assert report["window_start"] == datetime.fromtimestamp(1_000_060.0, tz=timezone.utc).isoformat()
+    previous = report["previous_window"]
+    assert (previous["n_rows"], previous["dataset_drift"]) == (len(serving_frame), False)
+
+    # two windows later with no traffic: both are empty
+    clock.now += 120
+    report = monitor.get_report()
+    assert report["n_rows"] == 0 and report["previous_window"]["n_rows"] == 0
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.flat_trees import (
+    FLAT_TREES_DIRNAME,
+    FlatTreeEnsemble,
+    flatten_estimator,
+    load_flat_trees,
+    max_abs_error,
+)
+from app.model_loader import load_model_package
+
+
+def _data(n: int = 400, seed: int = 0):
+    rng = np.random.RandomState(seed)
+    X = rng.normal(size=(n, 5))
+    y = ((X[:, 0] + 0.5 * X[:, 1] ** 2 - X[:, 2]) > 0.3).astype(int)
+    return X, y
+
+
+def test_flat_random_forest_matches_predict_proba():
+    X, y = _data()
+    rf = RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y)
+
+    flat = flatten_estimator(rf)
+
+    assert flat.n_trees == 30
+    np.testing.assert_array_equal(flat.predict_proba(X)[:, 1], rf.predict_proba(X)[:, 1])
+
+
+def test_flat_balanced_random_forest_matches_predict_proba():
+    imblearn = pytest.importorskip("imblearn.ensemble")
+    X, y = _data()
+    brf = imblearn.BalancedRandomForestClassifier(
+        n_estimators=20, sampling_strategy="all", replacement=True, random_state=0
+    ).fit(X, y)
+
+    assert max_abs_error(flatten_estimator(brf), brf, X) <= 1e-9
+
+
+def test_flat_xgboost_matches_predict_proba():
+    xgb = pytest.importorskip("xgboost")
+    X, y = _data()
+    model = xgb.XGBClassifier(n_estimators=60, max_depth=4, learning_rate=0.1).fit(X, y)
+
+    flat = flatten_estimator(model)
+
+    assert flat.aggregation == "sigmoid_margin"
+    assert max_abs_error(flat, model, X) <= 1e-9
+    # missing values follow each split's default direction
+    X_nan = X.copy()
+    X_nan[::3, 0] = np.nan
+    assert max_abs_error(flat, model, X_nan) <= 1e-9
+
+
+def test_flatten_rejects_unsupported_estimators():
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = _data()
+    with pytest.raises(ValueError):
+        flatten_estimator(LogisticRegression().fit(X, y))
+
+
+def test_save_load_round_trip(tmp_path):
+    X, y = _data()
+    flat = flatten_estimator(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y))
+
+    flat.save(tmp_path / FLAT_TREES_DIRNAME)
+    loaded = load_flat_trees(tmp_path, mmap_mode="r")
+
+    assert isinstance(loaded, FlatTreeEnsemble)
+    assert isinstance(loaded.threshold, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(X), flat.predict_proba(X))
+    assert load_flat_trees(tmp_path / "missing") is None
+
+
+def test_package_ships_flat_trees_and_serves_small_batches(model_package_dir, serving_frame):
+    manifest = json.loads(
+        (load_model_package(model_package_dir).package_dir / "package_manifest.json").read_text()
+    )
+    assert manifest["flat_trees"] == FLAT_TREES_DIRNAME
+    assert manifest["flat_trees_max_abs_error"] <= 1e-9
+
+    pkg = load_model_package(model_package_dir)
+    assert pkg.flat_trees is not None
+    assert pkg.compiled.flat_trees is pkg.flat_trees
+
+    X = serving_frame[pkg.features]
+    expected = pkg.predict_proba(X)
+    for n in (1, 8, len(X)):
+        np.testing.assert_array_equal(
+            pkg.compiled.predict_proba_matrix(X.head(n).to_numpy(dtype=np.float64)),
+            expected[:n],
+        )
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, PowerTransformer, RobustScaler
+
+from app.fused_transform import (
+    FUSED_TRANSFORM_FILENAME,
+    FusedTransform,
+    fuse_feature_pipeline,
+    load_fused_transform,
+)
+from app.model_loader import load_model_package
+from ml.model_pipeline.build_pipeline import build_feature_pipeline
+
+FEATURES = ["GP", "MIN", "PTS", "FTM", "FTA", "REB"]
+SUGGESTIONS = {"FTM": "log1p", "FTA": "log1p", "MIN": "yeo_johnson", "PTS": "yeo_johnson"}
+
+
+def _fit_feature_step(frame: pd.DataFrame, tmp_path, scaler: str) -> Pipeline:
+    skew_path = tmp_path / "skewness_report.csv"
+    pd.DataFrame(
+        [
+            {"feature": f, "skewness": 0.0, "zero_ratio": 0.0, "category": "test",
+             "suggestion": SUGGESTIONS.get(f, "none")}
+            for f in FEATURES
+        ]
+    ).to_csv(skew_path, index=False)
+
+    step, _ = build_feature_pipeline(
+        selected_features=FEATURES,
+        X_train=frame[FEATURES],
+        eng_cfg={"skewness_report_path": str(skew_path), "scaler": scaler},
+    )
+    return step.fit(frame[FEATURES])
+
+
+@pytest.mark.parametrize("scaler", ["standard", "minmax", "none"])
+def test_fused_matches_feature_pipeline_bit_for_bit(serving_frame, tmp_path, scaler):
+    step = _fit_feature_step(serving_frame, tmp_path, scaler)
+    X = serving_frame[FEATURES].to_numpy(dtype=np.float64)
+    # negative inputs take the other Yeo-Johnson branch
+    X = np.vstack([X, X[:20] * np.array([1, -0.5, -0.5, 1, 1, 1])])
+
+    fused = fuse_feature_pipeline(step, FEATURES)
+
+    assert fused is not None
+    expected = step.transform(pd.DataFrame(X, columns=FEATURES))
+    np.testing.assert_array_equal(fused.transform(X), expected)
+
+
+def test_fused_handles_yeo_johnson_limit_lambdas(serving_frame):
+    step = ColumnTransformer([("yeo_johnson", PowerTransformer(), ["MIN", "PTS"])])
+    step.fit(serving_frame[["MIN", "PTS"]])
+    # sklearn switches to log1p at exactly these lambdas
+    step.named_transformers_["yeo_johnson"].lambdas_ = np.array([0.0, 2.0])
+
+    X = np.array([[3.0, -2.0], [-0.5, 4.0], [0.0, 0.0]])
+    fused = fuse_feature_pipeline(step, ["MIN", "PTS"])
+
+    np.testing.assert_array_equal(
+        fused.transform(X),
+        step.transform(pd.DataFrame(X, columns=["MIN", "PTS"])),
+    )
+
+
+def test_unsupported_steps_are_not_fused(serving_frame):
+    step = Pipeline(
+        [
+            ("cols", ColumnTransformer([("sqrt", FunctionTransformer(np.sqrt), ["MIN"])])),
+            ("scaler", RobustScaler()),
+        ]
+    ).fit(serving_frame[["MIN"]])
+
+    assert fuse_feature_pipeline(step, ["MIN"]) is None
+
+
+def test_round_trip_and_package_export(model_package_dir, serving_frame):
+    pkg = load_model_package(model_package_dir)
+    manifest = json.loads((pkg.package_dir / "package_manifest.json").read_text())
+    assert manifest["fused_transform"] == FUSED_TRANSFORM_FILENAME
+
+    fused = load_fused_transform(pkg.package_dir)
+    assert isinstance(fused, FusedTransform)
+    assert pkg.compiled.fused is not None
+
+    X = serving_frame[pkg.features]
+    expected = pkg.model.named_steps["features"].transform(X)
+    np.testing.assert_array_equal(fused.transform(X.to_numpy(dtype=np.float64)), expected)
+    np.testing.assert_array_equal(
+        FusedTransform.from_dict(fused.to_dict()).transform(X.to_numpy(dtype=np.float64)),
+        expected,
+    )
+    assert load_fused_transform(pkg.package_dir / "missing") is None
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from app.monitoring.inference_logger import BufferedInferenceLogger, InferenceLogger
+from app.monitoring.parquet_sink import ParquetEventSink
+
+
+def _event(i: int, status: str = "success") -> dict:
+    return {"event_type": "single_inference", "request_id": str(i), "status": status}
+
+
+def _read(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_unbuffered_logger_writes_failed_events_twice(tmp_path):
+    logger = InferenceLogger(tmp_path / "inference.jsonl", tmp_path / "failures.jsonl")
+
+    logger.log_event(_event(0))
+    logger.log_event(_event(1, status="failed"))
+
+    assert [e["request_id"] for e in _read(logger.log_path)] == ["0", "1"]
+    assert [e["request_id"] for e in _read(logger.failure_log_path)] == ["1"]
+
+
+def test_buffered_logger_flushes_in_order_on_close(tmp_path):
+    logger = BufferedInferenceLogger(
+        tmp_path / "inference.jsonl",
+        tmp_path / "failures.jsonl",
+        flush_batch_size=1000,
+        flush_interval_s=60.0,
+    )
+
+    for i in range(50):
+        logger.log_event(_event(i, status="failed" if i % 10 == 0 else "success"))
+
+    assert not logger.log_path.exists()  # nothing hit the disk yet
+
+    logger.close()
+
+    assert [e["request_id"] for e in _read(logger.log_path)] == [str(i) for i in range(50)]
+    assert len(_read(logger.failure_log_path)) == 5
+
+    metrics = logger.get_metrics()
+    assert metrics["enqueued_events"] == 50
+    assert metrics["flushed_events"] == 50
+    assert metrics["dropped_events"] == 0
+    assert metrics["pending_events"] == 0
+
+
+def test_buffered_logger_flushes_on_batch_size(tmp_path):
+    logger = BufferedInferenceLogger(
+        tmp_path / "inference.jsonl",
+        tmp_path / "failures.jsonl",
+        flush_batch_size=10,
+        flush_interval_s=60.0,
+    )
+
+    for i in range(10):
+        logger.log_event(_event(i))
+
+    deadline = time.monotonic() + 5.0
+    while logger.get_metrics()["flushed_events"] < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    try:
+        assert logger.get_metrics()["flushed_events"] == 10
+        assert logger.log_path.exists()
+    finally:
+        logger.close()
+
+
+def test_flush_from_another_thread_keeps_order_and_close_leaves_no_open_file(tmp_path):
+    logger = BufferedInferenceLogger(
+        tmp_path / "inference.jsonl",
+        tmp_path / "failures.jsonl",
+        flush_batch_size=7,
+        flush_interval_s=0.001,
+        parquet_sink=ParquetEventSink(tmp_path / "events", features=["GP"]),
+    )
+
+    stop = threading.Event()
+
+    def flusher() -> None:
+        while not stop.is_set():
+            logger.flush()
+
+    thread = threading.Thread(target=flusher)
+    thread.start()
+    try:
+        for i in range(2000):
+            logger.log_event(_event(i))
+    finally:
+        stop.set()
+        thread.join()
+    logger.close()
+
+    assert [e["request_id"] for e in _read(logger.log_path)] == [str(i) for i in range(2000)]
+    assert not list((tmp_path / "events").rglob("*.inprogress"))
+
+    # events after shutdown are written directly, and the sink is closed again
+    logger.log_event(_event(2000))
+    assert _read(logger.log_path)[-1]["request_id"] == "2000"
+    assert not list((tmp_path / "events").rglob("*.inprogress"))
+
+
+def test_drop_oldest_policy_keeps_newest_events(tmp_path):
+    logger = BufferedInferenceLogger(
+        tmp_path / "inference.jsonl",
+        tmp_path / "failures.jsonl",
+        max_buffer_size=5,
+        flush_batch_size=1000,
+        flush_interval_s=60.0,
+        overflow_policy="drop_oldest",
+    )
+
+    for i in range(8):
+        logger.log_event(_event(i))
+    logger.close()
+
+    assert [e["request_id"] for e in _read(logger.log_path)] == ["3", "4", "5", "6", "7"]
+    assert logger.get_metrics()["dropped_events"] == 3
+
+
+def test_sample_policy_keeps_one_in_n_overflow_events(tmp_path):
+    logger = BufferedInferenceLogger(
+        tmp_path / "inference.jsonl",
+        tmp_path / "failures.jsonl",
+        max_buffer_size=5,
+        flush_batch_size=1000,
+        flush_interval_s=60.0,
+        overflow_policy="sample",
+        sample_every=5,
+    )
+
+    for i in range(15):
+        logger.log_event(_event(i))
+    logger.close()
+
+    kept = [e["request_id"] for e in _read(logger.log_path)]
+    assert len(kept) == 5
+    assert kept[-2:] == ["9", "14"]
+    assert logger.get_metrics()["dropped_events"] == 10
+
+
+def test_unknown_overflow_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        BufferedInferenceLogger(tmp_path / "a.jsonl", tmp_path / "b.jsonl", overflow_policy="panic")
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import io
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import app.main as main
+from app.jobs import JobRunner, JobStore
+from app.model_loader import load_model_package
+from ml.serving import run_batch_inference as batch
+from tests.conftest import _copy_package, _make_serving_frame
+
+
+@pytest.fixture
+def job_input(tmp_path):
+    df = _make_serving_frame(1000, seed=5)
+    df.insert(0, "Name", [f"player_{i}" for i in range(len(df))])
+    path = tmp_path / "inputs" / "input.parquet"
+    path.parent.mkdir()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=128)
+    return path
+
+
+def _expected(model_package_dir, input_path, tmp_path) -> pd.DataFrame:
+    batch.run_batch_inference(
+        package_dir=str(model_package_dir),
+        input_path=str(input_path),
+        output_path=str(tmp_path / "expected.parquet"),
+    )
+    return pd.read_parquet(tmp_path / "expected.parquet")
+
+
+def test_uploaded_job_is_scored_paged_and_streamed(client, model_package_dir, job_input, tmp_path, monkeypatch):
+    pkg = main.model_package
+    runner = JobRunner(JobStore(tmp_path / "jobs"), lambda: pkg, workers=0)
+    monkeypatch.setattr(main, "job_runner", runner)
+
+    created = client.post(
+        "/jobs",
+        files={"file": ("players.parquet", job_input.read_bytes())},
+        data={"chunk_rows": "300"},
+    )
+    assert created.status_code == 202
+    zero = client.post(
+        "/jobs",
+        files={"file": ("players.parquet", job_input.read_bytes())},
+        data={"chunk_rows": "0"},
+    )
+    assert zero.status_code == 400
+    job_id = created.json()["job_id"]
+    assert created.headers["Location"] == f"/jobs/{job_id}"
+    assert client.get(f"/jobs/{job_id}/results/stream").status_code == 409
+
+    assert runner.run_pending() == 1
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["state"] == "succeeded"
+    assert (job["chunks_done"], job["rows_done"], job["n_rows_total"]) == (4, 1000, 1000)
+    assert job["part_rows"] == [300, 300, 300, 100]
+    assert job["rows_per_s"] > 0
+
+    expected = _expected(model_package_dir, job_input, tmp_path)
+
+    # a page spanning two parts
+    page = client.get(f"/jobs/{job_id}/results", params={"offset": 250, "limit": 100}).json()
+    assert page["complete"] and page["n_rows_available"] == 1000
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(page["rows"]),
+        expected.iloc[250:350].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+    streamed = pd.read_csv(io.BytesIO(client.get(f"/jobs/{job_id}/results/stream").content))
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+    arrow = client.get(f"/jobs/{job_id}/results/stream", headers={"Accept": main.ARROW_STREAM_MEDIA_TYPE})
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.column("prediction_proba").to_pylist() == expected["prediction_proba"].tolist()
+
+    assert client.get("/jobs/job_20000101T000000000000Z_00000000").status_code == 404
+    assert runner.get_metrics()["rows_scored"] == 1000
+
+
+class _Crash(BaseException):
+    """Stands in for the worker process dying mid-job."""
+
+
+def test_crashed_job_resumes_after_last_completed_chunk(model_package_dir, job_input, tmp_path, monkeypatch):
+    pkg = load_model_package(model_package_dir)
+    store = JobStore(tmp_path / "jobs", input_roots=[job_input.parent])
+    job_id = store.create(chunk_rows=300, input_path=job_input)["job_id"]
+    expected = _expected(model_package_dir, job_input, tmp_path)
+
+    score_frame = batch.score_frame
+    calls = []
+
+    def crashing_score_frame(pkg, df):
+        calls.append(len(df))
+        if len(calls) == 3:
+            raise _Crash()
+        return score_frame(pkg, df)
+
+    monkeypatch.setattr(batch, "score_frame", crashing_score_frame)
+    with pytest.raises(_Crash):
+        JobRunner(store, lambda: pkg).run_pending()
+
+    job = store.get(job_id)
+    assert (job["state"], job["chunks_done"], job["rows_done"]) == ("running", 2, 600)
+
+    # a new worker takes the job over and scores only the chunks left
+    calls.clear()
+    assert JobRunner(store, lambda: pkg).run_pending() == 1
+    assert calls == [300, 100]
+
+    job = store.get(job_id)
+    assert (job["state"], job["attempts"], job["rows_done"]) == ("succeeded", 2, 1000)
+    page, _ = store.read_page(job_id, 0, 1000)
+    pd.testing.assert_frame_equal(page, expected)
+
+
+def test_resumed_job_keeps_the_package_it_started_on(model_package_dir, job_input, tmp_path, monkeypatch):
+    pkg = load_model_package(model_package_dir)
+    # swapped in while the job is down; threshold 0 would flip predictions
+    new = load_model_package(_copy_package(model_package_dir, "nba_model_20991231T000000Z", threshold=0.0))
+    store = JobStore(tmp_path / "jobs", input_roots=[job_input.parent])
+    expected = _expected(model_package_dir, job_input, tmp_path)
+    score_frame = batch.score_frame
+
+    def crash_on_second_chunk() -> str:
+        job_id = store.create(chunk_rows=300, input_path=job_input)["job_id"]
+        calls = []
+
+        def crashing_score_frame(pkg, df):
+            calls.append(len(df))
+            if len(calls) == 2:
+                raise _Crash()
+            return score_frame(pkg, df)
+
+        monkeypatch.setattr(batch, "score_frame", crashing_score_frame)
+        with pytest.raises(_Crash):
+            JobRunner(store, lambda: pkg).run_pending()
+        monkeypatch.setattr(batch, "score_frame", score_frame)
+        return job_id
+
+    job_id = crash_on_second_chunk()
+    assert JobRunner(store, lambda: new).run_pending() == 1
+    job = store.get(job_id)
+    assert (job["state"], job["package_id"]) == ("succeeded", pkg.manifest["package_id"])
+    page, _ = store.read_page(job_id, 0, 1000)
+    pd.testing.assert_frame_equal(page, expected)
+
+    # the package the job started on is gone: fail rather than mix models
+    job_id = crash_on_second_chunk()
+    shutil.rmtree(model_package_dir)
+    assert JobRunner(store, lambda: new).run_pending() == 1
+    job = store.get(job_id)
+    assert job["state"] == "failed"
+    assert "can no longer be loaded" in job["error"]
+
+
+def test_bad_inputs_are_rejected(model_package_dir, job_input, tmp_path):
+    store = JobStore(tmp_path / "jobs", input_roots=[tmp_path / "elsewhere"])
+
+    with pytest.raises(ValueError, match="inside one of"):
+        store.create(chunk_rows=100, input_path=job_input)
+    with pytest.raises(ValueError, match="must be"):
+        store.create(chunk_rows=100, upload=io.BytesIO(b"x"), filename="players.json")
+
+    # a scoring error fails the job instead of leaving it to be retried forever
+    bad = tmp_path / "elsewhere" / "bad.csv"
+    bad.parent.mkdir()
+    pd.DataFrame({"GP": [1.0]}).to_csv(bad, index=False)
+    job_id = store.create(chunk_rows=100, input_path=bad)["job_id"]
+
+    pkg = load_model_package(model_package_dir)
+    assert JobRunner(store, lambda: pkg).run_pending() == 1
+    job = store.get(job_id)
+    assert job["state"] == "failed"
+    assert "Missing expected features" in job["error"]
+    assert store.pending_ids() == []
+    assert JobRunner(store, lambda: pkg).run_pending() == 0
+
+    # finished jobs are deleted once past retention
+    runner = JobRunner(store, lambda: pkg, retention_s=3600)
+    assert runner.cleanup() == 0
+    store.update(job_id, finished_at="2000-01-01T00:00:00+00:00")
+    assert runner.cleanup() == 1
+    assert not store.job_dir(job_id).exists()
+    assert runner.get_metrics()["jobs_removed"] == 1
+
+
+def test_failed_upload_leaves_no_job_behind(tmp_path):
+    class _Dropped(io.RawIOBase):
+        def readinto(self, buf):
+            raise ConnectionResetError("client went away")
+
+    store = JobStore(tmp_path / "jobs")
+    with pytest.raises(ConnectionResetError):
+        store.create(chunk_rows=100, upload=_Dropped(), filename="players.csv")
+
+    assert store.job_ids() == []
+    assert store.pending_ids() == []
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.monitoring.log_reader import (
+    iter_feature_chunks,
+    load_feature_frame,
+    reservoir_sample_features,
+)
+
+
+T0 = datetime(2026, 3, 19, 10, 0, tzinfo=timezone.utc)
+
+
+def _write_log(path, n: int) -> None:
+    with path.open("w") as f:
+        for i in range(n):
+            f.write(
+                json.dumps(
+                    {
+                        "event_type": "single_inference",
+                        "timestamp_utc": (T0 + timedelta(seconds=i)).isoformat(),
+                        "package_id": "pkg_a" if i % 2 == 0 else "pkg_b",
+                        "features": {"GP": float(i), "MIN": 2.0 * i},
+                        "prediction": 1,
+                        "probability": 0.5,
+                        "error_message": None,
+                    }
+                )
+                + "\n"
+            )
+            if i % 10 == 0:
+                f.write(json.dumps({"event_type": "batch_inference", "n_rows": 5}) + "\n")
+        f.write("not json at all\n")
+        f.write("__import__('os').system('echo unsafe')\n")
+
+
+def test_iter_feature_chunks_streams_bounded_chunks(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    _write_log(log, 25)
+
+    chunks = list(iter_feature_chunks(log, chunk_size=10))
+
+    assert [len(c["GP"]) for c in chunks] == [10, 10, 5]
+    gp = np.concatenate([c["GP"] for c in chunks])
+    np.testing.assert_array_equal(gp, np.arange(25, dtype=float))
+    assert all(c["MIN"].dtype == np.float64 for c in chunks)
+
+
+def test_time_window_package_filter_and_row_cap(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    _write_log(log, 100)
+
+    df = load_feature_frame(
+        log,
+        ["GP"],
+        start=T0 + timedelta(seconds=10),
+        end=T0 + timedelta(seconds=20),
+        package_ids=["pkg_a"],
+    )
+    assert df["GP"].tolist() == [10.0, 12.0, 14.0, 16.0, 18.0]
+
+    assert len(load_feature_frame(log, ["GP"], max_rows=7)) == 7
+
+
+def test_missing_feature_reads_as_nan(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    _write_log(log, 3)
+
+    df = load_feature_frame(log, ["GP", "AST"])
+
+    assert df["AST"].isna().all()
+    assert df["GP"].tolist() == [0.0, 1.0, 2.0]
+
+
+def test_reservoir_sample_is_bounded_and_uniform(tmp_path):
+    log = tmp_path / "inference_log.jsonl"
+    _write_log(log, 2000)
+
+    sample = reservoir_sample_features(log, ["GP"], sample_size=200, chunk_size=128, seed=0)
+
+    assert len(sample["GP"]) == 200
+    assert len(np.unique(sample["GP"])) == 200
+    # uniform over [0, 2000): mean near 1000, both halves represented
+    assert 800 < sample["GP"].mean() < 1200
+    assert (sample["GP"] < 1000).sum() > 60 and (sample["GP"] >= 1000).sum() > 60
+
+    small = reservoir_sample_features(log, ["GP"], sample_size=5000)
+    assert len(small["GP"]) == 2000
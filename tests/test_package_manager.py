@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import app.main as main
+from app.batching import MicroBatcher
+from app.executor import InferenceExecutor
+from app.model_loader import load_model_package
+from app.package_manager import PackageManager
+from tests.conftest import _copy_package
+
+
+def test_latest_alias_swaps_to_new_package_and_runs_hooks(model_package_dir):
+    root = Path(model_package_dir).parent
+    manager = PackageManager(root / "latest")
+    swaps = []
+    manager.add_swap_hook(lambda new, old: swaps.append((new, old)))
+
+    assert manager.reload() is True
+    first = manager.current
+    assert first.package_dir == Path(model_package_dir)
+    assert swaps == [(first, None)]
+
+    # nothing changed: the watcher does not reload
+    assert manager.reload(force=False) is False
+
+    _copy_package(model_package_dir, "nba_model_20991231T000000Z")
+    assert manager.reload(force=False) is True
+    assert manager.current.manifest["package_id"] == "nba_model_20991231T000000Z"
+    assert swaps[-1] == (manager.current, first)
+
+    m = manager.get_metrics()
+    assert m["reload_count"] == 2
+    assert m["failed_reload_count"] == 0
+    assert "package_reload_duration_seconds_count 2" in manager.render_openmetrics()
+
+
+def test_broken_package_is_not_swapped_or_retried(model_package_dir):
+    root = Path(model_package_dir).parent
+    manager = PackageManager(root / "latest")
+    manager.reload()
+    good = manager.current
+
+    broken = _copy_package(model_package_dir, "nba_model_20991231T000000Z")
+    (broken / "model.joblib").unlink()
+
+    assert manager.reload(force=False) is False
+    assert manager.current is good
+    assert manager.get_metrics()["failed_reload_count"] == 1
+
+    # same broken fingerprint: skipped until the package changes again
+    assert manager.reload(force=False) is False
+    assert manager.get_metrics()["failed_reload_count"] == 1
+
+    with pytest.raises(FileNotFoundError, match="Model file not found"):
+        manager.reload()
+    assert manager.current is good
+
+
+def test_pin_and_unpin(model_package_dir):
+    root = Path(model_package_dir).parent
+    pinned_id = Path(model_package_dir).name
+    _copy_package(model_package_dir, "nba_model_20991231T000000Z")
+
+    manager = PackageManager(root / "latest")
+    manager.reload()
+    assert manager.current.manifest["package_id"] == "nba_model_20991231T000000Z"
+
+    assert manager.pin(pinned_id) is True
+    assert manager.current.package_dir == Path(model_package_dir)
+    # the watcher keeps the pinned package even though a newer one exists
+    assert manager.reload(force=False) is False
+
+    with pytest.raises(FileNotFoundError):
+        manager.pin("../elsewhere")
+    assert manager.pinned_package_id == pinned_id
+
+    manager.unpin()
+    assert manager.pinned_package_id is None
+    assert manager.current.manifest["package_id"] == "nba_model_20991231T000000Z"
+
+
+def test_requests_queued_across_a_swap_score_on_their_own_package(model_package_dir):
+    old = load_model_package(model_package_dir)
+    # threshold 0 makes every prediction 1: easy to tell which package scored
+    new = load_model_package(_copy_package(model_package_dir, "nba_model_20991231T000000Z", threshold=0.0))
+    row = {f: 1.0 for f in old.input_features}
+
+    # queued before the batcher runs, then the swap: both packages in one batch
+    batcher = MicroBatcher(max_batch_size=8, max_wait_ms=20)
+    futures = [batcher.submit(old, row), batcher.submit(new, row), batcher.submit(old, row)]
+    batcher.start()
+    try:
+        results = [fut.result(timeout=5) for fut in futures]
+    finally:
+        batcher.stop()
+    assert [r.threshold_used for r in results] == [old.threshold, 0.0, old.threshold]
+    assert results[1].prediction == 1
+
+    # a request that captured the old package reaches the pool after the swap
+    executor = InferenceExecutor(mode="process", max_workers=1)
+    executor.start(old.package_dir)
+    try:
+        executor.swap_package(new.package_dir)
+
+        async def score():
+            return await asyncio.gather(executor.predict_one(old, row), executor.predict_one(new, row))
+
+        from_old, from_new = asyncio.run(score())
+    finally:
+        executor.shutdown()
+    assert from_old == results[0]
+    assert from_new == results[1]
+
+
+def test_admin_reload_endpoint(model_package_dir, app_client, monkeypatch):
+    root = Path(model_package_dir).parent
+    _copy_package(model_package_dir, "nba_model_20991231T000000Z")
+
+    # the swap hook rebinds these globals; restore them afterwards
+    monkeypatch.setattr(main, "model_package", None)
+    monkeypatch.setattr(main, "drift_monitor", None)
+
+    manager = PackageManager(root / "latest")
+    manager.add_swap_hook(main._on_package_swap)
+    manager.reload()
+    monkeypatch.setattr(main, "package_manager", manager)
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    client = app_client
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    r = client.post("/admin/reload", json={"package_id": Path(model_package_dir).name}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["pinned_package_id"] == Path(model_package_dir).name
+    assert main.model_package is manager.current
+    assert client.get("/model-info").json()["package_id"] == Path(model_package_dir).name
+
+    r = client.post("/admin/reload", json={"package_id": "nba_model_missing"}, headers=headers)
+    assert r.status_code == 404
+
+    r = client.post("/admin/reload", json={"package_id": "latest"}, headers=headers)
+    assert r.status_code == 200
+    assert client.get("/model-info").json()["package_id"] == "nba_model_20991231T000000Z"
+
+    features = {f: 1.0 for f in main.model_package.input_features}
+    assert client.post("/predict", json={"features": features}).status_code == 200
+    assert client.get("/admin/package", headers=headers).json()["reload_count"] == 3
+
+
+def test_admin_routes_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    reloads = []
+    monkeypatch.setattr(main.package_manager, "reload", lambda *a, **k: reloads.append(1))
+
+    assert client.post("/admin/reload").status_code == 404
+    assert client.post("/admin/reload", json={"package_id": "latest"}).status_code == 404
+    assert client.get("/admin/package").status_code == 404
+    assert reloads == []
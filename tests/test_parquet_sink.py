@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pytest
+
+from app.monitoring.inference_logger import BufferedInferenceLogger
+from app.monitoring.parquet_sink import (
+    ParquetEventSink,
+    feature_columns,
+    read_inference_events,
+    read_inference_features,
+)
+from app.monitoring.prediction_monitor import PredictionMonitor
+
+
+T0 = datetime(2026, 3, 19, 10, 0, tzinfo=timezone.utc)
+FEATURES = ["GP", "MIN"]
+
+
+def _event(i: int, *, package_id: str = "pkg_a", minutes: int = 0) -> dict:
+    return {
+        "event_type": "single_inference",
+        "timestamp_utc": (T0 + timedelta(minutes=minutes)).isoformat(),
+        "request_id": str(i),
+        "package_id": package_id,
+        "threshold_used": 0.5,
+        "features": {"GP": float(i), "MIN": 20.0 + i},
+        "prediction": i % 2,
+        "probability": 0.1 * (i % 10),
+        "latency_ms": 1.0,
+        "status": "success",
+        "error_message": None,
+    }
+
+
+def test_sink_writes_flattened_typed_columns(tmp_path):
+    sink = ParquetEventSink(tmp_path / "events", features=FEATURES)
+    sink.write_events([_event(i) for i in range(5)])
+    sink.close()
+
+    table = read_inference_events(tmp_path / "events")
+
+    assert table.num_rows == 5
+    assert table.schema.field("feature__GP").type == pa.float64()
+    assert table.schema.field("timestamp_utc").type == pa.timestamp("us", tz="UTC")
+    assert table.column("feature__MIN").to_pylist() == [20.0, 21.0, 22.0, 23.0, 24.0]
+    assert list((tmp_path / "events").rglob("date=2026-03-19/hour=10/*.parquet"))
+
+
+def test_sink_rotates_on_rows_and_hour(tmp_path):
+    sink = ParquetEventSink(tmp_path / "events", features=FEATURES, max_rows_per_file=4)
+    for i in range(10):
+        sink.write_events([_event(i, minutes=i * 10)])  # crosses into hour 11
+    sink.close()
+
+    files = sorted((tmp_path / "events").rglob("*.parquet"))
+    assert sink.files_written == len(files) >= 3
+    assert {f.parent.name for f in files} == {"hour=10", "hour=11"}
+    assert read_inference_events(tmp_path / "events").num_rows == 10
+
+
+def test_unknown_feature_keys_are_counted_not_stored(tmp_path):
+    sink = ParquetEventSink(tmp_path / "events", features=FEATURES)
+    for i in range(5):
+        event = _event(i)
+        event["features"][f"bogus_{i}"] = 1.0
+        sink.write_events([event])
+    sink.close()
+
+    table = read_inference_events(tmp_path / "events")
+    assert sink.files_written == 1
+    assert feature_columns(table) == ["feature__GP", "feature__MIN"]
+    assert table.column("unexpected_feature_count").to_pylist() == [1] * 5
+    assert sink.get_metrics()["unexpected_features_dropped"] == 5
+
+    # a package swap changes the columns of the next file
+    sink.set_features(["GP", "PTS"])
+    sink.write_events([_event(5)])
+    sink.close()
+    assert sink.files_written == 2
+
+
+def test_open_file_is_invisible_until_rotated(tmp_path):
+    sink = ParquetEventSink(tmp_path / "events", features=FEATURES)
+    sink.write_events([_event(0)])
+
+    with pytest.raises(FileNotFoundError):
+        read_inference_events(tmp_path / "events")
+
+    sink.close()
+    assert read_inference_events(tmp_path / "events").num_rows == 1
+
+
+def test_reader_pushes_down_time_and_package_filters(tmp_path):
+    sink = ParquetEventSink(tmp_path / "events", features=FEATURES)
+    sink.write_events([_event(i, package_id="pkg_a", minutes=i) for i in range(10)])
+    sink.write_events([_event(i, package_id="pkg_b", minutes=i) for i in range(10)])
+    sink.close()
+
+    table = read_inference_events(
+        tmp_path / "events",
+        start=T0 + timedelta(minutes=2),
+        end=T0 + timedelta(minutes=5),
+        package_ids=["pkg_b"],
+    )
+
+    assert table.num_rows == 3
+    assert set(table.column("package_id").to_pylist()) == {"pkg_b"}
+
+
+def test_monitors_read_parquet_sink(tmp_path):
+    logger = BufferedInferenceLogger(
+        tmp_path / "inference.jsonl",
+        tmp_path / "failures.jsonl",
+        parquet_sink=ParquetEventSink(tmp_path / "events", features=FEATURES),
+        write_jsonl=False,
+    )
+    for i in range(20):
+        logger.log_event(_event(i))
+    logger.close()
+
+    assert not logger.log_path.exists()
+
+    preds = PredictionMonitor(str(tmp_path / "events")).load_predictions(package_ids=["pkg_a"])
+    assert len(preds) == 20
+    assert set(preds.columns) == {"prediction", "probability", "timestamp"}
+
+    features = read_inference_features(tmp_path / "events", ["GP", "MIN"])
+    assert list(features.columns) == ["GP", "MIN"]
+    assert features.shape == (20, 2)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import app.main as main
+from app.monitoring.data_reliability import DataReliabilityStore
+from app.prediction_cache import PredictionCache
+
+FEATURES = ["GP", "MIN", "PTS"]
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_and_ttl():
+    clock = _Clock()
+    cache = PredictionCache(max_entries=2, ttl_s=10, clock=clock)
+    keys = [cache.key("pkg", FEATURES, {"GP": i, "MIN": 1.0, "PTS": 2.0}) for i in range(3)]
+
+    cache.put(keys[0], "a")
+    cache.put(keys[1], "b")
+    assert cache.get(keys[0]) == "a"  # keys[1] is now least recently used
+    cache.put(keys[2], "c")
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == "c"
+
+    clock.now = 11.0
+    assert cache.get(keys[0]) is None
+
+    m = cache.get_metrics()
+    assert (m["hits"], m["misses"]) == (2, 2)
+    assert m["evictions"] == {"capacity": 1, "expired": 1, "invalidated": 0}
+    assert m["entries"] == 1
+
+
+def test_key_covers_package_order_and_quantization():
+    cache = PredictionCache()
+    row = {"GP": 60, "MIN": 28.5, "PTS": 12.0}
+
+    assert cache.key("a", FEATURES, row) == cache.key("a", FEATURES, {**row, "GP": 60.0})
+    assert cache.key("a", FEATURES, row) != cache.key("b", FEATURES, row)
+    assert cache.key("a", FEATURES, row) != cache.key("a", FEATURES[::-1], row)
+    assert cache.key("a", FEATURES, row) != cache.key("a", FEATURES, {**row, "MIN": 28.5000001})
+
+    rounded = PredictionCache(quantize_decimals=3)
+    assert rounded.key("a", FEATURES, row) == rounded.key("a", FEATURES, {**row, "MIN": 28.5000001})
+
+
+def test_predict_hits_cache_after_validation(client, monkeypatch):
+    pkg = main.model_package
+    cache = PredictionCache()
+    data_store = DataReliabilityStore()
+    monkeypatch.setattr(main, "prediction_cache", cache)
+    monkeypatch.setattr(main, "drift_monitor", None)
+    monkeypatch.setattr(main, "data_reliability_store", data_store)
+
+    calls = []
+    predict_one = main.inference_executor.predict_one
+
+    async def counting_predict_one(pkg, row):
+        calls.append(row)
+        return await predict_one(pkg, row)
+
+    monkeypatch.setattr(main.inference_executor, "predict_one", counting_predict_one)
+
+    row = {f: 1.0 for f in pkg.input_features}
+    first = client.post("/predict", json={"features": row})
+    second = client.post("/predict", json={"features": row})
+    invalid = client.post("/predict", json={"features": {"GP": 1.0}})
+
+    assert first.status_code == second.status_code == 200
+    assert invalid.status_code == 400
+    assert first.json() == second.json()
+    assert len(calls) == 1
+    assert cache.get_metrics()["hits"] == 1
+
+    main.bookkeeping.shutdown()
+    assert data_store.get_metrics()["total_payloads"] == 3
+
+    # a package swap drops every entry
+    main._on_package_swap(pkg, None)
+    assert len(cache) == 0
+    assert "nba_api_prediction_cache_lookups_total" in client.get("/metrics/prometheus").text
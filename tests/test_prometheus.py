@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pytest
+
+from app.monitoring.data_reliability import DataReliabilityStore
+from app.monitoring.metrics_store import MetricsStore
+from app.monitoring.prediction_reliability import PredictionReliabilityStore
+from app.monitoring.prometheus import Histogram, HistogramFamily, render_exposition
+
+
+SAMPLE = re.compile(r'^([a-z_]+)(\{[^}]*\})? (\S+)$')
+
+
+def _samples(text: str) -> dict:
+    out = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        m = SAMPLE.match(line)
+        assert m, line
+        out[m.group(1) + (m.group(2) or "")] = float(m.group(3))
+    return out
+
+
+def test_histogram_uses_le_buckets_and_renders_cumulative_counts():
+    hist = Histogram([1, 5, 10])
+    for v in (0.5, 1, 3, 10, 50):
+        hist.observe(v)
+
+    text = HistogramFamily("x", "x", [1, 5, 10]).render(hist._buffer)
+    s = _samples(text)
+
+    assert s['nba_api_x_bucket{le="1"}'] == 2
+    assert s['nba_api_x_bucket{le="5"}'] == 3
+    assert s['nba_api_x_bucket{le="10"}'] == 4
+    assert s['nba_api_x_bucket{le="+Inf"}'] == 5
+    assert s["nba_api_x_count"] == 5
+    assert s["nba_api_x_sum"] == 64.5
+
+
+def test_prediction_store_bulk_record_matches_per_row():
+    probabilities = np.array([0.05, 0.3, 0.3, 0.71, 0.99, 1.5, np.nan])
+    predictions = np.array([0, 0, 0, 1, 1, 1, 1])
+
+    bulk, per_row = PredictionReliabilityStore(), PredictionReliabilityStore()
+    bulk.record_predictions(predictions=predictions, probabilities=probabilities)
+    for y, p in zip(predictions.tolist(), probabilities.tolist()):
+        per_row.record_prediction(
+            prediction=y,
+            probability=p,
+            is_valid=bool(np.isfinite(p) and 0.0 <= p <= 1.0),
+        )
+
+    assert bulk.get_metrics() == per_row.get_metrics()
+    assert bulk.render_openmetrics() == per_row.render_openmetrics()
+
+
+def test_store_exposition():
+    metrics = MetricsStore()
+    predictions = PredictionReliabilityStore()
+    payloads = DataReliabilityStore()
+
+    metrics.record_request(latency_ms=3.0, success=True)
+    metrics.record_request(latency_ms=40.0, success=False, request_type="batch", n_rows=20)
+    predictions.record_prediction(prediction=1, probability=0.85, is_valid=True)
+    predictions.record_prediction(prediction=0, probability=0.15, is_valid=True)
+    predictions.record_prediction(prediction=7, probability=2.0, is_valid=False)
+    payloads.record_payload(is_valid=False, missing_count=2, invalid_value_count=1)
+
+    text = render_exposition([
+        metrics.render_openmetrics(),
+        predictions.render_openmetrics(),
+        payloads.render_openmetrics(),
+    ])
+    s = _samples(text)
+
+    assert text.endswith("# EOF\n")
+    assert s['nba_api_requests_total{status="error"}'] == 1
+    assert s["nba_api_batch_rows_total"] == 20
+    assert s['nba_api_request_duration_seconds_bucket{le="0.005"}'] == 1
+    assert s["nba_api_request_duration_seconds_sum"] == pytest.approx(0.043)
+    assert s['nba_api_batch_size_rows_bucket{le="25"}'] == 1
+    assert s['nba_api_predictions_total{outcome="invalid"}'] == 1
+    assert s['nba_api_prediction_probability_bucket{le="0.2"}'] == 1
+    assert s["nba_api_prediction_probability_count"] == 2
+    assert s['nba_api_schema_failures_total{kind="missing_count"}'] == 2
+    assert s['nba_api_schema_failures_total{kind="invalid_value_count"}'] == 1
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.monitoring.metrics_store import MetricsStore
+from app.monitoring.quantile_sketch import DDSketch, RingCounter, WindowedSketch
+
+
+def test_ddsketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(mean=1.0, sigma=1.0, size=50_000)
+    sketch = DDSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(float(v))
+
+    for q in (0.5, 0.9, 0.99, 0.999):
+        expected = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.02)
+
+    assert sketch.quantile(0.0) == values.min()
+    assert sketch.quantile(1.0) == values.max()
+    assert sketch.avg == pytest.approx(values.mean())
+
+
+def test_ddsketch_merge_equals_single_sketch():
+    values = np.random.default_rng(1).exponential(5.0, size=2000)
+    whole, a, b = DDSketch(), DDSketch(), DDSketch()
+    for i, v in enumerate(values):
+        whole.add(float(v))
+        (a if i % 2 else b).add(float(v))
+
+    a.merge(b)
+
+    np.testing.assert_array_equal(a.counts, whole.counts)
+    assert a.quantiles([0.5, 0.99]) == whole.quantiles([0.5, 0.99])
+
+    with pytest.raises(ValueError):
+        a.merge(DDSketch(relative_accuracy=0.05))
+
+
+def test_windowed_sketch_expires_old_slots():
+    window = WindowedSketch(window_s=60, n_slots=6)
+    window.add(100.0, now=1000.0)
+    window.add(1.0, now=1055.0)
+
+    assert window.snapshot(now=1055.0).count == 2
+    # the slot holding t=1000 has left the window
+    assert window.snapshot(now=1065.0).count == 1
+    assert window.snapshot(now=1065.0).quantile(0.5) == 1.0
+    assert window.snapshot(now=2000.0).count == 0
+
+
+def test_ring_counter_counts_last_window():
+    counter = RingCounter(window_s=60)
+    for t in range(0, 120):
+        counter.add(1, now=1000.0 + t)
+
+    assert counter.total(now=1119.0) == 60
+    assert counter.total(now=1150.0) == 29
+    assert counter.total(now=1500.0) == 0
+
+
+def test_metrics_store_reports_windowed_latency():
+    store = MetricsStore()
+    for i in range(1, 101):
+        store.record_request(latency_ms=float(i), success=i % 10 != 0)
+
+    m = store.get_metrics()
+
+    assert m["total_requests"] == 100
+    assert m["error_rate"] == 0.1
+    assert m["throughput_requests_per_min"] == 100
+    assert m["avg_latency_ms"] == pytest.approx(50.5)
+    assert m["p95_latency_ms"] == pytest.approx(95.0, rel=0.02)
+    assert set(m["latency_windows"]) == {"1m", "5m", "1h"}
+    assert m["latency_windows"]["1m"]["p999_ms"] == pytest.approx(100.0, rel=0.02)
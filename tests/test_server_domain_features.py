@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+import app.main as main
+from app.domain_features import DomainFeatureKernel
+from app.model_loader import load_model_package
+from ml.feature_pipeline.domain_features import (
+    DomainFeatureConfig,
+    add_domain_features,
+    serving_feature_spec,
+)
+from ml.model_pipeline.build_pipeline import build_feature_pipeline
+from ml.packaging.package_model import create_model_package
+
+RAW_COLS = ["GP", "MIN", "PTS", "FGM", "FGA", "3PA", "FTM", "FTA", "OREB", "DREB", "REB", "AST", "TOV"]
+MODEL_FEATURES = ["GP", "MIN", "PTS", "PTS_per_MIN", "Usage_proxy", "OREB_share", "AST_to_TOV"]
+
+
+def _raw_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({c: rng.uniform(0, 20, size=n) for c in RAW_COLS})
+    df.loc[::7, ["MIN", "REB", "TOV"]] = 0.0  # eps-guarded divisions
+    df["TARGET_5Yrs"] = (df["MIN"] > 10).astype(int)
+    return df
+
+
+@pytest.fixture
+def domain_package_dir(tmp_path):
+    df = add_domain_features(_raw_frame(200), DomainFeatureConfig())
+
+    skew_path = tmp_path / "skewness_report.csv"
+    pd.DataFrame(
+        [{"feature": f, "skewness": 0.0, "zero_ratio": 0.0, "category": "test", "suggestion": "none"}
+         for f in MODEL_FEATURES]
+    ).to_csv(skew_path, index=False)
+    feature_pipeline, _ = build_feature_pipeline(
+        selected_features=MODEL_FEATURES,
+        X_train=df[MODEL_FEATURES],
+        eng_cfg={"skewness_report_path": str(skew_path), "scaler": "standard"},
+    )
+    pipeline = Pipeline(
+        [("features", feature_pipeline), ("model", RandomForestClassifier(n_estimators=10, random_state=0))]
+    ).fit(df[MODEL_FEATURES], df["TARGET_5Yrs"])
+
+    model_path = tmp_path / "model.joblib"
+    joblib.dump(pipeline, model_path)
+    info = create_model_package(
+        package_root=tmp_path / "packages",
+        model_path=model_path,
+        threshold=0.5,
+        features=MODEL_FEATURES,
+        target_col="TARGET_5Yrs",
+        metrics={},
+        cfg_path=tmp_path / "model.yaml",
+        reference_df=df[MODEL_FEATURES],
+        feature_spec=serving_feature_spec(MODEL_FEATURES, DomainFeatureConfig()),
+    )
+    return info["package_dir"]
+
+
+def test_kernel_matches_training_features_bit_for_bit():
+    raw = _raw_frame(300, seed=3)
+    kernel = DomainFeatureKernel(MODEL_FEATURES, serving_feature_spec(MODEL_FEATURES, DomainFeatureConfig()))
+
+    assert kernel.domain_features == ["PTS_per_MIN", "Usage_proxy", "AST_to_TOV", "OREB_share"]
+    assert set(kernel.input_features) == {"GP", "MIN", "PTS", "FGA", "FTA", "TOV", "AST", "OREB", "REB"}
+
+    expected = add_domain_features(raw, DomainFeatureConfig())[MODEL_FEATURES].to_numpy()
+    got = kernel.expand(raw[kernel.input_features].to_numpy())
+
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_package_scores_raw_inputs_like_precomputed_features(domain_package_dir):
+    pkg = load_model_package(domain_package_dir)
+    raw = _raw_frame(50, seed=5)
+    engineered = add_domain_features(raw, DomainFeatureConfig())[MODEL_FEATURES]
+
+    assert pkg.input_features != pkg.features
+    expected = pkg.model.predict_proba(engineered)[:, 1]
+
+    X_raw = raw[pkg.input_features].to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(pkg.predict_proba_matrix(X_raw), expected)
+    np.testing.assert_array_equal(pkg.predict_proba(raw[pkg.input_features]), expected)
+    assert pkg.compiled.predict_proba_row(raw[pkg.input_features].iloc[0].to_dict()) == expected[0]
+
+
+def test_predict_endpoint_takes_raw_stats(domain_package_dir, app_client, monkeypatch):
+    pkg = load_model_package(domain_package_dir)
+    monkeypatch.setattr(main, "model_package", pkg)
+    client = app_client
+
+    raw = _raw_frame(5, seed=7)[pkg.input_features]
+    r = client.post("/predict", json={"features": raw.iloc[0].to_dict()})
+    assert r.status_code == 200
+
+    # clients that already send the model's engineered features keep working
+    engineered = [pkg.domain_features.expand_row(row) for row in raw.to_dict(orient="records")]
+    r_engineered = client.post("/predict", json={"features": engineered[0]})
+    assert r_engineered.status_code == 200
+    assert r_engineered.json() == r.json()
+
+    batch = client.post("/predict_batch", json={"rows": engineered}).json()
+    raw_batch = client.post("/predict_batch", json={"rows": raw.to_dict(orient="records")}).json()
+    assert batch == raw_batch
+    columnar = client.post("/predict_batch/columnar", json={f: [row[f] for row in engineered] for f in pkg.features})
+    assert columnar.json()["probability"] == [p["probability"] for p in raw_batch["predictions"]]
+
+    # neither every raw input nor every model feature
+    partial = {f: v for f, v in engineered[0].items() if f != "PTS_per_MIN"}
+    r = client.post("/predict", json={"features": partial})
+    assert r.status_code == 400
+    assert "Missing features" in r.json()["detail"]
+
+    info = client.get("/model-info").json()
+    assert info["input_features"] == pkg.input_features
+    assert info["domain_features"] == pkg.domain_features.domain_features
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+
+import pytest
+
+from app.monitoring.data_reliability import DataReliabilityStore
+from app.monitoring.metrics_store import MetricsStore
+from app.monitoring.prediction_reliability import PredictionReliabilityStore
+from app.monitoring.shared_memory import SharedStripes
+
+
+def _worker(shared_dir: str, n: int, latency_ms: float) -> None:
+    metrics = MetricsStore(shared_dir=shared_dir)
+    predictions = PredictionReliabilityStore(shared_dir=shared_dir)
+    payloads = DataReliabilityStore(shared_dir=shared_dir)
+
+    for i in range(n):
+        metrics.record_request(latency_ms=latency_ms, success=True)
+        predictions.record_prediction(prediction=i % 2, probability=0.5, is_valid=True)
+        payloads.record_payload(is_valid=i % 4 != 0, missing_count=1)
+
+
+def test_any_worker_reports_cluster_wide_metrics(tmp_path):
+    shared_dir = str(tmp_path / "metrics")
+    # the scraping "worker" stays alive for the whole generation
+    metrics = MetricsStore(shared_dir=shared_dir)
+    predictions = PredictionReliabilityStore(shared_dir=shared_dir)
+    payloads = DataReliabilityStore(shared_dir=shared_dir)
+    metrics.record_request(latency_ms=1.0, success=False)
+
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_worker, args=(shared_dir, 100, 10.0 * (k + 1))) for k in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    m = metrics.get_metrics()
+    assert m["total_requests"] == 301
+    assert m["error_rate"] == round(1 / 301, 4)
+    assert m["throughput_requests_per_min"] == 301
+    assert m["latency_windows"]["1m"]["p50_ms"] == pytest.approx(20.0, rel=0.02)
+    assert metrics.get_latency_sketch("5m").count == 301
+
+    assert predictions.get_metrics()["total_predictions"] == 300
+    assert predictions.get_metrics()["positive_prediction_rate"] == 0.5
+    assert payloads.total_payloads == 300
+    assert payloads.invalid_payload_count == 75
+    assert payloads.total_missing_features == 300
+
+
+def test_stripe_of_dead_worker_is_reused_and_new_generation_resets(tmp_path):
+    path = tmp_path / "counters.bin"
+
+    ctx = mp.get_context("spawn")
+    p = ctx.Process(target=_worker, args=(str(tmp_path), 10, 1.0))
+    p.start()
+    p.join(timeout=60)
+
+    # every owner is gone: a new generation starts from zero
+    assert DataReliabilityStore(shared_dir=tmp_path).total_payloads == 0
+
+    stripes = SharedStripes(path, length=4, n_stripes=2)
+    stripes.local[0] += 5
+    again = SharedStripes(path, length=4, n_stripes=2)
+
+    # same process: same stripe
+    assert again.stripe == stripes.stripe
+    assert again.rows()[:, 0].sum() == 5
+
+
+def test_layout_change_with_live_owner_is_rejected(tmp_path):
+    path = tmp_path / "counters.bin"
+    SharedStripes(path, length=4, n_stripes=2)
+
+    with pytest.raises(RuntimeError):
+        SharedStripes(path, length=8, n_stripes=2)
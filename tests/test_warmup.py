@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import app.main as main
+from app.model_loader import load_model_package
+from app.package_manager import PackageManager
+from app.warmup import synthetic_matrix, warm_up
+
+
+def test_synthetic_rows_follow_training_quantiles(model_package_dir):
+    pkg = load_model_package(model_package_dir)
+    X = synthetic_matrix(pkg, 500)
+
+    assert X.shape == (500, len(pkg.input_features))
+    for j, f in enumerate(pkg.input_features):
+        q = pkg.reference_sketches[f].quantiles
+        assert q[1] <= X[:, j].min() and X[:, j].max() <= q[99]
+
+
+def test_warm_up_records_latencies_per_path_and_batch_size(model_package_dir):
+    pkg = load_model_package(model_package_dir)
+    report = warm_up(pkg, batch_sizes=(1, 16), rounds=2)
+
+    d = report.to_dict()
+    assert set(d["latencies_ms"]) == {"predict_one", "predict_batch", "predict_matrix"}
+    assert set(d["latencies_ms"]["predict_batch"]) == {"1", "16"}
+    assert all(len(runs) == 2 for runs in report.latencies_ms["predict_matrix"].values())
+    assert 'path="predict_batch",batch_size="16",run="first"' in report.render_openmetrics()
+
+
+def test_warm_up_rejects_non_finite_output(model_package_dir, monkeypatch):
+    pkg = load_model_package(model_package_dir)
+    monkeypatch.setattr(pkg, "compiled", None)
+    monkeypatch.setattr(pkg, "predict_proba", lambda X: np.full(len(X), np.nan))
+
+    with pytest.raises(ValueError, match="invalid probabilities"):
+        warm_up(pkg, batch_sizes=(4,), rounds=1)
+
+
+def test_ready_flips_after_startup_warm_up(model_package_dir, app_client, monkeypatch):
+    manager = PackageManager(model_package_dir, warmup=main._warm_up)
+    manager.add_swap_hook(main._on_package_swap)
+    monkeypatch.setattr(main, "package_manager", manager)
+    monkeypatch.setattr(main, "model_package", None)
+    monkeypatch.setattr(main, "drift_monitor", None)
+    monkeypatch.setattr(main, "PACKAGE_WATCH_INTERVAL_S", 0)
+
+    assert app_client.get("/ready").status_code == 503
+
+    with app_client as client:
+        r = client.get("/ready")
+        assert r.status_code == 200
+        body = r.json()
+        assert body["package_id"] == manager.current.manifest["package_id"]
+        assert "predict_one" in body["warmup"]["latencies_ms"]
+        assert "nba_api_model_warmup_latency_seconds" in client.get("/metrics/prometheus").text
+
+    assert main.startup_complete is False